@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.api.dependencies_runtime_v2 import get_admin_user, get_db
+from app.api.perf import get_perf_profile, get_perf_snapshot, reset_perf_stats
 from app.models.models import Channel, ensure_channel_parser_profile_column
 from app.schemas.admin_models import (
     ChannelSampleResponse,
@@ -22,6 +23,7 @@ from app.schemas.admin_models import (
     LinkCheckTaskStatus,
 )
 from app.services.channel_service import fetch_channel_message_samples
+from app.services.link_check.rate_limiter import get_netdisk_rate_limit_snapshot
 from app.services.link_check_plan_service import (
     create_link_check_plan,
     delete_link_check_plan,
@@ -327,6 +329,63 @@ async def get_active_link_check_task_api(
     return LinkCheckTaskStatus(task_id=task_id, **status_data)
 
 
+@router.get(
+    "/link-check/rate-limits",
+    summary="获取网盘请求限速统计",
+)
+async def get_netdisk_rate_limits_api(
+    current_user: Dict[str, Any] = Depends(get_admin_user),
+) -> Dict[str, Any]:
+    del current_user
+
+    return get_netdisk_rate_limit_snapshot()
+
+
+@router.get(
+    "/perf",
+    summary="获取接口性能统计",
+)
+async def get_perf_stats_api(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: Dict[str, Any] = Depends(get_admin_user),
+) -> Dict[str, Any]:
+    del current_user
+
+    return get_perf_snapshot(limit=limit)
+
+
+@router.get(
+    "/perf/profiles/{profile_id}",
+    summary="获取抽样 profile 报告",
+)
+async def get_perf_profile_api(
+    profile_id: int,
+    current_user: Dict[str, Any] = Depends(get_admin_user),
+) -> Dict[str, Any]:
+    del current_user
+
+    profile = get_perf_profile(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"profile {profile_id} 不存在",
+        )
+    return profile
+
+
+@router.delete(
+    "/perf",
+    summary="重置接口性能统计",
+)
+async def reset_perf_stats_api(
+    current_user: Dict[str, Any] = Depends(get_admin_user),
+) -> Dict[str, Any]:
+    del current_user
+
+    reset_perf_stats()
+    return {"message": "性能统计已重置"}
+
+
 @router.post(
     "/link-check/tasks/{task_id}/stop",
     response_model=LinkCheckTaskStatus,
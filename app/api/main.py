@@ -6,11 +6,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.models.config import settings
 from app.api import admin, admin_accounts_runtime, admin_ai_center, admin_backups, admin_extras_runtime, admin_pan_transfer, admin_resource_ops, admin_statistics, auth_runtime_v2, messages_runtime, resource_ops_public, statistics
-from app.api import admin_security, security
+from app.api import admin_security, metrics, perf, security
 from app.schemas.admin_models import PublicSystemConfigResponse
 from app.services.account_service import bootstrap_account_storage
 from app.services.backup_scheduler import start_backup_scheduler, stop_backup_scheduler
 from app.services.dedup_scheduler import start_dedup_scheduler, stop_dedup_scheduler
+from app.services.link_check.engine import stop_link_check_engine
+from app.services.message_link_columns import start_message_link_backfill, stop_message_link_backfill
 from app.services.system_config_service import get_public_system_config_values
 import logging
 
@@ -46,6 +48,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 请求耗时指标（API_METRICS_ENABLED 开启后生效）
+app.middleware("http")(metrics.record_request_metrics)
+# 请求级性能统计：路由耗时、SQL 次数/耗时、响应大小与抽样 profile
+app.middleware("http")(perf.record_request_perf)
+
 # 注册路由
 app.include_router(auth_runtime_v2.router)
 app.include_router(messages_runtime.router)
@@ -61,19 +68,25 @@ app.include_router(admin_resource_ops.router)
 app.include_router(admin_statistics.router)
 app.include_router(security.router)
 app.include_router(resource_ops_public.router)
+app.include_router(metrics.router)
 
 
 @app.on_event("startup")
 async def startup_runtime_services() -> None:
     bootstrap_account_storage()
-    start_backup_scheduler()
-    start_dedup_scheduler()
+    # 备份/去重/链接列回填默认由 worker 的选主调度器执行；仅在未部署 worker 时开启
+    if settings.API_EMBEDDED_SCHEDULERS_ENABLED:
+        start_backup_scheduler()
+        start_dedup_scheduler()
+        start_message_link_backfill()
 
 
 @app.on_event("shutdown")
 async def shutdown_runtime_services() -> None:
     stop_backup_scheduler()
     stop_dedup_scheduler()
+    stop_message_link_backfill()
+    stop_link_check_engine()
 
 
 @app.get("/", summary="API 根路径")
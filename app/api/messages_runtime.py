@@ -4,10 +4,15 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.dependencies_runtime_v2 import get_db, get_optional_current_user
+from app.api.response_cache import (
+    RESPONSE_CACHE_TTL_MESSAGES_SECONDS,
+    RESPONSE_CACHE_TTL_TAG_STATS_SECONDS,
+    cached_json_response,
+)
 from app.models.models import MessageLinkRef
 from app.schemas.message import MessageListResponse, MessageResponse, TagStatsResponse
 from app.services.message_query_service import (
@@ -114,7 +119,7 @@ async def get_messages(
     page_size: int = Query(100, ge=1, le=200, description="每页数量"),
     db: Session = Depends(get_db),
     current_user: Optional[Dict[str, Any]] = Depends(get_optional_current_user),
-) -> MessageListResponse:
+) -> Response:
     _ensure_public_access_allowed(current_user, "需要登录后才能访问消息列表")
 
     if _is_public_guest(current_user):
@@ -132,42 +137,61 @@ async def get_messages(
             detail=str(exc),
         ) from exc
 
-    try:
-        messages, total, max_page = get_filtered_messages(
-            db=db,
-            search_query=search_query,
-            sort_mode=sort_mode,
-            time_range=time_range,
-            selected_tags=selected_tags or [],
-            selected_netdisks=selected_netdisks or [],
-            min_content_length=min_content_length,
-            has_links_only=has_links_only,
-            page=page,
-            page_size=page_size,
-        )
-
-        tracked_by_message = _load_tracked_links_for_message_ids(
-            db,
-            message_ids=[int(message.id) for message in messages if getattr(message, "id", None) is not None],
-        )
-
-        return MessageListResponse(
-            messages=[
-                _build_message_response(message, tracked_by_message.get(int(message.id)))
-                for message in messages
-            ],
-            total=total,
-            page=page,
-            page_size=page_size,
-            max_page=max_page,
-        )
-    except HTTPException:
-        raise
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"获取消息列表失败: {exc}",
-        ) from exc
+    def build() -> MessageListResponse:
+        try:
+            messages, total, max_page = get_filtered_messages(
+                db=db,
+                search_query=search_query,
+                sort_mode=sort_mode,
+                time_range=time_range,
+                selected_tags=selected_tags or [],
+                selected_netdisks=selected_netdisks or [],
+                min_content_length=min_content_length,
+                has_links_only=has_links_only,
+                page=page,
+                page_size=page_size,
+            )
+
+            tracked_by_message = _load_tracked_links_for_message_ids(
+                db,
+                message_ids=[int(message.id) for message in messages if getattr(message, "id", None) is not None],
+            )
+
+            return MessageListResponse(
+                messages=[
+                    _build_message_response(message, tracked_by_message.get(int(message.id)))
+                    for message in messages
+                ],
+                total=total,
+                page=page,
+                page_size=page_size,
+                max_page=max_page,
+            )
+        except HTTPException:
+            raise
+        except Exception as exc:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"获取消息列表失败: {exc}",
+            ) from exc
+
+    return await cached_json_response(
+        request,
+        namespace="messages.list",
+        params={
+            "sort_mode": sort_mode,
+            "search_query": search_query,
+            "time_range": time_range,
+            "selected_tags": selected_tags or [],
+            "selected_netdisks": selected_netdisks or [],
+            "min_content_length": min_content_length,
+            "has_links_only": has_links_only,
+            "page": page,
+            "page_size": page_size,
+        },
+        ttl_seconds=RESPONSE_CACHE_TTL_MESSAGES_SECONDS,
+        compute=build,
+    )
 
 
 @router.get("/{message_id}", response_model=MessageResponse, summary="获取单条消息详情")
@@ -201,23 +225,34 @@ async def get_message(
 
 @router.get("/tags/stats", response_model=List[TagStatsResponse], summary="获取标签统计")
 async def get_tags_stats(
+    request: Request,
     limit: int = Query(50, ge=1, le=100, description="返回的标签数量限制"),
     db: Session = Depends(get_db),
     current_user: Optional[Dict[str, Any]] = Depends(get_optional_current_user),
-) -> List[TagStatsResponse]:
+) -> Response:
     _ensure_public_access_allowed(current_user, "需要登录后才能访问标签统计")
-
-    try:
-        tag_stats = get_tag_stats(
-            db,
-            limit=limit,
-            since=_get_public_dashboard_cutoff() if _is_public_guest(current_user) else None,
-        )
-        return [TagStatsResponse(tag=tag, count=count) for tag, count in tag_stats]
-    except HTTPException:
-        raise
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"获取标签统计失败: {exc}",
-        ) from exc
+    public_guest = _is_public_guest(current_user)
+
+    def build() -> List[TagStatsResponse]:
+        try:
+            tag_stats = get_tag_stats(
+                db,
+                limit=limit,
+                since=_get_public_dashboard_cutoff() if public_guest else None,
+            )
+            return [TagStatsResponse(tag=tag, count=count) for tag, count in tag_stats]
+        except HTTPException:
+            raise
+        except Exception as exc:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"获取标签统计失败: {exc}",
+            ) from exc
+
+    return await cached_json_response(
+        request,
+        namespace="messages.tag_stats",
+        params={"limit": limit, "public_guest": public_guest},
+        ttl_seconds=RESPONSE_CACHE_TTL_TAG_STATS_SECONDS,
+        compute=build,
+    )
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import hmac
+import time
+from typing import Awaitable, Callable
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, MetricsRegistry
+from app.models.config import settings
+
+
+api_metrics = MetricsRegistry()
+_request_seconds = api_metrics.histogram(
+    "tg_api_request_seconds",
+    "API request latency by route template.",
+    ("method", "route", "status"),
+)
+_request_latency = api_metrics.summary(
+    "tg_api_request_latency_seconds",
+    "Recent API request latency quantiles by route template.",
+    ("route",),
+)
+_requests_in_flight = {"value": 0}
+
+router = APIRouter(tags=["metrics"])
+
+
+def _route_template(request: Request) -> str:
+    route = request.scope.get("route")
+    path = getattr(route, "path", None)
+    return str(path) if path else "__unmatched__"
+
+
+def _render_in_flight() -> list[str]:
+    return [
+        "# HELP tg_api_requests_in_flight API requests currently being served.",
+        "# TYPE tg_api_requests_in_flight gauge",
+        f"tg_api_requests_in_flight {_requests_in_flight['value']}",
+    ]
+
+
+api_metrics.register_collector(_render_in_flight)
+
+
+async def record_request_metrics(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    if not bool(getattr(settings, "API_METRICS_ENABLED", False)):
+        return await call_next(request)
+
+    started_at = time.perf_counter()
+    status_code = 500
+    _requests_in_flight["value"] += 1
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        _requests_in_flight["value"] -= 1
+        elapsed = time.perf_counter() - started_at
+        route = _route_template(request)
+        _request_seconds.observe(elapsed, method=request.method, route=route, status=str(status_code))
+        _request_latency.observe(elapsed, route=route)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request) -> Response:
+    if not bool(getattr(settings, "API_METRICS_ENABLED", False)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    token = str(getattr(settings, "METRICS_AUTH_TOKEN", "") or "")
+    if token:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, token):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+    return Response(content=api_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
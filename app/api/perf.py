@@ -0,0 +1,393 @@
+"""Per-route latency, SQL accounting and sampled profiles for the API process."""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.api.metrics import api_metrics
+from app.models.config import settings
+from app.models.db import engine_async
+from app.models.models import engine
+
+try:
+    from pyinstrument import Profiler as _PyinstrumentProfiler  # type: ignore
+except ImportError:  # pragma: no cover - optional profiler
+    _PyinstrumentProfiler = None
+
+
+logger = logging.getLogger(__name__)
+
+PERF_MAX_ROUTES = 500
+PERF_MAX_STATEMENTS = 500
+PERF_ROUTE_WINDOW_SIZE = 256
+PERF_MAX_PROFILES = 20
+PERF_PROFILE_TOP_FUNCTIONS = 40
+PERF_STATEMENT_PREVIEW_CHARS = 600
+BACKGROUND_ROUTE = "-"
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_BIND_LIST_PATTERN = re.compile(r"(?:%\(\w+\)s(?:,\s*)?){2,}|(?:\$\d+(?:,\s*)?){2,}")
+_NUMBER_LITERAL_PATTERN = re.compile(r"\b\d+\b")
+
+_sql_statements_per_request = api_metrics.histogram(
+    "tg_api_request_sql_statements",
+    "SQL statements executed per API request.",
+    ("route",),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 1000),
+)
+_sql_seconds_per_request = api_metrics.histogram(
+    "tg_api_request_sql_seconds",
+    "Time spent in SQL per API request.",
+    ("route",),
+)
+_response_bytes = api_metrics.histogram(
+    "tg_api_response_bytes",
+    "API response body size.",
+    ("route",),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+
+@dataclass(slots=True)
+class _RequestPerf:
+    request: Request
+    route: str = BACKGROUND_ROUTE
+    sql_count: int = 0
+    sql_seconds: float = 0.0
+
+
+@dataclass(slots=True)
+class _RouteStats:
+    count: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    sql_count: int = 0
+    sql_seconds: float = 0.0
+    max_sql_count: int = 0
+    response_bytes: int = 0
+    last_seen_at: Optional[datetime] = None
+    recent: Deque[float] = field(default_factory=lambda: deque(maxlen=PERF_ROUTE_WINDOW_SIZE))
+
+
+@dataclass(slots=True)
+class _StatementStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    slow_count: int = 0
+    last_route: str = BACKGROUND_ROUTE
+    last_seen_at: Optional[datetime] = None
+
+
+_current_request: ContextVar[Optional[_RequestPerf]] = ContextVar("api_perf_request", default=None)
+
+
+def _utc_now() -> datetime:
+    return datetime.utcnow()
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse whitespace, expanded IN lists and literals so repeats share a key."""
+    normalized = _WHITESPACE_PATTERN.sub(" ", str(statement or "")).strip()
+    normalized = _BIND_LIST_PATTERN.sub("?, ", normalized)
+    normalized = _NUMBER_LITERAL_PATTERN.sub("?", normalized)
+    return normalized[:PERF_STATEMENT_PREVIEW_CHARS]
+
+
+def _route_key(request: Request) -> str:
+    route = request.scope.get("route")
+    path = getattr(route, "path", None)
+    return f"{request.method} {path or '__unmatched__'}"
+
+
+def _percentile(values: List[float], quantile: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(quantile * len(ordered))) - 1))]
+
+
+class PerfRecorder:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: Dict[str, _RouteStats] = {}
+        self._statements: Dict[str, _StatementStats] = {}
+        self._profiles: Deque[Dict[str, Any]] = deque(maxlen=PERF_MAX_PROFILES)
+        self._profile_lock = threading.Lock()
+        self._profile_sequence = 0
+        self._started_at = _utc_now()
+
+    def record_statement(self, statement: str, seconds: float) -> None:
+        request_perf = _current_request.get()
+        if request_perf is not None:
+            request_perf.sql_count += 1
+            request_perf.sql_seconds += seconds
+        key = normalize_statement(statement)
+        slow_threshold = float(getattr(settings, "API_PERF_SLOW_QUERY_MS", 200) or 0) / 1000.0
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= PERF_MAX_STATEMENTS:
+                    cheapest = min(self._statements, key=lambda item: self._statements[item].total_seconds)
+                    self._statements.pop(cheapest, None)
+                stats = self._statements[key] = _StatementStats()
+            stats.count += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            if slow_threshold and seconds >= slow_threshold:
+                stats.slow_count += 1
+            stats.last_route = _route_key(request_perf.request) if request_perf is not None else BACKGROUND_ROUTE
+            stats.last_seen_at = _utc_now()
+
+    def record_request(self, request_perf: _RequestPerf, *, seconds: float, status_code: int, response_bytes: int) -> None:
+        with self._lock:
+            stats = self._routes.get(request_perf.route)
+            if stats is None:
+                if len(self._routes) >= PERF_MAX_ROUTES:
+                    return
+                stats = self._routes[request_perf.route] = _RouteStats()
+            stats.count += 1
+            if status_code >= 500:
+                stats.errors += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.sql_count += request_perf.sql_count
+            stats.sql_seconds += request_perf.sql_seconds
+            stats.max_sql_count = max(stats.max_sql_count, request_perf.sql_count)
+            stats.response_bytes += response_bytes
+            stats.last_seen_at = _utc_now()
+            stats.recent.append(seconds)
+
+    def add_profile(self, *, route: str, seconds: float, engine_name: str, report: str) -> None:
+        with self._lock:
+            self._profile_sequence += 1
+            self._profiles.appendleft(
+                {
+                    "id": self._profile_sequence,
+                    "route": route,
+                    "elapsed_ms": round(seconds * 1000, 2),
+                    "engine": engine_name,
+                    "captured_at": _utc_now().isoformat(),
+                    "report": report,
+                }
+            )
+
+    def try_begin_profile(self) -> bool:
+        return self._profile_lock.acquire(blocking=False)
+
+    def end_profile(self) -> None:
+        self._profile_lock.release()
+
+    def get_profile(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return next((dict(item) for item in self._profiles if item["id"] == profile_id), None)
+
+    def snapshot(self, *, limit: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            routes = [(route, stats, list(stats.recent)) for route, stats in self._routes.items()]
+            statements = list(self._statements.items())
+            profiles = [{key: value for key, value in item.items() if key != "report"} for item in self._profiles]
+
+        route_rows = []
+        for route, stats, recent in routes:
+            count = max(1, stats.count)
+            route_rows.append(
+                {
+                    "route": route,
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "avg_ms": round(stats.total_seconds / count * 1000, 2),
+                    "p50_ms": round(_percentile(recent, 0.5) * 1000, 2),
+                    "p95_ms": round(_percentile(recent, 0.95) * 1000, 2),
+                    "max_ms": round(stats.max_seconds * 1000, 2),
+                    "avg_sql_count": round(stats.sql_count / count, 2),
+                    "max_sql_count": stats.max_sql_count,
+                    "avg_sql_ms": round(stats.sql_seconds / count * 1000, 2),
+                    "avg_response_bytes": int(stats.response_bytes / count),
+                    "last_seen_at": stats.last_seen_at.isoformat() if stats.last_seen_at else None,
+                }
+            )
+        route_rows.sort(key=lambda row: (row["p95_ms"], row["avg_ms"]), reverse=True)
+
+        statement_rows = [
+            {
+                "statement": statement,
+                "count": stats.count,
+                "total_ms": round(stats.total_seconds * 1000, 2),
+                "avg_ms": round(stats.total_seconds / max(1, stats.count) * 1000, 2),
+                "max_ms": round(stats.max_seconds * 1000, 2),
+                "slow_count": stats.slow_count,
+                "last_route": stats.last_route,
+                "last_seen_at": stats.last_seen_at.isoformat() if stats.last_seen_at else None,
+            }
+            for statement, stats in statements
+        ]
+        statement_rows.sort(key=lambda row: row["total_ms"], reverse=True)
+
+        return {
+            "enabled": bool(getattr(settings, "API_PERF_ENABLED", True)),
+            "profiler_enabled": bool(getattr(settings, "API_PROFILER_ENABLED", False)),
+            "profiler_engine": "pyinstrument" if _PyinstrumentProfiler is not None else "cprofile",
+            "collecting_since": self._started_at.isoformat(),
+            "routes": route_rows[: max(1, int(limit))],
+            "statements": statement_rows[: max(1, int(limit))],
+            "profiles": profiles,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._statements.clear()
+            self._profiles.clear()
+            self._started_at = _utc_now()
+
+
+perf_recorder = PerfRecorder()
+_sql_hooks_installed: set[int] = set()
+
+
+def install_sql_hooks(target: Engine) -> None:
+    if id(target) in _sql_hooks_installed:
+        return
+    _sql_hooks_installed.add(id(target))
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # type: ignore[no-untyped-def]
+        del cursor, statement, parameters, context, executemany
+        conn.info.setdefault("perf_query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # type: ignore[no-untyped-def]
+        del cursor, parameters, context, executemany
+        started = conn.info.get("perf_query_started_at")
+        if not started:
+            return
+        perf_recorder.record_statement(statement, time.perf_counter() - started.pop())
+
+
+install_sql_hooks(engine)
+# Queries made through ``async_session`` run their cursor events on the
+# wrapped sync engine, so hooking it counts them toward the request too.
+install_sql_hooks(engine_async.sync_engine)
+
+
+def _should_profile() -> bool:
+    if not bool(getattr(settings, "API_PROFILER_ENABLED", False)):
+        return False
+    sample_rate = float(getattr(settings, "API_PROFILER_SAMPLE_RATE", 0.01) or 0.0)
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def _render_cprofile(profiler: cProfile.Profile) -> str:
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PERF_PROFILE_TOP_FUNCTIONS)
+    return buffer.getvalue()
+
+
+async def _call_with_profile(
+    request: Request,
+    call_next: Callable[[Request], Awaitable[Response]],
+) -> tuple[Response, Optional[Callable[[], tuple[str, str]]]]:
+    """Run the request under pyinstrument, or cProfile when it is not installed.
+
+    cProfile only sees the event loop thread, so sync endpoints that run in
+    the threadpool show up as time spent awaiting the pool.
+    """
+    if _PyinstrumentProfiler is not None:
+        profiler = _PyinstrumentProfiler(async_mode="enabled")
+        profiler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            profiler.stop()
+        return response, lambda: ("pyinstrument", profiler.output_text(unicode=True, color=False))
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        response = await call_next(request)
+    finally:
+        profiler.disable()
+    return response, lambda: ("cprofile", _render_cprofile(profiler))
+
+
+async def record_request_perf(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    if not bool(getattr(settings, "API_PERF_ENABLED", True)):
+        return await call_next(request)
+
+    request_perf = _RequestPerf(request=request)
+    token = _current_request.set(request_perf)
+    started_at = time.perf_counter()
+    status_code = 500
+    response_bytes = 0
+    render_profile: Optional[Callable[[], tuple[str, str]]] = None
+    profiling = _should_profile() and perf_recorder.try_begin_profile()
+    try:
+        if profiling:
+            response, render_profile = await _call_with_profile(request, call_next)
+        else:
+            response = await call_next(request)
+        status_code = response.status_code
+        response_bytes = int(response.headers.get("content-length") or 0)
+        return response
+    finally:
+        if profiling:
+            perf_recorder.end_profile()
+        _current_request.reset(token)
+        elapsed = time.perf_counter() - started_at
+        request_perf.route = _route_key(request)
+        perf_recorder.record_request(request_perf, seconds=elapsed, status_code=status_code, response_bytes=response_bytes)
+        _sql_statements_per_request.observe(request_perf.sql_count, route=request_perf.route)
+        _sql_seconds_per_request.observe(request_perf.sql_seconds, route=request_perf.route)
+        if response_bytes:
+            _response_bytes.observe(response_bytes, route=request_perf.route)
+
+        min_profile_seconds = float(getattr(settings, "API_PROFILER_MIN_DURATION_MS", 200) or 0) / 1000.0
+        if render_profile is not None and elapsed >= min_profile_seconds:
+            try:
+                engine_name, report = render_profile()
+                perf_recorder.add_profile(route=request_perf.route, seconds=elapsed, engine_name=engine_name, report=report)
+            except Exception:
+                logger.exception("Failed to render request profile")
+
+        slow_request_seconds = float(getattr(settings, "API_PERF_SLOW_REQUEST_MS", 1000) or 0) / 1000.0
+        if slow_request_seconds and elapsed >= slow_request_seconds:
+            logger.warning(
+                "slow_request route=%s status=%s elapsed_ms=%.1f sql_count=%s sql_ms=%.1f bytes=%s",
+                request_perf.route,
+                status_code,
+                elapsed * 1000,
+                request_perf.sql_count,
+                request_perf.sql_seconds * 1000,
+                response_bytes,
+            )
+
+
+def get_perf_snapshot(*, limit: int = 20) -> Dict[str, Any]:
+    return perf_recorder.snapshot(limit=limit)
+
+
+def get_perf_profile(profile_id: int) -> Optional[Dict[str, Any]]:
+    return perf_recorder.get_profile(profile_id)
+
+
+def reset_perf_stats() -> None:
+    perf_recorder.reset()
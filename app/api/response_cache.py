@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.models.config import settings
+from app.models.models import engine
+from app.services.response_cache_versions import (
+    RESPONSE_CACHE_SCOPE_MESSAGES,
+    load_response_cache_versions,
+    register_response_cache_listener,
+)
+
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_TTL_MESSAGES_SECONDS = 15
+RESPONSE_CACHE_TTL_TAG_STATS_SECONDS = 60
+RESPONSE_CACHE_TTL_STATISTICS_SECONDS = 30
+
+
+@dataclass(slots=True)
+class _CachedBody:
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+def _normalize_params(params: dict[str, Any]) -> str:
+    normalized: dict[str, Any] = {}
+    for key, value in params.items():
+        if isinstance(value, (list, tuple, set)):
+            value = sorted(str(item) for item in value)
+        normalized[key] = value
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _encode_body(payload: Any) -> bytes:
+    # Same encoding FastAPI's JSONResponse uses, so cached and uncached bodies match.
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _etag_matches(header_value: Optional[str], etag: str) -> bool:
+    if not header_value:
+        return False
+    for candidate in header_value.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _load_versions() -> dict[str, int]:
+    with Session(engine) as session:
+        return load_response_cache_versions(session)
+
+
+class ResponseCache:
+    """Per-process cache for read-mostly JSON endpoints.
+
+    Keys carry the data version of their scope, so a bump from any process
+    makes older entries unreachable. Concurrent misses on one key share a
+    single computation.
+    """
+
+    def __init__(self, *, max_entries: int, version_probe_seconds: float) -> None:
+        self._max_entries = max(1, int(max_entries))
+        self._version_probe_seconds = max(0.0, float(version_probe_seconds))
+        self._entries: OrderedDict[tuple[Any, ...], _CachedBody] = OrderedDict()
+        self._entries_lock = threading.Lock()
+        self._inflight: dict[tuple[Any, ...], asyncio.Future] = {}
+        self._versions: dict[str, int] = {}
+        self._versions_checked_at = float("-inf")
+        self._local_generation = 0
+        self._probe_lock = asyncio.Lock()
+
+    def invalidate(self, scope: str | None = None) -> None:
+        with self._entries_lock:
+            self._local_generation += 1
+            self._entries.clear()
+
+    async def _scope_version(self, scope: str) -> tuple[int, int]:
+        if time.monotonic() - self._versions_checked_at >= self._version_probe_seconds:
+            async with self._probe_lock:
+                if time.monotonic() - self._versions_checked_at >= self._version_probe_seconds:
+                    try:
+                        self._versions = await run_in_threadpool(_load_versions)
+                    except Exception:
+                        logger.warning("Failed to load response cache versions", exc_info=True)
+                    self._versions_checked_at = time.monotonic()
+        return self._versions.get(scope, 0), self._local_generation
+
+    def _lookup(self, key: tuple[Any, ...]) -> _CachedBody | None:
+        with self._entries_lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: tuple[Any, ...], entry: _CachedBody) -> None:
+        with self._entries_lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_compute(
+        self,
+        *,
+        namespace: str,
+        params: dict[str, Any],
+        ttl_seconds: float,
+        compute: Callable[[], Any],
+        scope: str = RESPONSE_CACHE_SCOPE_MESSAGES,
+    ) -> tuple[_CachedBody, bool]:
+        key = (namespace, *await self._scope_version(scope), _normalize_params(params))
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry, True
+
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            body = _encode_body(await run_in_threadpool(compute))
+            entry = _CachedBody(
+                body=body,
+                etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+                expires_at=time.monotonic() + max(0.0, float(ttl_seconds)),
+            )
+            self._store(key, entry)
+            future.set_result(entry)
+            return entry, False
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception retrieved when nobody else was waiting on it.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+
+response_cache = ResponseCache(
+    max_entries=int(getattr(settings, "RESPONSE_CACHE_MAX_ENTRIES", 512)),
+    version_probe_seconds=float(getattr(settings, "RESPONSE_CACHE_VERSION_PROBE_SECONDS", 2.0)),
+)
+register_response_cache_listener(response_cache.invalidate)
+
+
+async def cached_json_response(
+    request: Request,
+    *,
+    namespace: str,
+    params: dict[str, Any],
+    ttl_seconds: float,
+    compute: Callable[[], Any],
+) -> Response:
+    if not bool(getattr(settings, "RESPONSE_CACHE_ENABLED", True)):
+        return Response(content=_encode_body(compute()), media_type="application/json")
+
+    entry, hit = await response_cache.get_or_compute(
+        namespace=namespace,
+        params=params,
+        ttl_seconds=ttl_seconds,
+        compute=compute,
+    )
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": "private, no-cache",
+        "X-Cache": "HIT" if hit else "MISS",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.dependencies_runtime_v2 import get_db, get_optional_current_user
+from app.api.response_cache import RESPONSE_CACHE_TTL_STATISTICS_SECONDS, cached_json_response
 from app.schemas.statistics import (
     ActivityHeatmapCell,
     ActivityHeatmapResponse,
@@ -44,111 +45,161 @@ def _is_public_guest(current_user: Optional[Dict[str, Any]]) -> bool:
 
 @router.get("/overview", response_model=StatisticsOverview, summary="获取总体统计")
 async def get_overview(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: Optional[Dict[str, Any]] = Depends(get_optional_current_user),
-) -> StatisticsOverview:
+) -> Response:
     _ensure_public_access_allowed(current_user)
 
-    try:
-        stats = get_statistics_overview(db)
-        return StatisticsOverview(
-            total_messages=stats["total_messages"],
-            today_messages=stats["today_messages"],
-            total_links=stats["total_links"],
-        )
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"获取总体统计失败: {exc}",
-        ) from exc
+    def build() -> StatisticsOverview:
+        try:
+            stats = get_statistics_overview(db)
+            return StatisticsOverview(
+                total_messages=stats["total_messages"],
+                today_messages=stats["today_messages"],
+                total_links=stats["total_links"],
+            )
+        except Exception as exc:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"获取总体统计失败: {exc}",
+            ) from exc
+
+    return await cached_json_response(
+        request,
+        namespace="statistics.overview",
+        params={},
+        ttl_seconds=RESPONSE_CACHE_TTL_STATISTICS_SECONDS,
+        compute=build,
+    )
 
 
 @router.get("/daily-trend", response_model=DailyTrendResponse, summary="获取最近趋势")
 async def get_daily_trend_api(
+    request: Request,
     days: int = Query(10, ge=1, le=30, description="天数（1-30）"),
     db: Session = Depends(get_db),
     current_user: Optional[Dict[str, Any]] = Depends(get_optional_current_user),
-) -> DailyTrendResponse:
+) -> Response:
     _ensure_public_access_allowed(current_user)
 
     if _is_public_guest(current_user):
         days = min(days, 1)
 
-    try:
-        trend_data = get_daily_trend(db, days=days)
-        return DailyTrendResponse(days=[DailyTrendItem(**item) for item in trend_data])
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"获取每日趋势失败: {exc}",
-        ) from exc
+    def build() -> DailyTrendResponse:
+        try:
+            trend_data = get_daily_trend(db, days=days)
+            return DailyTrendResponse(days=[DailyTrendItem(**item) for item in trend_data])
+        except Exception as exc:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"获取每日趋势失败: {exc}",
+            ) from exc
+
+    return await cached_json_response(
+        request,
+        namespace="statistics.daily_trend",
+        params={"days": days},
+        ttl_seconds=RESPONSE_CACHE_TTL_STATISTICS_SECONDS,
+        compute=build,
+    )
 
 
 @router.get("/dedup-stats", response_model=DedupStatsResponse, summary="获取去重统计")
 async def get_dedup_stats_api(
+    request: Request,
     hours: int = Query(10, ge=1, le=24, description="小时数（1-24）"),
     db: Session = Depends(get_db),
     current_user: Optional[Dict[str, Any]] = Depends(get_optional_current_user),
-) -> DedupStatsResponse:
+) -> Response:
     _ensure_public_access_allowed(current_user)
 
     if _is_public_guest(current_user):
         hours = min(hours, 24)
 
-    try:
-        stats_data = get_dedup_stats(db, hours=hours)
-        return DedupStatsResponse(hours=[DedupStatsItem(**item) for item in stats_data])
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"获取去重统计失败: {exc}",
-        ) from exc
+    def build() -> DedupStatsResponse:
+        try:
+            stats_data = get_dedup_stats(db, hours=hours)
+            return DedupStatsResponse(hours=[DedupStatsItem(**item) for item in stats_data])
+        except Exception as exc:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"获取去重统计失败: {exc}",
+            ) from exc
+
+    return await cached_json_response(
+        request,
+        namespace="statistics.dedup_stats",
+        params={"hours": hours},
+        ttl_seconds=RESPONSE_CACHE_TTL_STATISTICS_SECONDS,
+        compute=build,
+    )
 
 
 @router.get("/netdisk-distribution", response_model=NetdiskDistributionResponse, summary="获取网盘分布")
 async def get_netdisk_distribution_api(
+    request: Request,
     hours: int = Query(24, ge=1, le=168, description="小时数（1-168）"),
     db: Session = Depends(get_db),
     current_user: Optional[Dict[str, Any]] = Depends(get_optional_current_user),
-) -> NetdiskDistributionResponse:
+) -> Response:
     _ensure_public_access_allowed(current_user)
 
     if _is_public_guest(current_user):
         hours = min(hours, 24)
 
-    try:
-        distribution_data = get_netdisk_distribution(db, hours=hours)
-        return NetdiskDistributionResponse(
-            distribution=[NetdiskDistributionItem(**item) for item in distribution_data]
-        )
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"获取网盘分布失败: {exc}",
-        ) from exc
+    def build() -> NetdiskDistributionResponse:
+        try:
+            distribution_data = get_netdisk_distribution(db, hours=hours)
+            return NetdiskDistributionResponse(
+                distribution=[NetdiskDistributionItem(**item) for item in distribution_data]
+            )
+        except Exception as exc:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"获取网盘分布失败: {exc}",
+            ) from exc
+
+    return await cached_json_response(
+        request,
+        namespace="statistics.netdisk_distribution",
+        params={"hours": hours},
+        ttl_seconds=RESPONSE_CACHE_TTL_STATISTICS_SECONDS,
+        compute=build,
+    )
 
 
 @router.get("/activity-heatmap", response_model=ActivityHeatmapResponse, summary="获取活跃热力图")
 async def get_activity_heatmap_api(
+    request: Request,
     days: int = Query(7, ge=3, le=14, description="天数（3-14）"),
     db: Session = Depends(get_db),
     current_user: Optional[Dict[str, Any]] = Depends(get_optional_current_user),
-) -> ActivityHeatmapResponse:
+) -> Response:
     _ensure_public_access_allowed(current_user)
 
     if _is_public_guest(current_user):
         days = min(days, 7)
 
-    try:
-        heatmap_data = get_activity_heatmap(db, days=days)
-        return ActivityHeatmapResponse(
-            dates=heatmap_data["dates"],
-            hours=heatmap_data["hours"],
-            cells=[ActivityHeatmapCell(**item) for item in heatmap_data["cells"]],
-            max_count=heatmap_data["max_count"],
-        )
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"获取活跃热力图失败: {exc}",
-        ) from exc
+    def build() -> ActivityHeatmapResponse:
+        try:
+            heatmap_data = get_activity_heatmap(db, days=days)
+            return ActivityHeatmapResponse(
+                dates=heatmap_data["dates"],
+                hours=heatmap_data["hours"],
+                cells=[ActivityHeatmapCell(**item) for item in heatmap_data["cells"]],
+                max_count=heatmap_data["max_count"],
+            )
+        except Exception as exc:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"获取活跃热力图失败: {exc}",
+            ) from exc
+
+    return await cached_json_response(
+        request,
+        namespace="statistics.activity_heatmap",
+        params={"days": days},
+        ttl_seconds=RESPONSE_CACHE_TTL_STATISTICS_SECONDS,
+        compute=build,
+    )
@@ -0,0 +1,288 @@
+"""Minimal Prometheus text-format instruments shared by the API, worker and monitor."""
+
+from __future__ import annotations
+
+import abc
+import logging
+import math
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DELAY_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 3600.0, 21600.0, 86400.0)
+SUMMARY_QUANTILES = (0.5, 0.9, 0.99)
+SUMMARY_WINDOW_SIZE = 1024
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+_LabelKey = Tuple[str, ...]
+
+
+def sanitize_metric_name(name: str) -> str:
+    sanitized = _INVALID_NAME_CHARS.sub("_", str(name))
+    return sanitized if not sanitized[:1].isdigit() else f"_{sanitized}"
+
+
+def counter_metric_name(name: str) -> str:
+    """Counter family name; HELP, TYPE and samples all use the ``_total`` form."""
+    sanitized = sanitize_metric_name(name)
+    return sanitized if sanitized.endswith("_total") else f"{sanitized}_total"
+
+
+def _escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Dict[str, str] | None = None) -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    for name, value in (extra or {}).items():
+        pairs.append(f'{name}="{_escape_label_value(value)}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(abc.ABC):
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        self.name = sanitize_metric_name(name)
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> _LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+
+    @abc.abstractmethod
+    def render(self) -> List[str]:
+        """Exposition lines for this metric, starting with its HELP/TYPE header."""
+
+
+class CounterMetric(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(counter_metric_name(name), documentation, label_names)
+        self._values: Dict[_LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + float(amount)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class HistogramMetric(_Metric):
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        self._series: Dict[_LabelKey, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        value = float(value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[key] = series
+            counts, total = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._series.items())
+        lines = self._header()
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, {"le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            base_labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{base_labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{base_labels} {cumulative}")
+        return lines
+
+
+class SummaryMetric(_Metric):
+    """Count, sum and quantiles over the most recent ``window_size`` observations."""
+
+    metric_type = "summary"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        window_size: int = SUMMARY_WINDOW_SIZE,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self._window_size = max(1, int(window_size))
+        self._series: Dict[_LabelKey, Tuple[deque, List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = (deque(maxlen=self._window_size), [0.0, 0.0])
+                self._series[key] = series
+            window, totals = series
+            window.append(float(value))
+            totals[0] += 1
+            totals[1] += float(value)
+
+    def quantiles(self, **labels: str) -> Dict[float, float]:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            values = sorted(series[0]) if series else []
+        return self._quantiles(values)
+
+    @staticmethod
+    def _quantiles(values: List[float]) -> Dict[float, float]:
+        if not values:
+            return {quantile: math.nan for quantile in SUMMARY_QUANTILES}
+        return {
+            quantile: values[min(len(values) - 1, int(math.ceil(quantile * len(values))) - 1)]
+            for quantile in SUMMARY_QUANTILES
+        }
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (sorted(window), list(totals))) for key, (window, totals) in self._series.items())
+        lines = self._header()
+        for key, (values, (count, total)) in items:
+            for quantile, value in self._quantiles(values).items():
+                labels = _format_labels(self.label_names, key, {"quantile": str(quantile)})
+                lines.append(f"{self.name}{labels} {'NaN' if math.isnan(value) else _format_value(value)}")
+            base_labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{base_labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{base_labels} {_format_value(count)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> CounterMetric:
+        return self._register(CounterMetric(name, documentation, label_names))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> HistogramMetric:
+        return self._register(HistogramMetric(name, documentation, label_names, buckets))  # type: ignore[return-value]
+
+    def summary(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> SummaryMetric:
+        return self._register(SummaryMetric(name, documentation, label_names))  # type: ignore[return-value]
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """Add a callable that renders extra exposition lines on every scrape."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                lines.extend(collector())
+            except Exception:
+                logger.exception("Metrics collector failed")
+        return "\n".join(lines) + "\n"
+
+
+def start_metrics_http_server(registry: MetricsRegistry, *, host: str, port: int) -> ThreadingHTTPServer | None:
+    """Serve ``registry`` at ``/metrics`` from a daemon thread; port 0 disables it."""
+    if int(port or 0) <= 0:
+        return None
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            if self.path.split("?", 1)[0] not in {"/metrics", "/"}:
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002 - http.server signature
+            del format, args
+
+    try:
+        server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    except OSError:
+        logger.exception("Failed to start metrics endpoint on %s:%s", host, port)
+        return None
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True, name=f"metrics-http-{port}")
+    thread.start()
+    logger.info("Metrics endpoint listening on %s:%s/metrics", host, port)
+    return server
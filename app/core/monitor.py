@@ -4,6 +4,7 @@ import asyncio
 import datetime
 import logging
 import sys
+import time
 import warnings
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
@@ -11,6 +12,8 @@ from typing import Any, Dict, List, Tuple
 from telethon import TelegramClient, events
 from sqlalchemy.orm import Session
 
+from app.core.metrics import start_metrics_http_server
+from app.core.monitor_catchup import RecentMessageKeys, run_monitor_catchup
 from app.core.monitor_observability import MonitorMetrics, log_monitor_event
 from app.core.monitor_parser import parse_message_content, parse_message_records
 from app.models.config import settings
@@ -26,6 +29,9 @@ from app.services.resource_ops import (
 from app.services.channel_daily_stats_service import (
     accumulate_channel_daily_stats_for_message_ids,
 )
+from app.services.dedup_runtime_service import IngestDedupPlan, delete_duplicate_messages, plan_ingest_dedup
+from app.services.message_hourly_stats_service import accumulate_message_hourly_stats_for_message_ids
+from app.services.response_cache_versions import bump_response_cache_version
 from app.services.system_config_service import get_monitor_runtime_config
 
 warnings.filterwarnings(
@@ -36,6 +42,7 @@ warnings.filterwarnings(
 logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL, "INFO"))
 logger = logging.getLogger(__name__)
 monitor_metrics = MonitorMetrics(logger)
+recent_message_keys = RecentMessageKeys()
 
 FAILED_MESSAGES_LOG = Path("data/failed_messages.log")
 ERROR_MESSAGES_LOG = Path("data/error_messages.log")
@@ -133,6 +140,7 @@ async def refresh_channel_mapping(force: bool = False) -> bool:
 
 async def channel_refresh_loop() -> None:
     """定时刷新频道映射。"""
+    was_connected = True
     while True:
         try:
             monitor_runtime_config = get_monitor_runtime_config()
@@ -141,6 +149,11 @@ async def channel_refresh_loop() -> None:
                 int(monitor_runtime_config["monitor_channel_refresh_interval_seconds"] or 60),
             )
             await asyncio.sleep(interval_seconds)
+            # Telethon reconnects on its own; a drop seen here means posts may have been missed.
+            is_connected = client.is_connected()
+            if is_connected and not was_connected:
+                schedule_catchup()
+            was_connected = is_connected
             await refresh_channel_mapping()
         except Exception as refresh_error:
             monitor_metrics.record_failure("channel_refresh", error=str(refresh_error))
@@ -173,11 +186,15 @@ async def parse_message(
 
 
 
-def get_event_channel_id(event: Any) -> int | None:
-    peer_id = getattr(getattr(event, "message", None), "peer_id", None)
+def get_message_chat_id(message: Any) -> int | None:
+    peer_id = getattr(message, "peer_id", None)
     return getattr(peer_id, "channel_id", None) or getattr(peer_id, "chat_id", None)
 
 
+def get_event_channel_id(event: Any) -> int | None:
+    return get_message_chat_id(getattr(event, "message", None))
+
+
 
 def get_channel_name_by_id(chat_id: int | None) -> str | None:
     """根据聊天 ID 获取频道名称。"""
@@ -205,13 +222,28 @@ def _append_local_log(path: Path, content: str) -> None:
 
 @client.on(events.NewMessage())
 async def handler(event: Any) -> None:
+    await ingest_telegram_message(event.message)
+
+
+async def ingest_telegram_message(message: Any, *, source: str = "live") -> None:
+    """Parse one Telegram post and write its records; shared by live events and catch-up."""
+    started_at = time.perf_counter()
+    handled = await _ingest_telegram_message(message, source=source)
+    if handled is not False:
+        monitor_metrics.observe_stage("total", time.perf_counter() - started_at, source=source)
+
+
+async def _ingest_telegram_message(message: Any, *, source: str) -> bool | None:
     try:
-        incoming_chat_id = get_event_channel_id(event)
+        incoming_chat_id = get_message_chat_id(message)
         if incoming_chat_id is None or incoming_chat_id not in channel_ids:
             monitor_metrics.increment("messages_skipped_unmonitored")
-            return
+            return False
+        if not recent_message_keys.claim(incoming_chat_id, getattr(message, "id", None)):
+            monitor_metrics.increment("messages_skipped_seen")
+            return False
 
-        chat = await event.get_chat()
+        chat = await message.get_chat()
         channel_name = get_channel_name_by_id(incoming_chat_id)
         if not channel_name:
             await refresh_channel_mapping(force=True)
@@ -221,10 +253,11 @@ async def handler(event: Any) -> None:
                 print(f"[DEBUG] 无法获取频道名称，ID: {incoming_chat_id}")
                 return
 
-        message_text = event.raw_text or ""
-        telegram_local_time = _to_local_telegram_time(event.date)
+        message_text = message.raw_text or ""
+        telegram_local_time = _to_local_telegram_time(message.date)
         monitor_time = datetime.datetime.now()
         delay_seconds = (monitor_time - telegram_local_time).total_seconds()
+        monitor_metrics.observe_delay(delay_seconds, source=source)
         channel_runtime_info = channel_info.get(channel_name) or {}
         chat_title = getattr(chat, "title", None) or channel_runtime_info.get("title") or channel_name or "Unknown"
 
@@ -235,13 +268,15 @@ async def handler(event: Any) -> None:
 
         try:
             parser_profile = (channel_info.get(channel_name) or {}).get("parser_profile")
+            parse_started_at = time.perf_counter()
             parsed_records, diagnostics = await parse_message_records(
                 message_text,
-                msg_obj=event.message,
+                msg_obj=message,
                 channel_name=channel_name,
                 channel_id=incoming_chat_id,
                 parser_profile=parser_profile,
             )
+            monitor_metrics.observe_stage("parse", time.perf_counter() - parse_started_at, source=source)
             parsed_records = [record for record in parsed_records if record.get("links")]
             monitor_metrics.record_parse(diagnostics, has_links=bool(parsed_records))
         except Exception as parse_error:
@@ -291,6 +326,7 @@ async def handler(event: Any) -> None:
         retry_delay_seconds = float(monitor_runtime_config["monitor_db_write_retry_delay_seconds"] or 1.0)
         for attempt in range(max_retries):
             try:
+                write_started_at = time.perf_counter()
                 async with async_session() as session:
                     try:
                         created_messages: list[Message] = []
@@ -298,8 +334,29 @@ async def handler(event: Any) -> None:
                         monitor_chat_id = int(incoming_chat_id) if incoming_chat_id is not None else None
                         monitor_channel_key = str(channel_runtime_info.get("channel_key") or channel_name or "").strip() or None
                         monitor_channel_title = str(chat_title).strip() or None
-                        monitor_message_id = getattr(event.message, "id", None)
-                        for parsed_data in parsed_records:
+                        monitor_message_id = getattr(message, "id", None)
+                        ingest_dedup_plan = IngestDedupPlan()
+                        dedup_started_at = time.perf_counter()
+                        try:
+                            async with session.begin_nested():
+                                ingest_dedup_plan = await session.run_sync(
+                                    lambda sync_session: plan_ingest_dedup(
+                                        sync_session,
+                                        [(telegram_local_time, record.get("links")) for record in parsed_records],
+                                    )
+                                )
+                        except Exception as ingest_dedup_error:
+                            log_monitor_event(
+                                logger,
+                                "ingest_dedup_check_failed",
+                                level=logging.WARNING,
+                                channel=channel_name,
+                                error=str(ingest_dedup_error),
+                            )
+                        monitor_metrics.observe_stage("dedup_check", time.perf_counter() - dedup_started_at, source=source)
+                        for position, parsed_data in enumerate(parsed_records):
+                            if position in ingest_dedup_plan.skipped_positions:
+                                continue
                             new_message = Message(
                                 timestamp=telegram_local_time,
                                 monitor_channel_config_id=int(monitor_channel_config_id) if monitor_channel_config_id else None,
@@ -319,11 +376,17 @@ async def handler(event: Any) -> None:
                             if getattr(new_message, "id", None) is not None
                         ]
                         if new_message_ids:
+                            link_ref_started_at = time.perf_counter()
                             try:
                                 async with session.begin_nested():
                                     await session.run_sync(
                                         lambda sync_session: ensure_message_link_refs_for_message_ids(sync_session, new_message_ids)
                                     )
+                                monitor_metrics.observe_stage(
+                                    "link_ref_sync",
+                                    time.perf_counter() - link_ref_started_at,
+                                    source=source,
+                                )
                             except Exception as resource_index_error:
                                 log_monitor_event(
                                     logger,
@@ -337,6 +400,7 @@ async def handler(event: Any) -> None:
                                     f"[{monitor_time}] 资源索引即时同步失败，已保留消息入库，将由读取修复/手动补录兜底: "
                                     f"{resource_index_error}"
                                 )
+                        stats_started_at = time.perf_counter()
                         if new_message_ids:
                             try:
                                 async with session.begin_nested():
@@ -359,23 +423,87 @@ async def handler(event: Any) -> None:
                                     f"[{monitor_time}] channel_daily_stats 鍚屾澶辫触锛屼絾涓嶄細褰卞搷娑堟伅鍏ュ簱: "
                                     f"{channel_daily_stats_error}"
                                 )
+                            try:
+                                async with session.begin_nested():
+                                    await session.run_sync(
+                                        lambda sync_session: accumulate_message_hourly_stats_for_message_ids(
+                                            sync_session,
+                                            new_message_ids,
+                                        )
+                                    )
+                            except Exception as hourly_stats_error:
+                                log_monitor_event(
+                                    logger,
+                                    "message_hourly_stats_sync_failed",
+                                    level=logging.WARNING,
+                                    channel=channel_name,
+                                    error=str(hourly_stats_error),
+                                    affected_messages=len(new_message_ids),
+                                )
+                        if new_message_ids:
+                            monitor_metrics.observe_stage("stats_sync", time.perf_counter() - stats_started_at, source=source)
+                        # Runs after the hourly accumulate: the rebuild of the superseded
+                        # rows' hours re-reads messages, which already include the new rows.
+                        superseded_count = 0
+                        if new_message_ids and ingest_dedup_plan.superseded_message_ids:
+                            try:
+                                async with session.begin_nested():
+                                    superseded_count = await session.run_sync(
+                                        lambda sync_session: delete_duplicate_messages(
+                                            sync_session,
+                                            ingest_dedup_plan.superseded_message_ids,
+                                        )
+                                    )
+                            except Exception as ingest_dedup_error:
+                                log_monitor_event(
+                                    logger,
+                                    "ingest_dedup_delete_failed",
+                                    level=logging.WARNING,
+                                    channel=channel_name,
+                                    error=str(ingest_dedup_error),
+                                    affected_messages=len(ingest_dedup_plan.superseded_message_ids),
+                                )
+                        if new_message_ids:
+                            try:
+                                async with session.begin_nested():
+                                    await session.run_sync(bump_response_cache_version)
+                            except Exception as cache_version_error:
+                                log_monitor_event(
+                                    logger,
+                                    "response_cache_version_bump_failed",
+                                    level=logging.WARNING,
+                                    channel=channel_name,
+                                    error=str(cache_version_error),
+                                )
                         await session.commit()
                     except Exception:
                         await session.rollback()
                         raise
 
-                monitor_metrics.increment("messages_saved", len(parsed_records))
+                monitor_metrics.observe_stage("db_write", time.perf_counter() - write_started_at, source=source)
+
+                saved_count = len(parsed_records) - len(ingest_dedup_plan.skipped_positions)
+                monitor_metrics.increment("messages_saved", saved_count)
+                if source != "live":
+                    monitor_metrics.increment(f"{source}_messages_saved", saved_count)
+                if ingest_dedup_plan.skipped_positions:
+                    monitor_metrics.increment("messages_skipped_duplicate", len(ingest_dedup_plan.skipped_positions))
+                if superseded_count:
+                    monitor_metrics.increment("messages_superseded_duplicate", superseded_count)
                 log_monitor_event(
                     logger,
                     "message_saved",
                     channel=channel_name,
+                    source=source,
                     delay_seconds=f"{delay_seconds:.1f}",
                     netdisk_types=",".join(saved_netdisk_types),
-                    saved_records=len(parsed_records),
+                    saved_records=saved_count,
+                    skipped_duplicates=len(ingest_dedup_plan.skipped_positions),
+                    superseded_duplicates=superseded_count,
                 )
                 print(
                     f"[{monitor_time}] 新消息已保存到数据库 "
-                    f"(尝试 {attempt + 1}/{max_retries}, 共 {len(parsed_records)} 条, 延迟: {delay_seconds:.1f}秒)"
+                    f"(尝试 {attempt + 1}/{max_retries}, 共 {saved_count} 条, 延迟: {delay_seconds:.1f}秒)"
                 )
                 break
             except Exception as db_error:
@@ -401,7 +529,7 @@ async def handler(event: Any) -> None:
         monitor_metrics.record_failure("handler", error=str(exc))
         log_monitor_event(logger, "handler_error", level=logging.WARNING, error=str(exc))
         print(f"[{datetime.datetime.now()}] 消息处理发生未知错误: {exc}")
-        raw_text = getattr(event, "raw_text", "") or ""
+        raw_text = getattr(message, "raw_text", "") or ""
         _append_local_log(
             ERROR_MESSAGES_LOG,
             f"[{datetime.datetime.now()}] error={exc} message={raw_text[:500]}\n",
@@ -411,12 +539,41 @@ async def handler(event: Any) -> None:
 print(f"✅ 正在监听 Telegram 频道：{len(channel_usernames)} 个频道...")
 
 
+_catchup_task: asyncio.Task | None = None
+
+
+async def _run_catchup() -> None:
+    try:
+        summary = await run_monitor_catchup(
+            client,
+            list(channel_ids),
+            ingest=ingest_telegram_message,
+            metrics=monitor_metrics,
+            logger=logger,
+        )
+        print(f"[{datetime.datetime.now()}] catch-up finished: {summary}")
+    except Exception as exc:
+        monitor_metrics.record_failure("catchup", error=str(exc))
+
+
+def schedule_catchup() -> bool:
+    """Start a catch-up pass in the background unless one is already running."""
+    global _catchup_task
+    if not bool(getattr(settings, "MONITOR_CATCHUP_ENABLED", True)):
+        return False
+    if _catchup_task is not None and not _catchup_task.done():
+        return False
+    _catchup_task = client.loop.create_task(_run_catchup())
+    return True
+
+
 @client.on(events.Raw)
 async def connection_handler(event: Any) -> None:
     """监控连接状态。"""
     if hasattr(event, "connected"):
         if event.connected:
             print(f"[{datetime.datetime.now()}] ✅ Telegram连接已建立")
+            schedule_catchup()
         else:
             print(f"[{datetime.datetime.now()}] ❌ Telegram连接已断开")
 
@@ -426,11 +583,18 @@ if __name__ == "__main__":
         client.start()
         print(f"[{datetime.datetime.now()}] ✅ 监控服务启动成功")
 
+        start_metrics_http_server(
+            monitor_metrics.registry,
+            host=str(getattr(settings, "MONITOR_METRICS_HOST", "0.0.0.0") or "0.0.0.0"),
+            port=int(getattr(settings, "MONITOR_METRICS_PORT", 0) or 0),
+        )
+
         loop = client.loop
         print("🔍 正在构建频道ID映射...")
         loop.run_until_complete(refresh_channel_mapping(force=True))
         loop.create_task(channel_refresh_loop())
         print(f"✅ 频道ID映射构建完成: {len(channel_ids)} 个频道")
+        schedule_catchup()
 
         client.run_until_disconnected()
     except Exception as exc:
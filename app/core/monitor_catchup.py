@@ -0,0 +1,201 @@
+"""Catch-up of posts missed while the monitor was offline or disconnected."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable
+
+from sqlalchemy import func, select
+from telethon import TelegramClient
+from telethon.errors import FloodWaitError
+from telethon.tl.types import PeerChannel
+
+from app.core.monitor_observability import MonitorMetrics, log_monitor_event
+from app.models.config import settings
+from app.models.db import async_session
+from app.models.models import Message
+
+
+IngestMessage = Callable[..., Awaitable[None]]
+
+CATCHUP_MAX_FLOOD_RETRIES = 5
+
+
+class FloodWaitLimiter:
+    """Bound concurrent history requests and pause all of them on a flood wait.
+
+    Telegram flood waits are account-wide, so a wait reported for one channel
+    holds back every channel until it has passed.
+    """
+
+    def __init__(self, concurrency: int, min_interval_seconds: float = 0.0) -> None:
+        self._semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+        self._min_interval_seconds = max(0.0, float(min_interval_seconds))
+        self._resume_at = 0.0
+        self._last_request_at = 0.0
+        self._spacing_lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        self._resume_at = max(self._resume_at, time.monotonic() + max(0.0, float(seconds)))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        async with self._semaphore:
+            async with self._spacing_lock:
+                now = time.monotonic()
+                wait_for = max(self._resume_at - now, self._last_request_at + self._min_interval_seconds - now)
+                if wait_for > 0:
+                    await asyncio.sleep(wait_for)
+                self._last_request_at = time.monotonic()
+            yield
+
+
+class RecentMessageKeys:
+    """Bounded set of (chat id, message id) pairs already handed to the pipeline.
+
+    Live events and catch-up can both see posts newer than the watermark
+    while a catch-up is running; whichever claims a post first ingests it.
+    """
+
+    def __init__(self, max_entries: int = 20000) -> None:
+        self._max_entries = max(1, int(max_entries))
+        self._keys: OrderedDict[tuple[int, int], None] = OrderedDict()
+
+    def claim(self, chat_id: int | None, message_id: int | None) -> bool:
+        if chat_id is None or message_id is None:
+            return True
+        key = (int(chat_id), int(message_id))
+        if key in self._keys:
+            return False
+        self._keys[key] = None
+        while len(self._keys) > self._max_entries:
+            self._keys.popitem(last=False)
+        return True
+
+
+async def load_chat_watermarks(chat_ids: Iterable[int]) -> Dict[int, int]:
+    ids = sorted({int(chat_id) for chat_id in chat_ids})
+    if not ids:
+        return {}
+    async with async_session() as session:
+        rows = await session.execute(
+            select(Message.monitor_chat_id, func.max(Message.monitor_message_id))
+            .where(Message.monitor_chat_id.in_(ids), Message.monitor_message_id.isnot(None))
+            .group_by(Message.monitor_chat_id)
+        )
+        return {int(chat_id): int(message_id) for chat_id, message_id in rows if message_id is not None}
+
+
+async def _catch_up_channel(
+    tg_client: TelegramClient,
+    chat_id: int,
+    watermark: int,
+    *,
+    ingest: IngestMessage,
+    limiter: FloodWaitLimiter,
+    max_messages: int,
+    metrics: MonitorMetrics,
+    logger: logging.Logger,
+) -> int:
+    fetched = 0
+    last_seen_id = watermark
+    flood_retries = 0
+    entity = PeerChannel(int(chat_id))
+    while fetched < max_messages:
+        page: list[Any] = []
+        try:
+            async with limiter.slot():
+                async for message in tg_client.iter_messages(
+                    entity,
+                    min_id=last_seen_id,
+                    reverse=True,
+                    limit=min(100, max_messages - fetched),
+                ):
+                    page.append(message)
+        except FloodWaitError as exc:
+            flood_retries += 1
+            metrics.increment("catchup_flood_waits")
+            limiter.pause(exc.seconds)
+            log_monitor_event(logger, "catchup_flood_wait", chat_id=chat_id, seconds=exc.seconds)
+            if flood_retries > CATCHUP_MAX_FLOOD_RETRIES:
+                break
+            continue
+
+        if not page:
+            break
+        for message in page:
+            if getattr(message, "id", None) is None:
+                continue
+            last_seen_id = max(last_seen_id, int(message.id))
+            fetched += 1
+            metrics.increment("catchup_messages_fetched")
+            if getattr(message, "action", None) is not None:
+                continue
+            await ingest(message, source="catchup")
+            # Give queued live updates a turn between catch-up posts.
+            await asyncio.sleep(0)
+    return fetched
+
+
+async def run_monitor_catchup(
+    tg_client: TelegramClient,
+    chat_ids: Iterable[int],
+    *,
+    ingest: IngestMessage,
+    metrics: MonitorMetrics,
+    logger: logging.Logger,
+) -> Dict[str, int]:
+    """Pull posts newer than each chat's stored watermark through ``ingest``.
+
+    Chats without any stored post are skipped, so adding a channel never
+    imports its whole history.
+    """
+    started_at = time.monotonic()
+    watermarks = await load_chat_watermarks(chat_ids)
+    limiter = FloodWaitLimiter(
+        int(getattr(settings, "MONITOR_CATCHUP_CONCURRENCY", 3) or 3),
+        float(getattr(settings, "MONITOR_CATCHUP_MIN_INTERVAL_SECONDS", 0.5) or 0.0),
+    )
+    max_messages = max(1, int(getattr(settings, "MONITOR_CATCHUP_MAX_MESSAGES_PER_CHANNEL", 500) or 500))
+    metrics.increment("catchup_runs")
+    log_monitor_event(logger, "catchup_started", channels=len(watermarks))
+
+    async def catch_up(chat_id: int, watermark: int) -> int:
+        try:
+            fetched = await _catch_up_channel(
+                tg_client,
+                chat_id,
+                watermark,
+                ingest=ingest,
+                limiter=limiter,
+                max_messages=max_messages,
+                metrics=metrics,
+                logger=logger,
+            )
+        except Exception as exc:
+            metrics.record_failure("catchup_channel", chat_id=chat_id, error=str(exc))
+            return 0
+        metrics.increment("catchup_channels_done")
+        if fetched:
+            log_monitor_event(
+                logger,
+                "catchup_channel_done",
+                chat_id=chat_id,
+                watermark=watermark,
+                fetched=fetched,
+                truncated=str(fetched >= max_messages).lower(),
+            )
+        return fetched
+
+    results = await asyncio.gather(*(catch_up(chat_id, watermark) for chat_id, watermark in watermarks.items()))
+    summary = {
+        "channels": len(watermarks),
+        "fetched": int(sum(results)),
+        "elapsed_ms": int((time.monotonic() - started_at) * 1000),
+    }
+    log_monitor_event(logger, "catchup_completed", **summary)
+    return summary
@@ -4,11 +4,16 @@ from __future__ import annotations
 
 import logging
 import threading
+import time
 from collections import Counter
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Iterator
 
+from app.core.metrics import DELAY_BUCKETS, MetricsRegistry, counter_metric_name
 from app.core.monitor_parser import ParseDiagnostics
 
+MONITOR_METRIC_PREFIX = "tg_monitor"
+
 
 def log_monitor_event(logger: logging.Logger, event: str, level: int = logging.INFO, **fields: Any) -> None:
     parts = [f"event={event}"]
@@ -23,6 +28,24 @@ class MonitorMetrics:
         self._summary_every = max(1, summary_every)
         self._lock = threading.RLock()
         self._counters: Counter[str] = Counter()
+        self.registry = MetricsRegistry()
+        self.stage_seconds = self.registry.histogram(
+            f"{MONITOR_METRIC_PREFIX}_stage_seconds",
+            "Time spent in each message handler stage.",
+            ("stage", "source"),
+        )
+        self.stage_summary = self.registry.summary(
+            f"{MONITOR_METRIC_PREFIX}_stage_latency_seconds",
+            "Recent per-stage latency quantiles.",
+            ("stage",),
+        )
+        self.delay_seconds = self.registry.histogram(
+            f"{MONITOR_METRIC_PREFIX}_telegram_delay_seconds",
+            "Delay between the Telegram post time and the monitor seeing it.",
+            ("source",),
+            buckets=DELAY_BUCKETS,
+        )
+        self.registry.register_collector(self._render_counters)
 
     def increment(self, name: str, amount: int = 1) -> None:
         with self._lock:
@@ -38,9 +61,26 @@ class MonitorMetrics:
             self._counters["links_extracted"] += diagnostics.extracted_link_count
             should_log = self._counters["messages_processed"] % self._summary_every == 0
 
+        if diagnostics.redirect_resolve_seconds > 0:
+            self.observe_stage("redirect_resolution", diagnostics.redirect_resolve_seconds)
         if should_log:
             self.log_summary()
 
+    def observe_stage(self, stage: str, seconds: float, *, source: str = "live") -> None:
+        self.stage_seconds.observe(seconds, stage=stage, source=source)
+        self.stage_summary.observe(seconds, stage=stage)
+
+    @contextmanager
+    def time_stage(self, stage: str, *, source: str = "live") -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - started_at, source=source)
+
+    def observe_delay(self, seconds: float, *, source: str = "live") -> None:
+        self.delay_seconds.observe(max(0.0, float(seconds)), source=source)
+
     def record_refresh(self, configured: int, active: int, changed: bool) -> None:
         self.increment("channel_refreshes")
         log_monitor_event(
@@ -59,6 +99,17 @@ class MonitorMetrics:
         with self._lock:
             return dict(self._counters)
 
+    def _render_counters(self) -> list[str]:
+        lines: list[str] = []
+        for name, value in sorted(self.snapshot().items()):
+            metric_name = counter_metric_name(f"{MONITOR_METRIC_PREFIX}_{name}")
+            lines.append(f"# TYPE {metric_name} counter")
+            lines.append(f"{metric_name} {int(value)}")
+        return lines
+
+    def render_prometheus(self) -> str:
+        return self.registry.render()
+
     def log_summary(self) -> None:
         snapshot = self.snapshot()
         log_monitor_event(self._logger, "monitor_summary", **snapshot)
@@ -7,6 +7,7 @@ import html
 import asyncio
 import re
 import threading
+import time
 from dataclasses import dataclass, field
 from functools import lru_cache
 from typing import Any, Dict, Iterable, List, Tuple
@@ -201,6 +202,7 @@ class ParseDiagnostics:
     resolved_url_count: int = 0
     redirect_resolved_count: int = 0
     extracted_link_count: int = 0
+    redirect_resolve_seconds: float = 0.0
     raw_url_samples: List[str] = field(default_factory=list)
     resolved_url_samples: List[str] = field(default_factory=list)
 
@@ -2276,12 +2278,14 @@ async def parse_message_records(
     all_urls = extract_all_urls(text, msg_obj)
     diagnostics.raw_url_count = len(all_urls)
     diagnostics.raw_url_samples = sorted(all_urls)[:3]
+    resolve_started_at = time.perf_counter()
     resolved_urls, redirect_resolved_count = await resolve_message_urls(
         all_urls,
         netdisk_map,
         redirect_query_keys,
         resolver_config=resolver_config,
     )
+    diagnostics.redirect_resolve_seconds = time.perf_counter() - resolve_started_at
     diagnostics.resolved_url_count = len(resolved_urls)
     diagnostics.redirect_resolved_count = redirect_resolved_count
     diagnostics.resolved_url_samples = list(dict.fromkeys(resolved_urls.values()))[:3]
@@ -2352,12 +2356,14 @@ async def parse_message_content(
     all_urls = extract_all_urls(text, msg_obj)
     diagnostics.raw_url_count = len(all_urls)
     diagnostics.raw_url_samples = sorted(all_urls)[:3]
+    resolve_started_at = time.perf_counter()
     resolved_urls, redirect_resolved_count = await resolve_message_urls(
         all_urls,
         netdisk_map,
         redirect_query_keys,
         resolver_config=resolver_config,
     )
+    diagnostics.redirect_resolve_seconds = time.perf_counter() - resolve_started_at
     diagnostics.resolved_url_count = len(resolved_urls)
     diagnostics.redirect_resolved_count = redirect_resolved_count
     diagnostics.resolved_url_samples = list(dict.fromkeys(resolved_urls.values()))[:3]
@@ -58,14 +58,104 @@ class Settings(BaseSettings):
     LINK_CHECK_MAX_ALLOWED_CONCURRENT: int = 10
     LINK_CHECK_MAX_ALLOWED_LINKS: int = 1000
     LINK_CHECK_POLL_INTERVAL_SECONDS: int = 2
+    # 常驻检测引擎：按平台复用连接（keep-alive + DNS 缓存）
+    LINK_CHECK_ENGINE_ENABLED: bool = True
+    LINK_CHECK_DNS_CACHE_SECONDS: int = 300
+    LINK_CHECK_KEEPALIVE_SECONDS: float = 30
+    LINK_CHECK_SESSION_MAX_AGE_SECONDS: float = 1800
 
     # 监控服务配置
     MONITOR_CHANNEL_REFRESH_INTERVAL_SECONDS: int = 60
     MONITOR_DB_WRITE_MAX_RETRIES: int = 3
     MONITOR_DB_WRITE_RETRY_DELAY_SECONDS: float = 1.0
     MONITOR_URL_RESOLUTION_CACHE_MAX_ENTRIES: int = 20000
+    MONITOR_CATCHUP_ENABLED: bool = True
+    MONITOR_CATCHUP_CONCURRENCY: int = 3
+    MONITOR_CATCHUP_MIN_INTERVAL_SECONDS: float = 0.5
+    MONITOR_CATCHUP_MAX_MESSAGES_PER_CHANNEL: int = 500
     LINK_CHECK_RESULT_CACHE_MAX_ENTRIES: int = 30000
 
+    # Prometheus 指标导出配置（端口为 0 时不启动）
+    MONITOR_METRICS_HOST: str = "0.0.0.0"
+    MONITOR_METRICS_PORT: int = 0
+    WORKER_METRICS_HOST: str = "0.0.0.0"
+    WORKER_METRICS_PORT: int = 0
+    API_METRICS_ENABLED: bool = False
+    METRICS_AUTH_TOKEN: str = ""
+
+    # 后台调度配置（worker 内选主执行备份、去重和链接巡检计划）
+    WORKER_SCHEDULER_ENABLED: bool = True
+    WORKER_SCHEDULER_HEARTBEAT_SECONDS: int = 15
+    WORKER_SCHEDULER_RETRY_SECONDS: int = 10
+    API_EMBEDDED_SCHEDULERS_ENABLED: bool = False
+
+    # Worker 队列并发配置（每个队列独立的处理槽数，0 表示本实例不处理该队列；发布规则队列由 advisory lock 全局串行，固定一个处理槽）
+    WORKER_RECOGNITION_CONCURRENCY: int = 1
+    WORKER_TRANSFER_CONCURRENCY: int = 3
+    WORKER_FOLLOW_TASK_CONCURRENCY: int = 1
+    WORKER_NOTIFY_ENABLED: bool = True
+    WORKER_IDLE_POLL_SECONDS: int = 15
+    WORKER_STALE_LOCK_REAPER_SECONDS: int = 120
+    WORKER_BATCH_RECONCILE_SECONDS: int = 300
+
+    # API 性能统计与抽样 profile 配置
+    API_PERF_ENABLED: bool = True
+    API_PERF_SLOW_REQUEST_MS: int = 1000
+    API_PERF_SLOW_QUERY_MS: int = 200
+    API_PROFILER_ENABLED: bool = False
+    API_PROFILER_SAMPLE_RATE: float = 0.01
+    API_PROFILER_MIN_DURATION_MS: int = 200
+
+    # AI 提供方连接池配置
+    AI_TRANSPORT_MAX_CONNECTIONS: int = 32
+    AI_TRANSPORT_KEEPALIVE_SECONDS: int = 60
+    AI_PROVIDER_DEFAULT_MAX_CONCURRENCY: int = 4
+
+    # 备份配置
+    BACKUP_PG_DUMP_COMPRESS_LEVEL: int = 6
+    BACKUP_WEBDAV_STREAM_UPLOAD: bool = False
+    BACKUP_WEBDAV_STREAM_QUEUE_CHUNKS: int = 8
+
+    # 公开接口响应缓存配置
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    RESPONSE_CACHE_VERSION_PROBE_SECONDS: float = 2.0
+
+    # 链接去重配置
+    DEDUP_MEMORY_MAX_URL_ENTRIES: int = 2000000
+    DEDUP_INDEX_FULL_REBUILD_HOURS: int = 168
+    DEDUP_INGEST_ENABLED: bool = True
+
+    # 网盘目录扫描配置
+    PAN_TRANSFER_SCAN_CONCURRENCY: int = 4
+    PAN_TRANSFER_SCAN_MIN_INTERVAL_SECONDS: float = 0.15
+    PAN_SHARE_LISTING_CACHE_TTL_SECONDS: float = 120
+    PAN_SHARE_LISTING_CACHE_MAX_AGE_SECONDS: float = 900
+    PAN_SHARE_LISTING_CACHE_MAX_ENTRIES: int = 2048
+
+    # 网盘账号会话池配置（worker 常驻事件循环内复用）
+    PAN_TRANSFER_CLIENT_IDLE_SECONDS: float = 300
+    PAN_TRANSFER_CLIENT_MAX_AGE_SECONDS: float = 1800
+    PAN_TRANSFER_ACCOUNT_TOKEN_TTL_SECONDS: float = 600
+
+    # 网盘转存并发配置（同一账号始终串行；0 表示该平台不设上限）
+    PAN_TRANSFER_BAIDU_MAX_PARALLEL: int = 2
+    PAN_TRANSFER_QUARK_MAX_PARALLEL: int = 2
+
+    # 链接健康巡检配置
+    LINK_HEALTH_VALID_INTERVAL_HOURS: float = 72
+    LINK_HEALTH_HOT_INTERVAL_HOURS: float = 12
+    LINK_HEALTH_HOT_CLICK_THRESHOLD: float = 20
+    LINK_HEALTH_UNCERTAIN_RETRY_HOURS: float = 6
+    LINK_HEALTH_INVALID_BASE_HOURS: float = 24
+    LINK_HEALTH_MAX_INTERVAL_HOURS: float = 720
+    LINK_HEALTH_CLICK_HALF_LIFE_DAYS: float = 3
+
+    # 网盘请求限速配置（memory / file / database）
+    NETDISK_RATE_LIMIT_ENABLED: bool = True
+    NETDISK_RATE_LIMIT_BACKEND: str = "memory"
+    NETDISK_RATE_LIMIT_LOCK_DIR: str = ""
+
     class Config:
         env_file = ".env"  # 指定 .env 文件
         env_file_encoding = "utf-8"
@@ -1,9 +1,10 @@
 ﻿import threading
 from datetime import datetime
 
-from sqlalchemy import ARRAY, JSON, BigInteger, Boolean, Column, Date, DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint, create_engine, inspect, text
+from sqlalchemy import ARRAY, JSON, BigInteger, Boolean, Column, Date, DateTime, Float, ForeignKey, Integer, String, Text, UniqueConstraint, create_engine, event, inspect, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm.attributes import get_history
 
 from app.models.config import settings
 
@@ -30,6 +31,27 @@ class Message(Base):
     monitor_message_id = Column(Integer, nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     netdisk_types = Column(JSONB, default=list)
+    # Derived from links on every ORM write; NULL means not backfilled yet.
+    link_count = Column(Integer, nullable=True)
+    link_url_hashes = Column(ARRAY(String(64)), nullable=True)
+    # Stamped on insert and on model/table updates so incremental backups pick up edits.
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+@event.listens_for(Message, "before_insert")
+def _fill_message_link_columns_on_insert(mapper, connection, target) -> None:
+    from app.services.message_link_columns import apply_message_link_columns
+
+    apply_message_link_columns(target)
+
+
+@event.listens_for(Message, "before_update")
+def _fill_message_link_columns_on_update(mapper, connection, target) -> None:
+    if target.link_count is not None and not get_history(target, "links").has_changes():
+        return
+    from app.services.message_link_columns import apply_message_link_columns
+
+    apply_message_link_columns(target)
 
 
 class LinkTarget(Base):
@@ -121,6 +143,39 @@ class LinkTargetDailyStat(Base):
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class LinkTargetHealth(Base):
+    __tablename__ = "link_target_health"
+
+    link_target_id = Column(Integer, ForeignKey("link_targets.id"), primary_key=True, autoincrement=False)
+    last_status = Column(String(32), nullable=True)
+    last_is_valid = Column(Boolean, nullable=True)
+    last_checked_at = Column(DateTime, nullable=True)
+    last_valid_at = Column(DateTime, nullable=True)
+    failure_streak = Column(Integer, nullable=False, default=0)
+    check_count = Column(Integer, nullable=False, default=0)
+    click_heat = Column(Float, nullable=False, default=0.0)
+    next_check_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class NetdiskRateBucket(Base):
+    __tablename__ = "netdisk_rate_buckets"
+
+    bucket_key = Column(String(128), primary_key=True)
+    tokens = Column(Float, nullable=False, default=0.0)
+    updated_epoch = Column(Float, nullable=False, default=0.0)
+
+
+class WorkerSchedulerLease(Base):
+    __tablename__ = "worker_scheduler_leases"
+
+    name = Column(String(64), primary_key=True)
+    holder = Column(String(255), nullable=False)
+    acquired_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    heartbeat_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
 class ChannelDailyStat(Base):
     __tablename__ = "channel_daily_stats"
     __table_args__ = (
@@ -139,6 +194,55 @@ class ChannelDailyStat(Base):
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class MessageHourlyStat(Base):
+    __tablename__ = "message_hourly_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    stat_hour = Column(DateTime, nullable=False, unique=True, index=True)
+    message_count = Column(Integer, nullable=False, default=0)
+    link_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class MessageHourlyNetdiskStat(Base):
+    __tablename__ = "message_hourly_netdisk_stats"
+    __table_args__ = (
+        UniqueConstraint("stat_hour", "netdisk_name", name="ux_message_hourly_netdisk_stats_hour_name"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    stat_hour = Column(DateTime, nullable=False, index=True)
+    netdisk_name = Column(String(64), nullable=False)
+    link_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class MessageHourlyTagStat(Base):
+    __tablename__ = "message_hourly_tag_stats"
+    __table_args__ = (
+        UniqueConstraint("stat_hour", "tag", name="ux_message_hourly_tag_stats_hour_tag"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    stat_hour = Column(DateTime, nullable=False, index=True)
+    tag = Column(String(255), nullable=False, index=True)
+    message_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ResponseCacheVersion(Base):
+    __tablename__ = "response_cache_versions"
+    __table_args__ = (
+        UniqueConstraint("scope", name="ux_response_cache_versions_scope"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String(64), nullable=False)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class ResourceCandidateProfile(Base):
     __tablename__ = "resource_candidate_profiles"
     __table_args__ = (
@@ -341,6 +445,15 @@ class PanTransferBatchItem(Base):
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class PanTransferBatchStatusCount(Base):
+    __tablename__ = "pan_transfer_batch_status_counts"
+
+    batch_id = Column(Integer, ForeignKey("pan_transfer_batches.id"), primary_key=True)
+    transfer_status = Column(String(32), primary_key=True)
+    item_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class PanTransferReplacementLog(Base):
     __tablename__ = "pan_transfer_replacement_logs"
 
@@ -558,6 +671,33 @@ class AiCallEvent(Base):
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
 
 
+class AiCircuitState(Base):
+    __tablename__ = "ai_circuit_states"
+    __table_args__ = (
+        UniqueConstraint("provider_id", "model_id", name="ux_ai_circuit_states_provider_model"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    provider_id = Column(Integer, ForeignKey("ai_provider_configs.id"), nullable=False, index=True)
+    model_id = Column(String(255), nullable=False, default="")
+    state = Column(String(16), nullable=False, default="closed", index=True)
+    window_started_at = Column(DateTime, nullable=True)
+    window_call_count = Column(Integer, nullable=False, default=0)
+    window_failure_count = Column(Integer, nullable=False, default=0)
+    window_slow_count = Column(Integer, nullable=False, default=0)
+    consecutive_failures = Column(Integer, nullable=False, default=0)
+    trip_count = Column(Integer, nullable=False, default=0)
+    ewma_latency_ms = Column(Float, nullable=True)
+    last_latency_ms = Column(Integer, nullable=True)
+    opened_at = Column(DateTime, nullable=True)
+    retry_at = Column(DateTime, nullable=True, index=True)
+    probe_started_at = Column(DateTime, nullable=True)
+    last_success_at = Column(DateTime, nullable=True)
+    last_failure_at = Column(DateTime, nullable=True)
+    last_error_message = Column(Text, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class Credential(Base):
     __tablename__ = "credentials"
 
@@ -575,6 +715,13 @@ class DedupStats(Base):
     deleted = Column(Integer, nullable=False)
 
 
+class DedupUrlKeeper(Base):
+    __tablename__ = "dedup_url_keepers"
+
+    url_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    message_id = Column(Integer, primary_key=True, autoincrement=False, index=True)
+
+
 class Channel(Base):
     __tablename__ = "channels"
 
@@ -778,6 +925,8 @@ class BackupTarget(Base):
     include_runtime_data = Column(Boolean, nullable=False, default=True)
     export_range_kind = Column(String(16), nullable=False, default="all")
     export_range_days = Column(Integer, nullable=True)
+    export_file_format = Column(String(16), nullable=False, default="xlsx")
+    incremental_full_every = Column(Integer, nullable=False, default=7)
     last_run_at = Column(DateTime, nullable=True)
     next_run_at = Column(DateTime, nullable=True, index=True)
     last_status = Column(String(32), nullable=True)
@@ -816,6 +965,15 @@ class BackupRun(Base):
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
 
+class BackupDeletedRow(Base):
+    __tablename__ = "backup_deleted_rows"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    table_name = Column(String(128), nullable=False)
+    row_id = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, server_default=text("timezone('utc', now())"))
+
+
 class AccountBatch(Base):
     __tablename__ = "account_batches"
 
@@ -978,6 +1136,9 @@ def ensure_message_monitor_source_columns() -> None:
             "monitor_channel_key": "ALTER TABLE messages ADD COLUMN monitor_channel_key VARCHAR(255)",
             "monitor_channel_title": "ALTER TABLE messages ADD COLUMN monitor_channel_title VARCHAR(255)",
             "monitor_message_id": "ALTER TABLE messages ADD COLUMN monitor_message_id INTEGER",
+            "link_count": "ALTER TABLE messages ADD COLUMN link_count INTEGER",
+            "link_url_hashes": "ALTER TABLE messages ADD COLUMN link_url_hashes VARCHAR(64)[]",
+            "updated_at": "ALTER TABLE messages ADD COLUMN updated_at TIMESTAMP",
         }
 
         with engine.begin() as connection:
@@ -1007,6 +1168,7 @@ def ensure_runtime_storage_tables() -> None:
                 BackupRecord.__table__,
                 BackupTarget.__table__,
                 BackupRun.__table__,
+                BackupDeletedRow.__table__,
                 AccountBatch.__table__,
                 UserAccount.__table__,
                 AuthIdentity.__table__,
@@ -1015,7 +1177,15 @@ def ensure_runtime_storage_tables() -> None:
                 MessageLinkRef.__table__,
                 LinkClickEvent.__table__,
                 LinkTargetDailyStat.__table__,
+                LinkTargetHealth.__table__,
+                NetdiskRateBucket.__table__,
+                WorkerSchedulerLease.__table__,
                 ChannelDailyStat.__table__,
+                MessageHourlyStat.__table__,
+                MessageHourlyNetdiskStat.__table__,
+                MessageHourlyTagStat.__table__,
+                ResponseCacheVersion.__table__,
+                DedupUrlKeeper.__table__,
                 ResourceCandidateProfile.__table__,
                 ResourceCandidateLog.__table__,
                 ResourceWork.__table__,
@@ -1025,6 +1195,7 @@ def ensure_runtime_storage_tables() -> None:
                 PanTransferAccount.__table__,
                 PanTransferBatch.__table__,
                 PanTransferBatchItem.__table__,
+                PanTransferBatchStatusCount.__table__,
                 PanTransferReplacementLog.__table__,
                 PanTransferExecutionLog.__table__,
                 PanTransferPublishRecord.__table__,
@@ -1035,6 +1206,7 @@ def ensure_runtime_storage_tables() -> None:
                 AiRouteProfile.__table__,
                 AiRouteStep.__table__,
                 AiCallEvent.__table__,
+                AiCircuitState.__table__,
             ],
         )
         ensure_message_monitor_source_columns()
@@ -1089,6 +1261,8 @@ def _ensure_backup_target_columns() -> None:
     pending_alters = {
         "run_log_retention_days": "ALTER TABLE backup_targets ADD COLUMN run_log_retention_days INTEGER NOT NULL DEFAULT 0",
         "schedule_priority": "ALTER TABLE backup_targets ADD COLUMN schedule_priority INTEGER NOT NULL DEFAULT 100",
+        "incremental_full_every": "ALTER TABLE backup_targets ADD COLUMN incremental_full_every INTEGER NOT NULL DEFAULT 7",
+        "export_file_format": "ALTER TABLE backup_targets ADD COLUMN export_file_format VARCHAR(16) NOT NULL DEFAULT 'xlsx'",
     }
     with engine.begin() as connection:
         for column_name, sql in pending_alters.items():
@@ -1195,6 +1369,22 @@ def _ensure_backup_management_indexes() -> None:
         ON backup_runs (target_id)
         WHERE target_id IS NOT NULL AND status IN ('pending', 'running')
         """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_backup_deleted_rows_table_id
+        ON backup_deleted_rows (table_name, id)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_link_targets_updated_at
+        ON link_targets (updated_at)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_message_link_refs_updated_at
+        ON message_link_refs (updated_at)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_link_click_events_updated_at
+        ON link_click_events (updated_at)
+        """,
     )
     with engine.begin() as connection:
         for statement in statements:
@@ -1215,6 +1405,24 @@ def _ensure_message_monitor_indexes() -> None:
         CREATE INDEX IF NOT EXISTS ix_messages_monitor_chat_message
         ON messages (monitor_chat_id, monitor_message_id DESC)
         """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_messages_with_links_timestamp
+        ON messages (timestamp) INCLUDE (link_count)
+        WHERE link_count > 0
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_messages_link_columns_pending
+        ON messages (id)
+        WHERE link_count IS NULL
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_messages_link_url_hashes
+        ON messages USING GIN (link_url_hashes)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_messages_updated_at
+        ON messages (updated_at)
+        """,
     )
     with engine.begin() as connection:
         for statement in statements:
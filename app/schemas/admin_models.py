@@ -1030,8 +1030,8 @@ class LinkCheckPlanUpdate(BaseModel):
     @classmethod
     def validate_plan_mode(cls, value: str) -> str:
         normalized = _normalize_text(value, field_name="plan_mode").lower()
-        if normalized not in {"backfill", "frontier"}:
-            raise ValueError("plan_mode must be backfill or frontier")
+        if normalized not in {"backfill", "frontier", "health"}:
+            raise ValueError("plan_mode must be backfill, frontier or health")
         return normalized
 
     @field_validator("traversal_order")
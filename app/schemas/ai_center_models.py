@@ -22,6 +22,25 @@ class AiCenterBaseModel(BaseModel):
     )
 
 
+class AiCenterCircuitItem(AiCenterBaseModel):
+    provider_id: int
+    provider_label: str | None = None
+    model_id: str | None = None
+    state: str = "closed"
+    window_call_count: int = 0
+    window_failure_count: int = 0
+    window_slow_count: int = 0
+    failure_rate: float = 0.0
+    consecutive_failures: int = 0
+    trip_count: int = 0
+    ewma_latency_ms: float | None = None
+    last_latency_ms: int | None = None
+    opened_at: datetime | None = None
+    retry_at: datetime | None = None
+    last_error_message: str | None = None
+    updated_at: datetime | None = None
+
+
 class AiCenterOverviewResponse(AiCenterBaseModel):
     total_providers: int = 0
     enabled_providers: int = 0
@@ -32,6 +51,9 @@ class AiCenterOverviewResponse(AiCenterBaseModel):
     recent_success_count_24h: int = 0
     recent_failure_count_24h: int = 0
     legacy_migration_applied: bool = False
+    open_circuit_count: int = 0
+    half_open_circuit_count: int = 0
+    circuits: list[AiCenterCircuitItem] = Field(default_factory=list)
     generated_at: datetime
 
 
@@ -92,6 +114,7 @@ class AiCenterProviderItem(AiCenterBaseModel):
     timeout_seconds: int = 25
     max_retries: int = 1
     cooldown_seconds: int = 300
+    max_concurrency: int = 4
     cooldown_until: datetime | None = None
     health_status: str = "unknown"
     consecutive_failures: int = 0
@@ -128,6 +151,7 @@ class AiCenterProviderUpsertRequest(AiCenterBaseModel):
     timeout_seconds: int = Field(default=25, ge=5, le=120)
     max_retries: int = Field(default=1, ge=0, le=5)
     cooldown_seconds: int = Field(default=300, ge=0, le=86400)
+    max_concurrency: int | None = Field(default=None, ge=1, le=64)
     extra_json: dict[str, Any] = Field(default_factory=dict)
     models: list[AiCenterProviderModelUpsertRequest] = Field(default_factory=list)
 
@@ -175,6 +199,8 @@ class AiCenterRouteItem(AiCenterBaseModel):
     preferred_capabilities: list[str] = Field(default_factory=list)
     allow_same_provider_model_failover: bool = True
     allow_cross_provider_failover: bool = True
+    hedge_enabled: bool = False
+    hedge_delay_ms: int = 800
     updated_by: str | None = None
     extra_json: dict[str, Any] = Field(default_factory=dict)
     steps: list[AiCenterRouteStepItem] = Field(default_factory=list)
@@ -214,6 +240,8 @@ class AiCenterRouteUpsertRequest(AiCenterBaseModel):
     preferred_capabilities: list[str] = Field(default_factory=list, max_length=24)
     allow_same_provider_model_failover: bool = True
     allow_cross_provider_failover: bool = True
+    hedge_enabled: bool = False
+    hedge_delay_ms: int = Field(default=800, ge=0, le=30000)
     extra_json: dict[str, Any] = Field(default_factory=dict)
     steps: list[AiCenterRouteStepUpsertRequest] = Field(default_factory=list)
 
@@ -6,9 +6,10 @@ from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 ALLOWED_TARGET_KINDS = {"local", "webdav"}
-ALLOWED_BACKUP_MODES = {"full", "media_export"}
+ALLOWED_BACKUP_MODES = {"full", "incremental", "media_export"}
 ALLOWED_SCHEDULE_KINDS = {"manual", "daily", "weekly", "monthly"}
 ALLOWED_EXPORT_RANGE_KINDS = {"all", "days"}
+ALLOWED_EXPORT_FILE_FORMATS = {"xlsx", "csv"}
 
 
 def _normalize_text(value: str, *, allow_empty: bool = False, field_name: str = "value") -> str:
@@ -45,6 +46,8 @@ class BackupTargetBase(BaseModel):
     include_runtime_data: bool = True
     export_range_kind: str = Field(default="all", max_length=16)
     export_range_days: Optional[int] = Field(default=None, ge=1, le=3650)
+    export_file_format: str = Field(default="xlsx", max_length=16)
+    incremental_full_every: int = Field(default=7, ge=1, le=365)
 
     @field_validator("name")
     @classmethod
@@ -70,7 +73,7 @@ class BackupTargetBase(BaseModel):
     def validate_backup_mode(cls, value: str) -> str:
         normalized = _normalize_text(value, field_name="backup_mode").lower()
         if normalized not in ALLOWED_BACKUP_MODES:
-            raise ValueError("backup_mode must be full or media_export")
+            raise ValueError("backup_mode must be full, incremental or media_export")
         return normalized
 
     @field_validator("schedule_kind")
@@ -105,6 +108,14 @@ class BackupTargetBase(BaseModel):
             raise ValueError("export_range_kind must be all or days")
         return normalized
 
+    @field_validator("export_file_format")
+    @classmethod
+    def validate_export_file_format(cls, value: str) -> str:
+        normalized = _normalize_text(value, field_name="export_file_format").lower()
+        if normalized not in ALLOWED_EXPORT_FILE_FORMATS:
+            raise ValueError("export_file_format must be xlsx or csv")
+        return normalized
+
     @model_validator(mode="after")
     def validate_cross_fields(self) -> "BackupTargetBase":
         if self.target_kind == "local":
@@ -126,7 +137,7 @@ class BackupTargetBase(BaseModel):
             self.schedule_weekday = None
             self.schedule_day = None
 
-        if self.backup_mode == "full":
+        if self.backup_mode in {"full", "incremental"}:
             self.export_range_kind = "all"
             self.export_range_days = None
         else:
@@ -176,6 +187,8 @@ class BackupTargetResponse(BaseModel):
     include_runtime_data: bool
     export_range_kind: str
     export_range_days: Optional[int] = None
+    export_file_format: str = "xlsx"
+    incremental_full_every: int = 7
     last_run_at: Optional[str] = None
     next_run_at: Optional[str] = None
     last_status: Optional[str] = None
@@ -406,7 +406,9 @@ def print_help():
   python manage.py --edit-channel 旧频道名 新频道名
   python manage.py --fix-tags
   python manage.py --dedup-links-fast [batch_size]
-  python manage.py --dedup-links
+  python manage.py --dedup-links [--full]
+  python manage.py --backfill-message-links [batch_size]
+  python manage.py --rebuild-hourly-stats [days]
   python manage.py --check-links [hours] [max_concurrent]
   python manage.py --check-all-links [max_concurrent]
   python manage.py --check-period [period] [max_concurrent]
@@ -1598,15 +1600,41 @@ if __name__ == "__main__":
             if len(sys.argv) > idx + 1 and sys.argv[idx + 1].isdigit():
                 print("提示: 新版统一去重已不再使用 batch_size 参数，将按后台去重计划执行。")
 
-        result = run_dedup_now(updated_by="cli")
+        result = run_dedup_now(updated_by="cli", force_full="--full" in sys.argv)
         if result.get("success"):
             print(
-                f"去重完成：扫描 {result.get('scanned_messages', 0)} 条消息，"
+                f"去重完成（{result.get('index_mode') or 'window'}）：扫描 {result.get('scanned_messages', 0)} 条消息，"
                 f"删除 {result.get('deleted_count', 0)} 条，"
                 f"耗时 {result.get('duration_seconds', 0)} 秒。"
             )
         else:
             print(f"去重失败: {result.get('error') or 'unknown error'}")
+    elif "--backfill-message-links" in sys.argv:
+        from app.models.models import ensure_message_monitor_source_columns
+        from app.services.message_link_columns import (
+            MESSAGE_LINK_BACKFILL_BATCH_SIZE,
+            backfill_message_link_columns,
+        )
+
+        batch_size = MESSAGE_LINK_BACKFILL_BATCH_SIZE
+        idx = sys.argv.index("--backfill-message-links")
+        if len(sys.argv) > idx + 1 and sys.argv[idx + 1].isdigit():
+            batch_size = int(sys.argv[idx + 1])
+        ensure_message_monitor_source_columns()
+        updated = backfill_message_link_columns(batch_size=batch_size)
+        print(f"链接派生字段回填完成：更新 {updated} 条消息。")
+    elif "--rebuild-hourly-stats" in sys.argv:
+        from app.services.message_hourly_stats_service import rebuild_message_hourly_stats
+
+        days = None
+        idx = sys.argv.index("--rebuild-hourly-stats")
+        if len(sys.argv) > idx + 1 and sys.argv[idx + 1].isdigit():
+            days = int(sys.argv[idx + 1])
+        with Session(engine) as session:
+            rebuilt = rebuild_message_hourly_stats(session, days=days)
+            session.commit()
+        scope_label = "全部历史" if days is None else f"最近 {days} 天"
+        print(f"小时统计汇总重建完成（{scope_label}）：写入 {rebuilt} 个小时。")
     elif "--check-links" in sys.argv:
         # 链接检测功能
         hours = 24  # 默认检测24小时
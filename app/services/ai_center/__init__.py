@@ -7,6 +7,7 @@ from .client import (
     AiCenterError,
     AiTextCompletionResult,
     complete_openai_compatible_text,
+    complete_openai_compatible_text_async,
     list_openai_compatible_models,
     normalize_api_mode,
     normalize_base_url,
@@ -51,6 +52,7 @@ __all__ = [
     "AiTextCompletionResult",
     "clear_ai_call_events",
     "complete_openai_compatible_text",
+    "complete_openai_compatible_text_async",
     "delete_ai_provider",
     "ensure_ai_center_seeded",
     "execute_text_route",
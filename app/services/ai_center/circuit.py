@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.models import AiCircuitState, AiProviderConfig, engine
+
+
+AI_CIRCUIT_STATE_CLOSED = "closed"
+AI_CIRCUIT_STATE_OPEN = "open"
+AI_CIRCUIT_STATE_HALF_OPEN = "half_open"
+AI_CIRCUIT_WINDOW_SECONDS = 300
+AI_CIRCUIT_MIN_WINDOW_CALLS = 6
+AI_CIRCUIT_FAILURE_RATE_THRESHOLD = 0.5
+AI_CIRCUIT_CONSECUTIVE_FAILURE_THRESHOLD = 3
+AI_CIRCUIT_SLOW_CALL_RATIO = 0.8
+AI_CIRCUIT_BASE_OPEN_SECONDS = 30
+AI_CIRCUIT_MAX_OPEN_SECONDS = 900
+AI_CIRCUIT_PROBE_TIMEOUT_SECONDS = 120
+AI_CIRCUIT_LATENCY_EWMA_ALPHA = 0.3
+
+
+@dataclass(slots=True)
+class AiCircuitDecision:
+    allowed: bool
+    state: str
+    retry_at: datetime | None = None
+
+
+def _utcnow() -> datetime:
+    return datetime.utcnow()
+
+
+def _normalize_model_key(model_id: Any) -> str:
+    text = "" if model_id is None else str(model_id).strip()
+    return text[:255]
+
+
+def _slow_call_threshold_ms(provider: AiProviderConfig) -> int:
+    return int(max(5, int(provider.timeout_seconds or 25)) * 1000 * AI_CIRCUIT_SLOW_CALL_RATIO)
+
+
+def _open_seconds(trip_count: int) -> int:
+    exponent = max(0, int(trip_count) - 1)
+    return min(AI_CIRCUIT_MAX_OPEN_SECONDS, AI_CIRCUIT_BASE_OPEN_SECONDS * (2 ** min(exponent, 10)))
+
+
+def load_circuit_states(
+    session: Session,
+    *,
+    provider_ids: list[int],
+) -> dict[tuple[int, str], AiCircuitState]:
+    if not provider_ids:
+        return {}
+    rows = session.query(AiCircuitState).filter(AiCircuitState.provider_id.in_(provider_ids)).all()
+    return {(int(row.provider_id), _normalize_model_key(row.model_id)): row for row in rows}
+
+
+def evaluate_circuit(row: AiCircuitState | None, *, now: datetime | None = None) -> AiCircuitDecision:
+    if row is None:
+        return AiCircuitDecision(allowed=True, state=AI_CIRCUIT_STATE_CLOSED)
+    current = now or _utcnow()
+    state = str(row.state or AI_CIRCUIT_STATE_CLOSED)
+    if state == AI_CIRCUIT_STATE_OPEN:
+        if row.retry_at is not None and row.retry_at <= current:
+            return AiCircuitDecision(allowed=True, state=AI_CIRCUIT_STATE_HALF_OPEN, retry_at=row.retry_at)
+        return AiCircuitDecision(allowed=False, state=state, retry_at=row.retry_at)
+    if state == AI_CIRCUIT_STATE_HALF_OPEN:
+        probe_expired = row.probe_started_at is None or row.probe_started_at <= current - timedelta(
+            seconds=AI_CIRCUIT_PROBE_TIMEOUT_SECONDS
+        )
+        return AiCircuitDecision(allowed=probe_expired, state=state, retry_at=row.retry_at)
+    return AiCircuitDecision(allowed=True, state=AI_CIRCUIT_STATE_CLOSED)
+
+
+def claim_half_open_probe(*, provider_id: int, model_id: Any) -> bool:
+    # Only one process may send the trial request after the open period ends.
+    # The claim is committed on its own connection so the row is not kept
+    # locked while the probe request is in flight.
+    now = _utcnow()
+    with Session(engine) as session:
+        claimed = (
+            session.query(AiCircuitState)
+            .filter(
+                AiCircuitState.provider_id == int(provider_id),
+                AiCircuitState.model_id == _normalize_model_key(model_id),
+                or_(
+                    (AiCircuitState.state == AI_CIRCUIT_STATE_OPEN) & (AiCircuitState.retry_at <= now),
+                    (AiCircuitState.state == AI_CIRCUIT_STATE_HALF_OPEN)
+                    & (
+                        AiCircuitState.probe_started_at.is_(None)
+                        | (AiCircuitState.probe_started_at <= now - timedelta(seconds=AI_CIRCUIT_PROBE_TIMEOUT_SECONDS))
+                    ),
+                ),
+            )
+            .update(
+                {
+                    AiCircuitState.state: AI_CIRCUIT_STATE_HALF_OPEN,
+                    AiCircuitState.probe_started_at: now,
+                    AiCircuitState.updated_at: now,
+                },
+                synchronize_session=False,
+            )
+        )
+        session.commit()
+    return int(claimed or 0) > 0
+
+
+def _lock_circuit_row(session: Session, *, provider_id: int, model_id: str) -> AiCircuitState:
+    row = (
+        session.query(AiCircuitState)
+        .filter(AiCircuitState.provider_id == int(provider_id), AiCircuitState.model_id == model_id)
+        .with_for_update()
+        .first()
+    )
+    if row is not None:
+        return row
+    row = AiCircuitState(
+        provider_id=int(provider_id),
+        model_id=model_id,
+        state=AI_CIRCUIT_STATE_CLOSED,
+        window_call_count=0,
+        window_failure_count=0,
+        window_slow_count=0,
+        consecutive_failures=0,
+        trip_count=0,
+    )
+    try:
+        with session.begin_nested():
+            session.add(row)
+            session.flush()
+    except IntegrityError:
+        # Another process created the row first; lock theirs instead.
+        return (
+            session.query(AiCircuitState)
+            .filter(AiCircuitState.provider_id == int(provider_id), AiCircuitState.model_id == model_id)
+            .with_for_update()
+            .one()
+        )
+    return row
+
+
+def _trip(row: AiCircuitState, *, now: datetime) -> None:
+    row.trip_count = int(row.trip_count or 0) + 1
+    row.state = AI_CIRCUIT_STATE_OPEN
+    row.opened_at = now
+    row.retry_at = now + timedelta(seconds=_open_seconds(int(row.trip_count)))
+    row.probe_started_at = None
+
+
+def record_circuit_result(
+    *,
+    provider: AiProviderConfig,
+    model_id: Any,
+    success: bool,
+    duration_ms: int | None,
+    error_message: str | None = None,
+) -> str:
+    # Committed on its own short transaction: callers roll back their session
+    # when every candidate fails, which must not discard the failures that
+    # are supposed to open the circuit.
+    provider_id = int(provider.id)
+    slow_threshold_ms = _slow_call_threshold_ms(provider)
+    with Session(engine) as session:
+        row = _lock_circuit_row(session, provider_id=provider_id, model_id=_normalize_model_key(model_id))
+        state = _apply_call_result(
+            row,
+            success=success,
+            duration_ms=duration_ms,
+            slow_threshold_ms=slow_threshold_ms,
+            error_message=error_message,
+        )
+        session.commit()
+    return state
+
+
+def _apply_call_result(
+    row: AiCircuitState,
+    *,
+    success: bool,
+    duration_ms: int | None,
+    slow_threshold_ms: int,
+    error_message: str | None,
+) -> str:
+    now = _utcnow()
+    if row.window_started_at is None or row.window_started_at <= now - timedelta(seconds=AI_CIRCUIT_WINDOW_SECONDS):
+        row.window_started_at = now
+        row.window_call_count = 0
+        row.window_failure_count = 0
+        row.window_slow_count = 0
+
+    latency_ms = max(0, int(duration_ms or 0))
+    row.last_latency_ms = latency_ms
+    previous_ewma = float(row.ewma_latency_ms) if row.ewma_latency_ms is not None else float(latency_ms)
+    row.ewma_latency_ms = round(
+        AI_CIRCUIT_LATENCY_EWMA_ALPHA * latency_ms + (1 - AI_CIRCUIT_LATENCY_EWMA_ALPHA) * previous_ewma,
+        1,
+    )
+    slow = success and latency_ms >= slow_threshold_ms
+    row.window_call_count = int(row.window_call_count or 0) + 1
+    if slow:
+        row.window_slow_count = int(row.window_slow_count or 0) + 1
+
+    previous_state = str(row.state or AI_CIRCUIT_STATE_CLOSED)
+    if success:
+        row.consecutive_failures = 0
+        row.last_success_at = now
+        if previous_state != AI_CIRCUIT_STATE_CLOSED:
+            row.state = AI_CIRCUIT_STATE_CLOSED
+            row.trip_count = 0
+            row.opened_at = None
+            row.retry_at = None
+            row.probe_started_at = None
+            row.window_started_at = now
+            row.window_call_count = 1
+            row.window_failure_count = 0
+            row.window_slow_count = 1 if slow else 0
+    else:
+        row.consecutive_failures = int(row.consecutive_failures or 0) + 1
+        row.window_failure_count = int(row.window_failure_count or 0) + 1
+        row.last_failure_at = now
+        row.last_error_message = (error_message or "unknown error")[:2000]
+        if previous_state == AI_CIRCUIT_STATE_HALF_OPEN:
+            _trip(row, now=now)
+
+    if row.state == AI_CIRCUIT_STATE_CLOSED:
+        window_calls = int(row.window_call_count or 0)
+        unhealthy_calls = int(row.window_failure_count or 0) + int(row.window_slow_count or 0)
+        if int(row.consecutive_failures or 0) >= AI_CIRCUIT_CONSECUTIVE_FAILURE_THRESHOLD or (
+            window_calls >= AI_CIRCUIT_MIN_WINDOW_CALLS
+            and unhealthy_calls / window_calls >= AI_CIRCUIT_FAILURE_RATE_THRESHOLD
+        ):
+            _trip(row, now=now)
+
+    return str(row.state)
+
+
+def serialize_circuit_state(row: AiCircuitState, *, provider_label: str | None = None) -> dict[str, Any]:
+    window_calls = int(row.window_call_count or 0)
+    decision = evaluate_circuit(row)
+    return {
+        "provider_id": int(row.provider_id),
+        "provider_label": provider_label,
+        "model_id": _normalize_model_key(row.model_id) or None,
+        "state": decision.state,
+        "window_call_count": window_calls,
+        "window_failure_count": int(row.window_failure_count or 0),
+        "window_slow_count": int(row.window_slow_count or 0),
+        "failure_rate": round(int(row.window_failure_count or 0) / window_calls, 3) if window_calls else 0.0,
+        "consecutive_failures": int(row.consecutive_failures or 0),
+        "trip_count": int(row.trip_count or 0),
+        "ewma_latency_ms": float(row.ewma_latency_ms) if row.ewma_latency_ms is not None else None,
+        "last_latency_ms": int(row.last_latency_ms) if row.last_latency_ms is not None else None,
+        "opened_at": row.opened_at,
+        "retry_at": row.retry_at,
+        "last_error_message": row.last_error_message or None,
+        "updated_at": row.updated_at,
+    }
@@ -2,11 +2,16 @@ from __future__ import annotations
 
 import json
 import logging
-import urllib.error
-import urllib.request
 from dataclasses import dataclass
 from typing import Any
 
+from app.services.ai_center.transport import (
+    AiTransportConnectionError,
+    AiTransportError,
+    AiTransportHttpError,
+    get_ai_transport,
+)
+
 
 logger = logging.getLogger(__name__)
 
@@ -112,46 +117,15 @@ def _format_payload_preview(payload: dict[str, Any]) -> str:
         return _truncate_preview_text(repr(payload), max_length=400)
 
 
-def _http_request_json(
-    method: str,
-    url: str,
-    *,
-    api_key: str,
-    payload: dict[str, Any] | None = None,
-    timeout: int = 25,
-) -> dict[str, Any]:
-    data = None
-    headers = {
-        "Accept": "application/json",
-        "User-Agent": "TGMonitor/1.0",
-    }
-    if api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-    if payload is not None:
-        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-        headers["Content-Type"] = "application/json"
+def _translate_transport_error(exc: AiTransportError) -> AiCenterError:
+    if isinstance(exc, AiTransportHttpError):
+        return AiCenterError(f"AI request failed: {exc.status} {exc.detail}")
+    if isinstance(exc, AiTransportConnectionError):
+        return AiCenterError(f"AI connection failed: {exc.reason}")
+    return AiCenterError(f"AI request failed: {exc}")
 
-    request = urllib.request.Request(url=url, data=data, headers=headers, method=method.upper())
-    try:
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            charset = response.headers.get_content_charset() or "utf-8"
-            body = response.read().decode(charset, errors="replace")
-    except urllib.error.HTTPError as exc:
-        raw_body = exc.read().decode("utf-8", errors="replace")
-        detail = raw_body
-        try:
-            parsed = json.loads(raw_body)
-            detail = (
-                _normalize_text(parsed.get("error", {}).get("message"))
-                or _normalize_text(parsed.get("message"))
-                or raw_body
-            )
-        except Exception:
-            detail = raw_body or str(exc)
-        raise AiCenterError(f"AI request failed: {exc.code} {detail}") from exc
-    except urllib.error.URLError as exc:
-        raise AiCenterError(f"AI connection failed: {exc.reason}") from exc
 
+def _parse_json_body(body: str) -> dict[str, Any]:
     try:
         parsed = json.loads(body)
     except json.JSONDecodeError as exc:
@@ -161,70 +135,64 @@ def _http_request_json(
     return parsed
 
 
-def _http_request_sse(
+async def _http_request_json_async(
+    method: str,
+    url: str,
+    *,
+    api_key: str,
+    payload: dict[str, Any] | None = None,
+    timeout: int = 25,
+    concurrency_key: str | None = None,
+    max_concurrency: int | None = None,
+) -> dict[str, Any]:
+    try:
+        body = await get_ai_transport().request_text(
+            method,
+            url,
+            api_key=api_key,
+            payload=payload,
+            timeout=timeout,
+            concurrency_key=concurrency_key,
+            max_concurrency=max_concurrency,
+        )
+    except AiTransportError as exc:
+        raise _translate_transport_error(exc) from exc
+    return _parse_json_body(body)
+
+
+async def _http_request_sse_async(
     url: str,
     *,
     api_key: str,
     payload: dict[str, Any],
     timeout: int = 30,
+    concurrency_key: str | None = None,
+    max_concurrency: int | None = None,
 ) -> list[str]:
-    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    headers = {
-        "Accept": "text/event-stream",
-        "Content-Type": "application/json",
-        "User-Agent": "TGMonitor/1.0",
-    }
-    if api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-
-    request = urllib.request.Request(url=url, data=data, headers=headers, method="POST")
     try:
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            charset = response.headers.get_content_charset() or "utf-8"
-            chunks: list[str] = []
-            current_lines: list[str] = []
-            for raw_line in response:
-                line = raw_line.decode(charset, errors="replace").rstrip("\r\n")
-                if not line:
-                    if current_lines:
-                        chunk = _extract_sse_data_block(current_lines)
-                        if chunk is not None:
-                            chunks.append(chunk)
-                        current_lines = []
-                    continue
-                if line.startswith(":"):
-                    continue
-                current_lines.append(line)
-            if current_lines:
-                chunk = _extract_sse_data_block(current_lines)
-                if chunk is not None:
-                    chunks.append(chunk)
-    except urllib.error.HTTPError as exc:
-        raw_body = exc.read().decode("utf-8", errors="replace")
-        detail = raw_body
-        try:
-            parsed = json.loads(raw_body)
-            detail = (
-                _normalize_text(parsed.get("error", {}).get("message"))
-                or _normalize_text(parsed.get("message"))
-                or raw_body
-            )
-        except Exception:
-            detail = raw_body or str(exc)
-        raise AiCenterError(f"AI request failed: {exc.code} {detail}") from exc
-    except urllib.error.URLError as exc:
-        raise AiCenterError(f"AI connection failed: {exc.reason}") from exc
-    return chunks
+        return await get_ai_transport().request_sse(
+            url,
+            api_key=api_key,
+            payload=payload,
+            timeout=timeout,
+            concurrency_key=concurrency_key,
+            max_concurrency=max_concurrency,
+        )
+    except AiTransportError as exc:
+        raise _translate_transport_error(exc) from exc
 
 
-def _extract_sse_data_block(lines: list[str]) -> str | None:
-    data_lines: list[str] = []
-    for line in lines:
-        if line.startswith("data:"):
-            data_lines.append(line[5:].lstrip())
-    if not data_lines:
-        return None
-    return "\n".join(data_lines).strip()
+def _http_request_json(
+    method: str,
+    url: str,
+    *,
+    api_key: str,
+    payload: dict[str, Any] | None = None,
+    timeout: int = 25,
+) -> dict[str, Any]:
+    return get_ai_transport().run(
+        _http_request_json_async(method, url, api_key=api_key, payload=payload, timeout=timeout)
+    )
 
 
 def _merge_text_parts(parts: list[str]) -> str:
@@ -442,6 +410,10 @@ def list_openai_compatible_models(*, base_url: str, api_key: str, timeout_second
         raise AiCenterError("AI API Key cannot be empty")
 
     response = _http_request_json("GET", f"{normalized_base_url}/models", api_key=normalized_api_key, timeout=timeout_seconds)
+    return _extract_model_items(response)
+
+
+def _extract_model_items(response: dict[str, Any]) -> list[dict[str, str]]:
     data = response.get("data")
     items: list[dict[str, str]] = []
     seen: set[str] = set()
@@ -463,7 +435,7 @@ def list_openai_compatible_models(*, base_url: str, api_key: str, timeout_second
     return items
 
 
-def complete_openai_compatible_text(
+async def complete_openai_compatible_text_async(
     *,
     base_url: str,
     api_key: str,
@@ -472,6 +444,8 @@ def complete_openai_compatible_text(
     user_prompt: str,
     api_mode: str = AI_API_MODE_AUTO,
     timeout_seconds: int = 25,
+    concurrency_key: str | None = None,
+    max_concurrency: int | None = None,
 ) -> AiTextCompletionResult:
     normalized_base_url = normalize_base_url(base_url)
     normalized_api_key = _normalize_text(api_key, max_length=8000)
@@ -484,7 +458,15 @@ def complete_openai_compatible_text(
 
     models_to_try = [normalized_model] if normalized_model else []
     if not models_to_try:
-        models_to_try = [item["id"] for item in list_openai_compatible_models(base_url=normalized_base_url, api_key=normalized_api_key, timeout_seconds=timeout_seconds)]
+        response = await _http_request_json_async(
+            "GET",
+            f"{normalized_base_url}/models",
+            api_key=normalized_api_key,
+            timeout=timeout_seconds,
+            concurrency_key=concurrency_key,
+            max_concurrency=max_concurrency,
+        )
+        models_to_try = [item["id"] for item in _extract_model_items(response)]
         if not models_to_try:
             raise AiCenterError("No available AI model was found")
 
@@ -512,20 +494,24 @@ def complete_openai_compatible_text(
                     )
                 endpoint_url = f"{normalized_base_url}{attempt.endpoint_path}"
                 if attempt.stream:
-                    chunks = _http_request_sse(
+                    chunks = await _http_request_sse_async(
                         endpoint_url,
                         api_key=normalized_api_key,
                         payload=payload,
                         timeout=max(30, timeout_seconds),
+                        concurrency_key=concurrency_key,
+                        max_concurrency=max_concurrency,
                     )
                     text = _extract_stream_text(chunks, api_mode=attempt.api_mode)
                 else:
-                    response = _http_request_json(
+                    response = await _http_request_json_async(
                         "POST",
                         endpoint_url,
                         api_key=normalized_api_key,
                         payload=payload,
                         timeout=timeout_seconds,
+                        concurrency_key=concurrency_key,
+                        max_concurrency=max_concurrency,
                     )
                     text = _extract_completion_text(response)
                 return AiTextCompletionResult(
@@ -542,3 +528,30 @@ def complete_openai_compatible_text(
     if len(last_errors) == 1:
         raise AiCenterError(last_errors[0])
     raise AiCenterError(" ; ".join(last_errors))
+
+
+def complete_openai_compatible_text(
+    *,
+    base_url: str,
+    api_key: str,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    api_mode: str = AI_API_MODE_AUTO,
+    timeout_seconds: int = 25,
+    concurrency_key: str | None = None,
+    max_concurrency: int | None = None,
+) -> AiTextCompletionResult:
+    return get_ai_transport().run(
+        complete_openai_compatible_text_async(
+            base_url=base_url,
+            api_key=api_key,
+            model=model,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            api_mode=api_mode,
+            timeout_seconds=timeout_seconds,
+            concurrency_key=concurrency_key,
+            max_concurrency=max_concurrency,
+        )
+    )
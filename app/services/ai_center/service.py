@@ -12,20 +12,34 @@ from sqlalchemy.orm import Session
 
 from app.models.models import (
     AiCallEvent,
+    AiCircuitState,
     AiProviderConfig,
     AiProviderModel,
     AiRouteProfile,
     AiRouteStep,
     ensure_runtime_storage_tables,
 )
+from app.models.config import settings
 from app.services.ai_center.client import (
     AI_API_MODE_AUTO,
     AiCenterError,
     complete_openai_compatible_text,
+    complete_openai_compatible_text_async,
     list_openai_compatible_models,
     normalize_api_mode,
     normalize_base_url,
 )
+from app.services.ai_center.circuit import (
+    AI_CIRCUIT_STATE_CLOSED,
+    AI_CIRCUIT_STATE_HALF_OPEN,
+    AI_CIRCUIT_STATE_OPEN,
+    claim_half_open_probe,
+    evaluate_circuit,
+    load_circuit_states,
+    record_circuit_result,
+    serialize_circuit_state,
+)
+from app.services.ai_center.transport import AiHedgeOutcome, get_ai_transport
 from app.services.secret_codec import decrypt_secret, encrypt_secret
 
 
@@ -49,6 +63,8 @@ AI_EVENT_STATUS_SUCCESS = "success"
 AI_EVENT_STATUS_ERROR = "error"
 AI_EVENT_STATUS_SKIPPED = "skipped"
 AI_MODEL_SCORE_DEFAULT = 50
+AI_ROUTE_DEFAULT_HEDGE_DELAY_MS = 800
+AI_PROVIDER_MAX_CONCURRENCY_LIMIT = 64
 AI_EMPTY_RESPONSE_MARKERS = (
     "empty message",
     "no content",
@@ -263,9 +279,74 @@ def _normalize_route_settings(*, route_key: str, extra_json: dict[str, Any] | No
         "preferred_capabilities": preferred_capabilities,
         "allow_same_provider_model_failover": _normalize_bool(raw.get("allow_same_provider_model_failover"), True),
         "allow_cross_provider_failover": _normalize_bool(raw.get("allow_cross_provider_failover"), True),
+        "hedge_enabled": _normalize_bool(raw.get("hedge_enabled"), False),
+        "hedge_delay_ms": _normalize_int(raw.get("hedge_delay_ms"), AI_ROUTE_DEFAULT_HEDGE_DELAY_MS, minimum=0, maximum=30_000),
+    }
+
+
+def _resolve_provider_max_concurrency(provider: AiProviderConfig) -> int:
+    default = int(getattr(settings, "AI_PROVIDER_DEFAULT_MAX_CONCURRENCY", 4) or 4)
+    return _normalize_int(
+        dict(provider.extra_json or {}).get("max_concurrency"),
+        default,
+        minimum=1,
+        maximum=AI_PROVIDER_MAX_CONCURRENCY_LIMIT,
+    )
+
+
+def _build_completion_request(
+    *,
+    provider: AiProviderConfig,
+    model_id: str,
+    system_prompt: str,
+    user_prompt: str,
+) -> dict[str, Any]:
+    return {
+        "base_url": normalize_base_url(str(provider.base_url or "")),
+        "api_key": decrypt_secret(_normalize_text(provider.api_key_encrypted, max_length=8000)),
+        "model": model_id,
+        "system_prompt": system_prompt,
+        "user_prompt": user_prompt,
+        "api_mode": _normalize_text(provider.api_mode, max_length=32) or AI_API_MODE_AUTO,
+        "timeout_seconds": int(provider.timeout_seconds or 25),
+        "concurrency_key": f"ai_provider:{int(provider.id)}",
+        "max_concurrency": _resolve_provider_max_concurrency(provider),
     }
 
 
+def _run_hedged_candidates(
+    *,
+    candidates: list[dict[str, Any]],
+    provider_lookup: dict[int, AiProviderConfig],
+    system_prompt: str,
+    user_prompt: str,
+    hedge_delay_ms: int,
+) -> dict[int, AiHedgeOutcome]:
+    requests: list[dict[str, Any]] = []
+    for candidate in candidates[:2]:
+        provider = provider_lookup.get(int(candidate["provider_id"]))
+        if provider is None or candidate.get("circuit_state") != AI_CIRCUIT_STATE_CLOSED:
+            break
+        requests.append(
+            _build_completion_request(
+                provider=provider,
+                model_id=_normalize_text(candidate.get("model_id"), max_length=255) or "",
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+            )
+        )
+    if len(requests) < 2:
+        return {}
+    transport = get_ai_transport()
+    outcomes = transport.run(
+        transport.hedge(
+            [lambda request=request: complete_openai_compatible_text_async(**request) for request in requests],
+            hedge_delay_seconds=max(0, int(hedge_delay_ms)) / 1000,
+        )
+    )
+    return {outcome.index: outcome for outcome in outcomes if outcome.started}
+
+
 def _merge_route_settings(
     *,
     route_key: str,
@@ -487,6 +568,7 @@ def _serialize_provider(
         "timeout_seconds": int(row.timeout_seconds or 25),
         "max_retries": int(row.max_retries or 1),
         "cooldown_seconds": int(row.cooldown_seconds or 300),
+        "max_concurrency": _resolve_provider_max_concurrency(row),
         "cooldown_until": row.cooldown_until,
         "health_status": _normalize_text(row.health_status, max_length=32) or "unknown",
         "consecutive_failures": int(row.consecutive_failures or 0),
@@ -570,6 +652,7 @@ def _build_route_candidates(
     route_settings = _normalize_route_settings(route_key=route_key, extra_json=dict(route.extra_json or {}))
     provider_ids = [int(step.provider_id) for step in steps if int(step.provider_id or 0) > 0]
     stats = _load_ai_call_stats(session, provider_ids=provider_ids, route_key=route_key)
+    circuit_states = load_circuit_states(session, provider_ids=provider_ids)
     candidates: list[dict[str, Any]] = []
     seen: set[tuple[int, str]] = set()
     now = _utcnow()
@@ -636,6 +719,11 @@ def _build_route_candidates(
             if allowlist and route_key not in allowlist:
                 continue
 
+            circuit_row = circuit_states.get((int(provider.id), model_id))
+            circuit = evaluate_circuit(circuit_row, now=now)
+            if not circuit.allowed:
+                continue
+
             reasons: list[str] = []
             score = 0.0
             if route_settings["selection_mode"] == AI_ROUTE_SELECTION_MODE_MANUAL:
@@ -686,6 +774,15 @@ def _build_route_candidates(
                 score += goal_bonus
                 reasons.append(f"goal{goal_bonus:+.1f}")
 
+            if circuit.state == AI_CIRCUIT_STATE_HALF_OPEN:
+                score -= 10
+                reasons.append("half-open-10")
+            if circuit_row is not None and circuit_row.ewma_latency_ms is not None:
+                latency_penalty = round(min(12.0, float(circuit_row.ewma_latency_ms) / 1000.0 * 1.5), 1)
+                if latency_penalty:
+                    score -= latency_penalty
+                    reasons.append(f"latency-{latency_penalty:.1f}")
+
             stats_key = (int(provider.id), model_id)
             route_stats = stats["route"].get(stats_key, {}) if model_id else {}
             global_stats = stats["global"].get(stats_key, {}) if model_id else {}
@@ -712,6 +809,7 @@ def _build_route_candidates(
                     or "auto"
                 ),
                 "model_row": model,
+                "circuit_state": circuit.state,
                 "selection_mode": route_settings["selection_mode"],
                 "optimization_goal": route_settings["optimization_goal"],
                 "score": round(score, 2),
@@ -846,6 +944,8 @@ def _serialize_route(
         "preferred_capabilities": list(route_settings["preferred_capabilities"]),
         "allow_same_provider_model_failover": bool(route_settings["allow_same_provider_model_failover"]),
         "allow_cross_provider_failover": bool(route_settings["allow_cross_provider_failover"]),
+        "hedge_enabled": bool(route_settings["hedge_enabled"]),
+        "hedge_delay_ms": int(route_settings["hedge_delay_ms"]),
         "updated_by": _normalize_text(row.updated_by, max_length=128) or None,
         "extra_json": dict(row.extra_json or {}),
         "steps": serialized_steps,
@@ -1264,6 +1364,20 @@ def get_ai_center_overview(session: Session) -> dict[str, Any]:
         .scalar()
         or 0
     )
+    circuit_rows = (
+        session.query(AiCircuitState)
+        .filter(AiCircuitState.state != AI_CIRCUIT_STATE_CLOSED)
+        .order_by(AiCircuitState.updated_at.desc(), AiCircuitState.id.desc())
+        .all()
+    )
+    circuit_items = [
+        serialize_circuit_state(
+            row,
+            provider_label=_normalize_text(getattr(provider_lookup.get(int(row.provider_id)), "display_name", None), max_length=128)
+            or None,
+        )
+        for row in circuit_rows
+    ]
     default_provider = next((row for row in provider_rows if bool(row.is_default)), None)
     migrated_provider = next(
         (
@@ -1285,6 +1399,9 @@ def get_ai_center_overview(session: Session) -> dict[str, Any]:
         "recent_success_count_24h": int(success_count_24h),
         "recent_failure_count_24h": int(failure_count_24h),
         "legacy_migration_applied": migrated_provider is not None,
+        "open_circuit_count": sum(1 for item in circuit_items if item["state"] == AI_CIRCUIT_STATE_OPEN),
+        "half_open_circuit_count": sum(1 for item in circuit_items if item["state"] == AI_CIRCUIT_STATE_HALF_OPEN),
+        "circuits": circuit_items,
         "generated_at": _utcnow(),
     }
 
@@ -1386,6 +1503,16 @@ def save_ai_provider(
         **dict(row.extra_json or {}),
         **dict(payload.get("extra_json") or {}),
     }
+    if payload.get("max_concurrency") is not None:
+        row.extra_json = {
+            **dict(row.extra_json or {}),
+            "max_concurrency": _normalize_int(
+                payload.get("max_concurrency"),
+                _resolve_provider_max_concurrency(row),
+                minimum=1,
+                maximum=AI_PROVIDER_MAX_CONCURRENCY_LIMIT,
+            ),
+        }
 
     if "api_key" in payload:
         api_key = _normalize_text(payload.get("api_key"), max_length=8000)
@@ -1538,13 +1665,12 @@ def test_ai_provider(
         provider_models_lookup=provider_models_lookup,
     )
     result = complete_openai_compatible_text(
-        base_url=str(provider.base_url or ""),
-        api_key=decrypt_secret(_normalize_text(provider.api_key_encrypted, max_length=8000)),
-        model=model_id or "",
-        system_prompt="You are an AI connectivity checker. Reply with a short confirmation only.",
-        user_prompt=_normalize_text((payload or {}).get("sample_text"), max_length=500) or "Reply with OK only.",
-        api_mode=_normalize_text(provider.api_mode, max_length=32) or AI_API_MODE_AUTO,
-        timeout_seconds=int(provider.timeout_seconds or 25),
+        **_build_completion_request(
+            provider=provider,
+            model_id=model_id or "",
+            system_prompt="You are an AI connectivity checker. Reply with a short confirmation only.",
+            user_prompt=_normalize_text((payload or {}).get("sample_text"), max_length=500) or "Reply with OK only.",
+        )
     )
     _mark_provider_success(session, provider=provider)
     session.flush()
@@ -1657,6 +1783,11 @@ def save_ai_route(
             "preferred_capabilities": payload.get("preferred_capabilities"),
             "allow_same_provider_model_failover": payload.get("allow_same_provider_model_failover"),
             "allow_cross_provider_failover": payload.get("allow_cross_provider_failover"),
+            **{
+                key: payload[key]
+                for key in ("hedge_enabled", "hedge_delay_ms")
+                if payload.get(key) is not None
+            },
         },
     )
     session.add(route)
@@ -1800,7 +1931,16 @@ def execute_text_route(
     route_max_attempts = max(1, int(route.max_attempts or AI_ROUTE_DEFAULT_MAX_ATTEMPTS))
     provider_attempts: dict[int, dict[str, Any]] = {}
     attempt_trace: list[dict[str, Any]] = []
-    for candidate in candidates:
+    hedged_outcomes: dict[int, AiHedgeOutcome] = {}
+    if route_settings["hedge_enabled"] and route_max_attempts >= 2:
+        hedged_outcomes = _run_hedged_candidates(
+            candidates=candidates,
+            provider_lookup=provider_lookup,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            hedge_delay_ms=int(route_settings["hedge_delay_ms"]),
+        )
+    for candidate_index, candidate in enumerate(candidates):
         if attempts >= route_max_attempts:
             break
         provider = provider_lookup.get(int(candidate["provider_id"]))
@@ -1810,6 +1950,28 @@ def execute_text_route(
         base_url = normalize_base_url(str(provider.base_url or ""))
         if not base_url or not _normalize_text(api_key, max_length=8000):
             continue
+        hedged = hedged_outcomes.get(candidate_index)
+        if hedged is not None and hedged.cancelled:
+            attempt_trace.append(
+                {
+                    "attempt_index": attempts,
+                    "provider_id": int(provider.id),
+                    "provider_label": candidate["provider_label"],
+                    "model_id": _normalize_text(candidate.get("model_id"), max_length=255) or None,
+                    "status": AI_EVENT_STATUS_SKIPPED,
+                    "error_message": "hedged request cancelled",
+                    "duration_ms": hedged.duration_ms,
+                    "selection_summary": candidate["selection_summary"],
+                    "candidate_score": float(candidate["score"]),
+                    "candidate_reasons": list(candidate["reasons"]),
+                }
+            )
+            continue
+        if candidate.get("circuit_state") == AI_CIRCUIT_STATE_HALF_OPEN and not claim_half_open_probe(
+            provider_id=int(provider.id),
+            model_id=candidate.get("model_id"),
+        ):
+            continue
         attempts += 1
         provider_state = provider_attempts.setdefault(
             int(provider.id),
@@ -1822,17 +1984,28 @@ def execute_text_route(
         model_id = _normalize_text(candidate.get("model_id"), max_length=255) or ""
         start_time = _utcnow()
         try:
-            result = complete_openai_compatible_text(
-                base_url=base_url,
-                api_key=api_key,
-                model=model_id,
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                api_mode=_normalize_text(provider.api_mode, max_length=32) or AI_API_MODE_AUTO,
-                timeout_seconds=int(provider.timeout_seconds or 25),
-            )
-            duration_ms = int((_utcnow() - start_time).total_seconds() * 1000)
+            if hedged is not None:
+                if hedged.error is not None:
+                    raise hedged.error
+                result = hedged.result
+                duration_ms = int(hedged.duration_ms or 0)
+            else:
+                result = complete_openai_compatible_text(
+                    **_build_completion_request(
+                        provider=provider,
+                        model_id=model_id,
+                        system_prompt=system_prompt,
+                        user_prompt=user_prompt,
+                    )
+                )
+                duration_ms = int((_utcnow() - start_time).total_seconds() * 1000)
             provider_state["success"] = True
+            record_circuit_result(
+                provider=provider,
+                model_id=model_id,
+                success=True,
+                duration_ms=duration_ms,
+            )
             trace_row = {
                 "attempt_index": attempts,
                 "provider_id": int(provider.id),
@@ -1866,6 +2039,7 @@ def execute_text_route(
                     "attempt_index": attempts,
                     "candidate_score": float(candidate["score"]),
                     "candidate_reasons": list(candidate["reasons"]),
+                    "hedged": hedged is not None,
                     "attempt_trace": list(attempt_trace),
                 },
             )
@@ -1895,8 +2069,18 @@ def execute_text_route(
             )
         except Exception as exc:
             error_message = _normalize_text(exc, max_length=2000) or type(exc).__name__
-            duration_ms = int((_utcnow() - start_time).total_seconds() * 1000)
+            if hedged is not None and hedged.duration_ms is not None:
+                duration_ms = int(hedged.duration_ms)
+            else:
+                duration_ms = int((_utcnow() - start_time).total_seconds() * 1000)
             provider_state["errors"].append(error_message)
+            record_circuit_result(
+                provider=provider,
+                model_id=model_id,
+                success=False,
+                duration_ms=duration_ms,
+                error_message=error_message,
+            )
             trace_row = {
                 "attempt_index": attempts,
                 "provider_id": int(provider.id),
@@ -1931,6 +2115,7 @@ def execute_text_route(
                     "attempt_index": attempts,
                     "candidate_score": float(candidate["score"]),
                     "candidate_reasons": list(candidate["reasons"]),
+                    "hedged": hedged is not None,
                 },
             )
             errors.append(f"candidate#{attempts}: {error_message}")
@@ -0,0 +1,376 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, TypeVar
+
+import aiohttp
+
+from app.models.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+AI_TRANSPORT_USER_AGENT = "TGMonitor/1.0"
+
+
+class AiTransportError(RuntimeError):
+    pass
+
+
+class AiTransportHttpError(AiTransportError):
+    def __init__(self, status: int, detail: str) -> None:
+        super().__init__(f"{status} {detail}")
+        self.status = int(status)
+        self.detail = detail
+
+
+class AiTransportConnectionError(AiTransportError):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+@dataclass(slots=True)
+class AiHedgeOutcome:
+    index: int
+    started: bool = False
+    cancelled: bool = False
+    result: Any = None
+    error: BaseException | None = None
+    duration_ms: int | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.started and not self.cancelled and self.error is None
+
+
+def _normalize_text(value: Any) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def extract_http_error_detail(raw_body: str, *, fallback: str = "") -> str:
+    try:
+        parsed = json.loads(raw_body)
+    except Exception:
+        return raw_body or fallback
+    if not isinstance(parsed, dict):
+        return raw_body or fallback
+    error_payload = parsed.get("error")
+    error_message = error_payload.get("message") if isinstance(error_payload, dict) else None
+    return _normalize_text(error_message) or _normalize_text(parsed.get("message")) or raw_body or fallback
+
+
+def _build_headers(*, api_key: str, accept: str, has_body: bool) -> dict[str, str]:
+    headers = {
+        "Accept": accept,
+        "User-Agent": AI_TRANSPORT_USER_AGENT,
+    }
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    if has_body:
+        headers["Content-Type"] = "application/json"
+    return headers
+
+
+def _operation_timeout(timeout: float) -> aiohttp.ClientTimeout:
+    # Per connect/read like the old urllib timeout, not a cap on the whole
+    # exchange, so long SSE streams are not cut off while tokens keep coming.
+    return aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+
+
+def _extract_sse_data_block(lines: list[str]) -> str | None:
+    data_lines: list[str] = []
+    for line in lines:
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+    if not data_lines:
+        return None
+    return "\n".join(data_lines).strip()
+
+
+class AiProviderTransport:
+    """Process-wide keep-alive HTTP client for OpenAI compatible providers.
+
+    All requests run on one background event loop that owns a single pooled
+    ``aiohttp`` session, so TCP/TLS connections are reused across calls and
+    sync callers (route execution, admin tests) never block each other on
+    connection setup. Each provider gets its own concurrency semaphore.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int,
+        keepalive_seconds: int,
+        default_max_concurrency: int,
+    ) -> None:
+        self.max_connections = max(1, int(max_connections))
+        self.keepalive_seconds = max(1, int(keepalive_seconds))
+        self.default_max_concurrency = max(1, int(default_max_concurrency))
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self._semaphores: dict[str, tuple[int, asyncio.Semaphore]] = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None and self._thread is not None and self._thread.is_alive():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run() -> None:
+                asyncio.set_event_loop(loop)
+                ready.set()
+                loop.run_forever()
+
+            thread = threading.Thread(target=_run, name="ai-provider-transport", daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop = loop
+            self._thread = thread
+            self._session = None
+            self._semaphores = {}
+            return loop
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise AiTransportError("AI transport cannot be driven from its own event loop")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=self.keepalive_seconds,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def _get_semaphore(self, key: str | None, max_concurrency: int | None) -> asyncio.Semaphore | None:
+        if not key:
+            return None
+        limit = max(1, int(max_concurrency or self.default_max_concurrency))
+        current = self._semaphores.get(key)
+        if current is None or current[0] != limit:
+            current = (limit, asyncio.Semaphore(limit))
+            self._semaphores[key] = current
+        return current[1]
+
+    async def _with_limit(
+        self,
+        factory: Callable[[], Awaitable[T]],
+        *,
+        concurrency_key: str | None,
+        max_concurrency: int | None,
+    ) -> T:
+        semaphore = self._get_semaphore(concurrency_key, max_concurrency)
+        if semaphore is None:
+            return await factory()
+        async with semaphore:
+            return await factory()
+
+    async def request_text(
+        self,
+        method: str,
+        url: str,
+        *,
+        api_key: str,
+        payload: dict[str, Any] | None = None,
+        timeout: float = 25,
+        concurrency_key: str | None = None,
+        max_concurrency: int | None = None,
+    ) -> str:
+        async def _send() -> str:
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+            headers = _build_headers(api_key=api_key, accept="application/json", has_body=data is not None)
+            try:
+                async with self._get_session().request(
+                    method.upper(),
+                    url,
+                    data=data,
+                    headers=headers,
+                    timeout=_operation_timeout(timeout),
+                ) as response:
+                    body = await response.text(errors="replace")
+                    if response.status >= 400:
+                        raise AiTransportHttpError(
+                            response.status,
+                            extract_http_error_detail(body, fallback=response.reason or ""),
+                        )
+                    return body
+            except asyncio.TimeoutError as exc:
+                raise AiTransportConnectionError("timed out") from exc
+            except aiohttp.ClientError as exc:
+                raise AiTransportConnectionError(str(exc) or type(exc).__name__) from exc
+
+        return await self._with_limit(_send, concurrency_key=concurrency_key, max_concurrency=max_concurrency)
+
+    async def stream_sse(
+        self,
+        url: str,
+        *,
+        api_key: str,
+        payload: dict[str, Any],
+        timeout: float = 30,
+    ) -> AsyncIterator[str]:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = _build_headers(api_key=api_key, accept="text/event-stream", has_body=True)
+        try:
+            async with self._get_session().post(
+                url,
+                data=data,
+                headers=headers,
+                timeout=_operation_timeout(timeout),
+            ) as response:
+                if response.status >= 400:
+                    body = await response.text(errors="replace")
+                    raise AiTransportHttpError(
+                        response.status,
+                        extract_http_error_detail(body, fallback=response.reason or ""),
+                    )
+                charset = response.charset or "utf-8"
+                current_lines: list[str] = []
+                async for raw_line in response.content:
+                    line = raw_line.decode(charset, errors="replace").rstrip("\r\n")
+                    if not line:
+                        if current_lines:
+                            chunk = _extract_sse_data_block(current_lines)
+                            if chunk is not None:
+                                yield chunk
+                            current_lines = []
+                        continue
+                    if line.startswith(":"):
+                        continue
+                    current_lines.append(line)
+                if current_lines:
+                    chunk = _extract_sse_data_block(current_lines)
+                    if chunk is not None:
+                        yield chunk
+        except asyncio.TimeoutError as exc:
+            raise AiTransportConnectionError("timed out") from exc
+        except aiohttp.ClientError as exc:
+            raise AiTransportConnectionError(str(exc) or type(exc).__name__) from exc
+
+    async def request_sse(
+        self,
+        url: str,
+        *,
+        api_key: str,
+        payload: dict[str, Any],
+        timeout: float = 30,
+        concurrency_key: str | None = None,
+        max_concurrency: int | None = None,
+    ) -> list[str]:
+        async def _collect() -> list[str]:
+            return [chunk async for chunk in self.stream_sse(url, api_key=api_key, payload=payload, timeout=timeout)]
+
+        return await self._with_limit(_collect, concurrency_key=concurrency_key, max_concurrency=max_concurrency)
+
+    async def hedge(
+        self,
+        factories: list[Callable[[], Awaitable[Any]]],
+        *,
+        hedge_delay_seconds: float,
+    ) -> list[AiHedgeOutcome]:
+        """Start ``factories`` one after another, ``hedge_delay_seconds`` apart.
+
+        The next request is launched early when the running one fails. The
+        first success wins and any request still in flight is cancelled.
+        """
+        outcomes = [AiHedgeOutcome(index=index) for index in range(len(factories))]
+        pending: dict[asyncio.Task, int] = {}
+        started_at: dict[int, float] = {}
+        next_index = 0
+
+        def _launch() -> None:
+            nonlocal next_index
+            index = next_index
+            next_index += 1
+            outcomes[index].started = True
+            started_at[index] = time.monotonic()
+            pending[asyncio.ensure_future(factories[index]())] = index
+
+        if factories:
+            _launch()
+        try:
+            while pending:
+                wait_timeout = max(0.0, float(hedge_delay_seconds)) if next_index < len(factories) else None
+                done, _ = await asyncio.wait(pending.keys(), timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    _launch()
+                    continue
+                winner: AiHedgeOutcome | None = None
+                for task in done:
+                    index = pending.pop(task)
+                    outcome = outcomes[index]
+                    outcome.duration_ms = int((time.monotonic() - started_at[index]) * 1000)
+                    try:
+                        outcome.result = task.result()
+                        if winner is None:
+                            winner = outcome
+                    except Exception as exc:
+                        outcome.error = exc
+                if winner is not None:
+                    break
+                if next_index < len(factories):
+                    _launch()
+        finally:
+            for task, index in pending.items():
+                task.cancel()
+                outcomes[index].cancelled = True
+                outcomes[index].duration_ms = int((time.monotonic() - started_at[index]) * 1000)
+            if pending:
+                await asyncio.gather(*pending.keys(), return_exceptions=True)
+        return outcomes
+
+    async def _close_session(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def close(self) -> None:
+        with self._lock:
+            loop = self._loop
+            thread = self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None or thread is None or not thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_session(), loop).result(timeout=5)
+        except Exception:
+            logger.debug("AI transport session close failed", exc_info=True)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+
+_transport_lock = threading.Lock()
+_transport: AiProviderTransport | None = None
+
+
+def get_ai_transport() -> AiProviderTransport:
+    global _transport
+    if _transport is not None:
+        return _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = AiProviderTransport(
+                max_connections=int(getattr(settings, "AI_TRANSPORT_MAX_CONNECTIONS", 32) or 32),
+                keepalive_seconds=int(getattr(settings, "AI_TRANSPORT_KEEPALIVE_SECONDS", 60) or 60),
+                default_max_concurrency=int(getattr(settings, "AI_PROVIDER_DEFAULT_MAX_CONCURRENCY", 4) or 4),
+            )
+            atexit.register(_transport.close)
+        return _transport
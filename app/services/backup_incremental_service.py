@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import json
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import BigInteger, Date, DateTime, Integer, Table, func, inspect, or_, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection
+
+from app.models.models import BackupDeletedRow, Base
+
+
+BACKUP_INCREMENTAL_FORMAT_VERSION = 2
+BACKUP_INCREMENTAL_CHUNK_ROWS = 5000
+# Ids are handed out before commit and updated_at is stamped by the writer's
+# clock, so each delta re-reads a small window behind the previous watermark.
+# Replay is an upsert, so the overlap is harmless.
+BACKUP_INCREMENTAL_ID_OVERLAP = 1000
+BACKUP_INCREMENTAL_TIME_OVERLAP_SECONDS = 300
+BACKUP_INCREMENTAL_TABLES_DIR = "tables"
+# Derived tables their owners rebuild when empty (the dedup keeper index and
+# the pan transfer batch counters). Deltas skip them and replay empties them,
+# so a restored chain never keeps a stale copy from the base archive.
+BACKUP_INCREMENTAL_REBUILDABLE_TABLES = frozenset({"dedup_url_keepers", "pan_transfer_batch_status_counts"})
+# Deletes on id tables are logged by statement-level triggers so a delta only
+# carries the ids removed since its parent instead of every live id range.
+BACKUP_DELETION_LOG_TABLE = BackupDeletedRow.__tablename__
+BACKUP_DELETION_LOG_FUNCTION = "backup_log_deleted_rows"
+BACKUP_DELETION_LOG_TRIGGER_PREFIX = "backup_deleted_rows_"
+
+
+def _utc_now() -> datetime:
+    return datetime.utcnow()
+
+
+def _has_integer_id(table: Table) -> bool:
+    primary_key = list(table.primary_key.columns)
+    return (
+        len(primary_key) == 1
+        and primary_key[0].name == "id"
+        and isinstance(primary_key[0].type, (Integer, BigInteger))
+    )
+
+
+def _list_backup_tables(connection: Connection) -> list[Table]:
+    existing = set(inspect(connection).get_table_names())
+    existing.discard(BACKUP_DELETION_LOG_TABLE)
+    return [table for table in Base.metadata.sorted_tables if table.name in existing]
+
+
+def _quote(connection: Connection, name: str) -> str:
+    return connection.dialect.identifier_preparer.quote(name)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Unsupported value type for incremental backup: {type(value).__name__}")
+
+
+def _decode_row(table: Table, payload: dict[str, Any]) -> dict[str, Any]:
+    row: dict[str, Any] = {}
+    for column in table.columns:
+        if column.name not in payload:
+            continue
+        value = payload[column.name]
+        if isinstance(value, str) and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif isinstance(value, str) and isinstance(column.type, Date):
+            value = date.fromisoformat(value)
+        row[column.name] = value
+    return row
+
+
+def ensure_backup_deletion_log(connection: Connection) -> None:
+    """Install the delete triggers that feed ``backup_deleted_rows``.
+
+    Must run, and commit, before the base archive's watermarks are taken:
+    deletes made before a table had its trigger never reach the log.
+    """
+    log_table = _quote(connection, BACKUP_DELETION_LOG_TABLE)
+    connection.execute(
+        text(
+            f"""
+            CREATE OR REPLACE FUNCTION {BACKUP_DELETION_LOG_FUNCTION}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                INSERT INTO {log_table} (table_name, row_id)
+                SELECT TG_TABLE_NAME, id FROM deleted_rows;
+                RETURN NULL;
+            END
+            $$
+            """
+        )
+    )
+    installed = set(connection.execute(text("SELECT tgname FROM pg_trigger WHERE NOT tgisinternal")).scalars())
+    for table in _list_backup_tables(connection):
+        trigger_name = f"{BACKUP_DELETION_LOG_TRIGGER_PREFIX}{table.name}"
+        if not _has_integer_id(table) or trigger_name in installed:
+            continue
+        connection.execute(
+            text(
+                f"""
+                CREATE TRIGGER {_quote(connection, trigger_name)}
+                AFTER DELETE ON {_quote(connection, table.name)}
+                REFERENCING OLD TABLE AS deleted_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION {BACKUP_DELETION_LOG_FUNCTION}()
+                """
+            )
+        )
+
+
+def prune_backup_deletion_log(connection: Connection, *, through_id: int) -> int:
+    if through_id <= 0:
+        return 0
+    result = connection.execute(BackupDeletedRow.__table__.delete().where(BackupDeletedRow.id <= through_id))
+    return int(result.rowcount or 0)
+
+
+def capture_backup_watermarks(connection: Connection) -> dict[str, Any]:
+    tables: dict[str, dict[str, Any]] = {}
+    for table in _list_backup_tables(connection):
+        if not _has_integer_id(table):
+            continue
+        max_id = connection.execute(select(func.max(table.c.id))).scalar()
+        tables[table.name] = {"max_id": int(max_id or 0)}
+    deleted_log_id = connection.execute(select(func.max(BackupDeletedRow.id))).scalar()
+    return {
+        "captured_at": _utc_now().isoformat(),
+        "deleted_log_id": int(deleted_log_id or 0),
+        "tables": tables,
+    }
+
+
+def _deleted_ids_since(
+    connection: Connection,
+    table: Table,
+    *,
+    previous_log_id: int,
+    current_log_id: int,
+) -> list[int]:
+    statement = (
+        select(BackupDeletedRow.row_id)
+        .where(
+            BackupDeletedRow.table_name == table.name,
+            BackupDeletedRow.id > max(0, previous_log_id - BACKUP_INCREMENTAL_ID_OVERLAP),
+            BackupDeletedRow.id <= current_log_id,
+        )
+        .distinct()
+        .order_by(BackupDeletedRow.row_id)
+    )
+    return [int(row_id) for row_id in connection.execute(statement).scalars()]
+
+
+def _write_row_chunks(archive: zipfile.ZipFile, connection: Connection, table: Table, statement: Any) -> tuple[int, list[str]]:
+    row_count = 0
+    chunk_names: list[str] = []
+    handle = None
+    try:
+        result = connection.execution_options(yield_per=BACKUP_INCREMENTAL_CHUNK_ROWS).execute(statement)
+        for row in result:
+            if row_count % BACKUP_INCREMENTAL_CHUNK_ROWS == 0:
+                if handle is not None:
+                    handle.close()
+                chunk_name = f"{BACKUP_INCREMENTAL_TABLES_DIR}/{table.name}/{len(chunk_names) + 1:05d}.jsonl"
+                chunk_names.append(chunk_name)
+                handle = archive.open(chunk_name, mode="w", force_zip64=True)
+            line = json.dumps(dict(row._mapping), ensure_ascii=False, default=_json_default)
+            handle.write(line.encode("utf-8") + b"\n")
+            row_count += 1
+    finally:
+        if handle is not None:
+            handle.close()
+    return row_count, chunk_names
+
+
+def write_incremental_tables(
+    archive: zipfile.ZipFile,
+    connection: Connection,
+    *,
+    previous_watermarks: dict[str, Any],
+    current_watermarks: dict[str, Any],
+) -> dict[str, Any]:
+    """Write rows changed since ``previous_watermarks`` as per-table JSONL chunks.
+
+    Tables keyed by an integer ``id`` export rows past the previous id
+    watermark, plus rows whose ``updated_at`` moved when the table has one,
+    and the ids the deletion log recorded since the parent so replay can drop
+    them. Edits to
+    id tables without ``updated_at`` are not captured; the chain's periodic
+    full backup (``incremental_full_every``) picks them up.
+
+    Other tables are written by primary key when they have ``updated_at``
+    (deleted rows are not tracked), left out when they are rebuildable
+    derived data, and snapshotted in full otherwise, which only leaves the
+    small runtime state tables.
+    """
+    previous_tables = previous_watermarks.get("tables") or {}
+    current_tables = current_watermarks.get("tables") or {}
+    previous_log_id = int(previous_watermarks.get("deleted_log_id") or 0)
+    current_log_id = int(current_watermarks.get("deleted_log_id") or 0)
+    since: datetime | None = None
+    if previous_watermarks.get("captured_at"):
+        since = datetime.fromisoformat(previous_watermarks["captured_at"]) - timedelta(
+            seconds=BACKUP_INCREMENTAL_TIME_OVERLAP_SECONDS
+        )
+
+    summary: dict[str, Any] = {}
+    total_rows = 0
+    for table in _list_backup_tables(connection):
+        if table.name in current_tables:
+            current_max_id = int(current_tables[table.name].get("max_id") or 0)
+            previous_max_id = int((previous_tables.get(table.name) or {}).get("max_id") or 0)
+            condition = table.c.id > max(0, previous_max_id - BACKUP_INCREMENTAL_ID_OVERLAP)
+            tracks_updates = "updated_at" in table.c and since is not None
+            if tracks_updates:
+                condition = or_(condition, table.c.updated_at > since)
+            statement = select(table).where(condition, table.c.id <= current_max_id).order_by(table.c.id)
+            row_count, chunk_names = _write_row_chunks(archive, connection, table, statement)
+
+            deleted_ids = _deleted_ids_since(
+                connection,
+                table,
+                previous_log_id=previous_log_id,
+                current_log_id=current_log_id,
+            )
+            deleted_name = None
+            if deleted_ids:
+                deleted_name = f"{BACKUP_INCREMENTAL_TABLES_DIR}/{table.name}/deleted_ids.json"
+                archive.writestr(deleted_name, json.dumps(deleted_ids))
+            summary[table.name] = {
+                "mode": "delta",
+                "rows": row_count,
+                "chunks": chunk_names,
+                "deleted_ids": deleted_name,
+                "deleted_count": len(deleted_ids),
+                "max_id": current_max_id,
+                "tracks_updates": "updated_at" in table.c,
+            }
+        elif table.name in BACKUP_INCREMENTAL_REBUILDABLE_TABLES:
+            row_count = 0
+            summary[table.name] = {"mode": "rebuild", "rows": 0, "chunks": []}
+        elif "updated_at" in table.c and since is not None:
+            statement = select(table).where(table.c.updated_at > since).order_by(*table.primary_key.columns)
+            row_count, chunk_names = _write_row_chunks(archive, connection, table, statement)
+            summary[table.name] = {"mode": "keyed", "rows": row_count, "chunks": chunk_names}
+        else:
+            row_count, chunk_names = _write_row_chunks(archive, connection, table, select(table))
+            summary[table.name] = {"mode": "snapshot", "rows": row_count, "chunks": chunk_names}
+        total_rows += row_count
+
+    return {
+        "format_version": BACKUP_INCREMENTAL_FORMAT_VERSION,
+        "row_count": total_rows,
+        "tables": summary,
+    }
+
+
+def _delete_ids(connection: Connection, table: Table, ids: list[int]) -> None:
+    for offset in range(0, len(ids), BACKUP_INCREMENTAL_CHUNK_ROWS):
+        batch = ids[offset : offset + BACKUP_INCREMENTAL_CHUNK_ROWS]
+        connection.execute(table.delete().where(table.c.id.in_(batch)))
+
+
+def _reset_id_sequence(connection: Connection, table: Table) -> None:
+    quoted = _quote(connection, table.name)
+    connection.execute(
+        text(
+            f"""
+            SELECT setval(pg_get_serial_sequence(:table_name, 'id'), GREATEST(COALESCE(MAX(id), 0), 1))
+            FROM {quoted}
+            """
+        ),
+        {"table_name": quoted},
+    )
+
+
+def replay_incremental_archive(archive: zipfile.ZipFile, connection: Connection) -> dict[str, int]:
+    """Apply one incremental archive on top of a restored database.
+
+    Runs with ``session_replication_role = replica`` so foreign keys are not
+    checked mid-replay, which needs a superuser (or table owner) connection.
+    """
+    manifest = json.loads(archive.read("manifest.json"))
+    incremental = manifest.get("incremental") or {}
+    if incremental.get("format_version") != BACKUP_INCREMENTAL_FORMAT_VERSION:
+        raise ValueError(f"Unsupported incremental backup format: {incremental.get('format_version')}")
+    tables_meta = incremental.get("tables") or {}
+    connection.execute(text("SET LOCAL session_replication_role = replica"))
+
+    applied: dict[str, int] = {}
+    for table in _list_backup_tables(connection):
+        meta = tables_meta.get(table.name)
+        if not meta:
+            continue
+        mode = meta.get("mode")
+        snapshot = mode == "snapshot"
+        if snapshot or mode == "rebuild":
+            connection.execute(table.delete())
+
+        row_count = 0
+        for chunk_name in meta.get("chunks") or []:
+            rows = [
+                _decode_row(table, json.loads(line))
+                for line in archive.read(chunk_name).decode("utf-8").splitlines()
+                if line.strip()
+            ]
+            if not rows:
+                continue
+            if snapshot:
+                connection.execute(table.insert(), rows)
+            else:
+                key_columns = list(table.primary_key.columns)
+                key_names = {column.name for column in key_columns}
+                statement = pg_insert(table)
+                statement = statement.on_conflict_do_update(
+                    index_elements=key_columns,
+                    set_={
+                        column.name: statement.excluded[column.name]
+                        for column in table.columns
+                        if column.name not in key_names
+                    },
+                )
+                connection.execute(statement, rows)
+            row_count += len(rows)
+
+        if meta.get("deleted_ids"):
+            _delete_ids(connection, table, json.loads(archive.read(meta["deleted_ids"])))
+        if _has_integer_id(table):
+            _reset_id_sequence(connection, table)
+        applied[table.name] = row_count
+    return applied
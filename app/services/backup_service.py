@@ -2,21 +2,25 @@ from __future__ import annotations
 
 import base64
 import calendar
+import csv
 import hashlib
 import http.client
 import json
 import logging
 import os
+import queue
 import re
 import shutil
 import ssl
 import subprocess
 import tempfile
 import threading
+import time
 import zipfile
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
 from urllib.parse import quote, unquote, urljoin, urlsplit, urlunsplit
 from xml.etree import ElementTree as ET
 from zoneinfo import ZoneInfo
@@ -27,6 +31,14 @@ from sqlalchemy.orm import Session
 
 from app.models.config import settings
 from app.models.models import BackupRun, BackupTarget, Message, engine, ensure_runtime_storage_tables
+from app.services.backup_incremental_service import (
+    BACKUP_INCREMENTAL_ID_OVERLAP,
+    capture_backup_watermarks,
+    ensure_backup_deletion_log,
+    prune_backup_deletion_log,
+    replay_incremental_archive,
+    write_incremental_tables,
+)
 from app.services.secret_codec import decrypt_secret, encrypt_secret
 
 
@@ -35,10 +47,13 @@ logger = logging.getLogger(__name__)
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 ACTIVE_RUN_STATUSES = {"pending", "running"}
 FULL_BACKUP_PREFIX = "tg-backup"
+INCREMENTAL_BACKUP_PREFIX = "tg-incr"
 EXPORT_BACKUP_PREFIX = "movie-data"
 WEBDAV_DEFAULT_PROVIDER = "generic_webdav"
 LOCAL_DEFAULT_DIR = "data/backups"
 BACKUP_QUEUE_LOCK_KEY = 90217041
+BACKUP_STREAM_CHUNK_SIZE = 1024 * 1024
+BACKUP_DATABASE_DUMP_NAME = "database.dump"
 EXPORT_XLSX_COLUMNS = [
     "\u5f71\u89c6\u540d\u5b57",
     "\u63cf\u8ff0",
@@ -46,6 +61,11 @@ EXPORT_XLSX_COLUMNS = [
     "\u7f51\u76d8\u94fe\u63a5",
 ]
 EXPORT_XLSX_SHEET_NAME = "\u5f71\u89c6\u8d44\u6e90"
+EXPORT_XLSX_MAX_ROWS_PER_SHEET = 1_048_575
+EXPORT_FILE_FORMATS = {"xlsx", "csv"}
+EXPORT_FETCH_BATCH_SIZE = 500
+EXPORT_PROGRESS_INTERVAL_ROWS = 5000
+EXPORT_PROGRESS_INTERVAL_SECONDS = 2.0
 
 _dispatch_lock = threading.RLock()
 _queue_worker_thread: threading.Thread | None = None
@@ -146,7 +166,12 @@ def _build_timestamp_label(target: BackupTarget | dict[str, Any]) -> str:
     return datetime.now(_get_target_timezone(target)).strftime("%Y%m%d-%H%M%S")
 
 
-def _build_file_name(target: BackupTarget | dict[str, Any]) -> tuple[str, str]:
+def _normalize_export_file_format(value: Any) -> str:
+    normalized = str(value or "").strip().lower()
+    return normalized if normalized in EXPORT_FILE_FORMATS else "xlsx"
+
+
+def _build_file_name(target: BackupTarget | dict[str, Any], *, incremental: bool = False) -> tuple[str, str]:
     target_name = target.name if isinstance(target, BackupTarget) else str(target.get("name") or "target")
     backup_mode = target.backup_mode if isinstance(target, BackupTarget) else str(target.get("backup_mode") or "full")
     timestamp = _build_timestamp_label(target)
@@ -154,9 +179,13 @@ def _build_file_name(target: BackupTarget | dict[str, Any]) -> tuple[str, str]:
     if backup_mode == "media_export":
         range_kind = target.export_range_kind if isinstance(target, BackupTarget) else str(target.get("export_range_kind") or "all")
         range_days = target.export_range_days if isinstance(target, BackupTarget) else target.get("export_range_days")
-        file_name = f"{EXPORT_BACKUP_PREFIX}-{slug}-{_days_label(range_days) if range_kind == 'days' else 'all'}-{timestamp}.xlsx"
-        return file_name, "xlsx"
-    file_name = f"{FULL_BACKUP_PREFIX}-{slug}-{timestamp}.zip"
+        export_format = _normalize_export_file_format(
+            target.export_file_format if isinstance(target, BackupTarget) else target.get("export_file_format")
+        )
+        file_name = f"{EXPORT_BACKUP_PREFIX}-{slug}-{_days_label(range_days) if range_kind == 'days' else 'all'}-{timestamp}.{export_format}"
+        return file_name, export_format
+    prefix = INCREMENTAL_BACKUP_PREFIX if incremental else FULL_BACKUP_PREFIX
+    file_name = f"{prefix}-{slug}-{timestamp}.zip"
     return file_name, "zip"
 
 
@@ -170,12 +199,16 @@ def _parse_backup_file_name(file_name: str, *, target: BackupTarget | dict[str,
 
     local_tz = _get_target_timezone(target)
     full_match = re.match(rf"^{FULL_BACKUP_PREFIX}-.+-(\d{{8}}-\d{{6}})\.zip$", file_name)
-    export_match = re.match(rf"^{EXPORT_BACKUP_PREFIX}-.+-(all|\d+d)-(\d{{8}}-\d{{6}})\.xlsx$", file_name)
+    incremental_match = re.match(rf"^{INCREMENTAL_BACKUP_PREFIX}-.+-(\d{{8}}-\d{{6}})\.zip$", file_name)
+    export_match = re.match(rf"^{EXPORT_BACKUP_PREFIX}-.+-(all|\d+d)-(\d{{8}}-\d{{6}})\.(?:xlsx|csv)$", file_name)
 
     timestamp_label: str | None = None
     if full_match:
         parsed["backup_mode"] = "full"
         timestamp_label = full_match.group(1)
+    elif incremental_match:
+        parsed["backup_mode"] = "incremental"
+        timestamp_label = incremental_match.group(1)
     elif export_match:
         parsed["backup_mode"] = "media_export"
         range_token = export_match.group(1)
@@ -240,6 +273,8 @@ def _serialize_backup_target(target: BackupTarget, active_runs: dict[int, Backup
         "include_runtime_data": bool(target.include_runtime_data),
         "export_range_kind": target.export_range_kind,
         "export_range_days": target.export_range_days,
+        "export_file_format": _normalize_export_file_format(target.export_file_format),
+        "incremental_full_every": target.incremental_full_every or 7,
         "last_run_at": _to_iso(target.last_run_at),
         "next_run_at": _to_iso(target.next_run_at),
         "last_status": target.last_status,
@@ -369,6 +404,8 @@ def _apply_target_payload(target: BackupTarget, values: dict[str, Any], *, is_up
     target.include_runtime_data = bool(values["include_runtime_data"])
     target.export_range_kind = values["export_range_kind"]
     target.export_range_days = values.get("export_range_days")
+    target.export_file_format = _normalize_export_file_format(values.get("export_file_format"))
+    target.incremental_full_every = max(1, int(values.get("incremental_full_every") or 7))
 
     if values.get("clear_webdav_password"):
         target.webdav_password_encrypted = ""
@@ -755,26 +792,30 @@ def _resolve_local_output_path(target: BackupTarget, file_name: str) -> Path:
     return destination_dir / file_name
 
 
-def _resolve_pg_dump_path() -> str:
-    env_override = os.getenv("PG_DUMP_PATH", "").strip()
+def _resolve_pg_tool_path(tool_name: str) -> str:
+    env_name = f"{tool_name.upper()}_PATH"
+    not_found_message = (
+        f"{tool_name} not found; install PostgreSQL client tools, add {tool_name} to PATH, or set {env_name}"
+    )
+    env_override = os.getenv(env_name, "").strip()
     if env_override and Path(env_override).exists():
         return env_override
 
-    resolved = shutil.which("pg_dump")
+    resolved = shutil.which(tool_name)
     if resolved:
         return resolved
 
     candidate_paths: list[Path] = []
     if os.name == "nt":
-        candidate_paths.extend(Path(r"C:\Program Files\PostgreSQL").glob(r"*\bin\pg_dump.exe"))
+        candidate_paths.extend(Path(r"C:\Program Files\PostgreSQL").glob(rf"*\bin\{tool_name}.exe"))
     else:
         candidate_paths.extend(
             [
-                Path("/usr/bin/pg_dump"),
-                Path("/usr/local/bin/pg_dump"),
+                Path(f"/usr/bin/{tool_name}"),
+                Path(f"/usr/local/bin/{tool_name}"),
             ]
         )
-        candidate_paths.extend(Path("/usr/lib/postgresql").glob("*/bin/pg_dump"))
+        candidate_paths.extend(Path("/usr/lib/postgresql").glob(f"*/bin/{tool_name}"))
 
     for candidate in candidate_paths:
         try:
@@ -783,61 +824,73 @@ def _resolve_pg_dump_path() -> str:
         except Exception:
             continue
 
-    raise RuntimeError(
-        "pg_dump not found; install PostgreSQL client tools, add pg_dump to PATH, or set PG_DUMP_PATH"
-    )
+    raise RuntimeError(not_found_message)
 
 
-def _dump_database(output_path: Path) -> None:
+def _build_pg_connection_args() -> tuple[list[str], dict[str, str], str]:
     database_url = make_url(settings.DATABASE_URL)
     db_name = database_url.database
     if not db_name:
         raise RuntimeError("DATABASE_URL does not include a database name")
 
-    command = [
-        _resolve_pg_dump_path(),
-        "--format=plain",
-        "--encoding=UTF8",
-        "--no-owner",
-        "--no-privileges",
+    args = [
         "--host",
         database_url.host or "",
         "--port",
         str(database_url.port or 5432),
         "--username",
         database_url.username or "",
-        "--file",
-        str(output_path),
-        db_name,
     ]
     env = os.environ.copy()
     if database_url.password:
         env["PGPASSWORD"] = database_url.password
+    return args, env, db_name
 
-    try:
-        completed = subprocess.run(
-            command,
-            check=False,
-            capture_output=True,
-            text=True,
-            env=env,
-        )
-    except FileNotFoundError as exc:
-        raise RuntimeError(
-            "pg_dump not found; install PostgreSQL client tools, add pg_dump to PATH, or set PG_DUMP_PATH"
-        ) from exc
 
-    if completed.returncode != 0:
-        message = (completed.stderr or completed.stdout or "unknown error").strip()
-        raise RuntimeError(f"pg_dump failed: {message}")
+def _build_pg_dump_command() -> tuple[list[str], dict[str, str]]:
+    connection_args, env, db_name = _build_pg_connection_args()
+    compress_level = min(9, max(0, int(getattr(settings, "BACKUP_PG_DUMP_COMPRESS_LEVEL", 6) or 0)))
+    command = [
+        _resolve_pg_tool_path("pg_dump"),
+        "--format=custom",
+        f"--compress={compress_level}",
+        "--encoding=UTF8",
+        "--no-owner",
+        "--no-privileges",
+        *connection_args,
+        db_name,
+    ]
+    return command, env
+
 
+def _stream_database_dump(destination: Any) -> int:
+    command, env = _build_pg_dump_command()
+    with tempfile.TemporaryFile() as stderr_handle:
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_handle, env=env)
+        except FileNotFoundError as exc:
+            raise RuntimeError(
+                "pg_dump not found; install PostgreSQL client tools, add pg_dump to PATH, or set PG_DUMP_PATH"
+            ) from exc
+
+        total_bytes = 0
+        stdout = process.stdout
+        try:
+            for chunk in iter(lambda: stdout.read(BACKUP_STREAM_CHUNK_SIZE), b""):
+                destination.write(chunk)
+                total_bytes += len(chunk)
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            stdout.close()
 
-def _copy_if_exists(source: Path, destination: Path) -> bool:
-    if not source.exists():
-        return False
-    destination.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(source, destination)
-    return True
+        if process.wait() != 0:
+            stderr_handle.seek(0)
+            message = stderr_handle.read().decode("utf-8", errors="replace").strip()
+            raise RuntimeError(f"pg_dump failed: {message or 'unknown error'}")
+    return total_bytes
 
 
 def _should_skip_runtime_path(path_value: Path, *, excluded_dirs: list[Path]) -> bool:
@@ -845,10 +898,10 @@ def _should_skip_runtime_path(path_value: Path, *, excluded_dirs: list[Path]) ->
     return any(resolved == excluded or excluded in resolved.parents for excluded in excluded_dirs)
 
 
-def _copy_runtime_data(destination_dir: Path, *, target: BackupTarget) -> int:
+def _iter_runtime_data_files(target: BackupTarget) -> Iterator[tuple[Path, str]]:
     source_root = PROJECT_ROOT / "data"
     if not source_root.exists():
-        return 0
+        return
 
     excluded_dirs = [(PROJECT_ROOT / "data" / "backups").resolve()]
     try:
@@ -859,29 +912,48 @@ def _copy_runtime_data(destination_dir: Path, *, target: BackupTarget) -> int:
     except Exception:
         pass
 
-    copied_count = 0
-    for source_path in source_root.rglob("*"):
+    for source_path in sorted(source_root.rglob("*")):
         if source_path.is_dir():
             continue
         if _should_skip_runtime_path(source_path, excluded_dirs=excluded_dirs):
             continue
-        relative_path = source_path.relative_to(source_root)
-        destination_path = destination_dir / relative_path
-        destination_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(source_path, destination_path)
-        copied_count += 1
-    return copied_count
+        yield source_path, (Path("data") / source_path.relative_to(source_root)).as_posix()
 
 
-def _zip_directory(source_dir: Path, output_path: Path) -> int:
-    file_count = 0
-    with zipfile.ZipFile(output_path, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
-        for path_value in sorted(source_dir.rglob("*")):
-            if path_value.is_dir():
-                continue
-            archive.write(path_value, path_value.relative_to(source_dir))
-            file_count += 1
-    return file_count
+class _HashingArchiveSink:
+    """Write-only sink that hashes and counts archive bytes as they pass through.
+
+    It intentionally exposes ``tell`` but not ``seek`` so ``zipfile`` writes in
+    streaming mode (data descriptors), letting the archive go straight to its
+    destination without a staging copy or a second read for the checksum.
+    """
+
+    def __init__(self, write_chunk: Callable[[bytes], Any]) -> None:
+        self._write_chunk = write_chunk
+        self._digest = hashlib.sha256()
+        self._size = 0
+
+    def write(self, data: bytes) -> int:
+        chunk = bytes(data)
+        if not chunk:
+            return 0
+        self._digest.update(chunk)
+        self._write_chunk(chunk)
+        self._size += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._size
+
+    def flush(self) -> None:
+        return None
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
 
 
 def _flatten_message_links(links: Any) -> str:
@@ -911,7 +983,7 @@ def _flatten_message_links(links: Any) -> str:
     return "\n".join(lines)
 
 
-def _build_export_rows(target: BackupTarget) -> list[dict[str, Any]]:
+def _iter_export_rows(target: BackupTarget) -> Iterator[tuple[str, str, str, str]]:
     with Session(engine) as session:
         query = session.query(Message.title, Message.description, Message.tags, Message.links).filter(Message.links.isnot(None))
         if target.export_range_kind == "days" and target.export_range_days:
@@ -919,39 +991,198 @@ def _build_export_rows(target: BackupTarget) -> list[dict[str, Any]]:
             query = query.filter(Message.timestamp >= cutoff)
         query = query.order_by(Message.timestamp.desc())
 
-        rows: list[dict[str, Any]] = []
-        for title, description, tags, links in query.yield_per(500):
+        for title, description, tags, links in query.yield_per(EXPORT_FETCH_BATCH_SIZE):
             link_text = _flatten_message_links(links)
             if not link_text:
                 continue
-            rows.append(
-                {
-                    EXPORT_XLSX_COLUMNS[0]: title or "",
-                    EXPORT_XLSX_COLUMNS[1]: description or "",
-                    EXPORT_XLSX_COLUMNS[2]: " ".join(f"#{tag}" for tag in (tags or [])),
-                    EXPORT_XLSX_COLUMNS[3]: link_text,
-                }
+            yield (
+                title or "",
+                description or "",
+                " ".join(f"#{tag}" for tag in (tags or [])),
+                link_text,
             )
-        return rows
 
 
-def _write_export_xlsx(output_path: Path, target: BackupTarget) -> int:
-    rows = _build_export_rows(target)
-    try:
-        import pandas as pd
-    except Exception as exc:
-        raise RuntimeError("pandas is required to generate the Excel export") from exc
+class _ExportProgressReporter:
+    """Throttled ``rows_written`` updates on the running ``BackupRun``."""
+
+    def __init__(self, run_id: int | None) -> None:
+        self.run_id = run_id
+        self._last_reported_rows = 0
+        self._last_reported_at = 0.0
 
+    def __call__(self, rows_written: int, *, force: bool = False) -> None:
+        if self.run_id is None:
+            return
+        now = time.monotonic()
+        if not force and (
+            rows_written - self._last_reported_rows < EXPORT_PROGRESS_INTERVAL_ROWS
+            or now - self._last_reported_at < EXPORT_PROGRESS_INTERVAL_SECONDS
+        ):
+            return
+        self._last_reported_rows = rows_written
+        self._last_reported_at = now
+        try:
+            with Session(engine) as session:
+                run = session.get(BackupRun, self.run_id)
+                if run is None or run.status != "running":
+                    return
+                run.result_json = {
+                    **(run.result_json or {}),
+                    "progress": {"rows_written": rows_written, "updated_at": _utc_now().isoformat()},
+                }
+                session.add(run)
+                session.commit()
+        except Exception:
+            logger.debug("Failed to report export progress for backup run %s", self.run_id, exc_info=True)
+
+
+def _write_export_xlsx(output_path: Path, target: BackupTarget, *, progress: _ExportProgressReporter) -> int:
     try:
-        dataframe = pd.DataFrame(rows, columns=EXPORT_XLSX_COLUMNS)
-        dataframe.to_excel(output_path, index=False, sheet_name=EXPORT_XLSX_SHEET_NAME, engine="openpyxl")
+        from openpyxl import Workbook
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
     except ImportError as exc:
         raise RuntimeError("openpyxl is required to generate the Excel export") from exc
-    return len(rows)
+
+    # Write-only workbooks stream rows to disk instead of keeping cells in memory.
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheet_index = 0
+    sheet_rows = EXPORT_XLSX_MAX_ROWS_PER_SHEET
+    row_count = 0
+    for row in _iter_export_rows(target):
+        if sheet_rows >= EXPORT_XLSX_MAX_ROWS_PER_SHEET:
+            sheet_index += 1
+            title = EXPORT_XLSX_SHEET_NAME if sheet_index == 1 else f"{EXPORT_XLSX_SHEET_NAME} {sheet_index}"
+            sheet = workbook.create_sheet(title=title)
+            sheet.append(EXPORT_XLSX_COLUMNS)
+            sheet_rows = 0
+        sheet.append([ILLEGAL_CHARACTERS_RE.sub("", value) for value in row])
+        sheet_rows += 1
+        row_count += 1
+        progress(row_count)
+    if sheet is None:
+        workbook.create_sheet(title=EXPORT_XLSX_SHEET_NAME).append(EXPORT_XLSX_COLUMNS)
+
+    workbook.save(output_path)
+    progress(row_count, force=True)
+    return row_count
+
+
+def _write_export_csv(output_path: Path, target: BackupTarget, *, progress: _ExportProgressReporter) -> int:
+    row_count = 0
+    # utf-8-sig lets Excel detect the encoding when the file is opened directly.
+    with output_path.open("w", encoding="utf-8-sig", newline="") as file_handle:
+        writer = csv.writer(file_handle)
+        writer.writerow(EXPORT_XLSX_COLUMNS)
+        for row in _iter_export_rows(target):
+            writer.writerow(row)
+            row_count += 1
+            progress(row_count)
+    progress(row_count, force=True)
+    return row_count
+
+
+def _write_media_export(output_path: Path, target: BackupTarget, *, run_id: int | None) -> int:
+    progress = _ExportProgressReporter(run_id)
+    if _normalize_export_file_format(target.export_file_format) == "csv":
+        return _write_export_csv(output_path, target, progress=progress)
+    return _write_export_xlsx(output_path, target, progress=progress)
+
+
+@dataclass(slots=True)
+class _IncrementalPlan:
+    role: str
+    run_id: int | None
+    base_run_id: int | None
+    parent_run_id: int | None = None
+    position: int = 0
+    previous_watermarks: dict[str, Any] | None = None
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "role": self.role,
+            "run_id": self.run_id,
+            "base_run_id": self.base_run_id,
+            "parent_run_id": self.parent_run_id,
+            "position": self.position,
+        }
 
 
-def _build_full_backup_archive(target: BackupTarget, output_path: Path) -> tuple[int, dict[str, Any]]:
-    manifest: dict[str, Any] = {
+def _latest_incremental_run(session: Session, target_id: int) -> BackupRun | None:
+    return (
+        session.query(BackupRun)
+        .filter(
+            BackupRun.target_id == target_id,
+            BackupRun.status == "success",
+            BackupRun.backup_mode == "incremental",
+        )
+        .order_by(BackupRun.finished_at.desc().nullslast(), BackupRun.id.desc())
+        .first()
+    )
+
+
+def _prepare_backup_deletion_log() -> None:
+    with engine.begin() as connection:
+        ensure_backup_deletion_log(connection)
+
+    # Each chain's next delta reads the log from its latest watermark on, so
+    # rows older than the oldest of those are dead. Any incremental target
+    # without a watermark yet may be taking its base right now; keep
+    # everything until it has one.
+    oldest_log_id: int | None = None
+    with Session(engine) as session:
+        target_ids = [
+            int(target_id)
+            for (target_id,) in session.query(BackupTarget.id).filter(BackupTarget.backup_mode == "incremental")
+        ]
+        for target_id in target_ids:
+            previous = _latest_incremental_run(session, target_id)
+            watermarks = ((previous.result_json or {}) if previous is not None else {}).get("watermarks") or {}
+            if "deleted_log_id" not in watermarks:
+                return
+            log_id = int(watermarks["deleted_log_id"] or 0)
+            oldest_log_id = log_id if oldest_log_id is None else min(oldest_log_id, log_id)
+    if oldest_log_id is None:
+        return
+    with engine.begin() as connection:
+        pruned = prune_backup_deletion_log(connection, through_id=oldest_log_id - BACKUP_INCREMENTAL_ID_OVERLAP)
+    if pruned:
+        logger.info("Pruned %s backup deletion log rows", pruned)
+
+
+def _plan_incremental_run(target: BackupTarget, *, run_id: int | None) -> _IncrementalPlan:
+    base_plan = _IncrementalPlan(role="base", run_id=run_id, base_run_id=run_id)
+    with Session(engine) as session:
+        previous = _latest_incremental_run(session, target.id)
+        if previous is None:
+            return base_plan
+        result_json = previous.result_json or {}
+
+    chain = result_json.get("chain") or {}
+    watermarks = result_json.get("watermarks") or {}
+    position = int(chain.get("position") or 0) + 1
+    if (
+        not chain.get("base_run_id")
+        or not watermarks
+        # Chains started before deletes were logged replay nothing for them.
+        or "deleted_log_id" not in watermarks
+        or result_json.get("artifact_pruned")
+        or position >= max(1, int(target.incremental_full_every or 7))
+    ):
+        return base_plan
+    return _IncrementalPlan(
+        role="incremental",
+        run_id=run_id,
+        base_run_id=int(chain["base_run_id"]),
+        parent_run_id=int(previous.id),
+        position=position,
+        previous_watermarks=watermarks,
+    )
+
+
+def _build_archive_manifest(target: BackupTarget) -> dict[str, Any]:
+    return {
         "generated_at": _utc_now().isoformat(),
         "target_id": target.id,
         "target_name": target.name,
@@ -960,31 +1191,94 @@ def _build_full_backup_archive(target: BackupTarget, output_path: Path) -> tuple
         "included_files": [],
     }
 
-    with tempfile.TemporaryDirectory(prefix="tg-backup-stage-") as staging_dir:
-        staging_root = Path(staging_dir)
 
-        database_dump_path = staging_root / "database.sql"
-        _dump_database(database_dump_path)
-        manifest["included_files"].append("database.sql")
+def _build_full_backup_archive(
+    target: BackupTarget,
+    sink: _HashingArchiveSink,
+    *,
+    extra_manifest: dict[str, Any] | None = None,
+) -> tuple[int, dict[str, Any]]:
+    manifest = _build_archive_manifest(target)
+    manifest["database_format"] = "pg_dump_custom"
+    manifest.update(extra_manifest or {})
 
-        if target.include_env_file and _copy_if_exists(PROJECT_ROOT / ".env", staging_root / ".env"):
+    file_count = 0
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
+        # pg_dump already compresses its custom format, so store it as-is.
+        dump_info = zipfile.ZipInfo(BACKUP_DATABASE_DUMP_NAME, date_time=datetime.now().timetuple()[:6])
+        dump_info.compress_type = zipfile.ZIP_STORED
+        dump_info.external_attr = 0o644 << 16
+        with archive.open(dump_info, mode="w", force_zip64=True) as dump_entry:
+            manifest["database_dump_bytes"] = _stream_database_dump(dump_entry)
+        manifest["included_files"].append(BACKUP_DATABASE_DUMP_NAME)
+        file_count += 1
+
+        env_path = PROJECT_ROOT / ".env"
+        if target.include_env_file and env_path.is_file():
+            archive.write(env_path, ".env")
             manifest["included_files"].append(".env")
+            file_count += 1
 
         runtime_file_count = 0
         if target.include_runtime_data:
-            runtime_destination = staging_root / "data"
-            runtime_file_count = _copy_runtime_data(runtime_destination, target=target)
+            for source_path, archive_name in _iter_runtime_data_files(target):
+                archive.write(source_path, archive_name)
+                runtime_file_count += 1
             if runtime_file_count > 0:
                 manifest["included_files"].append("data/")
+        file_count += runtime_file_count
 
         manifest["runtime_file_count"] = runtime_file_count
-        manifest_path = staging_root / "manifest.json"
-        manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
         manifest["included_files"].append("manifest.json")
+        file_count += 1
+    return file_count, manifest
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        file_count = _zip_directory(staging_root, output_path)
-        return file_count, manifest
+
+def _build_incremental_backup_archive(
+    target: BackupTarget,
+    sink: _HashingArchiveSink,
+    *,
+    plan: _IncrementalPlan,
+) -> tuple[int, dict[str, Any]]:
+    manifest = _build_archive_manifest(target)
+    manifest["chain"] = plan.to_json()
+
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
+        with engine.connect() as connection:
+            # One snapshot for watermarks, deltas and deleted ids.
+            connection.execution_options(isolation_level="REPEATABLE READ")
+            with connection.begin():
+                watermarks = capture_backup_watermarks(connection)
+                incremental = write_incremental_tables(
+                    archive,
+                    connection,
+                    previous_watermarks=plan.previous_watermarks or {},
+                    current_watermarks=watermarks,
+                )
+        manifest["watermarks"] = watermarks
+        manifest["incremental"] = incremental
+        manifest["included_files"].append("tables/")
+        archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+        manifest["included_files"].append("manifest.json")
+    return int(incremental["row_count"]), manifest
+
+
+def _write_archive_file(
+    output_path: Path,
+    build_archive: Callable[[_HashingArchiveSink], tuple[int, dict[str, Any]]],
+) -> tuple[int, dict[str, Any], float, str]:
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = output_path.with_name(f"{output_path.name}.part")
+    try:
+        with partial_path.open("wb") as file_handle:
+            sink = _HashingArchiveSink(file_handle.write)
+            item_count, manifest = build_archive(sink)
+        partial_path.replace(output_path)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    return item_count, manifest, float(sink.size_bytes), sink.hexdigest()
 
 
 def _build_webdav_connection(url: str, *, timeout_seconds: int, verify_ssl: bool) -> tuple[http.client.HTTPConnection, str]:
@@ -1122,6 +1416,94 @@ def _upload_file_to_webdav(target: BackupTarget, local_path: Path, remote_path:
     return _sanitize_url(target_url)
 
 
+class _WebdavStreamingUpload:
+    """Chunked WebDAV PUT fed from a bounded queue on a background thread.
+
+    The archive is produced and uploaded concurrently, so nothing is staged on
+    local disk. Servers must accept ``Transfer-Encoding: chunked``.
+    """
+
+    _ABORT = object()
+
+    def __init__(self, target: BackupTarget, remote_path: str) -> None:
+        _ensure_webdav_directories(target, remote_path)
+        self.target = target
+        self.target_url = _build_webdav_url(target.webdav_base_url, remote_path)
+        queue_chunks = max(1, int(getattr(settings, "BACKUP_WEBDAV_STREAM_QUEUE_CHUNKS", 8) or 8))
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=queue_chunks)
+        self._buffer = bytearray()
+        self._status_code: int | None = None
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="backup-webdav-upload", daemon=True)
+        self._thread.start()
+
+    def _iter_body(self) -> Iterator[bytes]:
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if chunk is self._ABORT:
+                raise RuntimeError("backup upload aborted")
+            yield chunk
+
+    def _run(self) -> None:
+        connection: http.client.HTTPConnection | None = None
+        try:
+            connection, request_path = _build_webdav_connection(
+                self.target_url,
+                timeout_seconds=self.target.webdav_timeout_seconds,
+                verify_ssl=bool(self.target.webdav_verify_ssl),
+            )
+            headers = _build_webdav_headers(self.target)
+            headers["Content-Type"] = "application/octet-stream"
+            connection.request("PUT", request_path, body=self._iter_body(), headers=headers, encode_chunked=True)
+            response = connection.getresponse()
+            self._status_code = response.status
+            response.read()
+        except BaseException as exc:
+            self._error = exc
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def _put(self, item: Any) -> None:
+        while True:
+            if self._error is not None:
+                raise RuntimeError(f"WebDAV upload failed: {self._error}") from self._error
+            try:
+                self._queue.put(item, timeout=1)
+                return
+            except queue.Full:
+                if not self._thread.is_alive():
+                    raise RuntimeError("WebDAV upload stopped unexpectedly")
+
+    def write(self, data: bytes) -> None:
+        self._buffer.extend(data)
+        if len(self._buffer) >= BACKUP_STREAM_CHUNK_SIZE:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def finish(self) -> str:
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+        self._put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError(f"WebDAV upload failed: {self._error}") from self._error
+        if self._status_code not in {200, 201, 204}:
+            raise RuntimeError(f"WebDAV upload failed: HTTP {self._status_code}")
+        return _sanitize_url(self.target_url)
+
+    def abort(self) -> None:
+        if self._thread.is_alive():
+            try:
+                self._queue.put(self._ABORT, timeout=5)
+            except queue.Full:
+                pass
+            self._thread.join(timeout=max(5, int(self.target.webdav_timeout_seconds or 60)))
+
+
 def _delete_webdav_file(target: BackupTarget, remote_path: str) -> bool:
     status_code = _perform_webdav_request(
         target,
@@ -1268,6 +1650,12 @@ def _cleanup_local_file(path_value: str | None) -> bool:
     return False
 
 
+def _chain_base_run_id(run: BackupRun) -> int | None:
+    chain = (run.result_json or {}).get("chain") or {}
+    base_run_id = chain.get("base_run_id")
+    return int(base_run_id) if base_run_id else None
+
+
 def _apply_retention(target_id: int, *, current_run_id: int) -> dict[str, Any]:
     ensure_runtime_storage_tables()
     deleted_local = 0
@@ -1286,12 +1674,23 @@ def _apply_retention(target_id: int, *, current_run_id: int) -> dict[str, Any]:
             .all()
         )
 
+        # An incremental run is useless without its base and parents, so any
+        # chain with a retained member is kept whole.
+        protected_chains = {
+            _chain_base_run_id(run)
+            for index, run in enumerate(runs)
+            if run.id == current_run_id or target.retention_count <= 0 or index < target.retention_count
+        }
+        protected_chains.discard(None)
+
         for index, run in enumerate(runs):
             if run.id == current_run_id:
                 continue
 
             if not (target.retention_count > 0 and index >= target.retention_count):
                 continue
+            if _chain_base_run_id(run) in protected_chains:
+                continue
 
             local_pruned = not run.local_path
             remote_pruned = not run.remote_path
@@ -1329,8 +1728,91 @@ def _apply_retention(target_id: int, *, current_run_id: int) -> dict[str, Any]:
     }
 
 
-def _perform_backup(target: BackupTarget) -> dict[str, Any]:
-    file_name, file_format = _build_file_name(target)
+def _should_stream_webdav_upload(target: BackupTarget) -> bool:
+    return (
+        target.target_kind == "webdav"
+        and target.backup_mode != "media_export"
+        and bool(getattr(settings, "BACKUP_WEBDAV_STREAM_UPLOAD", False))
+    )
+
+
+def _perform_streaming_webdav_backup(
+    target: BackupTarget,
+    *,
+    file_name: str,
+    file_format: str,
+    build_archive: Callable[[_HashingArchiveSink], tuple[int, dict[str, Any]]],
+) -> dict[str, Any]:
+    remote_path = _build_remote_file_path(target, file_name)
+    upload = _WebdavStreamingUpload(target, remote_path)
+    try:
+        sink = _HashingArchiveSink(upload.write)
+        item_count, manifest = build_archive(sink)
+        remote_url = upload.finish()
+    except BaseException:
+        upload.abort()
+        try:
+            _delete_webdav_file(target, remote_path)
+        except Exception:
+            logger.warning("Failed to remove partial WebDAV backup %s", remote_path, exc_info=True)
+        raise
+
+    manifest["mode"] = target.backup_mode
+    manifest["upload_mode"] = "stream"
+    return {
+        "file_name": file_name,
+        "file_format": file_format,
+        "file_size_bytes": float(sink.size_bytes),
+        "sha256": sink.hexdigest(),
+        "item_count": item_count,
+        "result_json": manifest,
+        "local_path": None,
+        "remote_path": remote_path,
+        "remote_url": remote_url,
+    }
+
+
+def _build_archive_builder(
+    target: BackupTarget,
+    *,
+    run_id: int | None,
+) -> tuple[Callable[[_HashingArchiveSink], tuple[int, dict[str, Any]]], bool]:
+    if target.backup_mode != "incremental":
+        return (lambda sink: _build_full_backup_archive(target, sink)), False
+
+    _prepare_backup_deletion_log()
+    plan = _plan_incremental_run(target, run_id=run_id)
+    if plan.role == "incremental":
+        return (lambda sink: _build_incremental_backup_archive(target, sink, plan=plan)), True
+
+    def _build_base(sink: _HashingArchiveSink) -> tuple[int, dict[str, Any]]:
+        # Watermarks are taken before pg_dump starts; rows written during the
+        # dump are picked up again by the first delta.
+        with engine.connect() as connection:
+            watermarks = capture_backup_watermarks(connection)
+        return _build_full_backup_archive(
+            target,
+            sink,
+            extra_manifest={"chain": plan.to_json(), "watermarks": watermarks},
+        )
+
+    return _build_base, False
+
+
+def _perform_backup(target: BackupTarget, *, run_id: int | None = None) -> dict[str, Any]:
+    build_archive = None
+    if target.backup_mode == "media_export":
+        file_name, file_format = _build_file_name(target)
+    else:
+        build_archive, is_incremental = _build_archive_builder(target, run_id=run_id)
+        file_name, file_format = _build_file_name(target, incremental=is_incremental)
+        if _should_stream_webdav_upload(target):
+            return _perform_streaming_webdav_backup(
+                target,
+                file_name=file_name,
+                file_format=file_format,
+                build_archive=build_archive,
+            )
 
     if target.target_kind == "local":
         temp_output_path = _resolve_local_output_path(target, file_name)
@@ -1340,19 +1822,20 @@ def _perform_backup(target: BackupTarget) -> dict[str, Any]:
         temp_output_path = Path(temp_dir.name) / file_name
 
     try:
-        if target.backup_mode == "media_export":
-            item_count = _write_export_xlsx(temp_output_path, target)
+        if build_archive is None:
+            item_count = _write_media_export(temp_output_path, target, run_id=run_id)
             manifest = {
                 "mode": "media_export",
                 "range_kind": target.export_range_kind,
                 "range_days": target.export_range_days,
+                "export_file_format": file_format,
                 "exported_rows": item_count,
             }
+            file_size_bytes, sha256 = _hash_file(temp_output_path)
         else:
-            item_count, manifest = _build_full_backup_archive(target, temp_output_path)
-            manifest["mode"] = "full"
+            item_count, manifest, file_size_bytes, sha256 = _write_archive_file(temp_output_path, build_archive)
+            manifest["mode"] = target.backup_mode
 
-        file_size_bytes, sha256 = _hash_file(temp_output_path)
         result: dict[str, Any] = {
             "file_name": file_name,
             "file_format": file_format,
@@ -1410,6 +1893,8 @@ def _clone_target(target: BackupTarget) -> BackupTarget:
         "include_runtime_data",
         "export_range_kind",
         "export_range_days",
+        "export_file_format",
+        "incremental_full_every",
     ):
         setattr(cloned, field, getattr(target, field))
     return cloned
@@ -1439,7 +1924,7 @@ def _execute_backup_run(run_id: int) -> None:
                 raise LookupError("Backup target not found")
             target_snapshot = _clone_target(target)
 
-        result = _perform_backup(target_snapshot)
+        result = _perform_backup(target_snapshot, run_id=run_id)
         finished_at = _utc_now()
         duration = max(0.0, (finished_at - started_at).total_seconds())
 
@@ -1554,3 +2039,71 @@ def test_backup_target(target_id: int) -> dict[str, Any]:
             "resolved_path": None,
             "remote_path": _normalize_webdav_root_path(target.webdav_root_path),
         }
+
+
+def _read_archive_manifest(path_value: Path) -> dict[str, Any]:
+    with zipfile.ZipFile(path_value) as archive:
+        try:
+            return json.loads(archive.read("manifest.json"))
+        except KeyError as exc:
+            raise ValueError(f"{path_value.name} is not a backup archive (manifest.json missing)") from exc
+
+
+def _validate_backup_chain(paths: list[Path]) -> list[dict[str, Any]]:
+    manifests = [_read_archive_manifest(path_value) for path_value in paths]
+    if manifests[0].get("database_format") != "pg_dump_custom":
+        raise ValueError(f"{paths[0].name} is not a full backup with a database.dump")
+
+    previous_run_id = (manifests[0].get("chain") or {}).get("run_id")
+    for path_value, manifest in zip(paths[1:], manifests[1:]):
+        chain = manifest.get("chain") or {}
+        if chain.get("role") != "incremental":
+            raise ValueError(f"{path_value.name} is not an incremental backup")
+        if previous_run_id is None or chain.get("parent_run_id") != previous_run_id:
+            raise ValueError(f"{path_value.name} does not follow the previous archive in the chain")
+        previous_run_id = chain.get("run_id")
+    return manifests
+
+
+def restore_backup_chain(archive_paths: list[str | Path]) -> dict[str, Any]:
+    """Restore a full base archive, then replay incremental archives in order.
+
+    The target database is overwritten. Incremental replay needs a role that
+    may set ``session_replication_role``.
+    """
+    paths = [Path(path_value) for path_value in archive_paths]
+    if not paths:
+        raise ValueError("No backup archives given")
+    _validate_backup_chain(paths)
+
+    connection_args, env, db_name = _build_pg_connection_args()
+    with tempfile.TemporaryDirectory(prefix="tg-backup-restore-") as temp_dir:
+        with zipfile.ZipFile(paths[0]) as archive:
+            dump_path = Path(archive.extract(BACKUP_DATABASE_DUMP_NAME, temp_dir))
+        command = [
+            _resolve_pg_tool_path("pg_restore"),
+            "--clean",
+            "--if-exists",
+            "--no-owner",
+            "--no-privileges",
+            *connection_args,
+            "--dbname",
+            db_name,
+            str(dump_path),
+        ]
+        completed = subprocess.run(command, check=False, capture_output=True, text=True, env=env)
+        if completed.returncode != 0:
+            message = (completed.stderr or completed.stdout or "unknown error").strip()
+            raise RuntimeError(f"pg_restore failed: {message}")
+
+    replayed: list[dict[str, Any]] = []
+    for path_value in paths[1:]:
+        with zipfile.ZipFile(path_value) as archive, engine.begin() as connection:
+            applied = replay_incremental_archive(archive, connection)
+        replayed.append({"file_name": path_value.name, "rows": sum(applied.values()), "tables": applied})
+
+    return {
+        "base_file_name": paths[0].name,
+        "incremental_count": len(replayed),
+        "replayed": replayed,
+    }
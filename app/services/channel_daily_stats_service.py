@@ -53,9 +53,12 @@ def _retention_cutoff(keep_days: int) -> date:
     return datetime.now().date() - timedelta(days=keep_days - 1)
 
 
-def _count_message_links(links: Any) -> int:
+def _count_message_links(message: Message) -> int:
+    link_count = getattr(message, "link_count", None)
+    if link_count is not None:
+        return int(link_count)
     try:
-        return len(flatten_message_links(links))
+        return len(flatten_message_links(getattr(message, "links", None)))
     except Exception:
         return 0
 
@@ -77,7 +80,7 @@ def _build_stat_row(message: Message) -> tuple[tuple[date, str], dict[str, Any]]
             "monitor_channel_key": channel_key,
             "monitor_channel_title": _normalize_channel_title(channel_key, getattr(message, "monitor_channel_title", None)),
             "message_count": 1,
-            "link_count": _count_message_links(getattr(message, "links", None)),
+            "link_count": _count_message_links(message),
             "last_message_at": timestamp,
         },
     )
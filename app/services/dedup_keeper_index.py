@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import logging
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.models import DedupUrlKeeper
+from app.services.message_link_columns import compute_message_link_columns
+
+
+logger = logging.getLogger(__name__)
+
+DEDUP_BATCH_SIZE = 1000
+DEDUP_INDEX_WRITE_CHUNK = 5000
+DEDUP_PERSISTENT_INDEX_TABLE = DedupUrlKeeper.__tablename__
+DEDUP_SPILL_INDEX_TABLE = "tmp_dedup_url_keepers"
+
+
+@dataclass(slots=True)
+class KeeperRecord:
+    id: int
+    timestamp: datetime
+    url_ids: array = field(repr=False)
+
+    @property
+    def link_count(self) -> int:
+        return len(self.url_ids)
+
+
+@dataclass(slots=True)
+class KeeperPassResult:
+    scanned_messages: int = 0
+    scanned_links: int = 0
+    duplicate_candidate_count: int = 0
+    duplicate_group_count: int = 0
+    deleted_message_ids: set[int] = field(default_factory=set)
+    spilled: bool = False
+
+
+def url_id_from_hash(url_hash: str) -> int:
+    """Fold a hex sha256 ``normalized_url_hash`` into a signed 64-bit id for BIGINT storage."""
+    value = int(url_hash[:16], 16)
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def build_keeper_record(message_id: int, timestamp: datetime, url_hashes: Any, links: Any) -> KeeperRecord | None:
+    if url_hashes is None:
+        url_hashes = compute_message_link_columns(links).link_url_hashes
+    url_ids = sorted({url_id_from_hash(url_hash) for url_hash in url_hashes or () if url_hash})
+    if not url_ids or timestamp is None:
+        return None
+    return KeeperRecord(id=int(message_id), timestamp=timestamp, url_ids=array("q", url_ids))
+
+
+class MemoryKeeperIndex:
+    def __init__(self) -> None:
+        self._keepers: dict[int, KeeperRecord] = {}
+        # Most URLs have exactly one keeper, so store a bare id and only grow
+        # to a list for URLs shared by several non-redundant messages.
+        self._url_keepers: dict[int, int | list[int]] = {}
+        self.entry_count = 0
+
+    def known_ids(self, message_ids: Iterable[int]) -> set[int]:
+        return {message_id for message_id in message_ids if message_id in self._keepers}
+
+    def load(self, url_ids: Iterable[int]) -> dict[int, KeeperRecord]:
+        loaded: dict[int, KeeperRecord] = {}
+        for url_id in url_ids:
+            holders = self._url_keepers.get(url_id)
+            if holders is None:
+                continue
+            for keeper_id in holders if isinstance(holders, list) else (holders,):
+                loaded[keeper_id] = self._keepers[keeper_id]
+        return loaded
+
+    def add(self, records: Iterable[KeeperRecord]) -> None:
+        for record in records:
+            self._keepers[record.id] = record
+            for url_id in record.url_ids:
+                holders = self._url_keepers.get(url_id)
+                if holders is None:
+                    self._url_keepers[url_id] = record.id
+                elif isinstance(holders, list):
+                    holders.append(record.id)
+                else:
+                    self._url_keepers[url_id] = [holders, record.id]
+                self.entry_count += 1
+
+    def remove(self, keeper_ids: Iterable[int]) -> None:
+        for keeper_id in keeper_ids:
+            record = self._keepers.pop(keeper_id, None)
+            if record is None:
+                continue
+            for url_id in record.url_ids:
+                holders = self._url_keepers.get(url_id)
+                if holders is None:
+                    continue
+                if isinstance(holders, list):
+                    if keeper_id in holders:
+                        holders.remove(keeper_id)
+                        self.entry_count -= 1
+                    if len(holders) == 1:
+                        self._url_keepers[url_id] = holders[0]
+                elif holders == keeper_id:
+                    del self._url_keepers[url_id]
+                    self.entry_count -= 1
+
+    def iter_pairs(self) -> Iterator[tuple[int, int]]:
+        for keeper_id, record in self._keepers.items():
+            for url_id in record.url_ids:
+                yield url_id, keeper_id
+
+    def stats(self) -> tuple[int, int]:
+        return len(self._url_keepers), len(self._keepers)
+
+
+class TableKeeperIndex:
+    """Keeper index stored as (url_id, message_id) rows.
+
+    Keeper timestamps and URL sets are read back from ``messages`` on every
+    lookup, so rows for deleted messages simply stop matching and edited
+    messages are compared with their current links.
+    """
+
+    def __init__(self, session: Session, table_name: str) -> None:
+        self._session = session
+        self._table_name = table_name
+
+    @classmethod
+    def create_spill_table(cls, session: Session) -> "TableKeeperIndex":
+        session.execute(
+            text(
+                f"""
+                CREATE TEMP TABLE IF NOT EXISTS {DEDUP_SPILL_INDEX_TABLE} (
+                    url_id BIGINT NOT NULL,
+                    message_id INTEGER NOT NULL,
+                    PRIMARY KEY (url_id, message_id)
+                ) ON COMMIT DROP
+                """
+            )
+        )
+        session.execute(
+            text(f"CREATE INDEX IF NOT EXISTS ix_{DEDUP_SPILL_INDEX_TABLE}_message ON {DEDUP_SPILL_INDEX_TABLE} (message_id)")
+        )
+        return cls(session, DEDUP_SPILL_INDEX_TABLE)
+
+    def clear(self) -> None:
+        self._session.execute(text(f"TRUNCATE {self._table_name}"))
+
+    def is_empty(self) -> bool:
+        return self._session.execute(text(f"SELECT 1 FROM {self._table_name} LIMIT 1")).first() is None
+
+    def known_ids(self, message_ids: Iterable[int]) -> set[int]:
+        ids = list(message_ids)
+        if not ids:
+            return set()
+        rows = self._session.execute(
+            text(f"SELECT DISTINCT message_id FROM {self._table_name} WHERE message_id = ANY(:ids)"),
+            {"ids": ids},
+        )
+        return {int(row[0]) for row in rows}
+
+    def load(self, url_ids: Iterable[int]) -> dict[int, KeeperRecord]:
+        ids = list(url_ids)
+        if not ids:
+            return {}
+        rows = self._session.execute(
+            text(
+                f"""
+                SELECT m.id, m.timestamp, m.link_url_hashes, m.links
+                FROM messages m
+                WHERE m.id IN (
+                    SELECT k.message_id FROM {self._table_name} k WHERE k.url_id = ANY(:url_ids)
+                )
+                """
+            ),
+            {"url_ids": ids},
+        )
+        loaded: dict[int, KeeperRecord] = {}
+        for message_id, timestamp, url_hashes, links in rows:
+            record = build_keeper_record(message_id, timestamp, url_hashes, links)
+            if record is not None:
+                loaded[record.id] = record
+        return loaded
+
+    def add(self, records: Iterable[KeeperRecord]) -> None:
+        self.add_pairs((url_id, record.id) for record in records for url_id in record.url_ids)
+
+    def add_pairs(self, pairs: Iterable[tuple[int, int]]) -> None:
+        statement = text(
+            f"""
+            INSERT INTO {self._table_name} (url_id, message_id)
+            VALUES (:url_id, :message_id)
+            ON CONFLICT DO NOTHING
+            """
+        )
+        chunk: list[dict[str, int]] = []
+        for url_id, message_id in pairs:
+            chunk.append({"url_id": int(url_id), "message_id": int(message_id)})
+            if len(chunk) >= DEDUP_INDEX_WRITE_CHUNK:
+                self._session.execute(statement, chunk)
+                chunk = []
+        if chunk:
+            self._session.execute(statement, chunk)
+
+    def remove(self, keeper_ids: Iterable[int]) -> None:
+        ids = list(keeper_ids)
+        if ids:
+            self._session.execute(
+                text(f"DELETE FROM {self._table_name} WHERE message_id = ANY(:ids)"),
+                {"ids": ids},
+            )
+
+    def stats(self) -> tuple[int, int]:
+        row = self._session.execute(
+            text(f"SELECT COUNT(DISTINCT url_id), COUNT(DISTINCT message_id) FROM {self._table_name}")
+        ).one()
+        return int(row[0] or 0), int(row[1] or 0)
+
+
+def _iter_batches(records: Iterable[KeeperRecord], size: int) -> Iterator[list[KeeperRecord]]:
+    batch: list[KeeperRecord] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_keeper_pass(
+    session: Session,
+    candidates: Iterable[KeeperRecord],
+    index: MemoryKeeperIndex | TableKeeperIndex,
+    *,
+    should_prefer_candidate: Any,
+    skip_known: bool = False,
+    memory_max_entries: int | None = None,
+    spill_index: Any = None,
+) -> tuple[KeeperPassResult, MemoryKeeperIndex | TableKeeperIndex]:
+    """Compare candidates, newest first, against the keeper index in batches.
+
+    Each batch loads only the keepers that share a URL with it, applies the
+    subset/preference rules in order, and writes the surviving keepers back.
+    A memory index that grows past ``memory_max_entries`` is moved into the
+    table returned by ``spill_index()`` and the pass continues from there.
+    """
+    result = KeeperPassResult()
+    for batch in _iter_batches(candidates, DEDUP_BATCH_SIZE):
+        if skip_known:
+            known = index.known_ids(record.id for record in batch)
+            batch = [record for record in batch if record.id not in known]
+            if not batch:
+                continue
+
+        keepers = index.load({url_id for record in batch for url_id in record.url_ids})
+        keeper_ids_by_url: dict[int, set[int]] = {}
+        for keeper in keepers.values():
+            for url_id in keeper.url_ids:
+                keeper_ids_by_url.setdefault(url_id, set()).add(keeper.id)
+        added: dict[int, KeeperRecord] = {}
+        removed: set[int] = set()
+
+        for snapshot in batch:
+            result.scanned_messages += 1
+            result.scanned_links += snapshot.link_count
+            snapshot_urls = set(snapshot.url_ids)
+            overlapping_keeper_ids = {
+                keeper_id
+                for url_id in snapshot_urls
+                for keeper_id in keeper_ids_by_url.get(url_id, ())
+                if keeper_id != snapshot.id
+            }
+            if overlapping_keeper_ids:
+                result.duplicate_candidate_count += 1
+
+            current_deleted = False
+            for keeper_id in sorted(overlapping_keeper_ids, reverse=True):
+                keeper = keepers[keeper_id]
+                if snapshot_urls.issubset(keeper.url_ids) and should_prefer_candidate(keeper, snapshot):
+                    result.deleted_message_ids.add(snapshot.id)
+                    result.duplicate_group_count += 1
+                    current_deleted = True
+                    break
+            if current_deleted:
+                continue
+
+            losers = [
+                keeper_id
+                for keeper_id in sorted(overlapping_keeper_ids, reverse=True)
+                if snapshot_urls.issuperset(keepers[keeper_id].url_ids)
+                and should_prefer_candidate(snapshot, keepers[keeper_id])
+            ]
+            if losers:
+                result.duplicate_group_count += 1
+                for keeper_id in losers:
+                    result.deleted_message_ids.add(keeper_id)
+                    loser = keepers.pop(keeper_id)
+                    for url_id in loser.url_ids:
+                        keeper_ids_by_url.get(url_id, set()).discard(keeper_id)
+                    if added.pop(keeper_id, None) is None:
+                        removed.add(keeper_id)
+
+            keepers[snapshot.id] = snapshot
+            added[snapshot.id] = snapshot
+            for url_id in snapshot_urls:
+                keeper_ids_by_url.setdefault(url_id, set()).add(snapshot.id)
+
+        index.remove(removed)
+        index.add(added.values())
+
+        if (
+            isinstance(index, MemoryKeeperIndex)
+            and memory_max_entries is not None
+            and spill_index is not None
+            and index.entry_count > memory_max_entries
+        ):
+            logger.info("Dedup keeper index reached %s entries, spilling to the database", index.entry_count)
+            table_index = spill_index()
+            table_index.add_pairs(index.iter_pairs())
+            index = table_index
+            result.spilled = True
+
+    return result, index
@@ -1,24 +1,39 @@
 from __future__ import annotations
 
-import json
 import logging
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Iterable, Iterator, Sequence
 
-from sqlalchemy import text
+from sqlalchemy import case, func, or_, text
 from sqlalchemy.orm import Session
 
-from app.core.monitor_parser import normalize_url
-from app.models.models import DedupStats, Message, engine
+from app.models.config import settings
+from app.models.models import DedupStats, LinkTarget, Message, MessageLinkRef, engine
+from app.services.dedup_keeper_index import (
+    DEDUP_BATCH_SIZE,
+    DEDUP_PERSISTENT_INDEX_TABLE,
+    KeeperRecord,
+    MemoryKeeperIndex,
+    TableKeeperIndex,
+    build_keeper_record,
+    run_keeper_pass,
+)
 from app.services.dedup_runtime_settings import (
     DEFAULT_WAIT_WHEN_BLOCKED_MINUTES,
     ensure_dedup_next_run,
     get_dedup_runtime_config,
+    update_dedup_index_state,
     update_dedup_runtime_meta,
 )
+from app.services.message_hourly_stats_service import (
+    collect_message_stat_hours,
+    rebuild_message_hourly_stats_for_hours,
+)
+from app.services.message_link_columns import compute_message_link_columns
 from app.services.resource_ops import delete_message_resource_data
+from app.services.response_cache_versions import bump_response_cache_version
 
 
 logger = logging.getLogger(__name__)
@@ -26,78 +41,28 @@ logger = logging.getLogger(__name__)
 DEDUP_RUN_LOCK_KEY = 42025094
 DEDUP_SCHEDULER_LOCK_KEY = 42025095
 DEDUP_CLOSE_WINDOW_SECONDS = 300
+# Re-read a slice below the watermark so rows committed out of id order are not missed.
+DEDUP_INCREMENTAL_OVERLAP_IDS = 1000
+DEDUP_INGEST_PENDING_ID_BASE = 1 << 62
 
 
 @dataclass(slots=True)
-class MessageSnapshot:
-    id: int
-    timestamp: datetime
-    normalized_urls: frozenset[str]
-    link_count: int
-
-
-def extract_urls(links: Any) -> list[str]:
-    urls: list[str] = []
-    if isinstance(links, str):
-        urls.append(links)
-    elif isinstance(links, dict):
-        for value in links.values():
-            urls.extend(extract_urls(value))
-    elif isinstance(links, list):
-        for item in links:
-            if isinstance(item, dict) and "url" in item:
-                urls.append(str(item["url"]))
-            else:
-                urls.extend(extract_urls(item))
-    return urls
-
-
-def _normalize_links_payload(links: Any) -> Any:
-    if isinstance(links, str):
-        try:
-            return json.loads(links)
-        except Exception:
-            return links
-    return links
-
-
-def _normalize_url_key(url: str | None) -> str:
-    normalized = normalize_url(url or "")
-    if not normalized:
-        return ""
-    return normalized
-
-
-def _build_snapshot(message_id: int, timestamp: datetime, links: Any) -> MessageSnapshot | None:
-    normalized_payload = _normalize_links_payload(links)
-    normalized_urls = {
-        normalized
-        for raw_url in extract_urls(normalized_payload)
-        if isinstance(raw_url, str)
-        for normalized in [_normalize_url_key(raw_url)]
-        if normalized
-    }
-    if not normalized_urls:
-        return None
-    return MessageSnapshot(
-        id=int(message_id),
-        timestamp=timestamp,
-        normalized_urls=frozenset(normalized_urls),
-        link_count=len(normalized_urls),
-    )
+class IngestDedupPlan:
+    skipped_positions: set[int] = field(default_factory=set)
+    superseded_message_ids: set[int] = field(default_factory=set)
 
 
-def _is_close_duplicate(left: MessageSnapshot, right: MessageSnapshot) -> bool:
+def _is_close_duplicate(left: KeeperRecord, right: KeeperRecord) -> bool:
     return abs((left.timestamp - right.timestamp).total_seconds()) < DEDUP_CLOSE_WINDOW_SECONDS
 
 
-def _is_newer(left: MessageSnapshot, right: MessageSnapshot) -> bool:
+def _is_newer(left: KeeperRecord, right: KeeperRecord) -> bool:
     if left.timestamp != right.timestamp:
         return left.timestamp > right.timestamp
     return left.id > right.id
 
 
-def _should_prefer_candidate(candidate: MessageSnapshot, current: MessageSnapshot) -> bool:
+def _should_prefer_candidate(candidate: KeeperRecord, current: KeeperRecord) -> bool:
     if _is_close_duplicate(candidate, current):
         if candidate.link_count != current.link_count:
             return candidate.link_count > current.link_count
@@ -117,42 +82,128 @@ def _try_claim_xact_lock(session: Session, lock_key: int) -> bool:
         return False
 
 
-def _remove_keeper(
-    keepers_by_id: dict[int, MessageSnapshot],
-    keeper_ids_by_url: dict[str, set[int]],
-    keeper_id: int,
-) -> None:
-    snapshot = keepers_by_id.pop(int(keeper_id), None)
-    if snapshot is None:
-        return
-    for normalized_url in snapshot.normalized_urls:
-        ids = keeper_ids_by_url.get(normalized_url)
-        if not ids:
-            continue
-        ids.discard(snapshot.id)
-        if not ids:
-            keeper_ids_by_url.pop(normalized_url, None)
-
-
-def _iter_message_snapshots(
+def _iter_keeper_records(
     session: Session,
     *,
-    scope_mode: str,
-    lookback_hours: int,
-) -> Any:
+    max_message_id: int,
+    min_timestamp: datetime | None = None,
+    min_message_id: int | None = None,
+) -> Iterator[KeeperRecord]:
+    # Raw links are only needed for rows the derived-column backfill has not reached yet.
+    pending_links = case((Message.link_url_hashes.is_(None), Message.links), else_=None)
     query = (
-        session.query(Message.id, Message.timestamp, Message.links)
-        .filter(Message.links.isnot(None))
+        session.query(Message.id, Message.timestamp, Message.link_url_hashes, pending_links)
+        .filter(
+            Message.id <= int(max_message_id),
+            Message.timestamp.isnot(None),
+            or_(Message.link_count > 0, Message.link_count.is_(None)),
+        )
         .order_by(Message.timestamp.desc(), Message.id.desc())
     )
-    if scope_mode == "recent_hours":
-        cutoff_time = datetime.now() - timedelta(hours=max(1, int(lookback_hours)))
-        query = query.filter(Message.timestamp >= cutoff_time)
+    if min_timestamp is not None:
+        query = query.filter(Message.timestamp >= min_timestamp)
+    if min_message_id is not None:
+        query = query.filter(Message.id > int(min_message_id))
+
+    for message_id, timestamp, url_hashes, links in query.yield_per(DEDUP_BATCH_SIZE):
+        record = build_keeper_record(message_id, timestamp, url_hashes, links)
+        if record is not None:
+            yield record
+
+
+def _needs_full_rebuild(config: dict[str, Any], index: TableKeeperIndex) -> bool:
+    if not config.get("index_watermark_message_id"):
+        return True
+    rebuilt_at = config.get("index_rebuilt_at")
+    rebuild_hours = int(getattr(settings, "DEDUP_INDEX_FULL_REBUILD_HOURS", 168) or 0)
+    if rebuilt_at is None or (rebuild_hours > 0 and rebuilt_at <= datetime.utcnow() - timedelta(hours=rebuild_hours)):
+        return True
+    return index.is_empty()
+
+
+def delete_duplicate_messages(session: Session, message_ids: Iterable[int]) -> int:
+    ids = {int(message_id) for message_id in message_ids}
+    if not ids:
+        return 0
+    affected_hours = collect_message_stat_hours(session, ids)
+    delete_message_resource_data(session, ids)
+    deleted_count = (
+        session.query(Message)
+        .filter(Message.id.in_(ids))
+        .delete(synchronize_session=False)
+    )
+    rebuild_message_hourly_stats_for_hours(session, affected_hours)
+    return int(deleted_count or 0)
 
-    for row in query.yield_per(1000):
-        snapshot = _build_snapshot(row.id, row.timestamp, row.links)
-        if snapshot is not None:
-            yield snapshot
+
+def plan_ingest_dedup(
+    session: Session,
+    records: Sequence[tuple[datetime, Any]],
+) -> IngestDedupPlan:
+    """Decide, before insert, which incoming ``(timestamp, links)`` records are duplicates.
+
+    Existing messages that share a URL are found through the resource index
+    (``link_targets`` / ``message_link_refs``) and judged with the same rules
+    as the scheduled run: an incoming record covered by a preferred message
+    is skipped, and existing messages it covers and is preferred over are
+    returned for deletion.
+    """
+    plan = IngestDedupPlan()
+    if not records or not bool(getattr(settings, "DEDUP_INGEST_ENABLED", True)):
+        return plan
+    config = get_dedup_runtime_config(session)
+    if not bool(config.get("enabled")):
+        return plan
+
+    # Incoming rows get ids above every stored id, in arrival order, so ties
+    # break the same way they would once the rows are inserted.
+    candidates: list[tuple[int, KeeperRecord]] = []
+    url_hashes: set[str] = set()
+    for position, (timestamp, links) in enumerate(records):
+        columns = compute_message_link_columns(links)
+        record = build_keeper_record(DEDUP_INGEST_PENDING_ID_BASE + position, timestamp, columns.link_url_hashes, None)
+        if record is None:
+            continue
+        candidates.append((position, record))
+        url_hashes.update(columns.link_url_hashes)
+    if not candidates:
+        return plan
+
+    query = (
+        session.query(Message.id, Message.timestamp, Message.link_url_hashes, Message.links)
+        .filter(
+            Message.id.in_(
+                session.query(MessageLinkRef.message_id)
+                .join(LinkTarget, LinkTarget.id == MessageLinkRef.link_target_id)
+                .filter(LinkTarget.normalized_url_hash.in_(sorted(url_hashes)))
+            ),
+            Message.timestamp.isnot(None),
+        )
+    )
+    if str(config.get("scope_mode") or "all_history") == "recent_hours":
+        lookback_hours = max(1, int(config.get("lookback_hours") or 72))
+        query = query.filter(Message.timestamp >= datetime.now() - timedelta(hours=lookback_hours))
+
+    index = MemoryKeeperIndex()
+    index.add(
+        record
+        for row in query.all()
+        for record in [build_keeper_record(row.id, row.timestamp, row.link_url_hashes, row.links)]
+        if record is not None
+    )
+    positions_by_id = {record.id: position for position, record in candidates}
+    pass_result, _ = run_keeper_pass(
+        session,
+        sorted((record for _, record in candidates), key=lambda item: (item.timestamp, item.id), reverse=True),
+        index,
+        should_prefer_candidate=_should_prefer_candidate,
+    )
+    for message_id in pass_result.deleted_message_ids:
+        if message_id in positions_by_id:
+            plan.skipped_positions.add(positions_by_id[message_id])
+        else:
+            plan.superseded_message_ids.add(message_id)
+    return plan
 
 
 def _prune_old_stats(session: Session, *, stats_retention_hours: int) -> None:
@@ -172,78 +223,75 @@ def execute_dedup_run(
     lookback_hours: int,
     stats_retention_hours: int,
     trigger_source: str = "manual",
+    force_full: bool = False,
 ) -> dict[str, Any]:
+    """Delete messages whose URL set is covered by a preferred message.
+
+    ``recent_hours`` compares only the window. ``all_history`` keeps a
+    persistent URL -> keeper index and, between periodic full rebuilds, only
+    feeds messages above the stored id watermark through it.
+    """
     if not _try_claim_xact_lock(session, DEDUP_RUN_LOCK_KEY):
         raise RuntimeError("链接去重任务已在运行，请稍后再试")
 
     started_at = datetime.now()
     started_perf = time.perf_counter()
-    keepers_by_id: dict[int, MessageSnapshot] = {}
-    keeper_ids_by_url: dict[str, set[int]] = {}
-    deleted_message_ids: set[int] = set()
-    duplicate_candidate_count = 0
-    duplicate_group_count = 0
-    scanned_links = 0
-    scanned_messages = 0
-
-    for snapshot in _iter_message_snapshots(
-        session,
-        scope_mode=scope_mode,
-        lookback_hours=lookback_hours,
-    ):
-        scanned_messages += 1
-        scanned_links += snapshot.link_count
-        overlapping_keeper_ids = {
-            keeper_id
-            for normalized_url in snapshot.normalized_urls
-            for keeper_id in keeper_ids_by_url.get(normalized_url, set())
-            if keeper_id in keepers_by_id
-        }
-        if overlapping_keeper_ids:
-            duplicate_candidate_count += 1
-
-        current_deleted = False
-        for keeper_id in sorted(overlapping_keeper_ids, reverse=True):
-            keeper = keepers_by_id.get(keeper_id)
-            if keeper is None:
-                continue
-            if snapshot.normalized_urls.issubset(keeper.normalized_urls) and _should_prefer_candidate(keeper, snapshot):
-                deleted_message_ids.add(snapshot.id)
-                duplicate_group_count += 1
-                current_deleted = True
-                break
-
-        if current_deleted:
-            continue
+    max_message_id = int(session.query(func.max(Message.id)).scalar() or 0)
+    memory_max_entries = max(1, int(getattr(settings, "DEDUP_MEMORY_MAX_URL_ENTRIES", 2000000) or 1))
 
-        losers_to_delete: list[int] = []
-        for keeper_id in sorted(overlapping_keeper_ids, reverse=True):
-            keeper = keepers_by_id.get(keeper_id)
-            if keeper is None:
-                continue
-            if keeper.normalized_urls.issubset(snapshot.normalized_urls) and _should_prefer_candidate(snapshot, keeper):
-                losers_to_delete.append(keeper.id)
-
-        if losers_to_delete:
-            duplicate_group_count += 1
-            for keeper_id in losers_to_delete:
-                deleted_message_ids.add(keeper_id)
-                _remove_keeper(keepers_by_id, keeper_ids_by_url, keeper_id)
-
-        keepers_by_id[snapshot.id] = snapshot
-        for normalized_url in snapshot.normalized_urls:
-            keeper_ids_by_url.setdefault(normalized_url, set()).add(snapshot.id)
-
-    deleted_count = 0
-    if deleted_message_ids:
-        delete_message_resource_data(session, deleted_message_ids)
-        deleted_count = (
-            session.query(Message)
-            .filter(Message.id.in_(deleted_message_ids))
-            .delete(synchronize_session=False)
+    if scope_mode == "all_history":
+        persistent_index = TableKeeperIndex(session, DEDUP_PERSISTENT_INDEX_TABLE)
+        config = get_dedup_runtime_config(session)
+        if force_full or _needs_full_rebuild(config, persistent_index):
+            run_mode = "full"
+            persistent_index.clear()
+            pass_result, index = run_keeper_pass(
+                session,
+                _iter_keeper_records(session, max_message_id=max_message_id),
+                MemoryKeeperIndex(),
+                should_prefer_candidate=_should_prefer_candidate,
+                memory_max_entries=memory_max_entries,
+                spill_index=lambda: persistent_index,
+            )
+            if isinstance(index, MemoryKeeperIndex):
+                persistent_index.add_pairs(index.iter_pairs())
+        else:
+            run_mode = "incremental"
+            watermark = int(config["index_watermark_message_id"])
+            pass_result, index = run_keeper_pass(
+                session,
+                _iter_keeper_records(
+                    session,
+                    max_message_id=max_message_id,
+                    min_message_id=max(0, watermark - DEDUP_INCREMENTAL_OVERLAP_IDS),
+                ),
+                persistent_index,
+                should_prefer_candidate=_should_prefer_candidate,
+                skip_known=True,
+            )
+        unique_links, kept_messages = index.stats()
+        update_dedup_index_state(
+            session,
+            watermark_message_id=max_message_id or None,
+            rebuilt_at=datetime.utcnow() if run_mode == "full" else None,
+        )
+    else:
+        run_mode = "window"
+        pass_result, index = run_keeper_pass(
+            session,
+            _iter_keeper_records(
+                session,
+                max_message_id=max_message_id,
+                min_timestamp=datetime.now() - timedelta(hours=max(1, int(lookback_hours))),
+            ),
+            MemoryKeeperIndex(),
+            should_prefer_candidate=_should_prefer_candidate,
+            memory_max_entries=memory_max_entries,
+            spill_index=lambda: TableKeeperIndex.create_spill_table(session),
         )
+        unique_links, kept_messages = index.stats()
 
-    unique_links = len(keeper_ids_by_url)
+    deleted_count = delete_duplicate_messages(session, pass_result.deleted_message_ids)
     _prune_old_stats(session, stats_retention_hours=stats_retention_hours)
     session.add(
         DedupStats(
@@ -252,6 +300,7 @@ def execute_dedup_run(
             deleted=int(deleted_count or 0),
         )
     )
+    bump_response_cache_version(session)
 
     duration_seconds = round(time.perf_counter() - started_perf, 3)
     scope_label = "全量历史" if scope_mode == "all_history" else f"最近 {int(lookback_hours)} 小时"
@@ -263,12 +312,14 @@ def execute_dedup_run(
         "scope_mode": scope_mode,
         "scope_label": scope_label,
         "lookback_hours": None if scope_mode == "all_history" else int(lookback_hours),
-        "scanned_messages": scanned_messages,
-        "scanned_links": scanned_links,
+        "index_mode": run_mode,
+        "index_spilled": pass_result.spilled,
+        "scanned_messages": pass_result.scanned_messages,
+        "scanned_links": pass_result.scanned_links,
         "unique_links": unique_links,
-        "kept_messages": len(keepers_by_id),
-        "duplicate_candidate_count": duplicate_candidate_count,
-        "duplicate_group_count": duplicate_group_count,
+        "kept_messages": kept_messages,
+        "duplicate_candidate_count": pass_result.duplicate_candidate_count,
+        "duplicate_group_count": pass_result.duplicate_group_count,
         "deleted_count": int(deleted_count or 0),
         "duration_seconds": duration_seconds,
         "error": None,
@@ -281,6 +332,7 @@ def run_dedup_with_session(
     trigger_source: str = "manual",
     updated_by: str | None = None,
     advance_next_run: bool = False,
+    force_full: bool = False,
 ) -> dict[str, Any]:
     config = get_dedup_runtime_config(session)
     scope_mode = str(config.get("scope_mode") or "all_history")
@@ -294,6 +346,7 @@ def run_dedup_with_session(
             lookback_hours=lookback_hours,
             stats_retention_hours=stats_retention_hours,
             trigger_source=trigger_source,
+            force_full=force_full,
         )
         update_dedup_runtime_meta(
             session,
@@ -366,13 +419,14 @@ def run_dedup_with_session(
         return failure_result
 
 
-def run_dedup_now(*, updated_by: str | None = None) -> dict[str, Any]:
+def run_dedup_now(*, updated_by: str | None = None, force_full: bool = False) -> dict[str, Any]:
     with Session(engine) as session:
         return run_dedup_with_session(
             session,
             trigger_source="manual",
             updated_by=updated_by,
             advance_next_run=False,
+            force_full=force_full,
         )
 
 
@@ -107,6 +107,8 @@ def build_default_dedup_runtime_settings() -> dict[str, Any]:
         "last_status": None,
         "last_error_message": "",
         "last_run_summary": {},
+        "index_watermark_message_id": None,
+        "index_rebuilt_at": None,
     }
 
 
@@ -153,6 +155,10 @@ def _normalize_runtime_storage_values(raw_value: Any) -> dict[str, Any]:
         "last_status": _coerce_text(payload.get("last_status"), "", max_length=32) or None,
         "last_error_message": _coerce_text(payload.get("last_error_message"), "", max_length=2000),
         "last_run_summary": dict(summary) if isinstance(summary, dict) else {},
+        "index_watermark_message_id": (
+            _coerce_int(payload.get("index_watermark_message_id"), 0, minimum=0) or None
+        ),
+        "index_rebuilt_at": _coerce_datetime(payload.get("index_rebuilt_at")),
     }
 
 
@@ -176,6 +182,7 @@ def _write_runtime_bucket(record: SystemSettings, payload: dict[str, Any], *, up
     serialized = dict(normalized)
     serialized["next_run_at"] = _to_iso(normalized.get("next_run_at"))
     serialized["last_run_at"] = _to_iso(normalized.get("last_run_at"))
+    serialized["index_rebuilt_at"] = _to_iso(normalized.get("index_rebuilt_at"))
 
     extra_json = dict(record.extra_json or {})
     extra_json[DEDUP_RUNTIME_EXTRA_KEY] = serialized
@@ -253,6 +260,7 @@ def get_dedup_runtime_settings(session: Session) -> dict[str, Any]:
     response["schedule_interval_hours"] = int(values.get("schedule_interval_hours") or DEFAULT_DEDUP_INTERVAL_HOURS)
     response["next_run_at"] = _to_iso(values.get("next_run_at"))
     response["last_run_at"] = _to_iso(values.get("last_run_at"))
+    response["index_rebuilt_at"] = _to_iso(values.get("index_rebuilt_at"))
     response["status_summary"] = _build_status_summary(values)
     return response
 
@@ -327,6 +335,23 @@ def update_dedup_runtime_meta(
     return get_dedup_runtime_settings(session)
 
 
+def update_dedup_index_state(
+    session: Session,
+    *,
+    watermark_message_id: int | None,
+    rebuilt_at: datetime | None = None,
+) -> None:
+    values = get_dedup_runtime_config(session)
+    values["index_watermark_message_id"] = watermark_message_id
+    if rebuilt_at is not None:
+        values["index_rebuilt_at"] = rebuilt_at
+
+    record = _ensure_system_settings_record(session)
+    _write_runtime_bucket(record, values, updated_by=record.updated_by)
+    session.add(record)
+    session.flush()
+
+
 def ensure_dedup_next_run(session: Session, *, updated_by: str | None = None) -> dict[str, Any]:
     values = get_dedup_runtime_config(session)
     if values.get("enabled") and values.get("next_run_at") is None:
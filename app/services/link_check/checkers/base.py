@@ -4,12 +4,12 @@ import abc
 import asyncio
 import json
 import random
-import time
 from typing import Any, Dict, Optional
 
 from aiohttp import ClientResponse
 
 from ..constants import get_platform_config
+from ..rate_limiter import acquire_netdisk_token
 from ..result import (
     CONSERVATIVE_VALID_STATUSES,
     LinkCheckResult,
@@ -40,30 +40,17 @@ class BaseChecker(abc.ABC):
         self.timeout = timeout
         self.max_concurrent = int(config.get("max_concurrent", 2))
         self.delay_range = tuple(config.get("delay_range", (0.0, 0.0)))
-        self.max_requests_per_second = int(config.get("max_requests_per_second", 0) or 0)
         self._rate_lock = asyncio.Lock()
-        self._last_request_at = 0.0
 
     def get_concurrency_limit(self) -> int:
         return self.max_concurrent
 
-    async def apply_rate_limit(self) -> None:
+    async def apply_rate_limit(self, *, host: Optional[str] = None) -> None:
         async with self._rate_lock:
-            wait_for = 0.0
-            now = time.monotonic()
-
-            if self.max_requests_per_second > 0:
-                min_interval = 1.0 / float(self.max_requests_per_second)
-                wait_for = max(wait_for, self._last_request_at + min_interval - now)
-
             low, high = self.delay_range
             if high > 0:
-                wait_for += random.uniform(low, high)
-
-            if wait_for > 0:
-                await asyncio.sleep(wait_for)
-
-            self._last_request_at = time.monotonic()
+                await asyncio.sleep(random.uniform(low, high))
+        await acquire_netdisk_token(self.platform, host=host)
 
     async def read_json_body(self, response: ClientResponse) -> tuple[Dict[str, Any], str]:
         body = await response.text(errors="ignore")
@@ -121,7 +121,6 @@ class CMCCChecker(BaseChecker):
         self.platform = PLATFORM_139
         self.max_concurrent = 2
         self.delay_range = (1.0, 1.8)
-        self.max_requests_per_second = 2
 
     async def check(self, target: LinkTarget, http_session: aiohttp.ClientSession):
         share_id = _extract_share_id(target.resolved_url)
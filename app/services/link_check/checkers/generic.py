@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import time
+from urllib.parse import urlparse
 
 import aiohttp
 
@@ -19,7 +20,7 @@ class GenericLinkChecker(BaseChecker):
 
         started_at = time.perf_counter()
         try:
-            await self.apply_rate_limit()
+            await self.apply_rate_limit(host=urlparse(target.resolved_url).hostname)
             async with http_session.get(
                 target.resolved_url,
                 allow_redirects=True,
@@ -0,0 +1,215 @@
+"""Long-lived event loop and per-platform HTTP sessions for link checks."""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, Optional, TypeVar
+
+import aiohttp
+
+from app.models.config import settings
+
+from .constants import DEFAULT_REQUEST_HEADERS, UNKNOWN_PLATFORM
+from .platforms import canonicalize_platform_name, get_platform_limits
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+DEFAULT_CHECK_TIMEOUT_SECONDS = 15.0
+# Redirect resolution and unknown platforms fan out over many hosts.
+DEFAULT_CONNECTOR_LIMIT = 32
+DEFAULT_CONNECTOR_LIMIT_PER_HOST = 8
+PLATFORM_CONNECTOR_LIMIT_FACTOR = 4
+ENGINE_START_TIMEOUT_SECONDS = 5.0
+
+
+class LinkCheckEngine:
+    """Run link-check coroutines on one background loop with warm connections.
+
+    Every platform gets its own ``aiohttp`` session whose connector keeps
+    connections alive, caches DNS and caps connections per host at the
+    platform's ``max_concurrent``, so concurrent runs together still respect
+    the platform limit. Sessions are rebuilt between runs once they are older
+    than ``session_max_age_seconds`` so cookie jars do not grow forever.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float = DEFAULT_CHECK_TIMEOUT_SECONDS,
+        dns_cache_seconds: float = 300,
+        keepalive_seconds: float = 30,
+        session_max_age_seconds: float = 1800,
+    ) -> None:
+        self.timeout = float(timeout)
+        self._dns_cache_seconds = max(0, int(dns_cache_seconds))
+        self._keepalive_seconds = max(1.0, float(keepalive_seconds))
+        self._session_max_age_seconds = max(0.0, float(session_max_age_seconds))
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._sessions_created_at = 0.0
+        self._active_runs = 0
+        self.runs_started = 0
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None and self._thread is not None and self._thread.is_alive():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=run, daemon=True, name="link-check-engine")
+            thread.start()
+            if not ready.wait(ENGINE_START_TIMEOUT_SECONDS):
+                raise RuntimeError("link check engine loop did not start")
+            self._loop = loop
+            self._thread = thread
+            logger.info("Link check engine started")
+            return loop
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            loop = self._loop
+            thread = self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_sessions(), loop).result(timeout)
+        except Exception:
+            logger.exception("Failed to close link check engine sessions")
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=timeout)
+        if not loop.is_running():
+            loop.close()
+
+    def owns_running_loop(self) -> bool:
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return running_loop is self._loop
+
+    def submit(self, coro: Coroutine[Any, Any, _T]) -> "concurrent.futures.Future[_T]":
+        loop = self.start()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def session_for(self, platform: str) -> aiohttp.ClientSession:
+        """Return the warm session for ``platform``; call only on the engine loop."""
+        key = canonicalize_platform_name(platform or UNKNOWN_PLATFORM)
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            if not self._sessions:
+                self._sessions_created_at = time.monotonic()
+            session = aiohttp.ClientSession(
+                connector=self._build_connector(key),
+                headers=DEFAULT_REQUEST_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._sessions[key] = session
+        return session
+
+    @asynccontextmanager
+    async def run_scope(self) -> AsyncIterator[Callable[[str], aiohttp.ClientSession]]:
+        self._active_runs += 1
+        self.runs_started += 1
+        try:
+            yield self.session_for
+        finally:
+            self._active_runs -= 1
+            if (
+                self._active_runs <= 0
+                and self._sessions
+                and time.monotonic() - self._sessions_created_at >= self._session_max_age_seconds
+            ):
+                await self._close_sessions()
+
+    def _build_connector(self, platform: str) -> aiohttp.TCPConnector:
+        if platform == UNKNOWN_PLATFORM:
+            limit, limit_per_host = DEFAULT_CONNECTOR_LIMIT, DEFAULT_CONNECTOR_LIMIT_PER_HOST
+        else:
+            limit_per_host = max(1, int(get_platform_limits(platform).get("max_concurrent", 2) or 2))
+            limit = limit_per_host * PLATFORM_CONNECTOR_LIMIT_FACTOR
+        return aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            use_dns_cache=self._dns_cache_seconds > 0,
+            ttl_dns_cache=self._dns_cache_seconds or None,
+            keepalive_timeout=self._keepalive_seconds,
+        )
+
+    async def _close_sessions(self) -> None:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            try:
+                await session.close()
+            except Exception:
+                logger.debug("Failed to close link check session", exc_info=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "active_runs": self._active_runs,
+            "runs_started": self.runs_started,
+            "platform_sessions": sorted(self._sessions),
+        }
+
+
+_engine_lock = threading.Lock()
+_engine: Optional[LinkCheckEngine] = None
+
+
+def link_check_engine_enabled() -> bool:
+    return bool(getattr(settings, "LINK_CHECK_ENGINE_ENABLED", True))
+
+
+def get_link_check_engine() -> LinkCheckEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = LinkCheckEngine(
+                dns_cache_seconds=float(getattr(settings, "LINK_CHECK_DNS_CACHE_SECONDS", 300) or 0),
+                keepalive_seconds=float(getattr(settings, "LINK_CHECK_KEEPALIVE_SECONDS", 30) or 30),
+                session_max_age_seconds=float(getattr(settings, "LINK_CHECK_SESSION_MAX_AGE_SECONDS", 1800) or 0),
+            )
+        return _engine
+
+
+def current_link_check_engine() -> Optional[LinkCheckEngine]:
+    """The engine whose loop is running the caller, if any."""
+    engine = _engine
+    if engine is not None and engine.owns_running_loop():
+        return engine
+    return None
+
+
+async def run_on_link_check_engine(coro: Coroutine[Any, Any, _T]) -> _T:
+    """Await ``coro`` on the engine loop from any other event loop."""
+    if not link_check_engine_enabled() or current_link_check_engine() is not None:
+        return await coro
+    return await asyncio.wrap_future(get_link_check_engine().submit(coro))
+
+
+def stop_link_check_engine() -> None:
+    global _engine
+    with _engine_lock:
+        engine = _engine
+        _engine = None
+    if engine is not None:
+        engine.stop()
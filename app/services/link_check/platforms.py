@@ -12,6 +12,7 @@ from .constants import (
     PLATFORM_UC,
     PLATFORM_XUNLEI,
     UNKNOWN_PLATFORM,
+    get_platform_config,
     get_platform_limits as get_base_platform_limits,
 )
 
@@ -27,6 +28,7 @@ _PLATFORM_LIMITS = {
     PLATFORM_139: {
         "max_concurrent": 2,
         "delay_range": (1.0, 1.8),
+        "max_requests_per_second": 2,
     }
 }
 
@@ -61,6 +63,15 @@ def detect_extended_platform_from_url(url: str) -> str:
     return UNKNOWN_PLATFORM
 
 
+def get_platform_rate_limit(platform: str) -> tuple[float, float] | None:
+    canonical = canonicalize_platform_name(platform)
+    config = _PLATFORM_LIMITS.get(canonical) or get_platform_config(canonical)
+    rate = float(config.get("max_requests_per_second", 0) or 0)
+    if rate <= 0:
+        return None
+    return rate, max(1.0, float(config.get("burst", rate) or rate))
+
+
 def get_platform_limits(platform: str):
     canonical = canonicalize_platform_name(platform)
     if canonical in _PLATFORM_LIMITS:
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Tuple
+
+from app.models.config import settings
+
+from .constants import UNKNOWN_PLATFORM
+from .platforms import canonicalize_platform_name, get_platform_rate_limit
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKEND_MEMORY = "memory"
+RATE_LIMIT_BACKEND_FILE = "file"
+RATE_LIMIT_BACKEND_DATABASE = "database"
+ALLOWED_RATE_LIMIT_BACKENDS = {
+    RATE_LIMIT_BACKEND_MEMORY,
+    RATE_LIMIT_BACKEND_FILE,
+    RATE_LIMIT_BACKEND_DATABASE,
+}
+
+_SAFE_KEY_PATTERN = re.compile(r"[^0-9A-Za-z._-]+")
+
+
+@dataclass(slots=True)
+class RateLimitStats:
+    acquired: int = 0
+    waited: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    last_wait_seconds: float = 0.0
+    backend_errors: int = 0
+
+
+def _refill(tokens: float, elapsed: float, rate: float, capacity: float) -> float:
+    return min(capacity, tokens + max(0.0, elapsed) * rate)
+
+
+class _MemoryBucketStore:
+    name = RATE_LIMIT_BACKEND_MEMORY
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._state: Dict[str, Tuple[float, float]] = {}
+
+    def reserve(self, key: str, rate: float, capacity: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_at = self._state.get(key, (capacity, now))
+            tokens = _refill(tokens, now - updated_at, rate, capacity) - 1.0
+            self._state[key] = (tokens, now)
+        return max(0.0, -tokens / rate)
+
+
+class _FileBucketStore:
+    """Bucket state shared by every process on one host through ``flock``."""
+
+    name = RATE_LIMIT_BACKEND_FILE
+
+    def __init__(self, directory: str) -> None:
+        import fcntl  # noqa: F401  - fail early on platforms without flock
+
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, f"{_SAFE_KEY_PATTERN.sub('_', key)}.bucket")
+
+    def reserve(self, key: str, rate: float, capacity: float) -> float:
+        import fcntl
+
+        with open(self._path(key), "a+", encoding="utf-8") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                raw = handle.read().strip()
+                now = time.time()
+                try:
+                    state = json.loads(raw) if raw else {}
+                except json.JSONDecodeError:
+                    state = {}
+                tokens = float(state.get("tokens", capacity))
+                updated_at = float(state.get("updated_at", now))
+                tokens = _refill(tokens, now - updated_at, rate, capacity) - 1.0
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps({"tokens": tokens, "updated_at": now}))
+                handle.flush()
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        return max(0.0, -tokens / rate)
+
+
+class _DatabaseBucketStore:
+    """Bucket state shared by every process through one upsert per request."""
+
+    name = RATE_LIMIT_BACKEND_DATABASE
+
+    def __init__(self) -> None:
+        from sqlalchemy import text
+
+        from app.models.models import engine, ensure_runtime_storage_tables
+
+        ensure_runtime_storage_tables()
+        self._engine = engine
+        self._statement = text(
+            """
+            INSERT INTO netdisk_rate_buckets (bucket_key, tokens, updated_epoch)
+            VALUES (:key, :capacity - 1, EXTRACT(EPOCH FROM clock_timestamp()))
+            ON CONFLICT (bucket_key) DO UPDATE
+            SET tokens = LEAST(
+                    :capacity,
+                    netdisk_rate_buckets.tokens
+                    + GREATEST(0, EXTRACT(EPOCH FROM clock_timestamp()) - netdisk_rate_buckets.updated_epoch) * :rate
+                ) - 1,
+                updated_epoch = EXTRACT(EPOCH FROM clock_timestamp())
+            RETURNING tokens
+            """
+        )
+
+    def reserve(self, key: str, rate: float, capacity: float) -> float:
+        with self._engine.begin() as connection:
+            tokens = float(
+                connection.execute(self._statement, {"key": key, "rate": rate, "capacity": capacity}).scalar_one()
+            )
+        return max(0.0, -tokens / rate)
+
+
+class NetdiskRateLimiter:
+    """Process-wide token buckets for outbound netdisk requests.
+
+    Every caller reserves a token before it hits a platform, and sleeps for
+    the time the bucket needs to refill when it is overdrawn. Rates come from
+    ``max_requests_per_second`` (and an optional ``burst``) in the platform
+    config, so link checks, transfers and follow-task validation share one
+    budget per platform instead of each pacing itself.
+    """
+
+    def __init__(self, *, backend: str = RATE_LIMIT_BACKEND_MEMORY, lock_dir: str | None = None) -> None:
+        self._fallback_store = _MemoryBucketStore()
+        self._store: Any = self._fallback_store
+        self._stats: Dict[str, RateLimitStats] = {}
+        self._stats_lock = threading.Lock()
+        self._backend_failed = False
+        self.enabled = True
+
+        normalized_backend = str(backend or RATE_LIMIT_BACKEND_MEMORY).strip().lower()
+        if normalized_backend not in ALLOWED_RATE_LIMIT_BACKENDS:
+            logger.warning("Unknown netdisk rate limit backend %s, using memory", backend)
+            normalized_backend = RATE_LIMIT_BACKEND_MEMORY
+        self._backend = normalized_backend
+        self._lock_dir = lock_dir or os.path.join(tempfile.gettempdir(), "netdisk-rate-limits")
+        self._store_ready = normalized_backend == RATE_LIMIT_BACKEND_MEMORY
+        self._store_init_lock = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        return self._store.name
+
+    def _get_store(self) -> Any:
+        if self._store_ready:
+            return self._store
+        with self._store_init_lock:
+            if not self._store_ready:
+                try:
+                    if self._backend == RATE_LIMIT_BACKEND_FILE:
+                        self._store = _FileBucketStore(self._lock_dir)
+                    elif self._backend == RATE_LIMIT_BACKEND_DATABASE:
+                        self._store = _DatabaseBucketStore()
+                except Exception:
+                    logger.exception("Failed to initialize %s rate limit backend, using memory", self._backend)
+                    self._store = self._fallback_store
+                self._store_ready = True
+        return self._store
+
+    @staticmethod
+    def bucket_key(platform: str, host: str | None = None) -> str:
+        canonical = canonicalize_platform_name(platform)
+        if canonical == UNKNOWN_PLATFORM and host:
+            return f"{canonical}:{host.lower()}"
+        return canonical
+
+    def _reserve(self, platform: str, host: str | None) -> float:
+        limits = get_platform_rate_limit(platform)
+        if not self.enabled or limits is None:
+            return 0.0
+        rate, capacity = limits
+        key = self.bucket_key(platform, host)
+        store = self._get_store()
+        try:
+            return store.reserve(key, rate, capacity)
+        except Exception:
+            self._record_backend_error(key)
+            return self._fallback_store.reserve(key, rate, capacity)
+
+    def _record_backend_error(self, key: str) -> None:
+        if not self._backend_failed:
+            logger.exception("Netdisk rate limit backend %s failed, falling back to memory", self._store.name)
+            self._backend_failed = True
+        with self._stats_lock:
+            self._stats.setdefault(key, RateLimitStats()).backend_errors += 1
+
+    def _record_wait(self, key: str, wait_seconds: float) -> None:
+        with self._stats_lock:
+            stats = self._stats.setdefault(key, RateLimitStats())
+            stats.acquired += 1
+            stats.last_wait_seconds = wait_seconds
+            if wait_seconds > 0:
+                stats.waited += 1
+                stats.total_wait_seconds += wait_seconds
+                stats.max_wait_seconds = max(stats.max_wait_seconds, wait_seconds)
+
+    async def acquire(self, platform: str, *, host: str | None = None) -> float:
+        if self._store_ready and self._store is self._fallback_store:
+            wait_for = self._reserve(platform, host)
+        else:
+            wait_for = await asyncio.to_thread(self._reserve, platform, host)
+        if wait_for > 0:
+            await asyncio.sleep(wait_for)
+        self._record_wait(self.bucket_key(platform, host), wait_for)
+        return wait_for
+
+    def acquire_sync(self, platform: str, *, host: str | None = None) -> float:
+        wait_for = self._reserve(platform, host)
+        if wait_for > 0:
+            time.sleep(wait_for)
+        self._record_wait(self.bucket_key(platform, host), wait_for)
+        return wait_for
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            buckets = {key: asdict(stats) for key, stats in sorted(self._stats.items())}
+        for stats in buckets.values():
+            acquired = int(stats["acquired"] or 0)
+            stats["avg_wait_seconds"] = round(stats["total_wait_seconds"] / acquired, 4) if acquired else 0.0
+        return {"enabled": self.enabled, "backend": self.backend, "buckets": buckets}
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._stats.clear()
+
+
+netdisk_rate_limiter = NetdiskRateLimiter(
+    backend=str(getattr(settings, "NETDISK_RATE_LIMIT_BACKEND", RATE_LIMIT_BACKEND_MEMORY) or RATE_LIMIT_BACKEND_MEMORY),
+    lock_dir=str(getattr(settings, "NETDISK_RATE_LIMIT_LOCK_DIR", "") or "") or None,
+)
+netdisk_rate_limiter.enabled = bool(getattr(settings, "NETDISK_RATE_LIMIT_ENABLED", True))
+
+
+async def acquire_netdisk_token(platform: str, *, host: str | None = None) -> float:
+    return await netdisk_rate_limiter.acquire(platform, host=host)
+
+
+def get_netdisk_rate_limit_snapshot() -> Dict[str, Any]:
+    return netdisk_rate_limiter.snapshot()
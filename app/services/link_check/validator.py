@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import asyncio
 import inspect
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import aiohttp
 
 from .cache import LINK_RESULT_CACHE, should_cache_status
 from .constants import DEFAULT_REQUEST_HEADERS, UNKNOWN_PLATFORM
+from .engine import current_link_check_engine
 from .platforms import get_platform_limits
 from .history import LinkCheckHistoryProvider
 from .parser import canonical_target_key, detect_platform_from_url, is_http_url, normalize_candidate_url
@@ -119,12 +121,31 @@ class LinkValidator:
             self.result_cache.set([history_url], history_result)
         return history_results
 
+    async def _load_history_results(self, urls: List[str]) -> Dict[str, LinkCheckResult]:
+        # A DB query; keep it off the event loop, which may be the shared engine loop.
+        return await asyncio.to_thread(self._get_history_results, urls)
+
     async def _create_session(self, timeout: float) -> aiohttp.ClientSession:
         return aiohttp.ClientSession(
             headers=DEFAULT_REQUEST_HEADERS,
             timeout=aiohttp.ClientTimeout(total=timeout),
         )
 
+    @asynccontextmanager
+    async def _session_scope(self, timeout: float) -> AsyncIterator[Callable[[str], aiohttp.ClientSession]]:
+        """Yield a platform -> session lookup for one check run.
+
+        On the link-check engine loop this hands out its warm per-platform
+        sessions; anywhere else a private session is opened for the run.
+        """
+        engine = current_link_check_engine()
+        if engine is not None and float(timeout) == engine.timeout:
+            async with engine.run_scope() as session_for:
+                yield session_for
+            return
+        async with await self._create_session(timeout) as http_session:
+            yield lambda platform: http_session
+
     async def _prepare_target(
         self,
         original_url: str,
@@ -180,13 +201,13 @@ class LinkValidator:
             if cached_result is not None:
                 return self._clone_result_for_url(cached_result, url=normalized_url)
 
-            history_results = self._get_history_results([normalized_url])
+            history_results = await self._load_history_results([normalized_url])
             history_result = history_results.get(normalized_url)
             if history_result is not None:
                 return self._clone_result_for_url(history_result, url=normalized_url)
 
-        async with await self._create_session(float(timeout)) as http_session:
-            target = await self._prepare_target(url, http_session)
+        async with self._session_scope(float(timeout)) as session_for:
+            target = await self._prepare_target(url, session_for(UNKNOWN_PLATFORM))
             if not target.resolved_url:
                 checker = registry.get_checker(target.netdisk_type)
                 result = checker.format_error_result(
@@ -207,7 +228,7 @@ class LinkValidator:
                     netdisk_type=target.netdisk_type,
                 )
 
-            history_results = self._get_history_results(target_cache_keys)
+            history_results = await self._load_history_results(target_cache_keys)
             history_result = None
             for cache_key in target_cache_keys:
                 history_result = history_results.get(cache_key)
@@ -223,7 +244,7 @@ class LinkValidator:
                 )
 
             checker = registry.get_checker(target.netdisk_type)
-            result = await self._execute_with_retry(target, checker, http_session)
+            result = await self._execute_with_retry(target, checker, session_for(target.netdisk_type))
             self._store_result_in_cache(target, result)
             self.error_counts[target.netdisk_type] = (
                 0 if result.is_valid else self.error_counts.get(target.netdisk_type, 0) + 1
@@ -307,7 +328,8 @@ class LinkValidator:
             return []
 
         normalized_inputs = [normalize_candidate_url(url) or (url or "").strip() for url in urls]
-        async with await self._create_session(self.default_timeout) as http_session:
+        async with self._session_scope(self.default_timeout) as session_for:
+            http_session = session_for(UNKNOWN_PLATFORM)
             all_results: List[Optional[Dict]] = [None] * len(urls)
             checked = 0
             valid = 0
@@ -381,7 +403,7 @@ class LinkValidator:
                 else:
                     original_misses.append(input_url)
 
-            original_history_hits = self._get_history_results(original_misses)
+            original_history_hits = await self._load_history_results(original_misses)
             remaining_indices: List[int] = []
             for index, input_url in enumerate(normalized_inputs):
                 base_result = original_cache_hits.get(input_url) or original_history_hits.get(input_url)
@@ -439,7 +461,7 @@ class LinkValidator:
                     continue
                 history_lookup_keys.extend(target_cache_keys)
 
-            resolved_history_hits = self._get_history_results(history_lookup_keys)
+            resolved_history_hits = await self._load_history_results(history_lookup_keys)
             for group in grouped_targets.values():
                 if group.get("result") is not None:
                     continue
@@ -475,11 +497,12 @@ class LinkValidator:
                 checker = self.registry.get_checker(platform)
                 platform_limit = min(checker.get_concurrency_limit(), max(1, max_concurrent))
                 semaphore = asyncio.Semaphore(platform_limit)
+                platform_session = session_for(platform)
 
                 async def check_group(group: Dict[str, object]) -> Tuple[Dict[str, object], LinkCheckResult]:
                     async with semaphore:
                         target = group["target"]
-                        result = await self._execute_with_retry(target, checker, http_session)
+                        result = await self._execute_with_retry(target, checker, platform_session)
                         self._store_result_in_cache(target, result)
                         return group, result
 
@@ -26,6 +26,11 @@ from app.services.link_check_runtime import (
     start_or_reuse_task,
 )
 from app.services.link_cleanup_service import apply_link_check_cleanup
+from app.services.link_health_service import (
+    build_health_batch_selection,
+    refresh_link_click_heat,
+    seed_link_target_health,
+)
 from app.services.system_config_service import get_link_check_runtime_config
 
 
@@ -38,9 +43,11 @@ PLAN_OVERVIEW_CACHE_TTL_SECONDS = 300
 PLAN_OVERVIEW_REFRESH_LEASE_SECONDS = 180
 DEFAULT_BACKFILL_PLAN_NAME = "补库巡检"
 DEFAULT_FRONTIER_PLAN_NAME = "追新巡检"
+DEFAULT_HEALTH_PLAN_NAME = "健康巡检"
 PLAN_MODE_BACKFILL = "backfill"
 PLAN_MODE_FRONTIER = "frontier"
-ALLOWED_PLAN_MODES = {PLAN_MODE_BACKFILL, PLAN_MODE_FRONTIER}
+PLAN_MODE_HEALTH = "health"
+ALLOWED_PLAN_MODES = {PLAN_MODE_BACKFILL, PLAN_MODE_FRONTIER, PLAN_MODE_HEALTH}
 LEGACY_PLAN_MIGRATION_MARKER = "multi_plan_migrated"
 DEFAULT_FRONTIER_OVERLAP_MESSAGE_COUNT = 200
 
@@ -175,13 +182,15 @@ def _store_plan_overview_cache(
 
 
 def _default_plan_name(plan_mode: str) -> str:
+    if plan_mode == PLAN_MODE_HEALTH:
+        return DEFAULT_HEALTH_PLAN_NAME
     return DEFAULT_FRONTIER_PLAN_NAME if plan_mode == PLAN_MODE_FRONTIER else DEFAULT_BACKFILL_PLAN_NAME
 
 
 def _normalize_plan_mode(value: Any) -> str:
     normalized = str(value or PLAN_MODE_BACKFILL).strip().lower()
     if normalized not in ALLOWED_PLAN_MODES:
-        raise ValueError("plan_mode must be backfill or frontier")
+        raise ValueError("plan_mode must be backfill, frontier or health")
     return normalized
 
 
@@ -198,14 +207,14 @@ def _effective_plan_mode(plan: LinkCheckPlan) -> str:
 
 def _direction_for_plan_mode(plan_mode: str) -> str:
     normalized_mode = _normalize_plan_mode(plan_mode)
-    if normalized_mode == PLAN_MODE_FRONTIER:
+    if normalized_mode in {PLAN_MODE_FRONTIER, PLAN_MODE_HEALTH}:
         return TRAVERSAL_NEWEST_FIRST
     return TRAVERSAL_OLDEST_FIRST
 
 
 def _build_default_plan_values(plan_mode: str = PLAN_MODE_BACKFILL) -> dict[str, Any]:
     normalized_mode = _normalize_plan_mode(plan_mode)
-    is_frontier = normalized_mode == PLAN_MODE_FRONTIER
+    is_frontier = normalized_mode in {PLAN_MODE_FRONTIER, PLAN_MODE_HEALTH}
     return {
         "name": _default_plan_name(normalized_mode),
         "plan_mode": normalized_mode,
@@ -824,6 +833,28 @@ def _prepare_frontier_preview(
     )
 
 
+def _prepare_health_preview(
+    session: Session,
+    plan: LinkCheckPlan,
+    *,
+    task_link_limit: int,
+) -> dict[str, Any]:
+    if plan.cycle_started_at is None:
+        now = _utc_now()
+        seeded = seed_link_target_health(session, now=now)
+        refresh_link_click_heat(session, now=now)
+        if seeded:
+            logger.info("Seeded %s link targets into the health index", seeded)
+        plan.cycle_started_at = now
+        plan.cycle_completed_at = None
+
+    return build_health_batch_selection(
+        session,
+        batch_link_target=min(int(plan.batch_link_target or 0), task_link_limit),
+        task_link_limit=task_link_limit,
+    )
+
+
 def _prepare_plan_preview(
     session: Session,
     plan: LinkCheckPlan,
@@ -831,6 +862,8 @@ def _prepare_plan_preview(
     task_link_limit: int,
 ) -> tuple[str, dict[str, Any]]:
     plan_mode = _effective_plan_mode(plan)
+    if plan_mode == PLAN_MODE_HEALTH:
+        return plan_mode, _prepare_health_preview(session, plan, task_link_limit=task_link_limit)
     if plan_mode == PLAN_MODE_FRONTIER:
         return plan_mode, _prepare_frontier_preview(session, plan, task_link_limit=task_link_limit)
     return plan_mode, _prepare_backfill_preview(session, plan, task_link_limit=task_link_limit)
@@ -842,6 +875,14 @@ def _update_plan_after_completed_batch(
     preview: dict[str, Any],
     plan_mode: str,
 ) -> None:
+    if plan_mode == PLAN_MODE_HEALTH:
+        # Checked targets were rescheduled when their results were saved, so
+        # the next batch simply takes whatever is due next.
+        if not preview.get("has_more_messages"):
+            plan.cycle_completed_at = _utc_now()
+            _clear_plan_window(plan)
+        return
+
     if preview.get("has_more_messages") and preview.get("next_cursor_message_id") is not None:
         plan.cursor_message_id = int(preview["next_cursor_message_id"])
         if plan_mode == PLAN_MODE_BACKFILL:
@@ -13,12 +13,14 @@ from collections import Counter
 from copy import deepcopy
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from app.core.monitor_parser import normalize_url
 from app.models.models import LinkCheckDetails, LinkCheckPlan, LinkCheckStats, Message, engine
+from app.services.link_check.engine import run_on_link_check_engine
+from app.services.link_health_service import record_link_check_results
 from app.services.system_config_service import get_link_check_runtime_config
 
 logger = logging.getLogger(__name__)
@@ -473,6 +475,8 @@ def dispatch_task(task_id: str, task_payload: Any, max_concurrent: int) -> bool:
             return False
         _active_task_threads.add(task_id)
 
+    # The task body does blocking DB and status-file work, so it keeps its own
+    # thread and loop; only the HTTP checks go to the shared link-check engine.
     worker = threading.Thread(
         target=_run_task_thread,
         args=(task_id, task_payload, max_concurrent),
@@ -483,12 +487,16 @@ def dispatch_task(task_id: str, task_payload: Any, max_concurrent: int) -> bool:
     return True
 
 
+async def _run_task(task_id: str, task_payload: Any, max_concurrent: int) -> None:
+    if isinstance(task_payload, dict):
+        await run_link_check_payload_task(task_id, task_payload, max_concurrent)
+    else:
+        await run_link_check_task(task_id, task_payload, max_concurrent)
+
+
 def _run_task_thread(task_id: str, task_payload: Any, max_concurrent: int) -> None:
     try:
-        if isinstance(task_payload, dict):
-            asyncio.run(run_link_check_payload_task(task_id, task_payload, max_concurrent))
-        else:
-            asyncio.run(run_link_check_task(task_id, task_payload, max_concurrent))
+        asyncio.run(_run_task(task_id, task_payload, max_concurrent))
     finally:
         with _dispatch_lock:
             _active_task_threads.discard(task_id)
@@ -678,6 +686,53 @@ def _save_link_check_rows(
             )
         session.commit()
 
+    _record_link_health(link_records, results)
+
+
+def _record_link_health(link_records: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> None:
+    try:
+        with Session(engine) as session:
+            record_link_check_results(session, link_records, results)
+            session.commit()
+    except Exception:
+        logger.exception("Failed to update link health after link check")
+
+
+async def _check_links_on_engine(
+    validator: LinkValidator,
+    task_id: str,
+    urls: List[str],
+    *,
+    max_concurrent: int,
+    progress_callback: Callable[[int, int, int, int], Awaitable[None]],
+    result_callback: Callable[[Dict[str, Any]], Awaitable[None]],
+) -> List[Dict[str, Any]]:
+    """Run the HTTP checks on the link-check engine, callbacks on this task's loop.
+
+    The callbacks read and write the task status file; relaying them back
+    keeps that blocking work off the loop shared with every other run.
+    """
+    task_loop = asyncio.get_running_loop()
+
+    def on_task_loop(callback: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        async def relay(*args: Any) -> Any:
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(callback(*args), task_loop))
+
+        return relay
+
+    async def stop_requested() -> bool:
+        return should_stop_task(task_id)
+
+    return await run_on_link_check_engine(
+        validator.check_multiple_links_with_progress(
+            urls,
+            max_concurrent=max_concurrent,
+            progress_callback=on_task_loop(progress_callback),
+            result_callback=on_task_loop(result_callback),
+            should_stop=on_task_loop(stop_requested),
+        )
+    )
+
 
 async def run_link_check_payload_task(task_id: str, task_request: Dict[str, Any], max_concurrent: int) -> None:
     scope_label = str(task_request.get("scope_label") or task_request.get("period_desc") or "自定义检测")
@@ -818,12 +873,13 @@ async def run_link_check_payload_task(task_id: str, task_request: Dict[str, Any]
                 current_phase="checking_links",
             )
 
-        results = await validator.check_multiple_links_with_progress(
+        results = await _check_links_on_engine(
+            validator,
+            task_id,
             all_urls,
             max_concurrent=max_concurrent,
             progress_callback=progress_callback,
             result_callback=result_callback,
-            should_stop=lambda: should_stop_task(task_id),
         )
 
         if should_stop_task(task_id):
@@ -1061,12 +1117,13 @@ async def run_link_check_task(task_id: str, period_str: str, max_concurrent: int
                 )
             _update_task_status(task_id, append_log=append_log, **update_fields)
 
-        results = await validator.check_multiple_links_with_progress(
+        results = await _check_links_on_engine(
+            validator,
+            task_id,
             all_urls,
             max_concurrent=max_concurrent,
             progress_callback=progress_callback,
             result_callback=result_callback,
-            should_stop=lambda: should_stop_task(task_id),
         )
 
         if should_stop_task(task_id):
@@ -1122,6 +1179,8 @@ async def run_link_check_task(task_id: str, period_str: str, max_concurrent: int
                 session.add(detail)
             session.commit()
 
+        _record_link_health(link_records, results)
+
         _update_task_status(
             task_id,
             status="completed",
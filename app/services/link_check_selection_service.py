@@ -4,9 +4,11 @@ import math
 from datetime import date, datetime, timedelta
 from typing import Any
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.models.models import Message
+from app.services.message_link_columns import compute_message_link_columns
 
 SELECTION_MODE_TIME_RANGE = "time_range"
 SELECTION_MODE_SMART_COUNT = "smart_count"
@@ -163,21 +165,36 @@ def _empty_preview(
 
 
 def get_link_check_dataset_summary(session: Session) -> dict[str, Any]:
-    query = session.query(Message).filter(Message.links.isnot(None)).order_by(Message.id.asc())
-    total_messages = 0
-    total_links = 0
-    first_message_time: datetime | None = None
-    last_message_time: datetime | None = None
-
-    for message in query.yield_per(300):
-        urls = extract_urls_from_links(message.links)
-        if not urls:
+    total_messages, total_links, first_message_time, last_message_time = (
+        session.query(
+            func.count(Message.id),
+            func.coalesce(func.sum(Message.link_count), 0),
+            func.min(Message.timestamp),
+            func.max(Message.timestamp),
+        )
+        .filter(Message.link_count > 0)
+        .one()
+    )
+    total_messages = int(total_messages or 0)
+    total_links = int(total_links or 0)
+
+    # Rows the background backfill has not reached yet still need a scan.
+    pending_query = (
+        session.query(Message.timestamp, Message.links)
+        .filter(Message.link_count.is_(None), Message.links.isnot(None))
+        .order_by(Message.id.asc())
+    )
+    for timestamp, links in pending_query.yield_per(300):
+        link_count = compute_message_link_columns(links).link_count
+        if not link_count:
             continue
         total_messages += 1
-        total_links += len(urls)
-        if first_message_time is None:
-            first_message_time = message.timestamp
-        last_message_time = message.timestamp
+        total_links += link_count
+        if timestamp is not None:
+            if first_message_time is None or timestamp < first_message_time:
+                first_message_time = timestamp
+            if last_message_time is None or timestamp > last_message_time:
+                last_message_time = timestamp
 
     return {
         "total_messages_with_links": total_messages,
@@ -3,15 +3,19 @@ from __future__ import annotations
 import json
 import logging
 from datetime import date, datetime
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterable, Iterator, Tuple
 
+from sqlalchemy import bindparam, text, update
 from sqlalchemy.orm import Session
 
 from app.core.monitor_parser import normalize_url
 from app.models.models import LinkCheckDetails, LinkCheckStats, Message
 from app.services.channel_daily_stats_service import rebuild_channel_daily_stats_for_pairs
 from app.services.link_check.result import STATUS_INVALID
+from app.services.message_hourly_stats_service import floor_to_hour, rebuild_message_hourly_stats_for_hours
+from app.services.message_link_columns import compute_message_link_columns
 from app.services.resource_ops import delete_message_resource_data, ensure_message_link_refs_for_message_ids
+from app.services.response_cache_versions import bump_response_cache_version
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +26,7 @@ SUPPORTED_CLEANUP_MODES = {
     CLEANUP_MODE_DELETE_MESSAGE_IF_EMPTY,
 }
 _CLEANUP_ELIGIBLE_STATUSES = {STATUS_INVALID}
+CLEANUP_CHUNK_SIZE = 500
 
 
 def _normalize_status(status: str | None) -> str:
@@ -111,7 +116,7 @@ def _message_channel_stat_pair(message: Message) -> Tuple[date, str] | None:
     return timestamp.date(), channel_key
 
 
-def _is_cleanup_candidate(detail: LinkCheckDetails) -> bool:
+def _is_cleanup_candidate(detail: Any) -> bool:
     return (
         not bool(detail.is_valid)
         and detail.message_id is not None
@@ -120,31 +125,59 @@ def _is_cleanup_candidate(detail: LinkCheckDetails) -> bool:
     )
 
 
-def _has_invalid_streak(
+def _chunked(values: list[Any], size: int = CLEANUP_CHUNK_SIZE) -> Iterator[list[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _select_invalid_streak_urls(
     db: Session,
-    normalized_url: str,
+    normalized_urls: Iterable[str],
     *,
     min_consecutive_invalid_runs: int,
-) -> bool:
-    rows = (
-        db.query(LinkCheckDetails.check_time, LinkCheckDetails.is_valid, LinkCheckDetails.action_taken)
-        .filter(LinkCheckDetails.normalized_url == normalized_url)
-        .order_by(LinkCheckDetails.check_time.desc(), LinkCheckDetails.id.desc())
-        .all()
+) -> set[str]:
+    """Return the URLs whose latest ``min_consecutive_invalid_runs`` check runs were all invalid.
+
+    Within one run the newest detail row wins, matching how the history page
+    reads a run.
+    """
+    streak_urls: set[str] = set()
+    statement = text(
+        """
+        WITH per_run AS (
+            SELECT DISTINCT ON (normalized_url, check_time)
+                normalized_url, check_time, is_valid, action_taken
+            FROM link_check_details
+            WHERE normalized_url = ANY(:urls)
+            ORDER BY normalized_url, check_time DESC, id DESC
+        ),
+        ranked AS (
+            SELECT
+                normalized_url,
+                is_valid,
+                LOWER(TRIM(COALESCE(action_taken, ''))) AS action_taken,
+                ROW_NUMBER() OVER (PARTITION BY normalized_url ORDER BY check_time DESC) AS run_rank
+            FROM per_run
+        )
+        SELECT normalized_url
+        FROM ranked
+        WHERE run_rank <= :min_runs
+        GROUP BY normalized_url
+        HAVING COUNT(*) >= :min_runs
+           AND BOOL_AND(NOT is_valid AND action_taken = ANY(:statuses))
+        """
     )
-
-    seen_check_times: set[datetime] = set()
-    streak_count = 0
-    for check_time, is_valid, action_taken in rows:
-        if check_time in seen_check_times:
-            continue
-        seen_check_times.add(check_time)
-        if bool(is_valid) or _normalize_status(action_taken) not in _CLEANUP_ELIGIBLE_STATUSES:
-            return False
-        streak_count += 1
-        if streak_count >= min_consecutive_invalid_runs:
-            return True
-    return False
+    for chunk in _chunked(sorted(set(normalized_urls))):
+        rows = db.execute(
+            statement,
+            {
+                "urls": chunk,
+                "min_runs": int(min_consecutive_invalid_runs),
+                "statuses": sorted(_CLEANUP_ELIGIBLE_STATUSES),
+            },
+        )
+        streak_urls.update(str(row[0]) for row in rows)
+    return streak_urls
 
 
 def apply_link_check_cleanup(
@@ -167,27 +200,37 @@ def apply_link_check_cleanup(
         raise LookupError("链接检测记录不存在")
 
     invalid_details = (
-        db.query(LinkCheckDetails)
-        .filter(LinkCheckDetails.check_time == check_time)
+        db.query(
+            LinkCheckDetails.message_id,
+            LinkCheckDetails.url,
+            LinkCheckDetails.is_valid,
+            LinkCheckDetails.action_taken,
+        )
+        .filter(LinkCheckDetails.check_time == check_time, LinkCheckDetails.is_valid.is_(False))
         .all()
     )
 
-    message_invalid_urls: Dict[int, set[str]] = {}
-    cleanup_candidates = 0
+    candidate_pairs: list[tuple[int, str]] = []
     for detail in invalid_details:
         if not _is_cleanup_candidate(detail):
             continue
         normalized_url = _normalize_url_key(detail.url)
         if not normalized_url:
             continue
-        if int(min_consecutive_invalid_runs or 1) > 1 and not _has_invalid_streak(
+        candidate_pairs.append((int(detail.message_id), normalized_url))
+
+    if int(min_consecutive_invalid_runs or 1) > 1 and candidate_pairs:
+        streak_urls = _select_invalid_streak_urls(
             db,
-            normalized_url,
+            (normalized_url for _, normalized_url in candidate_pairs),
             min_consecutive_invalid_runs=int(min_consecutive_invalid_runs or 1),
-        ):
-            continue
-        message_invalid_urls.setdefault(int(detail.message_id), set()).add(normalized_url)
-        cleanup_candidates += 1
+        )
+        candidate_pairs = [pair for pair in candidate_pairs if pair[1] in streak_urls]
+
+    message_invalid_urls: Dict[int, set[str]] = {}
+    for message_id, normalized_url in candidate_pairs:
+        message_invalid_urls.setdefault(message_id, set()).add(normalized_url)
+    cleanup_candidates = len(candidate_pairs)
 
     if not message_invalid_urls:
         return {
@@ -195,7 +238,7 @@ def apply_link_check_cleanup(
             "check_time": check_time.isoformat(),
             "mode": normalized_mode,
             "dry_run": dry_run,
-            "total_invalid_details": sum(1 for detail in invalid_details if not bool(detail.is_valid)),
+            "total_invalid_details": len(invalid_details),
             "cleanup_candidates": 0,
             "matched_messages": 0,
             "updated_messages": 0,
@@ -204,13 +247,6 @@ def apply_link_check_cleanup(
             "skipped_messages": 0,
         }
 
-    messages = (
-        db.query(Message)
-        .filter(Message.id.in_(list(message_invalid_urls.keys())))
-        .all()
-    )
-    message_by_id = {message.id: message for message in messages}
-
     matched_messages = 0
     updated_messages = 0
     deleted_messages = 0
@@ -220,63 +256,94 @@ def apply_link_check_cleanup(
     try:
         updated_message_ids: list[int] = []
         deleted_message_ids: list[int] = []
-        messages_to_delete: list[Message] = []
         affected_pairs: set[tuple[date, str]] = set()
-        for message_id, invalid_urls in message_invalid_urls.items():
-            message = message_by_id.get(message_id)
-            if message is None:
-                skipped_messages += 1
-                continue
-
-            matched_messages += 1
-            original_links = _normalize_links_payload(message.links)
-            cleaned_links, message_removed_links = _prune_invalid_links(original_links, invalid_urls)
-            cleaned_links = None if _is_empty_container(cleaned_links) else cleaned_links
-            next_netdisk_types = _extract_netdisk_types(cleaned_links)
-            links_changed = cleaned_links != original_links
-            should_delete_message = (
-                normalized_mode == CLEANUP_MODE_DELETE_MESSAGE_IF_EMPTY
-                and not next_netdisk_types
+        affected_hours: set[datetime] = set()
+        message_ids = sorted(message_invalid_urls.keys())
+        for message_id_chunk in _chunked(message_ids):
+            rows = (
+                db.query(Message.id, Message.links, Message.timestamp, Message.monitor_channel_key)
+                .filter(Message.id.in_(message_id_chunk))
+                .all()
             )
-
-            if should_delete_message:
-                removed_links += message_removed_links
-                deleted_messages += 1
-                if not dry_run:
-                    stat_pair = _message_channel_stat_pair(message)
-                    if stat_pair is not None:
-                        affected_pairs.add(stat_pair)
+            skipped_messages += len(message_id_chunk) - len(rows)
+            update_payload: list[dict[str, Any]] = []
+            for message in rows:
+                matched_messages += 1
+                original_links = _normalize_links_payload(message.links)
+                cleaned_links, message_removed_links = _prune_invalid_links(
+                    original_links,
+                    message_invalid_urls[int(message.id)],
+                )
+                cleaned_links = None if _is_empty_container(cleaned_links) else cleaned_links
+                next_netdisk_types = _extract_netdisk_types(cleaned_links)
+                links_changed = cleaned_links != original_links
+                should_delete_message = (
+                    normalized_mode == CLEANUP_MODE_DELETE_MESSAGE_IF_EMPTY
+                    and not next_netdisk_types
+                )
+
+                if should_delete_message:
+                    removed_links += message_removed_links
+                    deleted_messages += 1
                     deleted_message_ids.append(int(message.id))
-                    messages_to_delete.append(message)
-                continue
-
-            if not links_changed:
-                skipped_messages += 1
-                continue
+                elif not links_changed:
+                    skipped_messages += 1
+                    continue
+                else:
+                    removed_links += message_removed_links
+                    updated_messages += 1
+                    updated_message_ids.append(int(message.id))
+                    link_columns = compute_message_link_columns(cleaned_links)
+                    update_payload.append(
+                        {
+                            "message_id": int(message.id),
+                            "links": cleaned_links,
+                            "netdisk_types": next_netdisk_types,
+                            "link_count": link_columns.link_count,
+                            "link_url_hashes": link_columns.link_url_hashes,
+                        }
+                    )
 
-            removed_links += message_removed_links
-            updated_messages += 1
-            if not dry_run:
-                message.links = cleaned_links
-                message.netdisk_types = next_netdisk_types
-                updated_message_ids.append(int(message.id))
                 stat_pair = _message_channel_stat_pair(message)
                 if stat_pair is not None:
                     affected_pairs.add(stat_pair)
+                if isinstance(message.timestamp, datetime):
+                    affected_hours.add(floor_to_hour(message.timestamp))
+
+            if update_payload and not dry_run:
+                # Core executemany: one round trip per chunk instead of an ORM flush per message.
+                db.execute(
+                    update(Message.__table__)
+                    .where(Message.__table__.c.id == bindparam("message_id"))
+                    .values(
+                        links=bindparam("links"),
+                        netdisk_types=bindparam("netdisk_types"),
+                        link_count=bindparam("link_count"),
+                        link_url_hashes=bindparam("link_url_hashes"),
+                    ),
+                    update_payload,
+                )
 
         if not dry_run:
-            if updated_message_ids:
-                ensure_message_link_refs_for_message_ids(db, updated_message_ids)
-            if deleted_message_ids:
-                delete_message_resource_data(db, deleted_message_ids)
-                for message in messages_to_delete:
-                    db.delete(message)
+            for chunk in _chunked(updated_message_ids):
+                ensure_message_link_refs_for_message_ids(db, chunk)
+            for chunk in _chunked(deleted_message_ids):
+                delete_message_resource_data(db, chunk)
+                db.query(Message).filter(Message.id.in_(chunk)).delete(synchronize_session=False)
             if affected_pairs:
                 try:
                     with db.begin_nested():
                         rebuild_channel_daily_stats_for_pairs(db, affected_pairs)
                 except Exception:
                     logger.exception("failed to rebuild channel daily stats during cleanup")
+            if affected_hours:
+                try:
+                    with db.begin_nested():
+                        rebuild_message_hourly_stats_for_hours(db, affected_hours)
+                except Exception:
+                    logger.exception("failed to rebuild hourly message stats during cleanup")
+            if updated_message_ids or deleted_message_ids:
+                bump_response_cache_version(db)
             stats.updated_messages = int(stats.updated_messages or 0) + updated_messages
             stats.deleted_messages = int(stats.deleted_messages or 0) + deleted_messages
             db.commit()
@@ -299,7 +366,7 @@ def apply_link_check_cleanup(
         "check_time": check_time.isoformat(),
         "mode": normalized_mode,
         "dry_run": dry_run,
-        "total_invalid_details": sum(1 for detail in invalid_details if not bool(detail.is_valid)),
+        "total_invalid_details": len(invalid_details),
         "cleanup_candidates": cleanup_candidates,
         "matched_messages": matched_messages,
         "updated_messages": updated_messages,
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.config import settings
+from app.models.models import LinkTarget, LinkTargetHealth
+from app.services.link_check.parser import canonical_target_key
+from app.services.link_check.result import (
+    STATUS_FORMAT_ERROR,
+    STATUS_INVALID,
+    STATUS_RATE_LIMITED,
+    STATUS_UNCERTAIN,
+    STATUS_UNSUPPORTED,
+    STATUS_VALID,
+)
+
+
+logger = logging.getLogger(__name__)
+
+HEALTH_SELECTION_MODE = "health"
+HEALTH_LOOKUP_CHUNK_SIZE = 500
+HEALTH_CLICK_WINDOW_DAYS = 14
+_RETRY_STATUSES = {STATUS_UNCERTAIN, STATUS_RATE_LIMITED}
+_PARKED_STATUSES = {STATUS_UNSUPPORTED, STATUS_FORMAT_ERROR}
+
+
+def _utc_now() -> datetime:
+    return datetime.utcnow()
+
+
+def _setting_hours(name: str, default: float) -> timedelta:
+    return timedelta(hours=max(0.0, float(getattr(settings, name, default) or default)))
+
+
+def _hash_normalized_url(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _chunked(values: Sequence[Any], size: int) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def compute_next_check_interval(
+    *,
+    status: str | None,
+    is_valid: bool | None,
+    failure_streak: int,
+    click_heat: float,
+    recovered: bool = False,
+) -> timedelta:
+    """Pick the delay until a link target is due again.
+
+    Valid links shrink from the base interval towards the hot interval as
+    their click heat approaches the hot threshold, and a link that just came
+    back from a failure is re-checked at the hot interval. Dead links back off
+    exponentially with their failure streak; inconclusive results retry soon.
+    """
+    valid_interval = _setting_hours("LINK_HEALTH_VALID_INTERVAL_HOURS", 72)
+    hot_interval = min(valid_interval, _setting_hours("LINK_HEALTH_HOT_INTERVAL_HOURS", 12))
+    max_interval = max(valid_interval, _setting_hours("LINK_HEALTH_MAX_INTERVAL_HOURS", 720))
+
+    if status in _RETRY_STATUSES:
+        return _setting_hours("LINK_HEALTH_UNCERTAIN_RETRY_HOURS", 6)
+    if status in _PARKED_STATUSES:
+        return max_interval
+    if status == STATUS_INVALID or not is_valid:
+        base = _setting_hours("LINK_HEALTH_INVALID_BASE_HOURS", 24)
+        exponent = min(max(0, int(failure_streak) - 1), 16)
+        return min(max_interval, base * (2**exponent))
+    if recovered:
+        return hot_interval
+
+    threshold = float(getattr(settings, "LINK_HEALTH_HOT_CLICK_THRESHOLD", 20) or 20)
+    ratio = min(1.0, max(0.0, float(click_heat or 0.0)) / threshold) if threshold > 0 else 1.0
+    return valid_interval - (valid_interval - hot_interval) * ratio
+
+
+def seed_link_target_health(session: Session, *, now: datetime | None = None) -> int:
+    """Create due-now health rows for link targets that have never been tracked."""
+    result = session.execute(
+        text(
+            """
+            INSERT INTO link_target_health (
+                link_target_id, failure_streak, check_count, click_heat, next_check_at, created_at, updated_at
+            )
+            SELECT t.id, 0, 0, 0, :now, :now, :now
+            FROM link_targets t
+            WHERE NOT EXISTS (
+                SELECT 1 FROM link_target_health h WHERE h.link_target_id = t.id
+            )
+            ON CONFLICT (link_target_id) DO NOTHING
+            """
+        ),
+        {"now": now or _utc_now()},
+    )
+    return int(result.rowcount or 0)
+
+
+def refresh_link_click_heat(session: Session, *, now: datetime | None = None) -> int:
+    """Recompute click heat from recent daily stats and pull hot links forward.
+
+    Heat is the click count of the last ``HEALTH_CLICK_WINDOW_DAYS`` days with
+    each day weighted by ``0.5 ** (age / half_life)``.
+    """
+    current = now or _utc_now()
+    today: date = current.date()
+    half_life = max(0.1, float(getattr(settings, "LINK_HEALTH_CLICK_HALF_LIFE_DAYS", 3) or 3))
+    result = session.execute(
+        text(
+            """
+            UPDATE link_target_health h
+            SET click_heat = src.heat, updated_at = :now
+            FROM (
+                SELECT h2.link_target_id,
+                       COALESCE(SUM(s.click_count * POWER(0.5, (:today - s.stat_date) / :half_life)), 0) AS heat
+                FROM link_target_health h2
+                LEFT JOIN link_target_daily_stats s
+                  ON s.link_target_id = h2.link_target_id AND s.stat_date >= :since
+                GROUP BY h2.link_target_id
+            ) src
+            WHERE src.link_target_id = h.link_target_id
+              AND h.click_heat IS DISTINCT FROM src.heat
+            """
+        ),
+        {
+            "now": current,
+            "today": today,
+            "since": today - timedelta(days=HEALTH_CLICK_WINDOW_DAYS),
+            "half_life": half_life,
+        },
+    )
+    hot_interval = _setting_hours("LINK_HEALTH_HOT_INTERVAL_HOURS", 12)
+    threshold = float(getattr(settings, "LINK_HEALTH_HOT_CLICK_THRESHOLD", 20) or 20)
+    session.execute(
+        text(
+            """
+            UPDATE link_target_health
+            SET next_check_at = last_checked_at + :hot_interval
+            WHERE click_heat >= :threshold
+              AND last_is_valid IS TRUE
+              AND last_checked_at IS NOT NULL
+              AND next_check_at > last_checked_at + :hot_interval
+            """
+        ),
+        {"hot_interval": hot_interval, "threshold": threshold},
+    )
+    return int(result.rowcount or 0)
+
+
+def record_link_check_results(
+    session: Session,
+    link_records: Sequence[dict[str, Any]],
+    results: Sequence[dict[str, Any]],
+    *,
+    checked_at: datetime | None = None,
+) -> int:
+    """Fold one task's results into the per-target health rows.
+
+    Results are matched to link targets by the canonical form of the URL that
+    was submitted for checking, so every message sharing a target benefits.
+    """
+    now = checked_at or _utc_now()
+    outcomes: dict[str, dict[str, Any]] = {}
+    for record, result in zip(link_records, results):
+        normalized_url = canonical_target_key(str(record.get("url") or ""))
+        if not normalized_url:
+            continue
+        outcomes[_hash_normalized_url(normalized_url)] = result
+
+    if not outcomes:
+        return 0
+
+    target_outcomes: dict[int, dict[str, Any]] = {}
+    for hashes in _chunked(list(outcomes), HEALTH_LOOKUP_CHUNK_SIZE):
+        rows = (
+            session.query(LinkTarget.id, LinkTarget.normalized_url_hash)
+            .filter(LinkTarget.normalized_url_hash.in_(hashes))
+            .all()
+        )
+        for target_id, url_hash in rows:
+            target_outcomes[int(target_id)] = outcomes[url_hash]
+
+    updated = 0
+    target_ids = list(target_outcomes)
+    for chunk in _chunked(target_ids, HEALTH_LOOKUP_CHUNK_SIZE):
+        existing = {
+            int(row.link_target_id): row
+            for row in session.query(LinkTargetHealth).filter(LinkTargetHealth.link_target_id.in_(chunk))
+        }
+        for target_id in chunk:
+            outcome = target_outcomes[target_id]
+            health = existing.get(target_id)
+            if health is None:
+                health = LinkTargetHealth(link_target_id=target_id, failure_streak=0, check_count=0, click_heat=0.0)
+                session.add(health)
+
+            status = str(outcome.get("status") or "").strip() or None
+            is_valid = bool(outcome.get("is_valid", False))
+            previous_streak = int(health.failure_streak or 0)
+            if status == STATUS_INVALID or (not is_valid and status not in _RETRY_STATUSES):
+                health.failure_streak = previous_streak + 1
+            elif status not in _RETRY_STATUSES:
+                health.failure_streak = 0
+
+            health.last_status = status
+            health.last_is_valid = is_valid
+            health.last_checked_at = now
+            if status == STATUS_VALID:
+                health.last_valid_at = now
+            health.check_count = int(health.check_count or 0) + 1
+            health.next_check_at = now + compute_next_check_interval(
+                status=status,
+                is_valid=is_valid,
+                failure_streak=int(health.failure_streak or 0),
+                click_heat=float(health.click_heat or 0.0),
+                recovered=previous_streak > 0 and status == STATUS_VALID,
+            )
+            health.updated_at = now
+            updated += 1
+        session.flush()
+    return updated
+
+
+def build_health_batch_selection(
+    session: Session,
+    *,
+    batch_link_target: int,
+    task_link_limit: int,
+    now: datetime | None = None,
+) -> dict[str, Any]:
+    """Select the most overdue link targets, hottest first among equals.
+
+    Each target is checked once through the URL of its newest message
+    reference. The returned dict has the same shape as a smart-count preview.
+    """
+    current = now or _utc_now()
+    limit = max(1, min(int(batch_link_target or 0), int(task_link_limit)))
+    rows = session.execute(
+        text(
+            """
+            SELECT h.link_target_id, ref.message_id, ref.target_url, ref.message_timestamp
+            FROM link_target_health h
+            JOIN LATERAL (
+                SELECT r.message_id, r.target_url, r.message_timestamp
+                FROM message_link_refs r
+                WHERE r.link_target_id = h.link_target_id
+                ORDER BY r.message_id DESC
+                LIMIT 1
+            ) ref ON TRUE
+            WHERE h.next_check_at <= :now
+            ORDER BY h.next_check_at ASC, h.click_heat DESC, h.link_target_id ASC
+            LIMIT :limit
+            """
+        ),
+        {"now": current, "limit": limit + 1},
+    ).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    message_ids: list[int] = []
+    seen_message_ids: set[int] = set()
+    link_records: list[dict[str, Any]] = []
+    timestamps: list[datetime] = []
+    for _, message_id, target_url, message_timestamp in rows:
+        url = str(target_url or "").strip()
+        if not url:
+            continue
+        link_records.append({"message_id": int(message_id), "url": url})
+        if int(message_id) not in seen_message_ids:
+            seen_message_ids.add(int(message_id))
+            message_ids.append(int(message_id))
+        if message_timestamp is not None:
+            timestamps.append(message_timestamp)
+
+    estimated_links = len(link_records)
+    first_message_time = min(timestamps) if timestamps else None
+    last_message_time = max(timestamps) if timestamps else None
+    return {
+        "selection_mode": HEALTH_SELECTION_MODE,
+        "direction": None,
+        "scope_label": f"健康巡检 · 到期链接 {estimated_links}",
+        "estimated_messages": len(message_ids),
+        "estimated_links": estimated_links,
+        "range_start": None,
+        "range_end": None,
+        "first_message_time": first_message_time.isoformat() if first_message_time else None,
+        "last_message_time": last_message_time.isoformat() if last_message_time else None,
+        "requested_target_link_count": limit,
+        "effective_target_link_count": estimated_links,
+        "task_link_limit": task_link_limit,
+        "recommended_batch_count": 1 if estimated_links else 0,
+        "recommended_target_link_count": limit,
+        "can_start": estimated_links > 0,
+        "exceeds_task_limit": False,
+        "warnings": [] if estimated_links else ["当前没有到期需要巡检的链接。"],
+        "message_ids": message_ids,
+        "link_records": link_records,
+        "next_cursor_message_id": None,
+        "has_more_messages": has_more,
+    }
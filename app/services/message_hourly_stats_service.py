@@ -0,0 +1,412 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.models import (
+    Message,
+    MessageHourlyNetdiskStat,
+    MessageHourlyStat,
+    MessageHourlyTagStat,
+    SystemSettings,
+    engine,
+    ensure_runtime_storage_tables,
+)
+from app.services.system_config_service import (
+    SYSTEM_SETTINGS_SINGLETON_ID,
+    build_default_system_settings_values,
+)
+
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_HOURLY_REBUILD_CHUNK_DAYS = 31
+MESSAGE_HOURLY_TAG_MAX_LENGTH = 255
+MESSAGE_HOURLY_NETDISK_MAX_LENGTH = 64
+MESSAGE_HOURLY_BACKFILL_LOCK_KEY = 42025099
+MESSAGE_HOURLY_BACKFILL_EXTRA_KEY = "message_hourly_backfill"
+
+_initial_backfill_lock = threading.RLock()
+_initial_backfill_completed = False
+
+
+def floor_to_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _normalize_positive_ids(values: Iterable[int]) -> list[int]:
+    normalized: list[int] = []
+    seen: set[int] = set()
+    for raw_value in values:
+        try:
+            value = int(raw_value)
+        except (TypeError, ValueError):
+            continue
+        if value <= 0 or value in seen:
+            continue
+        seen.add(value)
+        normalized.append(value)
+    return normalized
+
+
+def _iter_netdisk_names(netdisk_types: Any) -> Iterable[str]:
+    if not isinstance(netdisk_types, list):
+        return
+    for item in netdisk_types:
+        if isinstance(item, str):
+            yield item[:MESSAGE_HOURLY_NETDISK_MAX_LENGTH]
+
+
+def _iter_tags(tags: Any) -> Iterable[str]:
+    if not isinstance(tags, list):
+        return
+    for tag in tags:
+        if isinstance(tag, str):
+            yield tag[:MESSAGE_HOURLY_TAG_MAX_LENGTH]
+
+
+def _collapse_messages(
+    messages: Iterable[Message],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    hourly: dict[datetime, dict[str, Any]] = {}
+    netdisk: dict[tuple[datetime, str], dict[str, Any]] = {}
+    tags: dict[tuple[datetime, str], dict[str, Any]] = {}
+    for message in messages:
+        timestamp = getattr(message, "timestamp", None)
+        if not isinstance(timestamp, datetime):
+            continue
+        stat_hour = floor_to_hour(timestamp)
+
+        row = hourly.setdefault(stat_hour, {"stat_hour": stat_hour, "message_count": 0, "link_count": 0})
+        row["message_count"] += 1
+        row["link_count"] += int(getattr(message, "link_count", None) or 0)
+
+        for netdisk_name in _iter_netdisk_names(getattr(message, "netdisk_types", None)):
+            netdisk_row = netdisk.setdefault(
+                (stat_hour, netdisk_name),
+                {"stat_hour": stat_hour, "netdisk_name": netdisk_name, "link_count": 0},
+            )
+            netdisk_row["link_count"] += 1
+
+        # unnest(tags) counts a repeated tag once per occurrence, so do the same here.
+        for tag in _iter_tags(getattr(message, "tags", None)):
+            tag_row = tags.setdefault((stat_hour, tag), {"stat_hour": stat_hour, "tag": tag, "message_count": 0})
+            tag_row["message_count"] += 1
+
+    return list(hourly.values()), list(netdisk.values()), list(tags.values())
+
+
+def _upsert_accumulate_rows(
+    session: Session,
+    hourly_rows: list[dict[str, Any]],
+    netdisk_rows: list[dict[str, Any]],
+    tag_rows: list[dict[str, Any]],
+) -> None:
+    if hourly_rows:
+        stmt = pg_insert(MessageHourlyStat.__table__).values(hourly_rows)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["stat_hour"],
+                set_={
+                    "message_count": MessageHourlyStat.message_count + stmt.excluded.message_count,
+                    "link_count": MessageHourlyStat.link_count + stmt.excluded.link_count,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+    if netdisk_rows:
+        stmt = pg_insert(MessageHourlyNetdiskStat.__table__).values(netdisk_rows)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["stat_hour", "netdisk_name"],
+                set_={
+                    "link_count": MessageHourlyNetdiskStat.link_count + stmt.excluded.link_count,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+    if tag_rows:
+        stmt = pg_insert(MessageHourlyTagStat.__table__).values(tag_rows)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["stat_hour", "tag"],
+                set_={
+                    "message_count": MessageHourlyTagStat.message_count + stmt.excluded.message_count,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+
+def accumulate_message_hourly_stats_for_message_ids(session: Session, message_ids: Iterable[int]) -> int:
+    ensure_runtime_storage_tables()
+
+    normalized_ids = _normalize_positive_ids(message_ids)
+    if not normalized_ids:
+        return 0
+
+    messages = session.query(Message).filter(Message.id.in_(normalized_ids)).all()
+    hourly_rows, netdisk_rows, tag_rows = _collapse_messages(messages)
+    _upsert_accumulate_rows(session, hourly_rows, netdisk_rows, tag_rows)
+    return len(hourly_rows)
+
+
+def collect_message_stat_hours(session: Session, message_ids: Iterable[int]) -> set[datetime]:
+    normalized_ids = _normalize_positive_ids(message_ids)
+    if not normalized_ids:
+        return set()
+    rows = (
+        session.query(func.date_trunc("hour", Message.timestamp))
+        .filter(Message.id.in_(normalized_ids), Message.timestamp.isnot(None))
+        .distinct()
+        .all()
+    )
+    return {row[0] for row in rows if isinstance(row[0], datetime)}
+
+
+def rebuild_message_hourly_stats_window(session: Session, *, start: datetime, end: datetime) -> int:
+    """Recompute every rollup bucket in ``[start, end)`` from the messages table."""
+    ensure_runtime_storage_tables()
+
+    start_hour = floor_to_hour(start)
+    end_hour = floor_to_hour(end)
+    if end_hour < end:
+        end_hour += timedelta(hours=1)
+    if end_hour <= start_hour:
+        return 0
+
+    # The rebuild reads messages through raw SQL, so pending ORM changes must land first.
+    session.flush()
+    params = {"start": start_hour, "end": end_hour}
+    for model in (MessageHourlyStat, MessageHourlyNetdiskStat, MessageHourlyTagStat):
+        (
+            session.query(model)
+            .filter(model.stat_hour >= start_hour, model.stat_hour < end_hour)
+            .delete(synchronize_session=False)
+        )
+
+    inserted = session.execute(
+        text(
+            """
+            INSERT INTO message_hourly_stats (stat_hour, message_count, link_count, created_at, updated_at)
+            SELECT date_trunc('hour', timestamp), COUNT(*), COALESCE(SUM(link_count), 0), NOW(), NOW()
+            FROM messages
+            WHERE timestamp >= :start AND timestamp < :end
+            GROUP BY 1
+            """
+        ),
+        params,
+    ).rowcount
+    session.execute(
+        text(
+            """
+            INSERT INTO message_hourly_netdisk_stats (stat_hour, netdisk_name, link_count, updated_at)
+            SELECT stat_hour, netdisk_name, COUNT(*), NOW()
+            FROM (
+                SELECT
+                    date_trunc('hour', m.timestamp) AS stat_hour,
+                    LEFT(item.value, :netdisk_max_length) AS netdisk_name
+                FROM messages m
+                CROSS JOIN LATERAL jsonb_array_elements_text(m.netdisk_types) AS item(value)
+                WHERE m.timestamp >= :start AND m.timestamp < :end
+                  AND jsonb_typeof(m.netdisk_types) = 'array'
+            ) t
+            GROUP BY stat_hour, netdisk_name
+            """
+        ),
+        {**params, "netdisk_max_length": MESSAGE_HOURLY_NETDISK_MAX_LENGTH},
+    )
+    session.execute(
+        text(
+            """
+            INSERT INTO message_hourly_tag_stats (stat_hour, tag, message_count, updated_at)
+            SELECT stat_hour, tag, COUNT(*), NOW()
+            FROM (
+                SELECT
+                    date_trunc('hour', m.timestamp) AS stat_hour,
+                    LEFT(item.value, :tag_max_length) AS tag
+                FROM messages m
+                CROSS JOIN LATERAL unnest(m.tags) AS item(value)
+                WHERE m.timestamp >= :start AND m.timestamp < :end
+                  AND item.value IS NOT NULL
+            ) t
+            GROUP BY stat_hour, tag
+            """
+        ),
+        {**params, "tag_max_length": MESSAGE_HOURLY_TAG_MAX_LENGTH},
+    )
+    return int(inserted or 0)
+
+
+def rebuild_message_hourly_stats_for_hours(session: Session, hours: Iterable[datetime]) -> int:
+    normalized_hours = sorted({floor_to_hour(hour) for hour in hours if isinstance(hour, datetime)})
+    if not normalized_hours:
+        return 0
+
+    # Merge adjacent buckets so a large dedup run rebuilds a few ranges, not one per hour.
+    rebuilt = 0
+    range_start = previous = normalized_hours[0]
+    for hour in normalized_hours[1:] + [None]:
+        if hour is not None and hour == previous + timedelta(hours=1):
+            previous = hour
+            continue
+        rebuilt += rebuild_message_hourly_stats_window(
+            session,
+            start=range_start,
+            end=previous + timedelta(hours=1),
+        )
+        if hour is not None:
+            range_start = previous = hour
+    return rebuilt
+
+
+def rebuild_message_hourly_stats(session: Session, *, days: int | None = None) -> int:
+    """Rebuild the rollups for the last ``days`` days, or for all history when ``days`` is None.
+
+    Works in month-sized windows and flushes between them so the delete and
+    re-insert never span the whole table at once.
+    """
+    end = floor_to_hour(datetime.now()) + timedelta(hours=1)
+    if days is not None:
+        start = floor_to_hour(end - timedelta(days=max(1, int(days))))
+    else:
+        first_timestamp = session.query(func.min(Message.timestamp)).scalar()
+        if first_timestamp is None:
+            return 0
+        start = floor_to_hour(first_timestamp)
+        latest_timestamp = session.query(func.max(Message.timestamp)).scalar()
+        if latest_timestamp is not None and latest_timestamp >= end:
+            end = floor_to_hour(latest_timestamp) + timedelta(hours=1)
+
+    rebuilt = 0
+    window_start = start
+    while window_start < end:
+        window_end = min(end, window_start + timedelta(days=MESSAGE_HOURLY_REBUILD_CHUNK_DAYS))
+        rebuilt += rebuild_message_hourly_stats_window(session, start=window_start, end=window_end)
+        session.flush()
+        window_start = window_end
+    return rebuilt
+
+
+def _parse_backfill_hour(value: Any) -> datetime | None:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _read_backfill_state(record: SystemSettings) -> dict[str, Any]:
+    payload = (record.extra_json or {}).get(MESSAGE_HOURLY_BACKFILL_EXTRA_KEY)
+    return dict(payload) if isinstance(payload, dict) else {}
+
+
+def _write_backfill_state(session: Session, state: dict[str, Any]) -> None:
+    # Re-read the row under lock right before writing so settings saved by
+    # the admin while a window was rebuilding are not overwritten.
+    record = session.get(
+        SystemSettings,
+        SYSTEM_SETTINGS_SINGLETON_ID,
+        with_for_update=True,
+        populate_existing=True,
+    )
+    extra_json = dict(record.extra_json or {})
+    extra_json[MESSAGE_HOURLY_BACKFILL_EXTRA_KEY] = state
+    record.extra_json = extra_json
+
+
+def _ensure_system_settings_record(session: Session) -> SystemSettings:
+    record = session.get(SystemSettings, SYSTEM_SETTINGS_SINGLETON_ID)
+    if record is not None:
+        return record
+    record = SystemSettings(id=SYSTEM_SETTINGS_SINGLETON_ID, **build_default_system_settings_values())
+    session.add(record)
+    session.flush()
+    return record
+
+
+def backfill_message_hourly_stats_history(session: Session) -> int:
+    """Rebuild every hour from the first run's cutoff back to the first message.
+
+    Progress lives in ``system_settings.extra_json`` rather than being read off
+    the rollup table: dedup, link cleanup and publish-record deletion rebuild
+    arbitrary old hours on their own, so the earliest rollup row says nothing
+    about how far the backfill got. Windows are rebuilt newest first and each
+    one commits together with the watermark, so an interrupted backfill resumes
+    where it stopped and a finished one is never repeated.
+    """
+    state = _read_backfill_state(_ensure_system_settings_record(session))
+    if state.get("completed_at"):
+        return 0
+
+    first_timestamp = session.query(func.min(Message.timestamp)).scalar()
+    window_end = _parse_backfill_hour(state.get("next_end_hour"))
+    if window_end is None:
+        # The first window also covers the current hour, which ingest only
+        # started accumulating part way through.
+        window_end = floor_to_hour(datetime.now()) + timedelta(hours=1)
+        latest_timestamp = session.query(func.max(Message.timestamp)).scalar()
+        if latest_timestamp is not None and latest_timestamp >= window_end:
+            window_end = floor_to_hour(latest_timestamp) + timedelta(hours=1)
+        state["cutoff_hour"] = window_end.isoformat()
+
+    rebuilt = 0
+    first_hour = floor_to_hour(first_timestamp) if first_timestamp is not None else window_end
+    while window_end > first_hour:
+        window_start = max(first_hour, window_end - timedelta(days=MESSAGE_HOURLY_REBUILD_CHUNK_DAYS))
+        rebuilt += rebuild_message_hourly_stats_window(session, start=window_start, end=window_end)
+        state["next_end_hour"] = window_start.isoformat()
+        _write_backfill_state(session, state)
+        session.commit()
+        window_end = window_start
+
+    state["next_end_hour"] = window_end.isoformat()
+    state["completed_at"] = datetime.utcnow().isoformat()
+    _write_backfill_state(session, state)
+    session.commit()
+    return rebuilt
+
+
+def backfill_message_hourly_stats_once() -> bool:
+    global _initial_backfill_completed
+
+    if _initial_backfill_completed:
+        return False
+
+    with _initial_backfill_lock:
+        if _initial_backfill_completed:
+            return False
+        ensure_runtime_storage_tables()
+        with engine.connect() as connection:
+            # Session-level lock so only one process rebuilds history; the
+            # others retry on their next pass and find nothing left to do.
+            acquired = bool(
+                connection.execute(
+                    text("SELECT pg_try_advisory_lock(:lock_key)"),
+                    {"lock_key": MESSAGE_HOURLY_BACKFILL_LOCK_KEY},
+                ).scalar()
+            )
+            connection.commit()
+            if not acquired:
+                return False
+            try:
+                with Session(bind=connection) as session:
+                    rebuilt = backfill_message_hourly_stats_history(session)
+                if rebuilt:
+                    logger.info("Built %s hourly message rollup rows from history", rebuilt)
+            finally:
+                connection.rollback()
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(:lock_key)"),
+                    {"lock_key": MESSAGE_HOURLY_BACKFILL_LOCK_KEY},
+                )
+                connection.commit()
+        _initial_backfill_completed = True
+        return True
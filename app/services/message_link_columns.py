@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from app.models.models import Message, engine
+from app.services.message_hourly_stats_service import backfill_message_hourly_stats_once
+from app.services.resource_ops.catalog import flatten_message_links
+
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_LINK_BACKFILL_BATCH_SIZE = 1000
+MESSAGE_LINK_BACKFILL_IDLE_SECONDS = 300
+
+_backfill_lock = threading.RLock()
+_backfill_stop_event = threading.Event()
+_backfill_thread: threading.Thread | None = None
+
+
+@dataclass(slots=True)
+class MessageLinkColumns:
+    link_count: int
+    link_url_hashes: list[str]
+
+
+def compute_message_link_columns(links: Any) -> MessageLinkColumns:
+    if not links:
+        return MessageLinkColumns(link_count=0, link_url_hashes=[])
+    try:
+        flattened = flatten_message_links(links)
+    except Exception:
+        logger.warning("Failed to flatten message links for derived columns", exc_info=True)
+        return MessageLinkColumns(link_count=0, link_url_hashes=[])
+
+    hashes: list[str] = []
+    seen: set[str] = set()
+    for item in flattened:
+        if item.normalized_url_hash in seen:
+            continue
+        seen.add(item.normalized_url_hash)
+        hashes.append(item.normalized_url_hash)
+    return MessageLinkColumns(link_count=len(flattened), link_url_hashes=hashes)
+
+
+def apply_message_link_columns(message: Message) -> None:
+    columns = compute_message_link_columns(message.links)
+    message.link_count = columns.link_count
+    message.link_url_hashes = columns.link_url_hashes
+
+
+def backfill_message_link_columns_batch(
+    session: Session,
+    *,
+    batch_size: int = MESSAGE_LINK_BACKFILL_BATCH_SIZE,
+    after_id: int = 0,
+) -> tuple[int, int | None]:
+    rows = (
+        session.query(Message.id, Message.links)
+        .filter(Message.link_count.is_(None), Message.id > int(after_id))
+        .order_by(Message.id.asc())
+        .limit(max(1, int(batch_size)))
+        .all()
+    )
+    if not rows:
+        return 0, None
+
+    payload: list[dict[str, Any]] = []
+    for message_id, links in rows:
+        columns = compute_message_link_columns(links)
+        payload.append(
+            {
+                "message_id": int(message_id),
+                "link_count": columns.link_count,
+                "link_url_hashes": columns.link_url_hashes,
+            }
+        )
+    # Core executemany keeps the batch out of the ORM flush and its listeners.
+    session.connection().execute(
+        update(Message.__table__)
+        .where(Message.__table__.c.id == bindparam("message_id"))
+        .values(link_count=bindparam("link_count"), link_url_hashes=bindparam("link_url_hashes")),
+        payload,
+    )
+    return len(payload), int(rows[-1][0])
+
+
+def backfill_message_link_columns(
+    *,
+    batch_size: int = MESSAGE_LINK_BACKFILL_BATCH_SIZE,
+    max_batches: int | None = None,
+    stop_event: threading.Event | None = None,
+) -> int:
+    """Fill ``link_count``/``link_url_hashes`` for rows written before the columns existed.
+
+    Walks pending rows in id order and commits after every chunk, so it can be
+    interrupted and resumed without redoing finished work.
+    """
+    total = 0
+    batches = 0
+    after_id = 0
+    while stop_event is None or not stop_event.is_set():
+        with Session(engine) as session:
+            updated, last_id = backfill_message_link_columns_batch(session, batch_size=batch_size, after_id=after_id)
+            session.commit()
+        if not updated or last_id is None:
+            break
+        total += updated
+        after_id = last_id
+        batches += 1
+        if max_batches is not None and batches >= max_batches:
+            break
+    return total
+
+
+def run_message_link_backfill(*, stop_event: threading.Event | None = None) -> int:
+    """One pass of derived link maintenance: fill missing columns, then build rollup history once."""
+    updated = backfill_message_link_columns(stop_event=stop_event)
+    if updated:
+        logger.info("Backfilled derived link columns for %s messages", updated)
+    # Rollups sum link_count, so the first build waits for the column backfill.
+    if stop_event is None or not stop_event.is_set():
+        backfill_message_hourly_stats_once()
+    return updated
+
+
+def _backfill_loop() -> None:
+    while not _backfill_stop_event.is_set():
+        try:
+            run_message_link_backfill(stop_event=_backfill_stop_event)
+        except Exception:
+            logger.exception("Message link column backfill failed")
+        _backfill_stop_event.wait(MESSAGE_LINK_BACKFILL_IDLE_SECONDS)
+
+
+def start_message_link_backfill() -> None:
+    """Embedded fallback for API-only deployments; workers run this as a leader job."""
+    global _backfill_thread
+    with _backfill_lock:
+        if _backfill_thread is not None and _backfill_thread.is_alive():
+            return
+        _backfill_stop_event.clear()
+        _backfill_thread = threading.Thread(
+            target=_backfill_loop,
+            daemon=True,
+            name="message-link-backfill",
+        )
+        _backfill_thread.start()
+
+
+def stop_message_link_backfill() -> None:
+    global _backfill_thread
+    with _backfill_lock:
+        _backfill_stop_event.set()
+        thread = _backfill_thread
+        _backfill_thread = None
+
+    if thread is not None and thread.is_alive():
+        thread.join(timeout=1.0)
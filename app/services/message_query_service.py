@@ -11,7 +11,8 @@ from sqlalchemy import and_, case, func, literal, or_
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text as sql_text
 
-from app.models.models import Message
+from app.models.models import Message, MessageHourlyTagStat
+from app.services.message_hourly_stats_service import floor_to_hour
 
 
 logger = logging.getLogger(__name__)
@@ -179,38 +180,14 @@ def get_tag_stats(
     since: Optional[datetime] = None,
 ) -> List[Tuple[str, int]]:
     try:
-        if since is None:
-            result = db.execute(
-                sql_text(
-                    """
-                    SELECT unnest(tags) as tag, COUNT(*) as count
-                    FROM messages
-                    WHERE tags IS NOT NULL AND array_length(tags, 1) > 0
-                    GROUP BY tag
-                    ORDER BY count DESC
-                    LIMIT :limit
-                    """
-                ),
-                {"limit": limit},
-            ).all()
-        else:
-            result = db.execute(
-                sql_text(
-                    """
-                    SELECT unnest(tags) as tag, COUNT(*) as count
-                    FROM messages
-                    WHERE tags IS NOT NULL
-                      AND array_length(tags, 1) > 0
-                      AND timestamp >= :since
-                    GROUP BY tag
-                    ORDER BY count DESC
-                    LIMIT :limit
-                    """
-                ),
-                {"limit": limit, "since": since},
-            ).all()
-
-        return [(tag, count) for tag, count in result]
+        # Read the hourly rollup instead of unnesting tags across all messages.
+        tag_total = func.sum(MessageHourlyTagStat.message_count)
+        query = db.query(MessageHourlyTagStat.tag, tag_total)
+        if since is not None:
+            query = query.filter(MessageHourlyTagStat.stat_hour >= floor_to_hour(since))
+        result = query.group_by(MessageHourlyTagStat.tag).order_by(tag_total.desc()).limit(limit).all()
+
+        return [(tag, int(count or 0)) for tag, count in result]
     except Exception as exc:
         logger.error("Failed to load tag stats: %s", exc, exc_info=True)
         return []
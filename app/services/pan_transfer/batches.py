@@ -9,10 +9,12 @@ from app.models.models import (
     PanTransferAccount,
     PanTransferBatch,
     PanTransferBatchItem,
+    PanTransferBatchStatusCount,
     PanTransferExecutionLog,
     PanTransferReplacementLog,
     ensure_runtime_storage_tables,
 )
+from app.services.worker_notifications import WORKER_QUEUE_TRANSFER, notify_worker_queue
 
 from .accounts import get_recommended_accounts_by_platform
 from .common import dedupe_ints, normalize_batch_path_strategy, normalize_positive_int, resolve_batch_item_storage_plan, utcnow
@@ -329,7 +331,9 @@ def create_manual_pan_transfer_batch(
         session.add(row)
     session.flush()
 
-    refresh_pan_transfer_batch_summary(session, batch_id=int(batch.id))
+    refresh_pan_transfer_batch_summary(session, batch_id=int(batch.id), recount=True)
+    if start_immediately:
+        notify_worker_queue(session, WORKER_QUEUE_TRANSFER)
     return get_pan_transfer_batch_detail(session, batch_id=int(batch.id))
 
 
@@ -469,6 +473,7 @@ def start_pan_transfer_batch(session: Session, *, batch_id: int) -> dict[str, An
     session.add(batch)
     session.flush()
     refresh_pan_transfer_batch_summary(session, batch_id=int(batch_id))
+    notify_worker_queue(session, WORKER_QUEUE_TRANSFER)
     return get_pan_transfer_batch_detail(session, batch_id=int(batch_id))
 
 
@@ -490,6 +495,7 @@ def retry_pan_transfer_batch(
     session.add(batch)
     session.flush()
     refresh_pan_transfer_batch_summary(session, batch_id=int(batch_id))
+    notify_worker_queue(session, WORKER_QUEUE_TRANSFER)
     return get_pan_transfer_batch_detail(session, batch_id=int(batch_id))
 
 
@@ -559,7 +565,7 @@ def cancel_pan_transfer_batch(
     }
     session.add(batch)
     session.flush()
-    refresh_pan_transfer_batch_summary(session, batch_id=int(batch_id))
+    refresh_pan_transfer_batch_summary(session, batch_id=int(batch_id), recount=True)
     return get_pan_transfer_batch_detail(session, batch_id=int(batch_id))
 
 
@@ -607,6 +613,11 @@ def delete_pan_transfer_batch(session: Session, *, batch_id: int) -> dict[str, A
             .filter(PanTransferBatchItem.id.in_(item_ids))
             .delete(synchronize_session=False)
         )
+    (
+        session.query(PanTransferBatchStatusCount)
+        .filter(PanTransferBatchStatusCount.batch_id == int(batch_id))
+        .delete(synchronize_session=False)
+    )
     session.delete(batch)
     session.flush()
     return {
@@ -10,6 +10,9 @@ import aiohttp
 
 from app.services.link_check.constants import PLATFORM_BAIDU, PLATFORM_QUARK
 from app.services.link_check.parser import detect_platform_from_url, normalize_candidate_url
+from app.services.link_check.rate_limiter import acquire_netdisk_token
+
+from .providers.share_cache import share_listing_cache
 
 
 _QUARK_HEADERS = {
@@ -89,6 +92,7 @@ async def _request_json(
     headers: dict[str, str] | None = None,
     cookies: dict[str, str] | None = None,
 ) -> tuple[int, dict[str, Any]]:
+    await acquire_netdisk_token(detect_platform_from_url(url), host=urlparse(url).netloc or None)
     async with session.request(
         method,
         url,
@@ -145,19 +149,22 @@ def _extract_quark_share_id(url: str) -> tuple[str, str | None, str, str | None]
     raise ValueError("无法解析夸克分享链接")
 
 
-async def _preview_quark_directory(
-    url: str,
-    *,
-    entry_id: str | None = None,
-    entry_name: str | None = None,
-) -> dict[str, Any]:
-    pwd_id, passcode, parsed_entry_id, parsed_entry_name = _extract_quark_share_id(url)
-    current_entry_id = _normalize_text(entry_id, max_length=255) or parsed_entry_id or "0"
-    current_entry_name = (
-        _normalize_text(entry_name, max_length=255)
-        or _normalize_text(parsed_entry_name, max_length=255)
-        or None
+def _build_quark_entry(row: dict[str, Any]) -> dict[str, Any]:
+    return _build_entry(
+        name=_normalize_text(row.get("file_name")) or "未命名项",
+        is_dir=bool(row.get("dir")),
+        size_bytes=_normalize_int(row.get("size")),
+        updated_at=_normalize_datetime(row.get("updated_at") or row.get("obj_update_time")),
+        entry_id=_normalize_text(row.get("fid")),
+        path=None,
     )
+
+
+async def _fetch_quark_preview_rows(
+    pwd_id: str,
+    passcode: str | None,
+    parent_id: str,
+) -> tuple[list[dict[str, Any]], int, bool]:
     async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30), headers=_QUARK_HEADERS) as session:
         status_code, token_payload = await _request_json(
             session,
@@ -174,10 +181,9 @@ async def _preview_quark_directory(
         if status_code != 200 or not stoken:
             raise ValueError(_normalize_text(token_payload.get("message")) or "夸克分享访问失败")
 
-        items: list[dict[str, Any]] = []
+        rows: list[dict[str, Any]] = []
         page = 1
         total_count = 0
-        truncated = False
         while True:
             detail_status, detail_payload = await _request_json(
                 session,
@@ -189,7 +195,7 @@ async def _preview_quark_directory(
                     "uc_param_str": "",
                     "pwd_id": pwd_id,
                     "stoken": stoken,
-                    "pdir_fid": current_entry_id,
+                    "pdir_fid": parent_id,
                     "force": "0",
                     "_page": str(page),
                     "_size": "50",
@@ -204,43 +210,64 @@ async def _preview_quark_directory(
             if detail_status != 200:
                 raise ValueError(_normalize_text(detail_payload.get("message")) or "夸克目录读取失败")
             detail_data = detail_payload.get("data") if isinstance(detail_payload.get("data"), dict) else {}
-            rows = detail_data.get("list") if isinstance(detail_data.get("list"), list) else []
+            page_rows = detail_data.get("list") if isinstance(detail_data.get("list"), list) else []
             metadata = detail_payload.get("metadata") if isinstance(detail_payload.get("metadata"), dict) else {}
-            total_count = max(total_count, _normalize_int(metadata.get("_total")) or 0, len(items) + len(rows))
-            for row in rows:
-                payload = dict(row or {})
-                items.append(
-                    _build_entry(
-                        name=_normalize_text(payload.get("file_name")) or "未命名项",
-                        is_dir=bool(payload.get("dir")),
-                        size_bytes=_normalize_int(payload.get("size")),
-                        updated_at=_normalize_datetime(payload.get("updated_at") or payload.get("obj_update_time")),
-                        entry_id=_normalize_text(payload.get("fid")),
-                        path=None,
-                    )
-                )
-                if len(items) >= _DIRECTORY_PREVIEW_LIMIT:
-                    truncated = True
-                    break
-            if truncated:
-                break
+            rows.extend(dict(row or {}) for row in page_rows)
+            total_count = max(total_count, _normalize_int(metadata.get("_total")) or 0, len(rows))
             page_size = _normalize_int(metadata.get("_size")) or 50
-            page_count = _normalize_int(metadata.get("_count")) or len(rows)
-            if page_count < page_size or len(rows) <= 0:
-                break
+            page_count = _normalize_int(metadata.get("_count")) or len(page_rows)
+            if page_count < page_size or len(page_rows) <= 0:
+                return rows, total_count, True
+            if len(rows) >= _DIRECTORY_PREVIEW_LIMIT:
+                return rows, total_count, False
             page += 1
-        return {
-            "url": url,
-            "platform": PLATFORM_QUARK,
-            "supported": True,
-            "item_count": max(total_count, len(items)),
-            "truncated": truncated or max(total_count, len(items)) > len(items),
-            "current_entry_id": None if current_entry_id == "0" else current_entry_id,
-            "current_path": None,
-            "current_name": current_entry_name,
-            "items": items,
-            "message": None if items else "目录为空",
-        }
+
+
+async def _preview_quark_directory(
+    url: str,
+    *,
+    entry_id: str | None = None,
+    entry_name: str | None = None,
+) -> dict[str, Any]:
+    pwd_id, passcode, parsed_entry_id, parsed_entry_name = _extract_quark_share_id(url)
+    current_entry_id = _normalize_text(entry_id, max_length=255) or parsed_entry_id or "0"
+    current_entry_name = (
+        _normalize_text(entry_name, max_length=255)
+        or _normalize_text(parsed_entry_name, max_length=255)
+        or None
+    )
+    # Same cache the transfer client fills, keyed the same way, so browsing a
+    # share and then transferring it lists each directory once.
+    rows = share_listing_cache.get(PLATFORM_QUARK, pwd_id, current_entry_id)
+    total_count = len(rows or [])
+    if rows is None:
+        rows, total_count, complete = await _fetch_quark_preview_rows(pwd_id, passcode, current_entry_id)
+        if complete:
+            share_listing_cache.store(
+                PLATFORM_QUARK,
+                pwd_id,
+                current_entry_id,
+                rows,
+                child_dirs=(
+                    (str(row.get("fid") or ""), row.get("updated_at"))
+                    for row in rows
+                    if bool(row.get("dir"))
+                ),
+            )
+    items = [_build_quark_entry(row) for row in rows[:_DIRECTORY_PREVIEW_LIMIT]]
+    item_count = max(total_count, len(rows))
+    return {
+        "url": url,
+        "platform": PLATFORM_QUARK,
+        "supported": True,
+        "item_count": item_count,
+        "truncated": item_count > len(items),
+        "current_entry_id": None if current_entry_id == "0" else current_entry_id,
+        "current_path": None,
+        "current_name": current_entry_name,
+        "items": items,
+        "message": None if items else "目录为空",
+    }
 
 
 def _extract_baidu_share_key(url: str) -> tuple[str, bool, str | None]:
@@ -256,18 +283,16 @@ def _extract_baidu_share_key(url: str) -> tuple[str, bool, str | None]:
     raise ValueError("无法解析百度分享链接")
 
 
-async def _preview_baidu_directory(
+async def _fetch_baidu_preview_rows(
     url: str,
     *,
-    entry_path: str | None = None,
-    entry_name: str | None = None,
-) -> dict[str, Any]:
-    share_key, requires_prefix_strip, passcode = _extract_baidu_share_key(url)
-    short_url = share_key[1:] if requires_prefix_strip and share_key.startswith("1") and len(share_key) > 1 else share_key
+    short_url: str,
+    passcode: str | None,
+    entry_path: str | None,
+) -> list[dict[str, Any]]:
     cookies: dict[str, str] | None = None
     referer_headers = dict(_BAIDU_HEADERS)
     referer_headers["Referer"] = url
-    normalized_entry_path = _normalize_text(entry_path, max_length=1024) or None
     async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30), headers=referer_headers) as session:
         if passcode:
             verify_status, verify_payload = await _request_json(
@@ -296,11 +321,11 @@ async def _preview_baidu_directory(
                 "desc": "1",
                 "showempty": "0",
                 "page": "1",
-                "num": "200",
+                "num": str(_DIRECTORY_PREVIEW_LIMIT),
                 "order": "time",
                 "shorturl": short_url,
-                "root": "0" if normalized_entry_path else "1",
-                "dir": normalized_entry_path or "",
+                "root": "0" if entry_path else "1",
+                "dir": entry_path or "",
                 "view_mode": "1",
                 "channel": "chunlei",
                 "clienttype": "0",
@@ -315,29 +340,62 @@ async def _preview_baidu_directory(
                 or "百度目录读取失败"
             )
         rows = list_payload.get("list") if isinstance(list_payload.get("list"), list) else []
-        items = [
-            _build_entry(
-                name=_normalize_text(row.get("server_filename")) or "未命名项",
-                is_dir=int(row.get("isdir") or 0) == 1,
-                size_bytes=_normalize_int(row.get("size")),
-                updated_at=_normalize_datetime(row.get("server_mtime")),
-                entry_id=_normalize_text(row.get("fs_id")),
-                path=_normalize_text(row.get("path")),
+        return [dict(row or {}) for row in rows]
+
+
+async def _preview_baidu_directory(
+    url: str,
+    *,
+    entry_path: str | None = None,
+    entry_name: str | None = None,
+) -> dict[str, Any]:
+    share_key, requires_prefix_strip, passcode = _extract_baidu_share_key(url)
+    short_url = share_key[1:] if requires_prefix_strip and share_key.startswith("1") and len(share_key) > 1 else share_key
+    normalized_entry_path = _normalize_text(entry_path, max_length=1024) or None
+    rows = share_listing_cache.get(PLATFORM_BAIDU, short_url, normalized_entry_path)
+    if rows is None:
+        rows = await _fetch_baidu_preview_rows(
+            url,
+            short_url=short_url,
+            passcode=passcode,
+            entry_path=normalized_entry_path,
+        )
+        # A full page may have more behind it; only complete listings are shared.
+        if len(rows) < _DIRECTORY_PREVIEW_LIMIT:
+            share_listing_cache.store(
+                PLATFORM_BAIDU,
+                short_url,
+                normalized_entry_path,
+                rows,
+                child_dirs=(
+                    (str(row.get("path") or ""), row.get("server_mtime"))
+                    for row in rows
+                    if int(row.get("isdir") or 0) == 1
+                ),
             )
-            for row in rows[:_DIRECTORY_PREVIEW_LIMIT]
-        ]
-        return {
-            "url": url,
-            "platform": PLATFORM_BAIDU,
-            "supported": True,
-            "item_count": len(rows),
-            "truncated": len(rows) > len(items),
-            "current_entry_id": None,
-            "current_path": normalized_entry_path,
-            "current_name": _normalize_text(entry_name, max_length=255) or None,
-            "items": items,
-            "message": None if items else "目录为空",
-        }
+    items = [
+        _build_entry(
+            name=_normalize_text(row.get("server_filename")) or "未命名项",
+            is_dir=int(row.get("isdir") or 0) == 1,
+            size_bytes=_normalize_int(row.get("size")),
+            updated_at=_normalize_datetime(row.get("server_mtime")),
+            entry_id=_normalize_text(row.get("fs_id")),
+            path=_normalize_text(row.get("path")),
+        )
+        for row in rows[:_DIRECTORY_PREVIEW_LIMIT]
+    ]
+    return {
+        "url": url,
+        "platform": PLATFORM_BAIDU,
+        "supported": True,
+        "item_count": len(rows),
+        "truncated": len(rows) > len(items),
+        "current_entry_id": None,
+        "current_path": normalized_entry_path,
+        "current_name": _normalize_text(entry_name, max_length=255) or None,
+        "items": items,
+        "message": None if items else "目录为空",
+    }
 
 
 async def preview_pan_transfer_link_directory(
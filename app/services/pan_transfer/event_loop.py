@@ -0,0 +1,58 @@
+"""Persistent per-thread event loops for the pan-transfer worker lanes."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import Any, Coroutine, TypeVar
+
+from .providers.session_pool import build_session_pool, register_session_pool, unregister_session_pool
+
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+_local = threading.local()
+
+
+def _get_worker_event_loop() -> asyncio.AbstractEventLoop:
+    loop: asyncio.AbstractEventLoop | None = getattr(_local, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        register_session_pool(loop, build_session_pool())
+        _local.loop = loop
+    return loop
+
+
+def run_worker_coroutine(coro: Coroutine[Any, Any, _T]) -> _T:
+    """Run ``coro`` on this thread's long-lived loop instead of ``asyncio.run``.
+
+    The coroutines still drive a synchronous SQLAlchemy session, so each lane
+    thread keeps its own loop; what survives between tasks is the loop and
+    its account session pool, not any shared state across threads.
+    """
+    loop = _get_worker_event_loop()
+    return loop.run_until_complete(coro)
+
+
+def close_worker_event_loop() -> None:
+    loop: asyncio.AbstractEventLoop | None = getattr(_local, "loop", None)
+    _local.loop = None
+    if loop is None or loop.is_closed():
+        return
+    pool = unregister_session_pool(loop)
+    try:
+        if pool is not None:
+            loop.run_until_complete(pool.close())
+        pending = [task for task in asyncio.all_tasks(loop) if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+    except Exception:
+        logger.exception("Failed to shut down worker event loop cleanly")
+    finally:
+        loop.close()
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import heapq
+import itertools
 import os
 import re
-from dataclasses import dataclass, field
+import time
+import weakref
+from collections import deque
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from sqlalchemy.orm import Session
 
+from app.models.config import settings
 from app.models.models import PanTransferAccount, PanTransferSyncTask, ensure_runtime_storage_tables
 from app.services.resource_identity import normalize_match_key, parse_resource_identity
 
@@ -157,6 +164,132 @@ class _FileEntry:
         return self.entry_id or self.path or f"{self.parent_path or ''}/{self.name}"
 
 
+@dataclass(slots=True)
+class _ScanTiming:
+    elapsed_ms: float = 0.0
+    fetch_ms: float = 0.0
+    limiter_wait_ms: float = 0.0
+    dirs_listed: int = 0
+    max_inflight: int = 0
+    stopped_early: bool = False
+
+
+class _AccountScanLimiter:
+    """Caps concurrent listings for one account and spaces out their start times."""
+
+    def __init__(self, *, concurrency: int, min_interval_seconds: float) -> None:
+        self.concurrency = max(1, int(concurrency))
+        self._min_interval_seconds = max(0.0, float(min_interval_seconds))
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._spacing_lock = asyncio.Lock()
+        self._next_start_at = 0.0
+
+    async def run(self, fetch: Callable[[], Awaitable[Any]], timing: _ScanTiming | None = None) -> Any:
+        waited_from = time.perf_counter()
+        async with self._semaphore:
+            async with self._spacing_lock:
+                loop = asyncio.get_running_loop()
+                delay = self._next_start_at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._next_start_at = loop.time() + self._min_interval_seconds
+            fetch_started = time.perf_counter()
+            if timing is not None:
+                timing.limiter_wait_ms += (fetch_started - waited_from) * 1000
+            try:
+                return await fetch()
+            finally:
+                if timing is not None:
+                    timing.fetch_ms += (time.perf_counter() - fetch_started) * 1000
+
+
+# asyncio primitives belong to one event loop, so limiters are kept per loop.
+_scan_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, _AccountScanLimiter]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _build_account_scan_limiter() -> _AccountScanLimiter:
+    return _AccountScanLimiter(
+        concurrency=int(getattr(settings, "PAN_TRANSFER_SCAN_CONCURRENCY", 4) or 1),
+        min_interval_seconds=float(getattr(settings, "PAN_TRANSFER_SCAN_MIN_INTERVAL_SECONDS", 0.15) or 0.0),
+    )
+
+
+def _get_account_scan_limiter(account_key: str | None) -> _AccountScanLimiter:
+    if not account_key:
+        return _build_account_scan_limiter()
+    loop_limiters = _scan_limiters.setdefault(asyncio.get_running_loop(), {})
+    limiter = loop_limiters.get(account_key)
+    if limiter is None:
+        limiter = loop_limiters[account_key] = _build_account_scan_limiter()
+    return limiter
+
+
+def _build_account_scan_key(account: PanTransferAccount) -> str:
+    return f"{_normalize_text(account.platform, max_length=64) or 'unknown'}:{int(account.id)}"
+
+
+def _directory_priority(directory: _DirectoryRef) -> Any:
+    # Newest directories first; negated offset keeps a min-heap usable.
+    return -((directory.updated_at or datetime.min) - datetime.min)
+
+
+async def _scan_directory_frontier(
+    root: _DirectoryRef,
+    *,
+    fetch: Callable[[_DirectoryRef], Awaitable[list[dict[str, Any]]]],
+    expand: Callable[[_DirectoryRef, list[dict[str, Any]]], list[_DirectoryRef]],
+    max_scan_dirs: int,
+    is_satisfied: Callable[[], bool],
+    limiter: _AccountScanLimiter,
+    timing: _ScanTiming | None = None,
+) -> int:
+    """Best-first walk of a directory tree with several listings in flight.
+
+    The frontier is a heap ordered by ``updated_at`` (ties keep discovery
+    order). Listings are started in priority order and expanded in the same
+    order, so file ``scan_order`` stays deterministic; once ``is_satisfied``
+    reports enough files, outstanding listings are cancelled.
+    """
+    started_at = time.perf_counter()
+    sequence = itertools.count()
+    frontier: list[tuple[Any, int, _DirectoryRef]] = []
+    heapq.heappush(frontier, (_directory_priority(root), next(sequence), root))
+    inflight: deque[tuple[_DirectoryRef, asyncio.Task]] = deque()
+    started_count = 0
+    visited_dir_count = 0
+    try:
+        while frontier or inflight:
+            while frontier and len(inflight) < limiter.concurrency and started_count < max_scan_dirs and not is_satisfied():
+                _, _, directory = heapq.heappop(frontier)
+                task = asyncio.ensure_future(limiter.run(lambda directory=directory: fetch(directory), timing))
+                inflight.append((directory, task))
+                started_count += 1
+                if timing is not None:
+                    timing.max_inflight = max(timing.max_inflight, len(inflight))
+            if not inflight:
+                break
+            directory, task = inflight.popleft()
+            rows = await task
+            visited_dir_count += 1
+            for child in expand(directory, rows):
+                heapq.heappush(frontier, (_directory_priority(child), next(sequence), child))
+            if is_satisfied():
+                break
+    finally:
+        pending = [task for _, task in inflight]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if timing is not None:
+            timing.elapsed_ms = (time.perf_counter() - started_at) * 1000
+            timing.dirs_listed = visited_dir_count
+            timing.stopped_early = bool(pending or frontier) and is_satisfied()
+    return visited_dir_count
+
+
 @dataclass(slots=True)
 class _DiagnosisStats:
     source_dir_count: int = 0
@@ -172,6 +305,8 @@ class _DiagnosisStats:
     expansions_used: int = 0
     warnings: list[str] = field(default_factory=list)
     stop_reason: str = ""
+    source_scan_timing: _ScanTiming = field(default_factory=_ScanTiming)
+    target_scan_timing: _ScanTiming = field(default_factory=_ScanTiming)
 
 
 def _normalize_path_parts(value: str | None) -> list[str]:
@@ -540,6 +675,8 @@ async def infer_follow_task_target_relative_path(
             fixed_save_path=task.fixed_save_path,
             max_scan_dirs=_DEFAULT_MAX_SCAN_DIRS,
             max_scan_files=_DEFAULT_MAX_SCAN_FILES,
+            account_key=_build_account_scan_key(account),
+            timing=stats.target_scan_timing,
         )
     elif platform == PLATFORM_BAIDU:
         target_entries, stats.target_dir_count = await _scan_baidu_target_entries(
@@ -547,6 +684,8 @@ async def infer_follow_task_target_relative_path(
             fixed_save_path=task.fixed_save_path,
             max_scan_dirs=_DEFAULT_MAX_SCAN_DIRS,
             max_scan_files=_DEFAULT_MAX_SCAN_FILES,
+            account_key=_build_account_scan_key(account),
+            timing=stats.target_scan_timing,
         )
     else:
         raise ValueError(f"unsupported follow diagnosis platform: {task.platform}")
@@ -736,20 +875,21 @@ async def _scan_quark_source_entries(
     source_url: str,
     max_scan_dirs: int,
     max_scan_files: int,
+    account_key: str | None = None,
+    timing: _ScanTiming | None = None,
 ) -> tuple[list[_FileEntry], int]:
     async with _QuarkClient(credential_value) as client:
         pwd_id = _extract_pwd_id(source_url)
         stoken = await client.get_stoken(pwd_id=pwd_id, passcode=_extract_passcode(source_url))
-        queue: list[_DirectoryRef] = [
-            _DirectoryRef(entry_id="0", path=None, name=None, relative_path=None, updated_at=None, depth=0)
-        ]
+        root = _DirectoryRef(entry_id="0", path=None, name=None, relative_path=None, updated_at=None, depth=0)
         results: list[_FileEntry] = []
-        visited_dir_count = 0
         scan_order = 0
-        while queue and visited_dir_count < max_scan_dirs and len(results) < max_scan_files:
-            current = queue.pop(0)
-            rows = await client.get_share_detail(pwd_id=pwd_id, stoken=stoken, parent_id=str(current.entry_id or "0"))
-            visited_dir_count += 1
+
+        async def fetch(current: _DirectoryRef) -> list[dict[str, Any]]:
+            return await client.get_share_detail(pwd_id=pwd_id, stoken=stoken, parent_id=str(current.entry_id or "0"))
+
+        def expand(current: _DirectoryRef, rows: list[dict[str, Any]]) -> list[_DirectoryRef]:
+            nonlocal scan_order
             normalized_dirs: list[_DirectoryRef] = []
             for row in rows:
                 name = _normalize_text(row.get("file_name"), max_length=255)
@@ -790,8 +930,17 @@ async def _scan_quark_source_entries(
                 )
                 if len(results) >= max_scan_files:
                     break
-            normalized_dirs.sort(key=lambda item: item.updated_at or datetime.min, reverse=True)
-            queue = sorted([*queue, *normalized_dirs], key=lambda item: item.updated_at or datetime.min, reverse=True)
+            return normalized_dirs
+
+        visited_dir_count = await _scan_directory_frontier(
+            root,
+            fetch=fetch,
+            expand=expand,
+            max_scan_dirs=max_scan_dirs,
+            is_satisfied=lambda: len(results) >= max_scan_files,
+            limiter=_get_account_scan_limiter(account_key),
+            timing=timing,
+        )
     return results, visited_dir_count
 
 
@@ -801,6 +950,8 @@ async def _scan_quark_target_entries(
     fixed_save_path: str,
     max_scan_dirs: int,
     max_scan_files: int,
+    account_key: str | None = None,
+    timing: _ScanTiming | None = None,
 ) -> tuple[list[_FileEntry], int]:
     async with _QuarkClient(credential_value) as client:
         parent_id = "0"
@@ -824,23 +975,22 @@ async def _scan_quark_target_entries(
             current_relative_path = _join_relative_path(current_relative_path, segment)
             current_name = segment
 
-        queue: list[_DirectoryRef] = [
-            _DirectoryRef(
-                entry_id=parent_id,
-                path=f"/{current_relative_path}" if current_relative_path else None,
-                name=current_name,
-                relative_path=None,
-                updated_at=None,
-                depth=0,
-            )
-        ]
+        root = _DirectoryRef(
+            entry_id=parent_id,
+            path=f"/{current_relative_path}" if current_relative_path else None,
+            name=current_name,
+            relative_path=None,
+            updated_at=None,
+            depth=0,
+        )
         results: list[_FileEntry] = []
-        visited_dir_count = 0
         scan_order = 0
-        while queue and visited_dir_count < max_scan_dirs and len(results) < max_scan_files:
-            current = queue.pop(0)
-            rows = await client.list_dir_all(parent_id=str(current.entry_id or "0"))
-            visited_dir_count += 1
+
+        async def fetch(current: _DirectoryRef) -> list[dict[str, Any]]:
+            return await client.list_dir_all(parent_id=str(current.entry_id or "0"))
+
+        def expand(current: _DirectoryRef, rows: list[dict[str, Any]]) -> list[_DirectoryRef]:
+            nonlocal scan_order
             normalized_dirs: list[_DirectoryRef] = []
             for row in rows:
                 name = _normalize_text(row.get("file_name"), max_length=255)
@@ -880,8 +1030,17 @@ async def _scan_quark_target_entries(
                 )
                 if len(results) >= max_scan_files:
                     break
-            normalized_dirs.sort(key=lambda item: item.updated_at or datetime.min, reverse=True)
-            queue = sorted([*queue, *normalized_dirs], key=lambda item: item.updated_at or datetime.min, reverse=True)
+            return normalized_dirs
+
+        visited_dir_count = await _scan_directory_frontier(
+            root,
+            fetch=fetch,
+            expand=expand,
+            max_scan_dirs=max_scan_dirs,
+            is_satisfied=lambda: len(results) >= max_scan_files,
+            limiter=_get_account_scan_limiter(account_key),
+            timing=timing,
+        )
     return results, visited_dir_count
 
 
@@ -891,26 +1050,27 @@ async def _scan_baidu_source_entries(
     source_url: str,
     max_scan_dirs: int,
     max_scan_files: int,
+    account_key: str | None = None,
+    timing: _ScanTiming | None = None,
 ) -> tuple[list[_FileEntry], int]:
     async with _BaiduClient(credential_value) as client:
         bdstoken, _validation = await client.get_bdstoken()
         share_key, requires_prefix_strip, url_passcode = _extract_share_access_context(source_url)
         if url_passcode:
             await client.verify_pass_code(share_key=share_key, passcode=url_passcode, bdstoken=bdstoken)
-        queue: list[_DirectoryRef] = [
-            _DirectoryRef(entry_id=None, path=None, name=None, relative_path=None, updated_at=None, depth=0)
-        ]
+        root = _DirectoryRef(entry_id=None, path=None, name=None, relative_path=None, updated_at=None, depth=0)
         results: list[_FileEntry] = []
-        visited_dir_count = 0
         scan_order = 0
-        while queue and visited_dir_count < max_scan_dirs and len(results) < max_scan_files:
-            current = queue.pop(0)
-            rows = await client.list_share_dir(
+
+        async def fetch(current: _DirectoryRef) -> list[dict[str, Any]]:
+            return await client.list_share_dir(
                 share_key=share_key,
                 requires_prefix_strip=requires_prefix_strip,
                 dir_path=current.path,
             )
-            visited_dir_count += 1
+
+        def expand(current: _DirectoryRef, rows: list[dict[str, Any]]) -> list[_DirectoryRef]:
+            nonlocal scan_order
             normalized_dirs: list[_DirectoryRef] = []
             for row in rows:
                 name = _normalize_text(row.get("server_filename"), max_length=255)
@@ -951,8 +1111,17 @@ async def _scan_baidu_source_entries(
                 )
                 if len(results) >= max_scan_files:
                     break
-            normalized_dirs.sort(key=lambda item: item.updated_at or datetime.min, reverse=True)
-            queue = sorted([*queue, *normalized_dirs], key=lambda item: item.updated_at or datetime.min, reverse=True)
+            return normalized_dirs
+
+        visited_dir_count = await _scan_directory_frontier(
+            root,
+            fetch=fetch,
+            expand=expand,
+            max_scan_dirs=max_scan_dirs,
+            is_satisfied=lambda: len(results) >= max_scan_files,
+            limiter=_get_account_scan_limiter(account_key),
+            timing=timing,
+        )
     return results, visited_dir_count
 
 
@@ -962,6 +1131,8 @@ async def _scan_baidu_target_entries(
     fixed_save_path: str,
     max_scan_dirs: int,
     max_scan_files: int,
+    account_key: str | None = None,
+    timing: _ScanTiming | None = None,
 ) -> tuple[list[_FileEntry], int]:
     target_path = "/" + "/".join(_normalize_path_parts(fixed_save_path))
     target_path = target_path if target_path != "/" else "/"
@@ -970,25 +1141,25 @@ async def _scan_baidu_target_entries(
         root_rows = await client.list_dir(target_path, bdstoken=bdstoken)
         if isinstance(root_rows, int):
             raise ValueError(f"resource directory not found: errno {root_rows}")
-        queue: list[_DirectoryRef] = [
-            _DirectoryRef(
-                entry_id=None,
-                path=target_path,
-                name=_normalize_path_parts(fixed_save_path)[-1] if _normalize_path_parts(fixed_save_path) else None,
-                relative_path=None,
-                updated_at=None,
-                depth=0,
-            )
-        ]
+        root = _DirectoryRef(
+            entry_id=None,
+            path=target_path,
+            name=_normalize_path_parts(fixed_save_path)[-1] if _normalize_path_parts(fixed_save_path) else None,
+            relative_path=None,
+            updated_at=None,
+            depth=0,
+        )
         results: list[_FileEntry] = []
-        visited_dir_count = 0
         scan_order = 0
-        while queue and visited_dir_count < max_scan_dirs and len(results) < max_scan_files:
-            current = queue.pop(0)
+
+        async def fetch(current: _DirectoryRef) -> list[dict[str, Any]]:
             rows = await client.list_dir(str(current.path or "/"), bdstoken=bdstoken)
             if isinstance(rows, int):
                 raise ValueError(f"resource directory scan failed: errno {rows}")
-            visited_dir_count += 1
+            return rows
+
+        def expand(current: _DirectoryRef, rows: list[dict[str, Any]]) -> list[_DirectoryRef]:
+            nonlocal scan_order
             normalized_dirs: list[_DirectoryRef] = []
             for row in rows:
                 name = _normalize_text(row.get("server_filename"), max_length=255)
@@ -1029,8 +1200,17 @@ async def _scan_baidu_target_entries(
                 )
                 if len(results) >= max_scan_files:
                     break
-            normalized_dirs.sort(key=lambda item: item.updated_at or datetime.min, reverse=True)
-            queue = sorted([*queue, *normalized_dirs], key=lambda item: item.updated_at or datetime.min, reverse=True)
+            return normalized_dirs
+
+        visited_dir_count = await _scan_directory_frontier(
+            root,
+            fetch=fetch,
+            expand=expand,
+            max_scan_dirs=max_scan_dirs,
+            is_satisfied=lambda: len(results) >= max_scan_files,
+            limiter=_get_account_scan_limiter(account_key),
+            timing=timing,
+        )
     return results, visited_dir_count
 
 
@@ -1426,6 +1606,13 @@ def _build_recommended_entries(
     )
 
 
+def _serialize_scan_timing(timing: _ScanTiming) -> dict[str, Any]:
+    payload = asdict(timing)
+    for key in ("elapsed_ms", "fetch_ms", "limiter_wait_ms"):
+        payload[key] = round(float(payload[key]), 1)
+    return payload
+
+
 def _build_diagnosis_summary(
     *,
     task: PanTransferSyncTask,
@@ -1481,6 +1668,10 @@ def _build_diagnosis_summary(
         "target_scope_relative_path": target_scope_relative_path,
         "warnings": list(stats.warnings),
         "stop_reason": stats.stop_reason,
+        "scan_timing": {
+            "source": _serialize_scan_timing(stats.source_scan_timing),
+            "target": _serialize_scan_timing(stats.target_scan_timing),
+        },
     }
 
 
@@ -1524,12 +1715,16 @@ async def diagnose_pan_transfer_follow_task_files(
             source_url=source_url,
             max_scan_dirs=_DEFAULT_MAX_SCAN_DIRS,
             max_scan_files=_DEFAULT_MAX_SCAN_FILES,
+            account_key=_build_account_scan_key(account),
+            timing=stats.source_scan_timing,
         )
         target_entries, stats.target_dir_count = await _scan_quark_target_entries(
             credential_value=credential_value,
             fixed_save_path=task.fixed_save_path,
             max_scan_dirs=_DEFAULT_MAX_SCAN_DIRS,
             max_scan_files=_DEFAULT_MAX_SCAN_FILES,
+            account_key=_build_account_scan_key(account),
+            timing=stats.target_scan_timing,
         )
     elif platform == PLATFORM_BAIDU:
         source_entries, stats.source_dir_count = await _scan_baidu_source_entries(
@@ -1537,12 +1732,16 @@ async def diagnose_pan_transfer_follow_task_files(
             source_url=source_url,
             max_scan_dirs=_DEFAULT_MAX_SCAN_DIRS,
             max_scan_files=_DEFAULT_MAX_SCAN_FILES,
+            account_key=_build_account_scan_key(account),
+            timing=stats.source_scan_timing,
         )
         target_entries, stats.target_dir_count = await _scan_baidu_target_entries(
             credential_value=credential_value,
             fixed_save_path=task.fixed_save_path,
             max_scan_dirs=_DEFAULT_MAX_SCAN_DIRS,
             max_scan_files=_DEFAULT_MAX_SCAN_FILES,
+            account_key=_build_account_scan_key(account),
+            timing=stats.target_scan_timing,
         )
     else:
         raise ValueError(f"unsupported follow diagnosis platform: {task.platform}")
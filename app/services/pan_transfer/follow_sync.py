@@ -14,6 +14,7 @@ from app.models.models import (
     ensure_runtime_storage_tables,
 )
 from app.services.resource_identity import compare_follow_candidate, parse_resource_identity
+from app.services.worker_notifications import WORKER_QUEUE_TRANSFER, notify_worker_queue
 
 from .common import normalize_relative_path, utcnow
 from .constants import (
@@ -821,7 +822,8 @@ async def create_pan_transfer_follow_sync_batch(
     session.add(row)
     session.flush()
 
-    refresh_pan_transfer_batch_summary(session, batch_id=int(batch.id))
+    refresh_pan_transfer_batch_summary(session, batch_id=int(batch.id), recount=True)
+    notify_worker_queue(session, WORKER_QUEUE_TRANSFER)
 
     extra_json = dict(task.extra_json or {})
     last_sync = {
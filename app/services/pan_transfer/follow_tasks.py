@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 import re
 import unicodedata
@@ -26,8 +25,10 @@ from app.models.models import (
 from app.services.ai_center import execute_text_route, extract_json_object_from_text
 from app.services.resource_identity import compare_follow_candidate, parse_resource_identity
 from app.services.resource_ops import get_work_binding_lookup
+from app.services.worker_notifications import WORKER_QUEUE_FOLLOW_TASK, notify_worker_queue
 
 from .common import DEFAULT_SHARE_TARGET_MODE, generate_share_passcode, normalize_relative_path, utcnow
+from .event_loop import run_worker_coroutine
 from .providers import decrypt_account_credential, get_pan_transfer_provider
 from .providers.base import PanTransferProviderError
 from .replacement import _ensure_link_target_for_url, replace_link_target_references_with_url, rewrite_message_link_ref_with_url
@@ -2681,6 +2682,7 @@ def create_pan_transfer_follow_task_from_batch_item(
             payload=identity_snapshot,
         )
     session.flush()
+    notify_worker_queue(session, WORKER_QUEUE_FOLLOW_TASK)
     return get_pan_transfer_follow_task_detail(session, task_id=int(task.id))
 
 
@@ -2707,6 +2709,7 @@ def queue_pan_transfer_follow_task_check(
         payload={"operator": _normalize_text(operator, max_length=128) or None},
     )
     session.flush()
+    notify_worker_queue(session, WORKER_QUEUE_FOLLOW_TASK)
     return get_pan_transfer_follow_task_detail(session, task_id=int(task.id))
 
 
@@ -2754,6 +2757,7 @@ def resume_pan_transfer_follow_task(
         payload={"operator": _normalize_text(operator, max_length=128) or None},
     )
     session.flush()
+    notify_worker_queue(session, WORKER_QUEUE_FOLLOW_TASK)
     return get_pan_transfer_follow_task_detail(session, task_id=int(task.id))
 
 
@@ -4984,7 +4988,7 @@ def process_next_pan_transfer_follow_task(session: Session, *, worker_name: str)
     previous_expire_on_commit = session.expire_on_commit
     session.expire_on_commit = False
     try:
-        asyncio.run(_process_pan_transfer_follow_task_async(session, task=task, worker_name=worker_name))
+        run_worker_coroutine(_process_pan_transfer_follow_task_async(session, task=task, worker_name=worker_name))
         task.locked_by = None
         task.locked_at = None
         task.last_checked_at = utcnow()
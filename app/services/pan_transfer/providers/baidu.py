@@ -10,6 +10,7 @@ from urllib.parse import parse_qs, urlparse
 import aiohttp
 
 from app.services.link_check.constants import PLATFORM_BAIDU
+from app.services.link_check.rate_limiter import acquire_netdisk_token
 
 from .base import (
     PanTransferAccountValidationResult,
@@ -20,6 +21,13 @@ from .base import (
     PanTransferShareResult,
     PanTransferTransferResult,
 )
+from .session_pool import (
+    PooledProviderSession,
+    account_token_ttl_seconds,
+    close_provider_session,
+    open_provider_session,
+)
+from .share_cache import share_listing_cache
 
 
 _DEFAULT_HEADERS = {
@@ -264,18 +272,34 @@ class _BaiduClient:
     def __init__(self, cookie_value: str) -> None:
         self.cookie_value = _normalize_cookie(cookie_value)
         self.session: aiohttp.ClientSession | None = None
+        self._pooled: PooledProviderSession | None = None
 
     async def __aenter__(self) -> "_BaiduClient":
-        timeout = aiohttp.ClientTimeout(total=60)
-        headers = dict(_DEFAULT_HEADERS)
-        headers["Cookie"] = self.cookie_value
-        self.session = aiohttp.ClientSession(timeout=timeout, headers=headers)
+        # Pooled sessions are shared per account while BDCLND is per share,
+        # so the cookie is sent on each request instead of set on the session.
+        self.session, self._pooled = await open_provider_session(
+            PLATFORM_BAIDU,
+            self.cookie_value,
+            headers=_DEFAULT_HEADERS,
+        )
         return self
 
     async def __aexit__(self, exc_type, exc, tb) -> None:  # type: ignore[no-untyped-def]
         if self.session is not None:
-            await self.session.close()
+            self._drop_share_cookie()
+            await close_provider_session(
+                self.session,
+                self._pooled,
+                discard=isinstance(exc, PanTransferProviderError) and not exc.retryable,
+            )
             self.session = None
+            self._pooled = None
+
+    def _drop_share_cookie(self) -> None:
+        # Jar cookies win over the request header; a BDCLND set by one share
+        # must not be replayed against the next share on the same account.
+        if self.session is not None:
+            self.session.cookie_jar.clear(lambda morsel: morsel.key == "BDCLND")
 
     @property
     def _session(self) -> aiohttp.ClientSession:
@@ -292,12 +316,14 @@ class _BaiduClient:
         data: dict[str, Any] | None = None,
         allow_redirects: bool = False,
     ) -> dict[str, Any]:
+        await acquire_netdisk_token(PLATFORM_BAIDU)
         async with self._session.request(
             method,
             url,
             params=params,
             data=data,
             allow_redirects=allow_redirects,
+            headers={"Cookie": self.cookie_value},
         ) as response:
             body = await response.text()
             if response.status >= 400:
@@ -307,7 +333,12 @@ class _BaiduClient:
             except json.JSONDecodeError as exc:
                 raise PanTransferProviderError("Baidu returned a non-JSON response") from exc
 
-    async def get_bdstoken(self) -> tuple[str, dict[str, Any]]:
+    async def get_bdstoken(self, *, use_cache: bool = True) -> tuple[str, dict[str, Any]]:
+        if use_cache and self._pooled is not None:
+            cached = self._pooled.get_value("bdstoken")
+            if cached is not None:
+                token, result = cached
+                return token, dict(result)
         payload = await self._request_json(
             "GET",
             "https://pan.baidu.com/api/gettemplatevariable",
@@ -328,6 +359,8 @@ class _BaiduClient:
         token = str(result.get("bdstoken") or "").strip()
         if not token:
             raise PanTransferProviderError("Baidu validation did not return bdstoken", retryable=False)
+        if self._pooled is not None:
+            self._pooled.set_value("bdstoken", (token, dict(result)), ttl_seconds=account_token_ttl_seconds())
         return token, result
 
     async def verify_pass_code(self, *, share_key: str, passcode: str, bdstoken: str) -> str:
@@ -358,11 +391,12 @@ class _BaiduClient:
         if not randsk:
             raise PanTransferProviderError("Baidu share passcode validation did not return BDCLND", retryable=False)
         self.cookie_value = _update_cookie_value(self.cookie_value, key="BDCLND", value=randsk)
-        self._session.headers["Cookie"] = self.cookie_value
+        self._drop_share_cookie()
         return randsk
 
     async def get_transfer_page(self, *, url: str) -> str:
-        async with self._session.get(url, allow_redirects=True) as response:
+        await acquire_netdisk_token(PLATFORM_BAIDU)
+        async with self._session.get(url, allow_redirects=True, headers={"Cookie": self.cookie_value}) as response:
             body = await response.text()
             if response.status >= 400:
                 raise PanTransferProviderError(f"Baidu share page request failed with HTTP {response.status}")
@@ -376,6 +410,24 @@ class _BaiduClient:
         dir_path: str | None,
     ) -> list[dict[str, Any]]:
         short_url = _build_share_list_short_url(share_key, requires_prefix_strip=requires_prefix_strip)
+        cached_rows = share_listing_cache.get(PLATFORM_BAIDU, short_url, dir_path)
+        if cached_rows is not None:
+            return cached_rows
+        rows = await self._fetch_share_dir(short_url=short_url, dir_path=dir_path)
+        share_listing_cache.store(
+            PLATFORM_BAIDU,
+            short_url,
+            dir_path,
+            rows,
+            child_dirs=(
+                (str(row.get("path") or ""), row.get("server_mtime"))
+                for row in rows
+                if int(row.get("isdir") or 0) == 1
+            ),
+        )
+        return rows
+
+    async def _fetch_share_dir(self, *, short_url: str, dir_path: str | None) -> list[dict[str, Any]]:
         page = 1
         page_size = 200
         rows: list[dict[str, Any]] = []
@@ -625,7 +677,7 @@ class BaiduPanTransferProvider(PanTransferProvider):
     async def validate_account(self, *, credential_value: str, account_name: str) -> PanTransferAccountValidationResult:
         del account_name
         async with _BaiduClient(credential_value) as client:
-            _, result = await client.get_bdstoken()
+            _, result = await client.get_bdstoken(use_cache=False)
         return PanTransferAccountValidationResult(
             ok=True,
             detail_message="Baidu account is available",
@@ -9,6 +9,7 @@ from urllib.parse import parse_qs, urlparse
 import aiohttp
 
 from app.services.link_check.constants import PLATFORM_QUARK
+from app.services.link_check.rate_limiter import acquire_netdisk_token
 
 from .base import (
     PanTransferAccountValidationResult,
@@ -19,6 +20,8 @@ from .base import (
     PanTransferShareResult,
     PanTransferTransferResult,
 )
+from .session_pool import PooledProviderSession, close_provider_session, open_provider_session
+from .share_cache import share_listing_cache
 
 
 _DEFAULT_HEADERS = {
@@ -207,18 +210,27 @@ class _QuarkClient:
     def __init__(self, cookie_value: str) -> None:
         self.cookie_value = _normalize_cookie(cookie_value)
         self.session: aiohttp.ClientSession | None = None
+        self._pooled: PooledProviderSession | None = None
 
     async def __aenter__(self) -> "_QuarkClient":
-        timeout = aiohttp.ClientTimeout(total=60)
-        headers = dict(_DEFAULT_HEADERS)
-        headers["cookie"] = self.cookie_value
-        self.session = aiohttp.ClientSession(timeout=timeout, headers=headers)
+        # On worker loops the session is shared by every client of this
+        # account; the cookie therefore goes on each request, not the session.
+        self.session, self._pooled = await open_provider_session(
+            PLATFORM_QUARK,
+            self.cookie_value,
+            headers=_DEFAULT_HEADERS,
+        )
         return self
 
     async def __aexit__(self, exc_type, exc, tb) -> None:  # type: ignore[no-untyped-def]
         if self.session is not None:
-            await self.session.close()
+            await close_provider_session(
+                self.session,
+                self._pooled,
+                discard=isinstance(exc, PanTransferProviderError) and not exc.retryable,
+            )
             self.session = None
+            self._pooled = None
 
     @property
     def _session(self) -> aiohttp.ClientSession:
@@ -234,11 +246,13 @@ class _QuarkClient:
         params: dict[str, Any] | None = None,
         json_payload: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
+        await acquire_netdisk_token(PLATFORM_QUARK)
         async with self._session.request(
             method,
             url,
             params=params,
             json=json_payload,
+            headers={"cookie": self.cookie_value},
         ) as response:
             body = await response.text()
             if response.status >= 400:
@@ -425,7 +439,31 @@ class _QuarkClient:
             )
         return token
 
-    async def get_share_detail(self, *, pwd_id: str, stoken: str, parent_id: str = "0") -> list[dict[str, Any]]:
+    async def get_share_detail(
+        self,
+        *,
+        pwd_id: str,
+        stoken: str,
+        parent_id: str = "0",
+    ) -> list[dict[str, Any]]:
+        cached_rows = share_listing_cache.get(PLATFORM_QUARK, pwd_id, parent_id)
+        if cached_rows is not None:
+            return cached_rows
+        file_list = await self._fetch_share_detail(pwd_id=pwd_id, stoken=stoken, parent_id=parent_id)
+        share_listing_cache.store(
+            PLATFORM_QUARK,
+            pwd_id,
+            parent_id,
+            file_list,
+            child_dirs=(
+                (str(row.get("fid") or ""), row.get("updated_at"))
+                for row in file_list
+                if bool(row.get("dir"))
+            ),
+        )
+        return file_list
+
+    async def _fetch_share_detail(self, *, pwd_id: str, stoken: str, parent_id: str) -> list[dict[str, Any]]:
         page = 1
         file_list: list[dict[str, Any]] = []
         while True:
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+
+import aiohttp
+
+from app.models.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+CLIENT_TIMEOUT_SECONDS = 60
+
+_PoolKey = tuple[str, str]
+
+
+@dataclass(slots=True)
+class PooledProviderSession:
+    key: _PoolKey
+    session: aiohttp.ClientSession
+    created_at: float
+    last_used_at: float
+    in_use: int = 0
+    retired: bool = False
+    values: dict[str, tuple[float, Any]] = field(default_factory=dict)
+
+    def get_value(self, name: str) -> Any:
+        cached = self.values.get(name)
+        if cached is None:
+            return None
+        expires_at, value = cached
+        if time.monotonic() >= expires_at:
+            self.values.pop(name, None)
+            return None
+        return value
+
+    def set_value(self, name: str, value: Any, *, ttl_seconds: float) -> None:
+        if ttl_seconds <= 0:
+            return
+        self.values[name] = (time.monotonic() + float(ttl_seconds), value)
+
+
+class ProviderSessionPool:
+    """Account-scoped aiohttp sessions kept warm on one event loop.
+
+    Entries are keyed by (platform, cookie digest), so every client built for
+    the same account credential reuses one connection pool and cookie jar, and
+    may park short-lived account tokens on the entry. An entry is closed once
+    it has been idle for ``idle_seconds`` or has lived ``max_age_seconds``;
+    entries still in use are only retired and closed on their last release.
+    """
+
+    def __init__(self, *, idle_seconds: float, max_age_seconds: float) -> None:
+        self._idle_seconds = max(0.0, float(idle_seconds))
+        self._max_age_seconds = max(self._idle_seconds, float(max_age_seconds))
+        self._entries: dict[_PoolKey, PooledProviderSession] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(platform: str, cookie_value: str) -> _PoolKey:
+        digest = hashlib.sha256(str(cookie_value or "").encode("utf-8")).hexdigest()
+        return str(platform), digest
+
+    def _is_expired(self, entry: PooledProviderSession, now: float) -> bool:
+        return (
+            entry.session.closed
+            or now - entry.last_used_at >= self._idle_seconds
+            or now - entry.created_at >= self._max_age_seconds
+        )
+
+    async def _sweep(self, now: float) -> None:
+        for key, entry in list(self._entries.items()):
+            if not self._is_expired(entry, now):
+                continue
+            self._entries.pop(key, None)
+            entry.retired = True
+            if entry.in_use <= 0:
+                await entry.session.close()
+
+    async def acquire(
+        self,
+        platform: str,
+        cookie_value: str,
+        *,
+        headers: Mapping[str, str],
+    ) -> PooledProviderSession:
+        now = time.monotonic()
+        await self._sweep(now)
+        key = self._key(platform, cookie_value)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = PooledProviderSession(
+                key=key,
+                session=_new_client_session(headers),
+                created_at=now,
+                last_used_at=now,
+            )
+            self._entries[key] = entry
+        else:
+            self.hits += 1
+        entry.in_use += 1
+        entry.last_used_at = now
+        return entry
+
+    async def release(self, entry: PooledProviderSession, *, discard: bool = False) -> None:
+        entry.in_use = max(0, entry.in_use - 1)
+        entry.last_used_at = time.monotonic()
+        if discard and not entry.retired:
+            entry.retired = True
+            if self._entries.get(entry.key) is entry:
+                self._entries.pop(entry.key, None)
+        if entry.retired and entry.in_use <= 0 and not entry.session.closed:
+            await entry.session.close()
+
+    async def close(self) -> None:
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for entry in entries:
+            entry.retired = True
+            try:
+                await entry.session.close()
+            except Exception:
+                logger.debug("Failed to close pooled provider session", exc_info=True)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _new_client_session(headers: Mapping[str, str]) -> aiohttp.ClientSession:
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=CLIENT_TIMEOUT_SECONDS),
+        headers=dict(headers),
+    )
+
+
+def build_session_pool() -> ProviderSessionPool:
+    return ProviderSessionPool(
+        idle_seconds=float(getattr(settings, "PAN_TRANSFER_CLIENT_IDLE_SECONDS", 300) or 0),
+        max_age_seconds=float(getattr(settings, "PAN_TRANSFER_CLIENT_MAX_AGE_SECONDS", 1800) or 0),
+    )
+
+
+def account_token_ttl_seconds() -> float:
+    return float(getattr(settings, "PAN_TRANSFER_ACCOUNT_TOKEN_TTL_SECONDS", 600) or 0)
+
+
+# Pools only exist on loops that outlive a single task (the worker lane
+# loops); API requests and ad-hoc ``asyncio.run`` callers keep using a fresh
+# session per client, which is closed with the client.
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ProviderSessionPool]" = weakref.WeakKeyDictionary()
+
+
+def register_session_pool(loop: asyncio.AbstractEventLoop, pool: ProviderSessionPool) -> None:
+    _pools[loop] = pool
+
+
+def unregister_session_pool(loop: asyncio.AbstractEventLoop) -> ProviderSessionPool | None:
+    return _pools.pop(loop, None)
+
+
+def current_session_pool() -> ProviderSessionPool | None:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return _pools.get(loop)
+
+
+async def open_provider_session(
+    platform: str,
+    cookie_value: str,
+    *,
+    headers: Mapping[str, str],
+) -> tuple[aiohttp.ClientSession, PooledProviderSession | None]:
+    pool = current_session_pool()
+    if pool is None:
+        return _new_client_session(headers), None
+    entry = await pool.acquire(platform, cookie_value, headers=headers)
+    return entry.session, entry
+
+
+async def close_provider_session(
+    session: aiohttp.ClientSession,
+    entry: PooledProviderSession | None,
+    *,
+    discard: bool = False,
+) -> None:
+    if entry is None:
+        await session.close()
+        return
+    pool = current_session_pool()
+    if pool is None:
+        entry.retired = True
+        entry.in_use = max(0, entry.in_use - 1)
+        if entry.in_use <= 0:
+            await session.close()
+        return
+    await pool.release(entry, discard=discard)
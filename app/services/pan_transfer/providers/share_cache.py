@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from app.models.config import settings
+
+
+_ShareListingKey = tuple[str, str, str]
+
+
+@dataclass(slots=True)
+class _ShareListingEntry:
+    rows: list[dict[str, Any]]
+    fetched_at: float
+    revalidated_at: float
+    version: Any = None
+
+
+class ShareListingCache:
+    """Process-wide cache of share directory listings.
+
+    Entries are keyed by (platform, share key, parent id) and live for a
+    short TTL. A fresh listing of a parent directory also revalidates cached
+    child listings whose ``updated_at`` it reports unchanged, and drops the
+    ones that changed, up to ``max_age_seconds`` after the original fetch.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_age_seconds: float, max_entries: int) -> None:
+        self._ttl_seconds = max(0.0, float(ttl_seconds))
+        self._max_age_seconds = max(self._ttl_seconds, float(max_age_seconds))
+        self._max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[_ShareListingKey, _ShareListingEntry] = OrderedDict()
+        # Versions seen in parent listings for directories not fetched yet.
+        self._known_versions: OrderedDict[_ShareListingKey, Any] = OrderedDict()
+
+    @staticmethod
+    def _key(platform: str, share_key: str, parent_id: str | None) -> _ShareListingKey:
+        return str(platform), str(share_key), str(parent_id or "")
+
+    def _is_fresh(self, entry: _ShareListingEntry, now: float) -> bool:
+        return now - entry.revalidated_at < self._ttl_seconds and now - entry.fetched_at < self._max_age_seconds
+
+    def get(self, platform: str, share_key: str, parent_id: str | None) -> list[dict[str, Any]] | None:
+        if self._ttl_seconds <= 0:
+            return None
+        key = self._key(platform, share_key, parent_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._is_fresh(entry, now):
+                if entry is not None:
+                    self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return [dict(row) for row in entry.rows]
+
+    def store(
+        self,
+        platform: str,
+        share_key: str,
+        parent_id: str | None,
+        rows: list[dict[str, Any]],
+        *,
+        child_dirs: Iterable[tuple[str, Any]] = (),
+    ) -> None:
+        if self._ttl_seconds <= 0:
+            return
+        key = self._key(platform, share_key, parent_id)
+        now = time.monotonic()
+        with self._lock:
+            previous = self._entries.get(key)
+            version = self._known_versions.pop(key, None)
+            if version is None and previous is not None:
+                version = previous.version
+            self._entries[key] = _ShareListingEntry(
+                rows=[dict(row) for row in rows],
+                fetched_at=now,
+                revalidated_at=now,
+                version=version,
+            )
+            self._entries.move_to_end(key)
+
+            for child_id, child_version in child_dirs:
+                if not child_id or child_version in (None, ""):
+                    continue
+                child_key = self._key(platform, share_key, child_id)
+                child_entry = self._entries.get(child_key)
+                if child_entry is None:
+                    self._known_versions[child_key] = child_version
+                    self._known_versions.move_to_end(child_key)
+                elif child_entry.version == child_version:
+                    child_entry.revalidated_at = now
+                elif child_entry.version is None:
+                    child_entry.version = child_version
+                else:
+                    self._entries.pop(child_key, None)
+                    self._known_versions[child_key] = child_version
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            while len(self._known_versions) > self._max_entries:
+                self._known_versions.popitem(last=False)
+
+
+share_listing_cache = ShareListingCache(
+    ttl_seconds=float(getattr(settings, "PAN_SHARE_LISTING_CACHE_TTL_SECONDS", 120) or 0),
+    max_age_seconds=float(getattr(settings, "PAN_SHARE_LISTING_CACHE_MAX_AGE_SECONDS", 900) or 0),
+    max_entries=int(getattr(settings, "PAN_SHARE_LISTING_CACHE_MAX_ENTRIES", 2048) or 1),
+)
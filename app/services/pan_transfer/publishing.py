@@ -4,7 +4,7 @@ from datetime import datetime, time as daytime, timedelta, timezone
 from typing import Any
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, text
 from sqlalchemy.orm import Session
 
 from app.models.models import (
@@ -18,7 +18,13 @@ from app.models.models import (
     PanTransferSyncTask,
     ensure_runtime_storage_tables,
 )
+from app.services.message_hourly_stats_service import (
+    accumulate_message_hourly_stats_for_message_ids,
+    floor_to_hour,
+    rebuild_message_hourly_stats_for_hours,
+)
 from app.services.resource_ops import delete_message_resource_data, ensure_message_link_refs_for_messages
+from app.services.response_cache_versions import bump_response_cache_version
 from app.services.resource_ops.catalog import flatten_message_links
 
 from .common import utcnow
@@ -36,6 +42,7 @@ from .worker import (
 
 
 _SHANGHAI_TZ = ZoneInfo("Asia/Shanghai")
+PUBLISH_RULE_LOCK_KEY = 42025097
 _WEEKDAY_LABELS = {
     1: "周一",
     2: "周二",
@@ -788,6 +795,8 @@ def _create_admin_manual_message(
     )
     session.add(message)
     session.flush()
+    accumulate_message_hourly_stats_for_message_ids(session, [int(message.id)])
+    bump_response_cache_version(session)
 
     refs_by_message, _ = ensure_message_link_refs_for_messages(session, [message])
     published_refs = refs_by_message.get(int(message.id), [])
@@ -1345,8 +1354,13 @@ def _delete_publish_record_messages(
                 messages_to_delete.append(message)
     if deleted_message_ids:
         delete_message_resource_data(session, deleted_message_ids)
+        affected_hours = {
+            floor_to_hour(message.timestamp) for message in messages_to_delete if isinstance(message.timestamp, datetime)
+        }
         for message in messages_to_delete:
             session.delete(message)
+        rebuild_message_hourly_stats_for_hours(session, affected_hours)
+        bump_response_cache_version(session)
     return {
         "deleted_message_count": len(deleted_message_ids),
         "deleted_message_ids": deleted_message_ids,
@@ -1707,8 +1721,21 @@ def republish_pan_transfer_publish_record(
     return _serialize_publish_record(session, updated_row)
 
 
+def _try_claim_publish_rule_lock(session: Session) -> bool:
+    return bool(
+        session.execute(
+            text("SELECT pg_try_advisory_xact_lock(:lock_key)"),
+            {"lock_key": PUBLISH_RULE_LOCK_KEY},
+        ).scalar()
+    )
+
+
 def process_next_pan_transfer_publish_rule(session: Session, *, worker_name: str) -> bool:
     ensure_runtime_storage_tables()
+    # Due rules are picked from a scan over all publish records, so the scan
+    # and the republish it leads to are serialized across worker instances.
+    if not _try_claim_publish_rule_lock(session):
+        return False
     rows = (
         session.query(PanTransferPublishRecord)
         .order_by(PanTransferPublishRecord.published_at.desc(), PanTransferPublishRecord.id.desc())
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
+import logging
 from datetime import timedelta
-from typing import Iterable
+from typing import Any, Iterable
 
-from sqlalchemy import and_, case, func, or_
+from sqlalchemy import and_, case, func, or_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from app.models.models import PanTransferBatch, PanTransferBatchItem, ensure_runtime_storage_tables
+from app.models.config import settings
+from app.models.models import (
+    PanTransferBatch,
+    PanTransferBatchItem,
+    PanTransferBatchStatusCount,
+    ensure_runtime_storage_tables,
+)
+from app.services.link_check.constants import PLATFORM_BAIDU, PLATFORM_QUARK
+from app.services.worker_notifications import WORKER_QUEUE_TRANSFER, notify_worker_queue
 
 from .common import dedupe_ints, utcnow
 from .constants import (
@@ -27,22 +37,144 @@ from .constants import (
 )
 
 
-def refresh_pan_transfer_batch_summary(session: Session, *, batch_id: int) -> PanTransferBatch:
-    ensure_runtime_storage_tables()
-    batch = session.get(PanTransferBatch, int(batch_id))
-    if batch is None:
-        raise LookupError("batch not found")
+logger = logging.getLogger(__name__)
+
+PAN_TRANSFER_BATCH_RECONCILE_FINISHED_HOURS = 24
+PAN_TRANSFER_CLAIM_LOCK_KEY = 42025098
+
+_PLATFORM_PARALLEL_SETTINGS = {
+    PLATFORM_BAIDU: "PAN_TRANSFER_BAIDU_MAX_PARALLEL",
+    PLATFORM_QUARK: "PAN_TRANSFER_QUARK_MAX_PARALLEL",
+}
+
 
+def get_pan_transfer_platform_parallelism(platform: str) -> int:
+    """Maximum items of ``platform`` processed at once across all workers; 0 means no cap."""
+    setting_name = _PLATFORM_PARALLEL_SETTINGS.get(str(platform or ""))
+    if setting_name is None:
+        return 0
+    return max(0, int(getattr(settings, setting_name, 0) or 0))
+
+
+def _count_batch_items_by_status(session: Session, batch_ids: list[int]) -> dict[int, dict[str, int]]:
+    if not batch_ids:
+        return {}
     rows = (
         session.query(
+            PanTransferBatchItem.batch_id,
             PanTransferBatchItem.transfer_status,
             func.count(PanTransferBatchItem.id),
         )
-        .filter(PanTransferBatchItem.batch_id == int(batch_id))
-        .group_by(PanTransferBatchItem.transfer_status)
+        .filter(PanTransferBatchItem.batch_id.in_(batch_ids))
+        .group_by(PanTransferBatchItem.batch_id, PanTransferBatchItem.transfer_status)
         .all()
     )
-    counts = {str(status or ""): int(total or 0) for status, total in rows}
+    counts: dict[int, dict[str, int]] = {int(batch_id): {} for batch_id in batch_ids}
+    for batch_id, status, total in rows:
+        counts[int(batch_id)][str(status or "")] = int(total or 0)
+    return counts
+
+
+def _load_batch_status_counts(session: Session, *, batch_id: int, for_update: bool = False) -> dict[str, int] | None:
+    query = (
+        session.query(PanTransferBatchStatusCount.transfer_status, PanTransferBatchStatusCount.item_count)
+        .filter(PanTransferBatchStatusCount.batch_id == int(batch_id))
+        .order_by(PanTransferBatchStatusCount.transfer_status.asc())
+    )
+    if for_update:
+        query = query.with_for_update()
+    rows = query.all()
+    if not rows:
+        return None
+    return {str(status or ""): int(total or 0) for status, total in rows}
+
+
+def _upsert_batch_status_counts(
+    session: Session,
+    *,
+    batch_id: int,
+    counts: dict[str, int],
+    accumulate: bool,
+) -> None:
+    # Rows go in status order so concurrent transitions lock them in the
+    # same order and cannot deadlock each other.
+    rows = [
+        {"batch_id": int(batch_id), "transfer_status": status, "item_count": int(total), "updated_at": utcnow()}
+        for status, total in sorted(counts.items())
+        if status and (total or not accumulate)
+    ]
+    if not rows:
+        return
+    stmt = pg_insert(PanTransferBatchStatusCount.__table__).values(rows)
+    item_count = (
+        PanTransferBatchStatusCount.item_count + stmt.excluded.item_count if accumulate else stmt.excluded.item_count
+    )
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["batch_id", "transfer_status"],
+            set_={"item_count": item_count, "updated_at": func.now()},
+        )
+    )
+
+
+def _recount_batch_status_counts(session: Session, *, batch_id: int) -> dict[str, int]:
+    counts = _count_batch_items_by_status(session, [int(batch_id)])[int(batch_id)]
+    previous = _load_batch_status_counts(session, batch_id=int(batch_id)) or {}
+    _upsert_batch_status_counts(
+        session,
+        batch_id=int(batch_id),
+        counts={**{status: 0 for status in previous}, **counts},
+        accumulate=False,
+    )
+    return counts
+
+
+def record_pan_transfer_item_transition(
+    session: Session,
+    *,
+    item: PanTransferBatchItem,
+    previous_status: str | None,
+) -> PanTransferBatch:
+    """Move one item between status counters and refresh the batch summary.
+
+    This keeps per-item work constant regardless of batch size; batches that
+    predate the counter table are seeded by a one-off recount.
+    """
+    current_status = str(item.transfer_status or "")
+    previous_status = str(previous_status or "")
+    batch_id = int(item.batch_id)
+    if current_status == previous_status:
+        return refresh_pan_transfer_batch_summary(session, batch_id=batch_id)
+    if previous_status == PAN_TRANSFER_ITEM_STATUS_PROCESSING:
+        # The account (and a platform slot) just freed up; slots that skipped
+        # this account's items should look again instead of idling.
+        notify_worker_queue(session, WORKER_QUEUE_TRANSFER)
+    if _load_batch_status_counts(session, batch_id=batch_id) is None:
+        return refresh_pan_transfer_batch_summary(session, batch_id=batch_id, recount=True)
+    deltas: dict[str, int] = {}
+    if previous_status:
+        deltas[previous_status] = deltas.get(previous_status, 0) - 1
+    if current_status:
+        deltas[current_status] = deltas.get(current_status, 0) + 1
+    _upsert_batch_status_counts(session, batch_id=batch_id, counts=deltas, accumulate=True)
+    return refresh_pan_transfer_batch_summary(session, batch_id=batch_id)
+
+
+def refresh_pan_transfer_batch_summary(session: Session, *, batch_id: int, recount: bool = False) -> PanTransferBatch:
+    """Derive batch counters and status from ``pan_transfer_batch_status_counts``.
+
+    Pass ``recount=True`` after bulk item changes that bypass
+    ``record_pan_transfer_item_transition``.
+    """
+    ensure_runtime_storage_tables()
+    batch = session.get(PanTransferBatch, int(batch_id))
+    if batch is None:
+        raise LookupError("batch not found")
+
+    counts = None if recount else _load_batch_status_counts(session, batch_id=int(batch_id))
+    if counts is None:
+        counts = _recount_batch_status_counts(session, batch_id=int(batch_id))
+    counts = {status: max(0, total) for status, total in counts.items()}
     total_count = int(sum(counts.values()))
     queued_count = counts.get(PAN_TRANSFER_ITEM_STATUS_QUEUED, 0)
     processing_count = counts.get(PAN_TRANSFER_ITEM_STATUS_PROCESSING, 0)
@@ -126,6 +258,7 @@ def recycle_stale_pan_transfer_locks(
     )
     recycled = 0
     for row in rows:
+        previous_status = str(row.transfer_status or "")
         batch = session.get(PanTransferBatch, int(row.batch_id))
         if batch is not None and str(batch.status or "") == PAN_TRANSFER_BATCH_STATUS_CANCELLED:
             row.transfer_status = PAN_TRANSFER_ITEM_STATUS_FAILED
@@ -140,20 +273,46 @@ def recycle_stale_pan_transfer_locks(
         if str(row.transfer_status or "") == PAN_TRANSFER_ITEM_STATUS_QUEUED:
             row.error_message = "Worker exited before finishing the transfer item"
         session.add(row)
-        recycled += 1
-    if recycled:
         session.flush()
-        affected_batch_ids = dedupe_ints(row.batch_id for row in rows)
-        for batch_id in affected_batch_ids:
-            refresh_pan_transfer_batch_summary(session, batch_id=batch_id)
+        record_pan_transfer_item_transition(session, item=row, previous_status=previous_status)
+        recycled += 1
     return recycled
 
 
+def _load_busy_transfer_slots(session: Session) -> tuple[set[int], dict[str, int]]:
+    rows = (
+        session.query(PanTransferBatchItem.platform, PanTransferBatchItem.target_account_id)
+        .filter(PanTransferBatchItem.transfer_status == PAN_TRANSFER_ITEM_STATUS_PROCESSING)
+        .all()
+    )
+    busy_account_ids: set[int] = set()
+    processing_by_platform: dict[str, int] = {}
+    for platform, account_id in rows:
+        if account_id is not None:
+            busy_account_ids.add(int(account_id))
+        key = str(platform or "")
+        processing_by_platform[key] = processing_by_platform.get(key, 0) + 1
+    return busy_account_ids, processing_by_platform
+
+
 def claim_next_pan_transfer_batch_item(session: Session, *, worker_name: str) -> PanTransferBatchItem | None:
+    """Claim the next due item whose account and platform have spare capacity.
+
+    Items of one target account run one at a time, and each platform is
+    capped by ``get_pan_transfer_platform_parallelism``. Both checks read the
+    set of processing items, so claims are serialized with a transaction
+    advisory lock; callers must commit right after claiming to release it.
+    """
     ensure_runtime_storage_tables()
-    recycle_stale_pan_transfer_locks(session)
+    session.execute(text("SELECT pg_advisory_xact_lock(:lock_key)"), {"lock_key": PAN_TRANSFER_CLAIM_LOCK_KEY})
     now = utcnow()
-    candidate = (
+    busy_account_ids, processing_by_platform = _load_busy_transfer_slots(session)
+    saturated_platforms = [
+        platform
+        for platform, processing_count in processing_by_platform.items()
+        if 0 < get_pan_transfer_platform_parallelism(platform) <= processing_count
+    ]
+    query = (
         session.query(PanTransferBatchItem)
         .join(PanTransferBatch, PanTransferBatch.id == PanTransferBatchItem.batch_id)
         .filter(
@@ -167,7 +326,18 @@ def claim_next_pan_transfer_batch_item(session: Session, *, worker_name: str) ->
                 ),
             ),
         )
-        .order_by(
+    )
+    if busy_account_ids:
+        query = query.filter(
+            or_(
+                PanTransferBatchItem.target_account_id.is_(None),
+                PanTransferBatchItem.target_account_id.notin_(sorted(busy_account_ids)),
+            )
+        )
+    if saturated_platforms:
+        query = query.filter(PanTransferBatchItem.platform.notin_(saturated_platforms))
+    candidate = (
+        query.order_by(
             case((PanTransferBatchItem.transfer_status == PAN_TRANSFER_ITEM_STATUS_QUEUED, 0), else_=1),
             PanTransferBatch.created_at.asc(),
             PanTransferBatchItem.created_at.asc(),
@@ -179,6 +349,7 @@ def claim_next_pan_transfer_batch_item(session: Session, *, worker_name: str) ->
     if candidate is None:
         return None
 
+    previous_status = str(candidate.transfer_status or "")
     candidate.transfer_status = PAN_TRANSFER_ITEM_STATUS_PROCESSING
     candidate.locked_by = str(worker_name or "tg-worker")[:128]
     candidate.locked_at = now
@@ -187,7 +358,7 @@ def claim_next_pan_transfer_batch_item(session: Session, *, worker_name: str) ->
     candidate.error_message = None
     session.add(candidate)
     session.flush()
-    refresh_pan_transfer_batch_summary(session, batch_id=int(candidate.batch_id))
+    record_pan_transfer_item_transition(session, item=candidate, previous_status=previous_status)
     return candidate
 
 
@@ -197,6 +368,7 @@ def mark_pan_transfer_item_success(
     item: PanTransferBatchItem,
 ) -> None:
     now = utcnow()
+    previous_status = str(item.transfer_status or "")
     item.transfer_status = PAN_TRANSFER_ITEM_STATUS_COMPLETED
     item.attempt_count = max(1, int(item.attempt_count or 0) + 1)
     item.next_retry_at = None
@@ -205,7 +377,7 @@ def mark_pan_transfer_item_success(
     item.finished_at = now
     session.add(item)
     session.flush()
-    refresh_pan_transfer_batch_summary(session, batch_id=int(item.batch_id))
+    record_pan_transfer_item_transition(session, item=item, previous_status=previous_status)
 
 
 def mark_pan_transfer_item_error(
@@ -220,6 +392,7 @@ def mark_pan_transfer_item_error(
     now = utcnow()
     batch = session.get(PanTransferBatch, int(item.batch_id))
     batch_cancelled = batch is not None and str(batch.status or "") == PAN_TRANSFER_BATCH_STATUS_CANCELLED
+    previous_status = str(item.transfer_status or "")
     retry_delay = int(batch.retry_delay_seconds or retry_delay_seconds or DEFAULT_PAN_TRANSFER_RETRY_DELAY_SECONDS) if batch is not None else int(retry_delay_seconds or DEFAULT_PAN_TRANSFER_RETRY_DELAY_SECONDS)
     item.attempt_count = max(1, int(item.attempt_count or 0) + 1)
     item.error_message = str(error_message or "Pan transfer execution failed").strip()[:2000]
@@ -240,7 +413,7 @@ def mark_pan_transfer_item_error(
         item.next_retry_at = None
     session.add(item)
     session.flush()
-    refresh_pan_transfer_batch_summary(session, batch_id=int(item.batch_id))
+    record_pan_transfer_item_transition(session, item=item, previous_status=previous_status)
 
 
 def reset_pan_transfer_batch_items(
@@ -278,5 +451,46 @@ def reset_pan_transfer_batch_items(
         row.updated_at = now
         session.add(row)
     session.flush()
-    refresh_pan_transfer_batch_summary(session, batch_id=int(batch_id))
+    refresh_pan_transfer_batch_summary(session, batch_id=int(batch_id), recount=True)
     return len(rows)
+
+
+def reconcile_pan_transfer_batch_summaries(session: Session, *, worker_name: str) -> dict[str, Any]:
+    """Recount active and recently finished batches and repair counter drift.
+
+    Counter rows are locked before the recount so in-flight transitions
+    either committed already or apply their deltas on top of the result.
+    """
+    del worker_name
+    ensure_runtime_storage_tables()
+    finished_after = utcnow() - timedelta(hours=PAN_TRANSFER_BATCH_RECONCILE_FINISHED_HOURS)
+    batch_ids = [
+        int(batch_id)
+        for (batch_id,) in session.query(PanTransferBatch.id)
+        .filter(
+            or_(
+                PanTransferBatch.status.in_([PAN_TRANSFER_BATCH_STATUS_DRAFT, PAN_TRANSFER_BATCH_STATUS_RUNNING]),
+                PanTransferBatch.finished_at >= finished_after,
+            )
+        )
+        .order_by(PanTransferBatch.id.asc())
+        .all()
+    ]
+    repaired_batch_ids: list[int] = []
+    for batch_id in batch_ids:
+        stored = _load_batch_status_counts(session, batch_id=batch_id, for_update=True)
+        actual = _count_batch_items_by_status(session, [batch_id])[batch_id]
+        stored_nonzero = {status: total for status, total in (stored or {}).items() if total}
+        if stored_nonzero != actual:
+            if stored is not None:
+                logger.warning(
+                    "Pan transfer batch %s counters drifted: stored=%s actual=%s",
+                    batch_id,
+                    stored_nonzero,
+                    actual,
+                )
+            refresh_pan_transfer_batch_summary(session, batch_id=batch_id, recount=True)
+            repaired_batch_ids.append(batch_id)
+        # Release this batch's counter locks before moving on.
+        session.commit()
+    return {"checked_batches": len(batch_ids), "repaired_batch_ids": repaired_batch_ids}
@@ -23,6 +23,7 @@ from app.services.resource_ops.catalog import (
     _refresh_link_target_daily_stats,
     flatten_message_links,
 )
+from app.services.response_cache_versions import bump_response_cache_version
 
 from .common import utcnow
 
@@ -369,6 +370,8 @@ def replace_link_target_references_with_url(
     )
     _merge_recognition_task(session, old_target_id=int(old_target.id), new_target_id=int(new_target.id))
     _refresh_link_target_daily_stats(session, [int(old_target.id), int(new_target.id)])
+    if affected_message_count:
+        bump_response_cache_version(session)
     return {
         "old_link_target_id": int(old_target.id),
         "new_link_target_id": int(new_target.id),
@@ -445,6 +448,7 @@ def rewrite_message_link_ref_with_url(
         .update({"link_target_id": int(new_target.id)}, synchronize_session=False)
     )
     _refresh_link_target_daily_stats(session, [int(old_target.id), int(new_target.id)])
+    bump_response_cache_version(session)
     return {
         **base_result,
         "affected_message_count": 1,
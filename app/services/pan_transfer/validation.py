@@ -5,6 +5,7 @@ from typing import Any
 from sqlalchemy.orm import Session
 
 from app.models.models import PanTransferAccount
+from app.services.link_check.engine import run_on_link_check_engine
 from app.services.link_check.validator import LinkValidator
 
 from .common import utcnow
@@ -87,7 +88,7 @@ async def validate_pan_transfer_account(
 
 async def validate_share_url(url: str) -> dict[str, Any]:
     validator = LinkValidator()
-    result = await validator.check_single_link(url)
+    result = await run_on_link_check_engine(validator.check_single_link(url))
     is_valid = result.get("is_valid")
     if is_valid is True:
         status = "valid"
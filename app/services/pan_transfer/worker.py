@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 from typing import Any
 
 from sqlalchemy.orm import Session
@@ -28,6 +27,7 @@ from .constants import (
     PAN_TRANSFER_VALIDATION_STATUS_INVALID,
     PAN_TRANSFER_VALIDATION_STATUS_PENDING,
 )
+from .event_loop import run_worker_coroutine
 from .execution_logs import append_pan_transfer_execution_log
 from .providers import decrypt_account_credential, get_pan_transfer_provider
 from .providers.base import PanTransferProviderError
@@ -769,8 +769,11 @@ def process_next_pan_transfer_item(session: Session, *, worker_name: str) -> boo
 
     previous_expire_on_commit = session.expire_on_commit
     session.expire_on_commit = False
+    # Publish the claim and release the claim lock so other slots can pick
+    # up items of other accounts while this one runs.
+    _commit_before_external_call(session)
     try:
-        asyncio.run(_process_pan_transfer_item_async(session, item=item, worker_name=worker_name))
+        run_worker_coroutine(_process_pan_transfer_item_async(session, item=item, worker_name=worker_name))
         mark_pan_transfer_item_success(session, item=item)
         try:
             from .follow_sync import handle_follow_sync_item_success
@@ -3,14 +3,18 @@ from __future__ import annotations
 import json
 import logging
 import re
-import urllib.error
-import urllib.request
 from dataclasses import dataclass, field
 from typing import Any
 
 from sqlalchemy.orm import Session
 
 from app.services.ai_center import execute_text_route
+from app.services.ai_center.transport import (
+    AiTransportConnectionError,
+    AiTransportError,
+    AiTransportHttpError,
+    get_ai_transport,
+)
 from app.services.resource_ops.settings import RESOURCE_OPS_AI_API_MODES, resolve_resource_ops_ai_request_config
 
 
@@ -149,6 +153,14 @@ def _extract_plain_title(raw_text: str) -> str:
     return _normalize_text(title, max_length=255)
 
 
+def _translate_transport_error(exc: AiTransportError) -> ResourceOpsAiError:
+    if isinstance(exc, AiTransportHttpError):
+        return ResourceOpsAiError(f"AI 请求失败: {exc.status} {exc.detail}")
+    if isinstance(exc, AiTransportConnectionError):
+        return ResourceOpsAiError(f"AI 连接失败: {exc.reason}")
+    return ResourceOpsAiError(f"AI 请求失败: {exc}")
+
+
 def _http_request_json(
     method: str,
     url: str,
@@ -157,37 +169,11 @@ def _http_request_json(
     payload: dict[str, Any] | None = None,
     timeout: int = 18,
 ) -> dict[str, Any]:
-    data = None
-    headers = {
-        "Accept": "application/json",
-        "User-Agent": "TGMonitor/1.0",
-    }
-    if api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-    if payload is not None:
-        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-        headers["Content-Type"] = "application/json"
-
-    request = urllib.request.Request(url=url, data=data, headers=headers, method=method.upper())
+    transport = get_ai_transport()
     try:
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            charset = response.headers.get_content_charset() or "utf-8"
-            body = response.read().decode(charset, errors="replace")
-    except urllib.error.HTTPError as exc:
-        raw_body = exc.read().decode("utf-8", errors="replace")
-        detail = raw_body
-        try:
-            parsed = json.loads(raw_body)
-            detail = (
-                _normalize_text(parsed.get("error", {}).get("message"))
-                or _normalize_text(parsed.get("message"))
-                or raw_body
-            )
-        except Exception:
-            detail = raw_body or str(exc)
-        raise ResourceOpsAiError(f"AI 请求失败: {exc.code} {detail}") from exc
-    except urllib.error.URLError as exc:
-        raise ResourceOpsAiError(f"AI 连接失败: {exc.reason}") from exc
+        body = transport.run(transport.request_text(method, url, api_key=api_key, payload=payload, timeout=timeout))
+    except AiTransportError as exc:
+        raise _translate_transport_error(exc) from exc
 
     try:
         parsed = json.loads(body)
@@ -205,53 +191,11 @@ def _http_request_sse(
     payload: dict[str, Any],
     timeout: int = 30,
 ) -> list[str]:
-    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    headers = {
-        "Accept": "text/event-stream",
-        "Content-Type": "application/json",
-        "User-Agent": "TGMonitor/1.0",
-    }
-    if api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-
-    request = urllib.request.Request(url=url, data=data, headers=headers, method="POST")
+    transport = get_ai_transport()
     try:
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            charset = response.headers.get_content_charset() or "utf-8"
-            chunks: list[str] = []
-            current_lines: list[str] = []
-            for raw_line in response:
-                line = raw_line.decode(charset, errors="replace").rstrip("\r\n")
-                if not line:
-                    if current_lines:
-                        chunk = _extract_sse_data_block(current_lines)
-                        if chunk is not None:
-                            chunks.append(chunk)
-                        current_lines = []
-                    continue
-                if line.startswith(":"):
-                    continue
-                current_lines.append(line)
-            if current_lines:
-                chunk = _extract_sse_data_block(current_lines)
-                if chunk is not None:
-                    chunks.append(chunk)
-    except urllib.error.HTTPError as exc:
-        raw_body = exc.read().decode("utf-8", errors="replace")
-        detail = raw_body
-        try:
-            parsed = json.loads(raw_body)
-            detail = (
-                _normalize_text(parsed.get("error", {}).get("message"))
-                or _normalize_text(parsed.get("message"))
-                or raw_body
-            )
-        except Exception:
-            detail = raw_body or str(exc)
-        raise ResourceOpsAiError(f"AI 请求失败: {exc.code} {detail}") from exc
-    except urllib.error.URLError as exc:
-        raise ResourceOpsAiError(f"AI 连接失败: {exc.reason}") from exc
-    return chunks
+        return transport.run(transport.request_sse(url, api_key=api_key, payload=payload, timeout=timeout))
+    except AiTransportError as exc:
+        raise _translate_transport_error(exc) from exc
 
 
 def _merge_text_parts(parts: list[str]) -> str:
@@ -259,16 +203,6 @@ def _merge_text_parts(parts: list[str]) -> str:
     return "\n".join(normalized_parts).strip()
 
 
-def _extract_sse_data_block(lines: list[str]) -> str | None:
-    data_lines: list[str] = []
-    for line in lines:
-        if line.startswith("data:"):
-            data_lines.append(line[5:].lstrip())
-    if not data_lines:
-        return None
-    return "\n".join(data_lines).strip()
-
-
 def _extract_choice_metadata(choice: dict[str, Any]) -> dict[str, str]:
     finish_reason = _normalize_text(choice.get("finish_reason"), max_length=64) or "-"
     native_finish_reason = _normalize_text(choice.get("native_finish_reason"), max_length=64) or "-"
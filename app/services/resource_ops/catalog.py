@@ -14,6 +14,7 @@ from app.models.models import (
     LinkClickEvent,
     LinkTarget,
     LinkTargetDailyStat,
+    LinkTargetHealth,
     Message,
     MessageLinkRef,
     PanTransferBatchItem,
@@ -544,6 +545,11 @@ def _purge_orphan_link_targets(session: Session, target_ids: Iterable[int]) -> N
         .filter(LinkTargetDailyStat.link_target_id.in_(orphan_target_ids))
         .delete(synchronize_session=False)
     )
+    (
+        session.query(LinkTargetHealth)
+        .filter(LinkTargetHealth.link_target_id.in_(orphan_target_ids))
+        .delete(synchronize_session=False)
+    )
     (
         session.query(ResourceCandidateLog)
         .filter(ResourceCandidateLog.link_target_id.in_(orphan_target_ids))
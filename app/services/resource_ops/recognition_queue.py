@@ -7,6 +7,7 @@ from sqlalchemy import and_, case, func, or_
 from sqlalchemy.orm import Session
 
 from app.models.models import ResourceRecognitionTask, ResourceWorkBinding, ensure_runtime_storage_tables
+from app.services.worker_notifications import WORKER_QUEUE_RECOGNITION, notify_worker_queue
 
 
 TASK_STATUS_QUEUED = "queued"
@@ -153,6 +154,8 @@ def enqueue_recognition_tasks(
         accepted_count += 1
 
     session.flush()
+    if accepted_count:
+        notify_worker_queue(session, WORKER_QUEUE_RECOGNITION)
     return {
         "requested_count": len(normalized_ids),
         "accepted_count": accepted_count,
@@ -219,7 +222,6 @@ def recycle_stale_processing_tasks(session: Session, *, stale_seconds: int = STA
 def claim_next_recognition_task(session: Session, *, worker_name: str) -> ResourceRecognitionTask | None:
     ensure_runtime_storage_tables()
     now = _utcnow()
-    recycle_stale_processing_tasks(session)
     candidate = (
         session.query(ResourceRecognitionTask)
         .filter(
@@ -331,4 +333,5 @@ def reset_failed_recognition_tasks(
         reset_count += 1
     if reset_count:
         session.flush()
+        notify_worker_queue(session, WORKER_QUEUE_RECOGNITION)
     return reset_count
@@ -19,8 +19,8 @@ from app.services.resource_ops.recognition_service import (
 )
 from app.services.resource_ops.settings import (
     get_resource_ops_runtime_config,
-    update_resource_ops_runtime_meta,
-    update_resource_ops_worker_state,
+    record_resource_ops_runtime_meta,
+    record_resource_ops_worker_state,
 )
 
 
@@ -47,39 +47,36 @@ def _should_run_cleanup(config: dict[str, Any]) -> bool:
 
 
 def _set_worker_idle(
-    session: Session,
     *,
     worker_name: str,
     last_error: str | None = None,
     log_line: str | None = None,
+    processed: bool = False,
 ) -> None:
     now = _utcnow()
-    update_resource_ops_worker_state(
-        session,
-        {
-            "worker_state": "idle",
-            "worker_finished_at": now,
-            "worker_last_heartbeat_at": now,
-            "worker_current_link_target_id": None,
-            "worker_current_title": "",
-            "worker_current_source": "",
-            "worker_last_error": last_error or "",
-            "log_line": log_line,
-        },
-        updated_by=worker_name,
-    )
+    payload: dict[str, Any] = {
+        "worker_state": "idle",
+        "worker_finished_at": now,
+        "worker_last_heartbeat_at": now,
+        "worker_current_link_target_id": None,
+        "worker_current_title": "",
+        "worker_current_source": "",
+        "worker_last_error": last_error or "",
+        "log_line": log_line,
+    }
+    if processed:
+        payload["worker_last_processed_at"] = now
+    record_resource_ops_worker_state(payload, updated_by=worker_name)
 
 
 def _set_worker_running(
-    session: Session,
     *,
     worker_name: str,
     link_target_id: int,
     source: str,
 ) -> None:
     now = _utcnow()
-    update_resource_ops_worker_state(
-        session,
+    record_resource_ops_worker_state(
         {
             "worker_state": "running",
             "worker_started_at": now,
@@ -108,11 +105,10 @@ def process_next_recognition_task(session: Session, *, worker_name: str) -> bool
 
     task = claim_next_recognition_task(session, worker_name=worker_name)
     if task is None:
-        _set_worker_idle(session, worker_name=worker_name, last_error=None)
+        _set_worker_idle(worker_name=worker_name, last_error=None)
         return False
 
     _set_worker_running(
-        session,
         worker_name=worker_name,
         link_target_id=int(task.link_target_id),
         source=str(task.source or "manual"),
@@ -138,8 +134,7 @@ def process_next_recognition_task(session: Session, *, worker_name: str) -> bool
                 recognized_title=str(recognized_title or "").strip() or None,
             )
             binding_summary = get_work_binding_summary(session)
-            update_resource_ops_runtime_meta(
-                session,
+            record_resource_ops_runtime_meta(
                 last_sync_summary={
                     "processed_count": 1,
                     "matched_count": 1 if result_status == "matched" else 0,
@@ -151,21 +146,13 @@ def process_next_recognition_task(session: Session, *, worker_name: str) -> bool
                 },
                 updated_by=worker_name,
             )
-            update_resource_ops_worker_state(
-                session,
-                {
-                    "worker_last_processed_at": _utcnow(),
-                },
-                updated_by=worker_name,
-            )
-            _set_worker_idle(session, worker_name=worker_name, last_error=None, log_line=log_line)
+            _set_worker_idle(worker_name=worker_name, last_error=None, log_line=log_line, processed=True)
             return True
 
         error_message = str(result.get("reason") or "AI recognition failed")
         mark_recognition_task_error(session, task=task, error_message=error_message)
         binding_summary = get_work_binding_summary(session)
-        update_resource_ops_runtime_meta(
-            session,
+        record_resource_ops_runtime_meta(
             last_sync_summary={
                 "processed_count": 1,
                 "matched_count": 0,
@@ -176,14 +163,7 @@ def process_next_recognition_task(session: Session, *, worker_name: str) -> bool
             },
             updated_by=worker_name,
         )
-        update_resource_ops_worker_state(
-            session,
-            {
-                "worker_last_processed_at": _utcnow(),
-            },
-            updated_by=worker_name,
-        )
-        _set_worker_idle(session, worker_name=worker_name, last_error=error_message, log_line=log_line)
+        _set_worker_idle(worker_name=worker_name, last_error=error_message, log_line=log_line, processed=True)
         return True
     except Exception as exc:
         error_message = str(exc)
@@ -191,17 +171,10 @@ def process_next_recognition_task(session: Session, *, worker_name: str) -> bool
         task_for_error = session.get(type(task), task_id)
         if task_for_error is not None:
             mark_recognition_task_error(session, task=task_for_error, error_message=error_message)
-        update_resource_ops_worker_state(
-            session,
-            {
-                "worker_last_processed_at": _utcnow(),
-            },
-            updated_by=worker_name,
-        )
         _set_worker_idle(
-            session,
             worker_name=worker_name,
             last_error=error_message,
             log_line=f"[ERR] link_target:{task_link_target_id} -> {error_message}",
+            processed=True,
         )
         return True
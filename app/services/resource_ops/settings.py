@@ -6,7 +6,7 @@ from typing import Any
 
 from sqlalchemy.orm import Session
 
-from app.models.models import SystemSettings, ensure_runtime_storage_tables
+from app.models.models import SystemSettings, engine, ensure_runtime_storage_tables
 from app.services.secret_codec import decrypt_secret
 from app.services.system_config_service import (
     SYSTEM_SETTINGS_SINGLETON_ID,
@@ -461,6 +461,46 @@ def update_resource_ops_worker_state(
     return get_resource_ops_runtime_settings(session)
 
 
+def _lock_system_settings_record(session: Session) -> SystemSettings:
+    record = session.get(
+        SystemSettings,
+        SYSTEM_SETTINGS_SINGLETON_ID,
+        with_for_update=True,
+        populate_existing=True,
+    )
+    return record if record is not None else _ensure_system_settings_record(session)
+
+
+def record_resource_ops_worker_state(payload: dict[str, Any], *, updated_by: str | None = None) -> None:
+    """Apply ``update_resource_ops_worker_state`` in its own short transaction.
+
+    Recognition slots report state while their task transaction is still
+    open; writing the shared settings row there would hold its lock until
+    the task commits and serialize every slot and instance behind it.
+    """
+    with Session(engine) as session:
+        _lock_system_settings_record(session)
+        update_resource_ops_worker_state(session, payload, updated_by=updated_by)
+        session.commit()
+
+
+def record_resource_ops_runtime_meta(
+    *,
+    last_sync_summary: dict[str, Any] | None = None,
+    last_cleanup_summary: dict[str, Any] | None = None,
+    updated_by: str | None = None,
+) -> None:
+    with Session(engine) as session:
+        _lock_system_settings_record(session)
+        update_resource_ops_runtime_meta(
+            session,
+            last_sync_summary=last_sync_summary,
+            last_cleanup_summary=last_cleanup_summary,
+            updated_by=updated_by,
+        )
+        session.commit()
+
+
 def append_resource_ops_runtime_log(
     session: Session,
     *,
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.models import ResponseCacheVersion, ensure_runtime_storage_tables
+
+
+RESPONSE_CACHE_SCOPE_MESSAGES = "messages"
+
+_local_listeners_lock = threading.Lock()
+_local_listeners: list[Callable[[str], None]] = []
+
+
+def register_response_cache_listener(listener: Callable[[str], None]) -> None:
+    """Let an in-process cache drop entries as soon as this process bumps a scope."""
+    with _local_listeners_lock:
+        if listener not in _local_listeners:
+            _local_listeners.append(listener)
+
+
+def bump_response_cache_version(session: Session, scope: str = RESPONSE_CACHE_SCOPE_MESSAGES) -> None:
+    # Other processes notice the new version on their next probe; listeners in
+    # this process are told right away.
+    ensure_runtime_storage_tables()
+    stmt = pg_insert(ResponseCacheVersion.__table__).values(scope=scope, version=1)
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["scope"],
+            set_={
+                "version": ResponseCacheVersion.version + 1,
+                "updated_at": func.now(),
+            },
+        )
+    )
+    with _local_listeners_lock:
+        listeners = list(_local_listeners)
+    for listener in listeners:
+        listener(scope)
+
+
+def load_response_cache_versions(session: Session) -> dict[str, int]:
+    ensure_runtime_storage_tables()
+    rows = session.query(ResponseCacheVersion.scope, ResponseCacheVersion.version).all()
+    return {str(scope): int(version or 0) for scope, version in rows}
@@ -8,12 +8,26 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, text as sql_text
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Tuple
-from app.models.models import Message, DedupStats
+from app.models.models import Message, DedupStats, MessageHourlyNetdiskStat, MessageHourlyStat
+from app.services.message_hourly_stats_service import floor_to_hour
+from app.services.message_link_columns import compute_message_link_columns
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _count_pending_links(db: Session) -> int:
+    """累计尚未回填 link_count 的消息链接数（回填完成后为空查询）"""
+    total = 0
+    rows = db.query(Message.links).filter(
+        Message.link_count.is_(None),
+        Message.links.isnot(None)
+    ).yield_per(300)
+    for (msg_links,) in rows:
+        total += compute_message_link_columns(msg_links).link_count
+    return total
+
+
 def get_statistics_overview(db: Session) -> Dict[str, int]:
     """
     获取总体统计信息（优化版本，使用SQL聚合）
@@ -38,41 +52,11 @@ def get_statistics_overview(db: Session) -> Dict[str, int]:
             Message.timestamp >= today_start
         ).scalar() or 0
         
-        # 总链接数（使用SQL聚合，不加载数据）
-        # 优化：使用 jsonb_object_keys 函数计算JSONB对象的键数量
-        try:
-            # 方法1：使用 jsonb_object_keys 计算每个消息的链接数，然后求和
-            total_links_result = db.execute(sql_text("""
-                SELECT COALESCE(SUM(
-                    (SELECT COUNT(*) FROM jsonb_object_keys(links::jsonb))
-                ), 0) as total
-                FROM messages
-                WHERE links IS NOT NULL
-            """)).scalar()
-            
-            if total_links_result is None:
-                total_links_result = 0
-        except Exception:
-            # 如果上面的方法失败，使用更兼容的方法
-            try:
-                # 方法2：使用子查询
-                total_links_result = db.execute(sql_text("""
-                    SELECT COALESCE(SUM(
-                        jsonb_array_length(jsonb_object_keys(links::jsonb)::text[])
-                    ), 0)
-                    FROM messages
-                    WHERE links IS NOT NULL
-                """)).scalar() or 0
-            except Exception:
-                # 方法3：最安全的方法，但需要遍历（只获取links字段，不加载整个消息）
-                total_links = 0
-                messages_with_links = db.query(Message.links).filter(
-                    Message.links.isnot(None)
-                ).all()
-                for (msg_links,) in messages_with_links:
-                    if isinstance(msg_links, dict):
-                        total_links += len(msg_links)
-                total_links_result = total_links
+        # 总链接数：读取入库时写好的 link_count，只有尚未回填的旧消息才现场计算
+        total_links_result = db.query(
+            func.coalesce(func.sum(Message.link_count), 0)
+        ).filter(Message.link_count > 0).scalar() or 0
+        total_links_result += _count_pending_links(db)
         
         return {
             "total_messages": total,
@@ -104,60 +88,24 @@ def get_daily_trend(db: Session, days: int = 10) -> List[Dict[str, Any]]:
         每日趋势列表，每个元素包含 date, messages, links
     """
     try:
-        # 使用SQL聚合，按日期分组
-        result = db.execute(sql_text("""
-            SELECT 
-                DATE(timestamp) as date,
-                COUNT(*) as message_count,
-                COALESCE(SUM(
-                    CASE 
-                        WHEN links IS NOT NULL AND jsonb_typeof(links::jsonb) = 'object'
-                            THEN (SELECT COUNT(*) FROM jsonb_object_keys(links::jsonb))
-                        ELSE 0
-                    END
-                ), 0) as link_count
-            FROM messages
-            WHERE timestamp >= NOW() - INTERVAL '1 day' * :days
-            GROUP BY DATE(timestamp)
-            ORDER BY date DESC
-            LIMIT :days
-        """), {"days": days}).all()
-        
-        # 如果上面的查询不工作，使用更简单的方法
-        if not result:
-            # 使用更兼容的查询
-            result = db.execute(sql_text("""
-                SELECT 
-                    DATE(timestamp) as date,
-                    COUNT(*) as message_count,
-                    0 as link_count
-                FROM messages
-                WHERE timestamp >= NOW() - INTERVAL '1 day' * :days
-                GROUP BY DATE(timestamp)
-                ORDER BY date DESC
-                LIMIT :days
-            """), {"days": days}).all()
-            
-            # 单独计算链接数（但只对每天的消息进行查询，不加载所有数据）
-            for row in result:
-                date = row.date
-                next_date = date + timedelta(days=1)
-                link_count = db.query(func.count(Message.id)).filter(
-                    Message.timestamp >= datetime.combine(date, datetime.min.time()),
-                    Message.timestamp < datetime.combine(next_date, datetime.min.time()),
-                    Message.links.isnot(None)
-                ).scalar() or 0
-                # 这里简化处理，假设每条消息平均1个链接
-                # 如果需要精确值，可以进一步优化
-                row.link_count = link_count
+        # 读取小时汇总表，按日期合并
+        since_hour = floor_to_hour(datetime.now() - timedelta(days=days))
+        stat_date = func.date(MessageHourlyStat.stat_hour)
+        result = db.query(
+            stat_date.label("date"),
+            func.sum(MessageHourlyStat.message_count).label("message_count"),
+            func.sum(MessageHourlyStat.link_count).label("link_count"),
+        ).filter(
+            MessageHourlyStat.stat_hour >= since_hour
+        ).group_by(stat_date).all()
         
         # 转换为字典列表
         trend_data = []
         for row in result:
             trend_data.append({
                 "date": row.date.strftime("%m-%d") if hasattr(row.date, 'strftime') else str(row.date),
-                "messages": row.message_count,
-                "links": int(row.link_count) if row.link_count else 0
+                "messages": int(row.message_count or 0),
+                "links": int(row.link_count or 0)
             })
         
         # 确保返回10天的数据（如果不足则补0）
@@ -272,26 +220,19 @@ def get_netdisk_distribution(db: Session, hours: int = 24) -> List[Dict[str, Any
         网盘分布列表，每个元素包含 netdisk_name, link_count, percentage
     """
     try:
-        result = db.execute(sql_text("""
-            SELECT 
-                netdisk_name,
-                COUNT(*) as link_count
-            FROM (
-                SELECT 
-                    jsonb_array_elements_text(netdisk_types) as netdisk_name
-                FROM messages 
-                WHERE timestamp >= NOW() - INTERVAL ':hours hours'
-                  AND netdisk_types IS NOT NULL
-            ) t
-            GROUP BY netdisk_name
-            ORDER BY link_count DESC
-        """), {"hours": hours}).all()
+        since_hour = floor_to_hour(datetime.now() - timedelta(hours=hours))
+        result = db.query(
+            MessageHourlyNetdiskStat.netdisk_name.label("netdisk_name"),
+            func.sum(MessageHourlyNetdiskStat.link_count).label("link_count"),
+        ).filter(
+            MessageHourlyNetdiskStat.stat_hour >= since_hour
+        ).group_by(MessageHourlyNetdiskStat.netdisk_name).all()
         
         if not result:
             return []
         
         # 计算总数和百分比
-        total = sum(row.link_count for row in result)
+        total = sum(int(row.link_count or 0) for row in result)
         
         # 品牌名映射（兼容 web.py）
         brand_map = {
@@ -312,7 +253,7 @@ def get_netdisk_distribution(db: Session, hours: int = 24) -> List[Dict[str, Any
             brand = brand_map.get(row.netdisk_name, row.netdisk_name)
             if brand not in brand_stats:
                 brand_stats[brand] = 0
-            brand_stats[brand] += row.link_count
+            brand_stats[brand] += int(row.link_count or 0)
         
         # 重新计算总数（按品牌）
         total_by_brand = sum(brand_stats.values())
@@ -350,30 +291,18 @@ def get_activity_heatmap(db: Session, days: int = 7) -> Dict[str, Any]:
         start_date = today - timedelta(days=days - 1)
         start_time = datetime.combine(start_date, datetime.min.time())
 
-        result = db.execute(
-            sql_text(
-                """
-                SELECT
-                    DATE(timestamp) AS date,
-                    EXTRACT(HOUR FROM timestamp) AS hour,
-                    COUNT(*) AS message_count
-                FROM messages
-                WHERE timestamp >= :start_time
-                GROUP BY DATE(timestamp), EXTRACT(HOUR FROM timestamp)
-                ORDER BY DATE(timestamp), EXTRACT(HOUR FROM timestamp)
-                """
-            ),
-            {"start_time": start_time},
-        ).all()
+        result = (
+            db.query(MessageHourlyStat.stat_hour, MessageHourlyStat.message_count)
+            .filter(MessageHourlyStat.stat_hour >= start_time)
+            .all()
+        )
 
         dates = [(start_date + timedelta(days=i)).isoformat() for i in range(days)]
         hours = list(range(24))
 
         count_map: Dict[Tuple[str, int], int] = {}
         for row in result:
-            row_date = row.date.isoformat() if hasattr(row.date, "isoformat") else str(row.date)
-            row_hour = int(row.hour)
-            count_map[(row_date, row_hour)] = int(row.message_count or 0)
+            count_map[(row.stat_hour.date().isoformat(), row.stat_hour.hour)] = int(row.message_count or 0)
 
         cells: List[Dict[str, Any]] = []
         max_count = 0
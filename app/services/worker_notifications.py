@@ -0,0 +1,109 @@
+"""PostgreSQL NOTIFY wakeups for the worker queues."""
+
+from __future__ import annotations
+
+import logging
+import select
+import threading
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.models import engine
+
+
+logger = logging.getLogger(__name__)
+
+WORKER_NOTIFY_CHANNEL = "tg_worker_queue"
+WORKER_QUEUE_RECOGNITION = "recognition"
+WORKER_QUEUE_TRANSFER = "transfer"
+WORKER_QUEUE_FOLLOW_TASK = "follow_task"
+WORKER_QUEUE_PUBLISH_RULE = "publish_rule"
+WORKER_QUEUE_ALL = "*"
+
+LISTEN_POLL_SECONDS = 5.0
+LISTEN_RETRY_SECONDS = 5.0
+
+
+def notify_worker_queue(session: Session, queue: str) -> None:
+    """Wake workers draining ``queue`` once the current transaction commits.
+
+    PostgreSQL holds the notification until commit and drops it on rollback,
+    and identical notifications in one transaction are folded into one.
+    """
+    session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": WORKER_NOTIFY_CHANNEL, "payload": str(queue)},
+    )
+
+
+class WorkerQueueListener:
+    """Background ``LISTEN`` on a dedicated connection that forwards payloads.
+
+    After every (re)connect ``on_notify`` is called with ``WORKER_QUEUE_ALL``
+    so that work enqueued while the listener was down is picked up.
+    """
+
+    def __init__(self, on_notify: Callable[[str], None], *, channel: str = WORKER_NOTIFY_CHANNEL) -> None:
+        self._on_notify = on_notify
+        self._channel = channel
+        self._stop_event = threading.Event()
+        self._connected = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="worker-queue-listener")
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop_event.set()
+        thread = self._thread
+        self._thread = None
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=timeout)
+
+    def _loop(self) -> None:
+        while not self._stop_event.is_set():
+            raw_connection = None
+            try:
+                raw_connection = engine.raw_connection()
+                # Keep the LISTEN session out of the pool for its whole life.
+                raw_connection.detach()
+                connection = raw_connection.driver_connection
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self._channel}")
+                self._connected.set()
+                logger.info("Worker queue listener subscribed to %s", self._channel)
+                self._on_notify(WORKER_QUEUE_ALL)
+                self._listen(connection)
+            except Exception:
+                logger.exception("Worker queue listener failed, reconnecting in %s seconds", LISTEN_RETRY_SECONDS)
+            finally:
+                self._connected.clear()
+                if raw_connection is not None:
+                    try:
+                        raw_connection.close()
+                    except Exception:
+                        logger.debug("Failed to close worker queue listener connection", exc_info=True)
+            self._stop_event.wait(LISTEN_RETRY_SECONDS)
+
+    def _listen(self, connection) -> None:  # type: ignore[no-untyped-def]
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([connection], [], [], LISTEN_POLL_SECONDS)
+            if not readable:
+                continue
+            connection.poll()
+            payloads = set()
+            while connection.notifies:
+                payloads.add(str(connection.notifies.pop(0).payload or WORKER_QUEUE_ALL))
+            for payload in payloads:
+                self._on_notify(payload)
@@ -1,163 +1,277 @@
 from __future__ import annotations
 
 import logging
+import os
 import signal
+import socket
+import threading
 import time
+from dataclasses import dataclass, field
 from threading import Event
+from typing import Callable, Dict, List, Optional
 
-from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from app.core.metrics import MetricsRegistry, start_metrics_http_server
+from app.models.config import settings
 from app.models.models import engine, ensure_runtime_storage_tables
-from app.services.link_check_scheduler import start_link_check_scheduler, stop_link_check_scheduler
+from app.services.link_check.engine import stop_link_check_engine
 from app.services.pan_transfer import (
     process_next_pan_transfer_follow_task,
     process_next_pan_transfer_item,
     process_next_pan_transfer_publish_rule,
 )
-from app.services.pan_transfer.maintenance import run_pan_transfer_log_retention_if_due
-from app.services.resource_ops.recognition_worker import (
-    process_next_recognition_task,
-    run_resource_ops_maintenance_if_due,
-)
+from app.services.pan_transfer.event_loop import close_worker_event_loop
+from app.services.resource_ops.recognition_worker import process_next_recognition_task
 from app.services.resource_ops.settings import update_resource_ops_worker_state
+from app.services.worker_notifications import WORKER_QUEUE_ALL, WorkerQueueListener
+from app.worker.scheduler import start_worker_scheduler, stop_worker_scheduler
 
 
 logger = logging.getLogger(__name__)
 
 WORKER_NAME = "tg-worker"
-WORKER_LOCK_KEY = 42025092
 IDLE_SLEEP_SECONDS = 3
+# Idle fallback poll while NOTIFY wakeups are live; still needed for rows
+# that only become due with time (retry waits, follow checks, publish rules).
+NOTIFY_IDLE_SLEEP_SECONDS = 15
 BUSY_SLEEP_SECONDS = 0.2
-LOCK_WAIT_SECONDS = 5
+LANE_JOIN_TIMEOUT_SECONDS = 10
 
 _stop_event = Event()
 
+worker_metrics = MetricsRegistry()
+_job_seconds = worker_metrics.histogram(
+    "tg_worker_job_seconds",
+    "Wall time of one worker job iteration.",
+    ("job", "processed"),
+)
+_job_failures = worker_metrics.counter(
+    "tg_worker_job_failures",
+    "Worker job iterations that raised.",
+    ("job",),
+)
+
+
+@dataclass(slots=True)
+class WorkerLane:
+    """One queue drained by ``concurrency`` independent slot threads.
+
+    Handlers claim their next row with ``FOR UPDATE SKIP LOCKED`` and mark
+    it as in progress (publish rules hold a transaction advisory lock
+    instead), so slots of this and other worker instances never pick up the
+    same work.
+    """
+
+    name: str
+    handler: Callable[..., bool]
+    concurrency: int
+    failure_message: str
+    on_failure: Optional[Callable[[Session, str], None]] = None
+    wakeup: threading.Event = field(default_factory=threading.Event)
+
+
+def _record_job(job: str, started_at: float, processed: bool) -> None:
+    _job_seconds.observe(time.perf_counter() - started_at, job=job, processed=str(bool(processed)).lower())
+
 
 def _handle_stop_signal(signum, frame) -> None:  # type: ignore[no-untyped-def]
     del signum, frame
     _stop_event.set()
 
 
-def _try_claim_worker_lock(session: Session) -> bool:
-    return bool(
-        session.execute(
-            text("SELECT pg_try_advisory_lock(:lock_key)"),
-            {"lock_key": WORKER_LOCK_KEY},
-        ).scalar()
-    )
+def _instance_name() -> str:
+    return f"{WORKER_NAME}@{socket.gethostname()}:{os.getpid()}"
 
 
-def _release_worker_lock(session: Session) -> None:
-    session.execute(
-        text("SELECT pg_advisory_unlock(:lock_key)"),
-        {"lock_key": WORKER_LOCK_KEY},
+def _lane_concurrency(setting_name: str, default: int = 1) -> int:
+    return max(0, int(getattr(settings, setting_name, default) or 0))
+
+
+def _mark_recognition_failed(session: Session, worker_name: str) -> None:
+    update_resource_ops_worker_state(
+        session,
+        {
+            "worker_state": "idle",
+            "worker_last_error": "worker iteration failed",
+        },
+        updated_by=worker_name,
     )
 
 
+def build_worker_lanes() -> List[WorkerLane]:
+    return [
+        WorkerLane(
+            name="recognition",
+            handler=process_next_recognition_task,
+            concurrency=_lane_concurrency("WORKER_RECOGNITION_CONCURRENCY"),
+            failure_message="resource worker iteration failed",
+            on_failure=_mark_recognition_failed,
+        ),
+        WorkerLane(
+            name="transfer",
+            handler=process_next_pan_transfer_item,
+            concurrency=_lane_concurrency("WORKER_TRANSFER_CONCURRENCY"),
+            failure_message="pan transfer worker iteration failed",
+        ),
+        WorkerLane(
+            name="follow_task",
+            handler=process_next_pan_transfer_follow_task,
+            concurrency=_lane_concurrency("WORKER_FOLLOW_TASK_CONCURRENCY"),
+            failure_message="pan transfer follow-task worker iteration failed",
+        ),
+        WorkerLane(
+            name="publish_rule",
+            handler=process_next_pan_transfer_publish_rule,
+            # Publish-rule scans are serialized by an advisory lock, so extra slots would only idle.
+            concurrency=1,
+            failure_message="pan transfer publish-rule worker iteration failed",
+        ),
+    ]
+
+
+def _run_lane_once(lane: WorkerLane, worker_name: str) -> bool:
+    started_at = time.perf_counter()
+    processed = False
+    with Session(engine) as session:
+        try:
+            processed = bool(lane.handler(session, worker_name=worker_name))
+            session.commit()
+        except Exception:
+            session.rollback()
+            _job_failures.inc(job=lane.name)
+            logger.exception(lane.failure_message)
+            processed = False
+            if lane.on_failure is not None:
+                try:
+                    lane.on_failure(session, worker_name)
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    logger.exception("failed to record %s lane failure", lane.name)
+    _record_job(lane.name, started_at, processed)
+    return processed
+
+
+def _idle_sleep_seconds(listener: WorkerQueueListener | None) -> float:
+    if listener is not None and listener.connected:
+        return float(getattr(settings, "WORKER_IDLE_POLL_SECONDS", NOTIFY_IDLE_SLEEP_SECONDS) or NOTIFY_IDLE_SLEEP_SECONDS)
+    return IDLE_SLEEP_SECONDS
+
+
+def _run_lane_slot(lane: WorkerLane, worker_name: str, listener: WorkerQueueListener | None) -> None:
+    try:
+        while not _stop_event.is_set():
+            # Cleared before the claim so a NOTIFY that lands mid-iteration is
+            # not lost; the idle wait below then returns immediately.
+            lane.wakeup.clear()
+            try:
+                processed = _run_lane_once(lane, worker_name)
+            except Exception:
+                # Session setup itself failed, e.g. the database is unreachable.
+                logger.exception("%s lane crashed before next retry", lane.name)
+                processed = False
+            if processed:
+                if _stop_event.wait(BUSY_SLEEP_SECONDS):
+                    break
+                continue
+            lane.wakeup.wait(_idle_sleep_seconds(listener))
+    finally:
+        # Transfer handlers keep an event loop and account sessions per slot.
+        close_worker_event_loop()
+
+
+def _build_wakeup_dispatcher(lanes: List[WorkerLane]) -> Callable[[str], None]:
+    lanes_by_name: Dict[str, WorkerLane] = {lane.name: lane for lane in lanes}
+
+    def dispatch(queue: str) -> None:
+        if queue == WORKER_QUEUE_ALL:
+            for lane in lanes:
+                lane.wakeup.set()
+            return
+        lane = lanes_by_name.get(queue)
+        if lane is not None:
+            lane.wakeup.set()
+
+    return dispatch
+
+
+def start_worker_lanes(
+    lanes: List[WorkerLane],
+    *,
+    listener: WorkerQueueListener | None = None,
+) -> List[threading.Thread]:
+    instance_name = _instance_name()
+    threads: List[threading.Thread] = []
+    for lane in lanes:
+        for slot in range(lane.concurrency):
+            worker_name = f"{instance_name}/{lane.name}-{slot}"[:128]
+            thread = threading.Thread(
+                target=_run_lane_slot,
+                args=(lane, worker_name, listener),
+                daemon=True,
+                name=f"worker-{lane.name}-{slot}",
+            )
+            thread.start()
+            threads.append(thread)
+        logger.info("worker lane %s started with %s slot(s)", lane.name, lane.concurrency)
+    return threads
+
+
+def _reset_resource_worker_state() -> None:
+    try:
+        with Session(engine) as session:
+            update_resource_ops_worker_state(
+                session,
+                {
+                    "worker_state": "idle",
+                    "worker_current_link_target_id": None,
+                    "worker_current_title": "",
+                    "worker_current_source": "",
+                },
+                updated_by=WORKER_NAME,
+            )
+            session.commit()
+    except Exception:
+        logger.exception("failed to reset resource worker state on shutdown")
+
+
 def main() -> None:
     logging.basicConfig(level=logging.INFO)
     signal.signal(signal.SIGINT, _handle_stop_signal)
     signal.signal(signal.SIGTERM, _handle_stop_signal)
     ensure_runtime_storage_tables()
-    start_link_check_scheduler()
+    start_metrics_http_server(
+        worker_metrics,
+        host=str(getattr(settings, "WORKER_METRICS_HOST", "0.0.0.0") or "0.0.0.0"),
+        port=int(getattr(settings, "WORKER_METRICS_PORT", 0) or 0),
+    )
+    start_worker_scheduler()
+
+    lanes = build_worker_lanes()
+    listener: WorkerQueueListener | None = None
+    if bool(getattr(settings, "WORKER_NOTIFY_ENABLED", True)):
+        listener = WorkerQueueListener(_build_wakeup_dispatcher(lanes))
+        listener.start()
 
+    threads: List[threading.Thread] = []
     try:
-        while not _stop_event.is_set():
-            lock_session = Session(engine)
-            has_lock = False
-            try:
-                has_lock = _try_claim_worker_lock(lock_session)
-                if not has_lock:
-                    logger.info("resource worker lock not available, retrying in %s seconds", LOCK_WAIT_SECONDS)
-                    lock_session.close()
-                    if _stop_event.wait(LOCK_WAIT_SECONDS):
-                        break
-                    continue
-
-                logger.info("resource worker started")
-                lock_session.commit()
-                while not _stop_event.is_set():
-                    processed_recognition = False
-                    processed_transfer = False
-                    processed_follow_task = False
-                    processed_publish_rule = False
-                    with Session(engine) as session:
-                        try:
-                            run_resource_ops_maintenance_if_due(session, worker_name=WORKER_NAME)
-                            run_pan_transfer_log_retention_if_due(session, worker_name=WORKER_NAME)
-                            processed_recognition = process_next_recognition_task(session, worker_name=WORKER_NAME)
-                            session.commit()
-                        except Exception:
-                            session.rollback()
-                            logger.exception("resource worker iteration failed")
-                            update_resource_ops_worker_state(
-                                session,
-                                {
-                                    "worker_state": "idle",
-                                    "worker_last_error": "worker iteration failed",
-                                },
-                                updated_by=WORKER_NAME,
-                            )
-                            session.commit()
-                            processed_recognition = False
-
-                    with Session(engine) as session:
-                        try:
-                            processed_transfer = process_next_pan_transfer_item(session, worker_name=WORKER_NAME)
-                            session.commit()
-                        except Exception:
-                            session.rollback()
-                            logger.exception("pan transfer worker iteration failed")
-                            processed_transfer = False
-
-                    with Session(engine) as session:
-                        try:
-                            processed_follow_task = process_next_pan_transfer_follow_task(session, worker_name=WORKER_NAME)
-                            session.commit()
-                        except Exception:
-                            session.rollback()
-                            logger.exception("pan transfer follow-task worker iteration failed")
-                            processed_follow_task = False
-
-                    with Session(engine) as session:
-                        try:
-                            processed_publish_rule = process_next_pan_transfer_publish_rule(session, worker_name=WORKER_NAME)
-                            session.commit()
-                        except Exception:
-                            session.rollback()
-                            logger.exception("pan transfer publish-rule worker iteration failed")
-                            processed_publish_rule = False
-
-                    processed = bool(processed_recognition or processed_transfer or processed_follow_task or processed_publish_rule)
-
-                    if _stop_event.wait(BUSY_SLEEP_SECONDS if processed else IDLE_SLEEP_SECONDS):
-                        break
-            except Exception:
-                logger.exception("resource worker crashed before next retry")
-                time.sleep(LOCK_WAIT_SECONDS)
-            finally:
-                try:
-                    if has_lock:
-                        with Session(engine) as session:
-                            update_resource_ops_worker_state(
-                                session,
-                                {
-                                    "worker_state": "idle",
-                                    "worker_current_link_target_id": None,
-                                    "worker_current_title": "",
-                                    "worker_current_source": "",
-                                },
-                                updated_by=WORKER_NAME,
-                            )
-                            session.commit()
-                        _release_worker_lock(lock_session)
-                        lock_session.commit()
-                except Exception:
-                    logger.exception("failed to release resource worker lock cleanly")
-                lock_session.close()
+        threads = start_worker_lanes(lanes, listener=listener)
+        logger.info("resource worker started as %s", _instance_name())
+        while not _stop_event.wait(1.0):
+            pass
     finally:
-        stop_link_check_scheduler()
+        _stop_event.set()
+        for lane in lanes:
+            lane.wakeup.set()
+        if listener is not None:
+            listener.stop()
+        deadline = time.monotonic() + LANE_JOIN_TIMEOUT_SECONDS
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        _reset_resource_worker_state()
+        stop_worker_scheduler()
+        stop_link_check_engine()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,383 @@
+"""Periodic background jobs, run by whichever worker process holds the leader lease."""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.config import settings
+from app.models.models import engine
+from app.services.backup_service import claim_due_backup_runs
+from app.services.dedup_runtime_service import run_due_scheduled_dedup
+from app.services.link_check_plan_service import claim_due_link_check_plan_runs
+from app.services.message_link_columns import MESSAGE_LINK_BACKFILL_IDLE_SECONDS, run_message_link_backfill
+from app.services.pan_transfer.maintenance import run_pan_transfer_log_retention_if_due
+from app.services.pan_transfer.queue import reconcile_pan_transfer_batch_summaries, recycle_stale_pan_transfer_locks
+from app.services.resource_ops.recognition_queue import recycle_stale_processing_tasks
+from app.services.resource_ops.recognition_worker import run_resource_ops_maintenance_if_due
+from app.services.worker_notifications import (
+    WORKER_QUEUE_RECOGNITION,
+    WORKER_QUEUE_TRANSFER,
+    notify_worker_queue,
+)
+
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LEADER_LOCK_KEY = 42025096
+SCHEDULER_LEASE_NAME = "worker-scheduler"
+SCHEDULER_TICK_SECONDS = 1.0
+SCHEDULER_WORKER_NAME = "tg-worker-scheduler"
+
+
+@dataclass(slots=True)
+class ScheduledJob:
+    name: str
+    interval_seconds: float
+    run: Callable[[], Any]
+    next_run_at: float = 0.0
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_error: str = ""
+    future: Optional[Future] = None
+
+
+def _utc_now() -> datetime:
+    return datetime.utcnow()
+
+
+def _default_holder() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _with_session(func: Callable[..., Any]) -> Callable[[], Any]:
+    def run() -> Any:
+        with Session(engine) as session:
+            try:
+                result = func(session, worker_name=SCHEDULER_WORKER_NAME)
+                session.commit()
+                return result
+            except Exception:
+                session.rollback()
+                raise
+
+    return run
+
+
+def reap_stale_worker_locks(session: Session, *, worker_name: str) -> Dict[str, int]:
+    """Requeue rows whose worker died mid-task; claims no longer do this inline."""
+    del worker_name
+    recycled_transfers = recycle_stale_pan_transfer_locks(session)
+    recycled_recognitions = recycle_stale_processing_tasks(session)
+    if recycled_transfers:
+        notify_worker_queue(session, WORKER_QUEUE_TRANSFER)
+    if recycled_recognitions:
+        notify_worker_queue(session, WORKER_QUEUE_RECOGNITION)
+    if recycled_transfers or recycled_recognitions:
+        logger.info(
+            "Stale lock reaper requeued %s transfer item(s) and %s recognition task(s)",
+            recycled_transfers,
+            recycled_recognitions,
+        )
+    return {"transfer_items": recycled_transfers, "recognition_tasks": recycled_recognitions}
+
+
+def build_default_jobs() -> List[ScheduledJob]:
+    return [
+        ScheduledJob(name="backup", interval_seconds=30, run=claim_due_backup_runs),
+        ScheduledJob(name="dedup", interval_seconds=60, run=run_due_scheduled_dedup),
+        ScheduledJob(name="link_check", interval_seconds=30, run=lambda: claim_due_link_check_plan_runs(limit=1)),
+        ScheduledJob(
+            name="message_link_backfill",
+            interval_seconds=MESSAGE_LINK_BACKFILL_IDLE_SECONDS,
+            run=run_message_link_backfill,
+        ),
+        ScheduledJob(
+            name="resource_ops_maintenance",
+            interval_seconds=60,
+            run=_with_session(run_resource_ops_maintenance_if_due),
+        ),
+        ScheduledJob(
+            name="pan_transfer_log_retention",
+            interval_seconds=60,
+            run=_with_session(run_pan_transfer_log_retention_if_due),
+        ),
+        ScheduledJob(
+            name="stale_lock_reaper",
+            interval_seconds=float(getattr(settings, "WORKER_STALE_LOCK_REAPER_SECONDS", 120) or 120),
+            run=_with_session(reap_stale_worker_locks),
+        ),
+        ScheduledJob(
+            name="pan_transfer_batch_reconcile",
+            interval_seconds=float(getattr(settings, "WORKER_BATCH_RECONCILE_SECONDS", 300) or 300),
+            run=_with_session(reconcile_pan_transfer_batch_summaries),
+        ),
+    ]
+
+
+class WorkerScheduler:
+    """Run periodic jobs in exactly one process across all worker instances.
+
+    Leadership is a session-level advisory lock held on a dedicated
+    connection, so it is released by PostgreSQL as soon as that connection
+    dies. The leader checks on every heartbeat that it still owns the lock and
+    records the heartbeat in ``worker_scheduler_leases`` for operators;
+    standbys retry the lock until the current leader goes away.
+    """
+
+    def __init__(
+        self,
+        jobs: List[ScheduledJob],
+        *,
+        lock_key: int = SCHEDULER_LEADER_LOCK_KEY,
+        lease_name: str = SCHEDULER_LEASE_NAME,
+        holder: str | None = None,
+        heartbeat_seconds: float = 15.0,
+        retry_seconds: float = 10.0,
+    ) -> None:
+        self._jobs = list(jobs)
+        self._lock_key = int(lock_key)
+        self._lease_name = lease_name
+        self._holder = holder or _default_holder()
+        self._heartbeat_seconds = max(1.0, float(heartbeat_seconds))
+        self._retry_seconds = max(1.0, float(retry_seconds))
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock_connection: Connection | None = None
+        self._next_heartbeat_at = 0.0
+        self._leader_since: Optional[datetime] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_connection is not None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(self._jobs)),
+            thread_name_prefix="worker-scheduler-job",
+        )
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="worker-scheduler")
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        thread = self._thread
+        self._thread = None
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=timeout)
+        executor = self._executor
+        self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _loop(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                if not self.is_leader and not self._try_become_leader():
+                    self._stop_event.wait(self._retry_seconds)
+                    continue
+
+                now = time.monotonic()
+                if now >= self._next_heartbeat_at:
+                    if not self._heartbeat():
+                        self._demote(release=False)
+                        continue
+                    self._next_heartbeat_at = now + self._heartbeat_seconds
+
+                self._dispatch_due_jobs(now)
+                self._stop_event.wait(SCHEDULER_TICK_SECONDS)
+        finally:
+            self._demote(release=True)
+
+    def _try_become_leader(self) -> bool:
+        connection: Connection | None = None
+        try:
+            connection = engine.connect()
+            acquired = bool(
+                connection.execute(text("SELECT pg_try_advisory_lock(:lock_key)"), {"lock_key": self._lock_key}).scalar()
+            )
+            connection.commit()
+        except Exception:
+            logger.exception("Worker scheduler failed to contend for leadership")
+            if connection is not None:
+                connection.invalidate()
+                connection.close()
+            return False
+
+        if not acquired:
+            connection.close()
+            return False
+
+        self._lock_connection = connection
+        self._leader_since = _utc_now()
+        self._next_heartbeat_at = 0.0
+        for job in self._jobs:
+            job.next_run_at = 0.0
+        logger.info("Worker scheduler elected leader as %s", self._holder)
+        return True
+
+    def _heartbeat(self) -> bool:
+        connection = self._lock_connection
+        if connection is None:
+            return False
+        try:
+            still_held = bool(
+                connection.execute(
+                    text(
+                        """
+                        SELECT EXISTS (
+                            SELECT 1 FROM pg_locks
+                            WHERE locktype = 'advisory'
+                              AND pid = pg_backend_pid()
+                              AND granted
+                              AND classid = ((CAST(:lock_key AS bigint) >> 32) & 4294967295)::oid
+                              AND objid = (CAST(:lock_key AS bigint) & 4294967295)::oid
+                              AND objsubid = 1
+                        )
+                        """
+                    ),
+                    {"lock_key": self._lock_key},
+                ).scalar()
+            )
+            connection.commit()
+        except Exception:
+            logger.exception("Worker scheduler lost its lock connection")
+            return False
+        if not still_held:
+            logger.warning("Worker scheduler no longer holds the leader lock")
+            return False
+
+        try:
+            with engine.begin() as lease_connection:
+                lease_connection.execute(
+                    text(
+                        """
+                        INSERT INTO worker_scheduler_leases (name, holder, acquired_at, heartbeat_at)
+                        VALUES (:name, :holder, :acquired_at, :now)
+                        ON CONFLICT (name) DO UPDATE
+                        SET holder = EXCLUDED.holder,
+                            acquired_at = EXCLUDED.acquired_at,
+                            heartbeat_at = EXCLUDED.heartbeat_at
+                        """
+                    ),
+                    {
+                        "name": self._lease_name,
+                        "holder": self._holder,
+                        "acquired_at": self._leader_since or _utc_now(),
+                        "now": _utc_now(),
+                    },
+                )
+        except Exception:
+            # The advisory lock is what guarantees a single leader; a missed
+            # lease write only makes the admin view stale.
+            logger.exception("Worker scheduler failed to record its heartbeat")
+        return True
+
+    def _demote(self, *, release: bool) -> None:
+        connection = self._lock_connection
+        self._lock_connection = None
+        self._leader_since = None
+        if connection is None:
+            return
+        try:
+            if release:
+                connection.execute(text("SELECT pg_advisory_unlock(:lock_key)"), {"lock_key": self._lock_key})
+                connection.commit()
+            else:
+                connection.invalidate()
+        except Exception:
+            logger.exception("Worker scheduler failed to release its leader lock cleanly")
+        finally:
+            connection.close()
+        logger.info("Worker scheduler stepped down as leader")
+
+    def _dispatch_due_jobs(self, now: float) -> None:
+        executor = self._executor
+        if executor is None:
+            return
+        for job in self._jobs:
+            if job.next_run_at > now:
+                continue
+            if job.future is not None and not job.future.done():
+                continue
+            job.next_run_at = now + max(1.0, float(job.interval_seconds))
+            job.future = executor.submit(self._run_job, job)
+
+    @staticmethod
+    def _run_job(job: ScheduledJob) -> None:
+        job.last_started_at = _utc_now()
+        try:
+            job.run()
+            job.last_error = ""
+        except Exception as exc:
+            job.last_error = str(exc)
+            logger.exception("Scheduled job %s failed", job.name)
+        finally:
+            job.last_finished_at = _utc_now()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "holder": self._holder,
+            "is_leader": self.is_leader,
+            "leader_since": self._leader_since.isoformat() if self._leader_since else None,
+            "jobs": [
+                {
+                    "name": job.name,
+                    "interval_seconds": job.interval_seconds,
+                    "running": job.future is not None and not job.future.done(),
+                    "last_started_at": job.last_started_at.isoformat() if job.last_started_at else None,
+                    "last_finished_at": job.last_finished_at.isoformat() if job.last_finished_at else None,
+                    "last_error": job.last_error,
+                }
+                for job in self._jobs
+            ],
+        }
+
+
+_scheduler_lock = threading.RLock()
+_scheduler: WorkerScheduler | None = None
+
+
+def start_worker_scheduler() -> WorkerScheduler | None:
+    global _scheduler
+    if not bool(getattr(settings, "WORKER_SCHEDULER_ENABLED", True)):
+        logger.info("Worker scheduler disabled by WORKER_SCHEDULER_ENABLED")
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = WorkerScheduler(
+                build_default_jobs(),
+                heartbeat_seconds=float(getattr(settings, "WORKER_SCHEDULER_HEARTBEAT_SECONDS", 15) or 15),
+                retry_seconds=float(getattr(settings, "WORKER_SCHEDULER_RETRY_SECONDS", 10) or 10),
+            )
+        _scheduler.start()
+        return _scheduler
+
+
+def stop_worker_scheduler() -> None:
+    global _scheduler
+    with _scheduler_lock:
+        scheduler = _scheduler
+        _scheduler = None
+    if scheduler is not None:
+        scheduler.stop()
+
+
+def get_worker_scheduler_state() -> Dict[str, Any] | None:
+    with _scheduler_lock:
+        return _scheduler.snapshot() if _scheduler is not None else None
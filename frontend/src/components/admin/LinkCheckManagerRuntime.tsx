@@ -29,6 +29,7 @@ import {
   DeleteOutlined,
   EditOutlined,
   EyeOutlined,
+  HeartOutlined,
   PlusOutlined,
   PauseCircleOutlined,
   PlayCircleOutlined,
@@ -80,7 +81,7 @@ type DateRangeValue = [Dayjs, Dayjs] | null
 type ManualSelectionMode = 'smart_count' | 'time_range'
 type TraversalOrder = 'newest_first' | 'oldest_first'
 type CleanupMode = 'none' | 'remove_invalid_links' | 'delete_message_if_empty'
-type PlanMode = 'backfill' | 'frontier'
+type PlanMode = 'backfill' | 'frontier' | 'health'
 type InvalidLinkDetail = LinkCheckTaskResult['details'][number]
 
 type ManualDraft = {
@@ -172,6 +173,7 @@ const cleanupModeLabelMap: Record<CleanupMode, string> = {
 const planModeLabelMap: Record<PlanMode, string> = {
   backfill: '补库巡检',
   frontier: '追新巡检',
+  health: '健康巡检',
 }
 
 const resultStatusLabelMap: Record<string, string> = {
@@ -213,6 +215,12 @@ const planModeChoiceOptions: Array<{
     title: '追新巡检',
     description: '最新优先，适合回看最新消息并快速追新。',
   },
+  {
+    value: 'health',
+    icon: <HeartOutlined />,
+    title: '健康巡检',
+    description: '按链接健康度排期，热门链接勤查，失效链接逐步退避。',
+  },
 ]
 
 const createDefaultManualDraft = (): ManualDraft => ({
@@ -306,7 +314,7 @@ const buildPlanPayload = (draft: PlanDraft): LinkCheckPlanUpdate => ({
   batch_link_target: draft.batch_link_target,
   max_batches_per_run: draft.max_batches_per_run,
   max_concurrent: draft.max_concurrent,
-  traversal_order: draft.plan_mode === 'frontier' ? 'newest_first' : 'oldest_first',
+  traversal_order: draft.plan_mode === 'backfill' ? 'oldest_first' : 'newest_first',
   overlap_message_count: draft.overlap_message_count,
   cleanup_mode: draft.cleanup_mode,
   cleanup_min_consecutive_invalid_runs: draft.cleanup_min_consecutive_invalid_runs,
@@ -315,10 +323,10 @@ const buildPlanPayload = (draft: PlanDraft): LinkCheckPlanUpdate => ({
 const serializePlanDraft = (draft: PlanDraft) => JSON.stringify(buildPlanPayload(draft))
 
 const buildPlanCreatePayload = (planMode: PlanMode): LinkCheckPlanCreate => {
-  if (planMode === 'frontier') {
+  if (planMode === 'frontier' || planMode === 'health') {
     return {
-      name: planModeLabelMap.frontier,
-      plan_mode: 'frontier',
+      name: planModeLabelMap[planMode],
+      plan_mode: planMode,
       is_enabled: false,
       schedule_hour: 3,
       schedule_minute: 0,
@@ -1672,13 +1680,14 @@ const LinkCheckManagerRuntime = () => {
                         />
                       </div>
                       <div className="link-check-runtime-field">
-                        {createFieldLabel('计划类型', '补库偏向旧消息补扫，追新偏向最新消息回看。')}
+                        {createFieldLabel('计划类型', '补库偏向旧消息补扫，追新偏向最新消息回看，健康巡检按链接到期时间排期。')}
                         <Select
                           className="link-check-runtime-compact-control"
                           value={planDraft.plan_mode}
                           options={[
                             { value: 'backfill', label: planModeLabelMap.backfill },
                             { value: 'frontier', label: planModeLabelMap.frontier },
+                            { value: 'health', label: planModeLabelMap.health },
                           ]}
                           onChange={(value) =>
                             setPlanDraft((current) => (current ? { ...current, plan_mode: value as PlanMode } : current))
@@ -341,6 +341,16 @@ const AiCenterAdminRuntime = () => {
         value: String(overview?.recent_failure_count_24h || 0),
         hint: '最近失败调用次数',
       },
+      {
+        label: '熔断',
+        value: `${overview?.open_circuit_count || 0}/${overview?.half_open_circuit_count || 0}`,
+        hint: overview?.circuits?.length
+          ? overview.circuits
+              .slice(0, 3)
+              .map((item) => `${item.provider_label || item.provider_id} / ${item.model_id || 'auto'}`)
+              .join('、')
+          : '熔断中 / 半开探测，当前全部正常',
+      },
     ],
     [overview, routes.length]
   )
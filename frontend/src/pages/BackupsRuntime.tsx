@@ -93,6 +93,8 @@ const defaults = (): FormValues => ({
   include_runtime_data: true,
   export_range_kind: 'days',
   export_range_days: 7,
+  export_file_format: 'xlsx',
+  incremental_full_every: 7,
 })
 
 const label = (title: string, hint: string) => (
@@ -126,7 +128,7 @@ const fmtTime = (value?: string | null) => {
   const parsed = parseBackendDateTime(value)
   return parsed ? parsed.format('YYYY-MM-DD HH:mm:ss') : '-'
 }
-const fmtMode = (value?: string | null) => (value === 'media_export' ? '影视导出' : '完整备份')
+const fmtMode = (value?: string | null) => (value === 'media_export' ? '影视导出' : value === 'incremental' ? '增量备份' : '完整备份')
 const fmtKind = (value: BackupTarget['target_kind']) => (value === 'webdav' ? 'WebDAV' : '本地目录')
 const fmtSize = (value?: number | null) => {
   if (!value || value <= 0) return '-'
@@ -172,8 +174,9 @@ const toFormValues = (target: BackupTarget): FormValues => ({
   clear_webdav_password: false,
 })
 
-const buildContent = (values: Pick<FormValues, 'backup_mode' | 'export_range_kind' | 'export_range_days' | 'include_runtime_data' | 'include_env_file'>) => {
+const buildContent = (values: Pick<FormValues, 'backup_mode' | 'export_range_kind' | 'export_range_days' | 'include_runtime_data' | 'include_env_file' | 'incremental_full_every'>) => {
   if (values.backup_mode === 'media_export') return values.export_range_kind === 'days' ? `最近 ${values.export_range_days || '-'} 天影视数据` : '全部影视数据'
+  if (values.backup_mode === 'incremental') return `每 ${values.incremental_full_every || 7} 次做一次完整基线，其余只导出变更行`
   return ['数据库快照', values.include_runtime_data ? '站点运行数据' : '', values.include_env_file ? '.env' : ''].filter(Boolean).join(' + ')
 }
 
@@ -184,6 +187,7 @@ const buildTargetContent = (target: BackupTarget) =>
     export_range_days: target.export_range_days,
     include_runtime_data: target.include_runtime_data,
     include_env_file: target.include_env_file,
+    incremental_full_every: target.incremental_full_every,
   })
 
 const issues = (values: FormValues) => {
@@ -491,7 +495,8 @@ export default function BackupsRuntime() {
                   <button type="button" className={`backup-runtime-choice-card ${current.target_kind === 'local' ? 'is-active' : ''}`} onClick={() => setValues({ target_kind: 'local', provider: 'local' })}><FolderOpenOutlined className="backup-runtime-choice-icon" /><span className="backup-runtime-choice-title">本地目录</span><span className="backup-runtime-choice-description">直接写入服务器目录，适合快速落盘。</span></button>
                   <button type="button" className={`backup-runtime-choice-card ${current.target_kind === 'webdav' ? 'is-active' : ''}`} onClick={() => setValues({ target_kind: 'webdav', provider: current.provider === 'local' ? 'generic_webdav' : current.provider })}><CloudUploadOutlined className="backup-runtime-choice-icon" /><span className="backup-runtime-choice-title">WebDAV</span><span className="backup-runtime-choice-description">上传到 NAS、坚果云或其他兼容 WebDAV 的远端。</span></button>
                   <button type="button" className={`backup-runtime-choice-card ${current.backup_mode === 'full' ? 'is-active' : ''}`} onClick={() => setValues({ backup_mode: 'full' })}><DatabaseOutlined className="backup-runtime-choice-icon" /><span className="backup-runtime-choice-title">完整备份</span><span className="backup-runtime-choice-description">固定包含数据库快照，可附带运行数据和 .env。</span></button>
-                  <button type="button" className={`backup-runtime-choice-card ${current.backup_mode === 'media_export' ? 'is-active' : ''}`} onClick={() => setValues({ backup_mode: 'media_export', export_range_days: current.export_range_days || 7 })}><FileExcelOutlined className="backup-runtime-choice-icon" /><span className="backup-runtime-choice-title">影视数据导出</span><span className="backup-runtime-choice-description">导出 Excel，只保留影视信息和网盘链接。</span></button>
+                  <button type="button" className={`backup-runtime-choice-card ${current.backup_mode === 'incremental' ? 'is-active' : ''}`} onClick={() => setValues({ backup_mode: 'incremental', incremental_full_every: current.incremental_full_every || 7 })}><DatabaseOutlined className="backup-runtime-choice-icon" /><span className="backup-runtime-choice-title">增量备份</span><span className="backup-runtime-choice-description">定期做完整基线，其余只导出上次成功后变更的数据行。</span></button>
+                  <button type="button" className={`backup-runtime-choice-card ${current.backup_mode === 'media_export' ? 'is-active' : ''}`} onClick={() => setValues({ backup_mode: 'media_export', export_range_days: current.export_range_days || 7 })}><FileExcelOutlined className="backup-runtime-choice-icon" /><span className="backup-runtime-choice-title">影视数据导出</span><span className="backup-runtime-choice-description">导出 Excel 或 CSV，只保留影视信息和网盘链接。</span></button>
                 </div>
               </section>
 
@@ -516,9 +521,10 @@ export default function BackupsRuntime() {
 
               <section className="backup-runtime-panel">
                 <div className="backup-runtime-section-head">{label('备份内容', '完整备份固定包含数据库快照，附加项只保留真正需要选择的内容。')}</div>
-                {current.backup_mode === 'full' ? (
+                {current.backup_mode !== 'media_export' ? (
                   <>
-                    <div className="backup-runtime-base-note"><DatabaseOutlined /><span>基础内容始终包含数据库快照。</span></div>
+                    <div className="backup-runtime-base-note"><DatabaseOutlined /><span>{current.backup_mode === 'incremental' ? '基线包含数据库快照，增量只包含变更行；恢复时用 scripts/restore_backup_chain.py 依次回放。' : '基础内容始终包含数据库快照。'}</span></div>
+                    {current.backup_mode === 'incremental' ? <div className="backup-runtime-field-card">{label('基线间隔', '每隔多少次运行做一次完整基线，链越短恢复越快。')}<Form.Item name="incremental_full_every" noStyle><InputNumber min={1} max={365} style={{ width: '100%' }} /></Form.Item></div> : null}
                     <div className="backup-runtime-grid backup-runtime-grid--two">
                       <div className="backup-runtime-switch-card"><div className="backup-runtime-switch-copy">{label('站点运行数据', '会打包 data/，并自动排除 data/backups。')}</div><Switch checked={current.include_runtime_data} onChange={(checked) => setValues({ include_runtime_data: checked })} /></div>
                       <div className="backup-runtime-switch-card"><div className="backup-runtime-switch-copy">{label('.env 文件', '只在确实需要保留环境变量时开启。')}</div><Switch checked={current.include_env_file} onChange={(checked) => setValues({ include_env_file: checked })} /></div>
@@ -547,6 +553,16 @@ export default function BackupsRuntime() {
                           <span className="backup-runtime-export-text">天</span>
                         </>
                       ) : null}
+                      <Form.Item name="export_file_format" noStyle>
+                        <Select
+                          className="backup-runtime-export-select"
+                          options={[
+                            { label: 'Excel (.xlsx)', value: 'xlsx' },
+                            { label: 'CSV (.csv)', value: 'csv' },
+                          ]}
+                          onChange={(value) => setValues({ export_file_format: value })}
+                        />
+                      </Form.Item>
                     </div>
                   </div>
                 )}
@@ -620,7 +620,7 @@ export interface LinkCheckPlanOverview {
   summary: string
   next_run_at?: string | null
   last_run_at?: string | null
-  plan_mode?: 'backfill' | 'frontier' | string | null
+  plan_mode?: 'backfill' | 'frontier' | 'health' | string | null
   schedule_priority: number
   cursor_message_id?: number | null
   window_lower_message_id?: number | null
@@ -637,7 +637,7 @@ export interface LinkCheckPlanOverview {
 
 export interface LinkCheckPlanUpdate {
   name?: string | null
-  plan_mode: 'backfill' | 'frontier'
+  plan_mode: 'backfill' | 'frontier' | 'health'
   is_enabled: boolean
   schedule_hour: number
   schedule_minute: number
@@ -658,7 +658,7 @@ export interface LinkCheckPlanCreate extends LinkCheckPlanUpdate {}
 export interface LinkCheckPlanResponse {
   id: number
   name: string
-  plan_mode: 'backfill' | 'frontier'
+  plan_mode: 'backfill' | 'frontier' | 'health'
   is_enabled: boolean
   schedule_hour: number
   schedule_minute: number
@@ -1,3 +1,22 @@
+export interface AiCenterCircuitItem {
+  provider_id: number
+  provider_label?: string | null
+  model_id?: string | null
+  state: string
+  window_call_count: number
+  window_failure_count: number
+  window_slow_count: number
+  failure_rate: number
+  consecutive_failures: number
+  trip_count: number
+  ewma_latency_ms?: number | null
+  last_latency_ms?: number | null
+  opened_at?: string | null
+  retry_at?: string | null
+  last_error_message?: string | null
+  updated_at?: string | null
+}
+
 export interface AiCenterOverviewResponse {
   total_providers: number
   enabled_providers: number
@@ -8,6 +27,9 @@ export interface AiCenterOverviewResponse {
   recent_success_count_24h: number
   recent_failure_count_24h: number
   legacy_migration_applied: boolean
+  open_circuit_count: number
+  half_open_circuit_count: number
+  circuits: AiCenterCircuitItem[]
   generated_at: string
 }
 
@@ -68,6 +90,7 @@ export interface AiCenterProviderItem {
   timeout_seconds: number
   max_retries: number
   cooldown_seconds: number
+  max_concurrency: number
   cooldown_until?: string | null
   health_status: string
   consecutive_failures: number
@@ -104,6 +127,7 @@ export interface AiCenterProviderUpsertRequest {
   timeout_seconds: number
   max_retries: number
   cooldown_seconds: number
+  max_concurrency?: number | null
   extra_json?: Record<string, any>
   models?: AiCenterProviderModelUpsertRequest[]
 }
@@ -151,6 +175,8 @@ export interface AiCenterRouteItem {
   preferred_capabilities: string[]
   allow_same_provider_model_failover: boolean
   allow_cross_provider_failover: boolean
+  hedge_enabled: boolean
+  hedge_delay_ms: number
   updated_by?: string | null
   extra_json: Record<string, any>
   steps: AiCenterRouteStepItem[]
@@ -190,6 +216,8 @@ export interface AiCenterRouteUpsertRequest {
   preferred_capabilities: string[]
   allow_same_provider_model_failover: boolean
   allow_cross_provider_failover: boolean
+  hedge_enabled?: boolean
+  hedge_delay_ms?: number
   extra_json?: Record<string, any>
   steps: AiCenterRouteStepUpsertRequest[]
 }
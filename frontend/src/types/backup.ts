@@ -1,7 +1,8 @@
 export type BackupTargetKind = 'local' | 'webdav'
-export type BackupMode = 'full' | 'media_export'
+export type BackupMode = 'full' | 'incremental' | 'media_export'
 export type BackupScheduleKind = 'manual' | 'daily' | 'weekly' | 'monthly'
 export type BackupExportRangeKind = 'all' | 'days'
+export type BackupExportFileFormat = 'xlsx' | 'csv'
 
 export interface BackupTargetPayload {
   name: string
@@ -30,6 +31,8 @@ export interface BackupTargetPayload {
   include_runtime_data: boolean
   export_range_kind: BackupExportRangeKind
   export_range_days?: number | null
+  export_file_format: BackupExportFileFormat
+  incremental_full_every: number
 }
 
 export interface BackupTarget extends Omit<BackupTargetPayload, 'webdav_password' | 'clear_webdav_password'> {
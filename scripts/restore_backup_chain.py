@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+备份链恢复脚本
+先用 pg_restore 恢复完整基线备份，再按顺序回放增量备份
+用法: python scripts/restore_backup_chain.py --yes 基线.zip 增量1.zip 增量2.zip ...
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.services.backup_service import restore_backup_chain  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="恢复完整备份并回放增量备份链")
+    parser.add_argument("archives", nargs="+", help="基线完整备份在前，增量备份按时间顺序排列")
+    parser.add_argument("--yes", action="store_true", help="确认覆盖 DATABASE_URL 指向的数据库")
+    args = parser.parse_args()
+
+    if not args.yes:
+        print("❌ 恢复会覆盖当前数据库，请确认后加 --yes 重新执行")
+        return 1
+
+    result = restore_backup_chain(args.archives)
+    print("✅ 恢复完成")
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())